@@ -19,12 +19,22 @@ import pandas as pd
 import locale
 import numpy as np
 import re
-import unicodedata
 import json
 from PIL import Image, ImageTk 
 import sys # Adicionado para resource_path
 import os  # Adicionado para resource_path
 
+from pontoknup1028 import (
+    armazenamento, banco_horas, cache, calculos, calendario, config as config_core, diagnostico, edicao, escalas,
+    esquema, exibicao, exportacao, filtros, historico, mesclagem, tarefas, totais
+)
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_AREA, COL_DATA, COL_SEMANA,
+    COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA,
+    COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_HORAS_NORMAIS,
+    COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA, COL_NOTA, COL_BANCO_HORAS
+)
+
 # Definir o padrão de localização para português do Brasil
 try:
     locale.setlocale(locale.LC_TIME, "pt_BR.UTF-8")
@@ -33,26 +43,33 @@ except locale.Error:
     print("Locale pt_BR.UTF-8 não encontrado. Usando locale padrão.")
 
 
-# --- CONSTANTES PARA NOMES DE COLUNAS ---
-COL_ID = "ID"
-COL_NOME = "Nome"
-COL_AREA = "Área"
-COL_DATA = "Data"
-COL_SEMANA = "Semana"
-COL_ENTRADA = "Entrada"
-COL_SAIDA_ALMOCO = "Saída-Almoço"
-COL_VOLTA_ALMOCO = "Volta-Almoço"
-COL_SAIDA = "Saída"
-COL_HORAS_DEVIDAS = "Horas Devidas"
-COL_HORAS_EXTRAS = "Horas Extras"
-COL_HORAS_NORMAIS = "Horas Normais"
-COL_SALARIO_BASE = "Salário Base"
-COL_VALOR_HORA_EXTRA = "Valor Hora Extra"
-COL_NOTA = "Nota"
-
 # Variável global para o DataFrame
 df = pd.DataFrame()
 
+# Estado da tabela paginada: rótulos (em `df`) das linhas em exibição e quantas já foram inseridas no Treeview
+TAMANHO_PAGINA_TABELA = 200
+LIMIAR_NOVA_PAGINA = 0.9  # Fração rolada que dispara a próxima página
+_tabela_rotulos = pd.Index([])
+_tabela_inseridas = 0
+
+# Índice de busca dos filtros (recriado sob demanda após carga/edição/exclusão)
+ATRASO_FILTRO_MS = 250  # Espera após a última tecla antes de filtrar
+indice_busca = None
+_filtro_agendado = None
+
+# Resumo de totais já calculado (descartado quando as linhas mudam)
+resumo_totais = None
+
+# Desfazer/refazer das edições e exclusões (esvaziado ao trocar de planilha)
+historico_edicoes = historico.Historico()
+
+# Escala de trabalho (jornada por ID ou Área), lida de `app_preferencias["arquivo_escalas"]`
+escala_trabalho = None
+
+# Operação longa em andamento (carregar, salvar, totais) numa thread de trabalho
+INTERVALO_TAREFA_MS = 100  # Intervalo de leitura da fila de progresso
+tarefa_atual = None
+
 # --- CONFIGURAÇÕES DO APLICATIVO ---
 def resource_path(relative_path):
     """
@@ -73,17 +90,12 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 CONFIG_FILE = resource_path("config.json")
-app_config = {
-    "horas_normais_h": 8.8,
-    "multiplicador_hora_extra": 1.5
-}
+DIAGNOSTICO_LOG_FILE = resource_path("diagnostico.jsonl")
+BANCO_FILE = resource_path("ponto.sqlite3")
+app_config = config_core.nova_config()
+app_preferencias = dict(config_core.PREFERENCIAS_PADRAO)
 
-OMISSAO_VALS = ["omissão", "omissao", "nan", ""]
-ERRO_FORMATO = "INV_FORMATO"
-ERRO_SEQUENCIA = "INV_SEQ"
-HORA_ZERO = "00:00"
-
-# --- FUNÇÕES CORE (Lógica do Aplicativo - sem grandes alterações visuais aqui) ---
+# --- FUNÇÕES DA INTERFACE (a lógica de cálculo fica no pacote pontoknup1028) ---
 
 def load_config():
 
@@ -94,17 +106,14 @@ def load_config():
     usa as configurações padrão e tenta salvar um novo arquivo de configuração.
 
     Side Effects:
-        Modifica a variável global `app_config`.
+        Modifica as variáveis globais `app_config` e `app_preferencias`.
         Pode chamar `save_config()` se o arquivo de configuração não existir ou for inválido.
         Imprime mensagens no console sobre o status do carregamento.
     """
     global app_config
     try:
-        with open(CONFIG_FILE, "r") as f:
-            loaded_config = json.load(f)
-            for key, value in loaded_config.items():
-                if key in app_config:
-                    app_config[key] = value
+        app_config.update(config_core.ler_config(CONFIG_FILE))
+        app_preferencias.update(config_core.ler_preferencias(CONFIG_FILE))
         print("Configurações carregadas com sucesso.")
     except FileNotFoundError:
         print("Arquivo de configuração não encontrado. Usando configurações padrão.")
@@ -116,9 +125,30 @@ def load_config():
         print(f"Erro inesperado ao carregar configurações: {e}. Usando configurações padrão.")
         save_config()
 
+def carregar_escala_preferida():
+    """
+    Lê a escala de trabalho lembrada em `app_preferencias["arquivo_escalas"]`.
+
+    Um arquivo ausente ou inválido não impede a abertura do aplicativo: a
+    escala fica desligada (jornada única) e o motivo é mostrado no console.
+
+    Side Effects:
+        Modifica a variável global `escala_trabalho`.
+    """
+    global escala_trabalho
+    escala_trabalho = None
+    caminho = app_preferencias["arquivo_escalas"]
+    if not caminho:
+        return
+    try:
+        escala_trabalho = escalas.ler_escalas(caminho)
+        print(f"Escala de trabalho carregada: {caminho}")
+    except (OSError, ValueError) as e:
+        print(f"Escala de trabalho não carregada ({e}). Usando a jornada única.")
+
 def save_config():
     """
-    Salva as configurações atuais da variável global `app_config` em um arquivo JSON.
+    Salva as configurações atuais (`app_config` e `app_preferencias`) em um arquivo JSON.
 
     Exibe uma caixa de mensagem de erro se o salvamento falhar.
 
@@ -127,8 +157,7 @@ def save_config():
         Imprime mensagens no console sobre o status do salvamento.
     """
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(app_config, f, indent=4)
+        config_core.salvar_config({**app_config, **app_preferencias}, CONFIG_FILE)
         print("Configurações salvas com sucesso.")
     except Exception as e:
         messagebox.showerror("Erro ao Salvar Configurações", f"Não foi possível salvar as configurações:\n{e}")
@@ -138,289 +167,301 @@ def update_button_states():
     Atualiza o estado (habilitado/desabilitado) dos botões da interface
     com base no estado atual da aplicação (DataFrame carregado, seleção na tabela).
 
+    Enquanto uma operação longa está em andamento, todos os botões que leem
+    ou alteram `df` ficam desabilitados.
+
     Side Effects:
-        Modifica o atributo 'state' de vários botões da UI (btn_salvar,
-        btn_excluir_id, btn_calcular_totais, btn_editar, btn_remover_fds).
+        Modifica o atributo 'state' de vários botões da UI (btn_selecionar, btn_abrir_banco,
+        btn_salvar, btn_config, btn_excluir_id, btn_editar_massa, btn_fds_feriados, btn_calcular_totais,
+        btn_editar, btn_remover_fds, btn_desfazer, btn_refazer).
     """
+    if tarefa_atual is not None:
+        for botao in (btn_selecionar, btn_abrir_banco, btn_salvar, btn_config, btn_excluir_id, btn_editar_massa,
+                      btn_fds_feriados, btn_calcular_totais, btn_editar, btn_remover_fds, btn_desfazer, btn_refazer):
+            botao.config(state="disabled")
+        return
+    btn_selecionar.config(state="normal")
+    btn_abrir_banco.config(state="normal" if app_preferencias["banco_local"] else "disabled")
+    btn_config.config(state="normal")
+    btn_desfazer.config(state="normal" if historico_edicoes.pode_desfazer() else "disabled")
+    btn_refazer.config(state="normal" if historico_edicoes.pode_refazer() else "disabled")
+
     if df.empty:
         btn_salvar.config(state="disabled")
         btn_excluir_id.config(state="disabled")
+        btn_editar_massa.config(state="disabled")
+        btn_fds_feriados.config(state="disabled")
         btn_calcular_totais.config(state="disabled")
         # Os botões de edição dependem da seleção na tabela, tratados em on_treeview_select
     else:
         btn_salvar.config(state="normal")
         btn_excluir_id.config(state="normal")
+        btn_editar_massa.config(state="normal")
+        btn_fds_feriados.config(state="normal")
         btn_calcular_totais.config(state="normal")
 
-    # Estado dos botões de edição/seleção
-    if tabela.selection():
-        btn_editar.config(state="normal")
-        btn_remover_fds.config(state="normal")
-    else:
-        btn_editar.config(state="disabled")
-        btn_remover_fds.config(state="disabled")
+    # Estado dos botões de edição/seleção (editar célula vale para uma única linha)
+    selecionadas = len(tabela.selection())
+    btn_editar.config(state="normal" if selecionadas == 1 else "disabled")
+    btn_remover_fds.config(state="normal" if selecionadas else "disabled")
+
+
+def iniciar_tarefa(descricao, funcao, args, ao_concluir, ao_falhar):
+    """
+    Executa uma operação longa numa thread de trabalho, mostrando a barra de progresso.
+
+    A interface continua respondendo: a fila de eventos da tarefa é lida a cada
+    INTERVALO_TAREFA_MS por `root.after`, e os callbacks rodam na thread do Tk.
+
+    Args:
+        descricao (str): Texto exibido ao lado da barra de progresso.
+        funcao (callable): Operação; recebe `*args` e o argumento nomeado `progresso`.
+        args (tuple): Argumentos posicionais da operação.
+        ao_concluir (callable): Chamado com o resultado quando a operação termina.
+        ao_falhar (callable): Chamado com a exceção se a operação falhar.
+    Side Effects:
+        Modifica a variável global `tarefa_atual`.
+        Mostra `frame_progresso` e desabilita os botões via `update_button_states()`.
+    """
+    global tarefa_atual
+    tarefa_atual = tarefas.Tarefa(funcao, *args).iniciar()
+    lbl_progresso.config(text=f"{descricao}...")
+    barra_progresso.config(mode="indeterminate", value=0)
+    barra_progresso.start(15)
+    btn_cancelar_tarefa.config(state="normal")
+    frame_progresso.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+    update_button_states()
+    root.after(INTERVALO_TAREFA_MS, _acompanhar_tarefa, descricao, ao_concluir, ao_falhar)
+
+
+def _acompanhar_tarefa(descricao, ao_concluir, ao_falhar):
+    """
+    Consome os eventos da tarefa atual: atualiza o progresso ou encerra a tarefa.
+
+    Args:
+        descricao (str): Texto da operação (ver `iniciar_tarefa`).
+        ao_concluir (callable): Callback de sucesso.
+        ao_falhar (callable): Callback de erro.
+    """
+    global tarefa_atual
+    for evento in tarefa_atual.eventos_pendentes():
+        tipo = evento[0]
+        if tipo == tarefas.EVENTO_PROGRESSO:
+            _, feito, total = evento
+            if not tarefa_atual.cancelamento_pedido:
+                if total:
+                    barra_progresso.stop()
+                    barra_progresso.config(mode="determinate", value=min(100, 100 * feito / total))
+                    lbl_progresso.config(text=f"{descricao}: {feito:n} de {total:n} linhas")
+                else:
+                    lbl_progresso.config(text=f"{descricao}: {feito:n} linhas")
+            continue
+
+        tarefa_atual = None
+        barra_progresso.stop()
+        frame_progresso.pack_forget()
+        update_button_states()
+        if tipo == tarefas.EVENTO_CONCLUIDA:
+            ao_concluir(evento[1])
+        elif tipo == tarefas.EVENTO_ERRO:
+            ao_falhar(evento[1])
+        else:
+            lbl_status.config(text=f"ℹ️ {descricao}: operação cancelada.", foreground="orange")
+        return
+    root.after(INTERVALO_TAREFA_MS, _acompanhar_tarefa, descricao, ao_concluir, ao_falhar)
+
+
+def cancelar_tarefa():
+    """
+    Pede o cancelamento da operação em andamento; ela para no próximo bloco de linhas.
+
+    Side Effects:
+        Desabilita `btn_cancelar_tarefa` e atualiza `lbl_progresso`.
+    """
+    if tarefa_atual is None:
+        return
+    tarefa_atual.cancelar()
+    btn_cancelar_tarefa.config(state="disabled")
+    lbl_progresso.config(text="Cancelando...")
 
 
 def selecionar_arquivo():
     """
-    Abre um diálogo para o usuário selecionar uma planilha Excel.
+    Abre um diálogo para o usuário selecionar uma ou mais planilhas Excel ou
+    arquivos AFD do relógio de ponto (`afd`).
 
-    Após a seleção, lê os dados da planilha, processa as colunas,
-    calcula as horas e atualiza a tabela na interface.
-    Atualiza a barra de status com o resultado da operação.
+    Após a seleção, lê os dados, processa as colunas e calcula as horas numa
+    thread de trabalho (`iniciar_tarefa`), com barra de progresso e opção de
+    cancelar. Várias planilhas (ex: os meses de um trimestre) são lidas ao
+    mesmo tempo e juntadas: se o mesmo ID e Data aparecer em mais de uma,
+    vale a do arquivo que vem por último em ordem alfabética. O `df` atual só
+    é substituído quando a leitura termina com sucesso.
 
     Side Effects:
-        Modifica a variável global `df` com os dados da planilha.
-        Chama `calcular_todas_horas_e_extras()` e `aplicar_filtros()`.
+        Inicia a leitura com `_carregar_planilhas()` (cache, junção e banco local).
         Atualiza `lbl_status` e o estado dos botões através de `update_button_states()`.
     """
-    global df
     root.config(cursor="watch")
     root.update_idletasks()
-    file_path = filedialog.askopenfilename(title="Selecione a Planilha", filetypes=[("Excel Files", "*.xlsx;*.xls")])
+    file_paths = filedialog.askopenfilenames(title="Selecione a(s) Planilha(s) ou AFD",
+                                             filetypes=[("Planilhas e AFD", "*.xlsx;*.xls;*.txt"),
+                                                        ("Excel Files", "*.xlsx;*.xls"), ("AFD", "*.txt")])
     root.config(cursor="")
 
-    if file_path:
-        try:
-            df_raw = pd.read_excel(file_path, sheet_name=2)
-            df = df_raw.iloc[4:].reset_index(drop=True)
-
-            novos_nomes_existentes = [
-                COL_ID, COL_NOME, COL_AREA, COL_DATA, COL_ENTRADA, COL_SAIDA_ALMOCO,
-                COL_VOLTA_ALMOCO, COL_SAIDA, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS,
-                COL_HORAS_NORMAIS, COL_NOTA
-            ]
-            colunas_para_renomear = min(len(novos_nomes_existentes), len(df.columns))
-            df = df.iloc[:, :colunas_para_renomear]
-            df.columns = novos_nomes_existentes[:colunas_para_renomear]
-
-            df[COL_ID] = df[COL_ID].astype(str)
-            df[COL_DATA] = pd.to_datetime(df[COL_DATA], dayfirst=True, errors="coerce")
-            df[COL_SEMANA] = df[COL_DATA].dt.strftime("%A").str.capitalize()
-            
-            horas_normais_h_int = int(app_config["horas_normais_h"])
-            minutos_normais_h = int((app_config["horas_normais_h"] * 60) % 60)
-            df[COL_HORAS_NORMAIS] = f"{horas_normais_h_int:02}:{minutos_normais_h:02}"
-
-            ordem_colunas = [
-                COL_ID, COL_NOME, COL_AREA, COL_DATA, COL_SEMANA, COL_ENTRADA,
-                COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA, COL_HORAS_DEVIDAS,
-                COL_HORAS_EXTRAS, COL_HORAS_NORMAIS, COL_SALARIO_BASE,
-                COL_VALOR_HORA_EXTRA, COL_NOTA
-            ]
-            for col in ordem_colunas:
-                if col not in df.columns:
-                    if col in [COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA]:
-                         df[col] = np.nan
-                         df[col] = df[col].astype(float)
-                    else:
-                        df[col] = ""
-            df = df[ordem_colunas]
-            df[COL_NOTA] = df[COL_NOTA].fillna("")
-            df.replace("Omissão", "", inplace=True, regex=True) # regex=True para case-insensitive "Omissão"
-
-            calcular_todas_horas_e_extras()
+    if file_paths:
+        file_paths = sorted(file_paths, key=os.path.basename)
+        nome_arquivo = os.path.basename(file_paths[0]) if len(file_paths) == 1 else f"{len(file_paths)} planilhas"
+
+        def concluir(resultado):
+            global df
+            novo_df, do_cache = resultado
+            df = novo_df  # Troca atômica: a tabela só vê o DataFrame completo
+            historico_edicoes.limpar()
+            marcar_dados_alterados()
+            _atualizar_banco_horas(atualizar_itens=False)
             aplicar_filtros()
-            lbl_status.config(text=f"✅ Sucesso: Planilha '{file_path.split('/')[-1]}' carregada!", foreground="green")
-        except Exception as e:
-            df = pd.DataFrame() # Limpa o DataFrame em caso de erro
-            aplicar_filtros() # Atualiza a tabela para mostrar que está vazia
+            origem = " (cache)" if do_cache else ""
+            if len(file_paths) == 1:
+                lbl_status.config(text=f"✅ Sucesso: Planilha '{nome_arquivo}' carregada{origem}!", foreground="green")
+            else:
+                lbl_status.config(text=f"✅ Sucesso: {nome_arquivo} juntadas ({len(df):n} linhas únicas)!", foreground="green")
+
+        def falhar(e):
             lbl_status.config(text=f"❌ Erro ao carregar planilha: {e}", foreground="red")
             messagebox.showerror("Erro de Leitura", f"Ocorreu um erro: {e}")
-        finally:
-            update_button_states()
+
+        iniciar_tarefa(f"Lendo '{nome_arquivo}'", _carregar_planilhas,
+                       (file_paths, dict(app_config), app_preferencias["banco_local"], escala_trabalho), concluir, falhar)
     else:
         lbl_status.config(text="ℹ️ Seleção de arquivo cancelada.", foreground="darkorange")
         update_button_states()
 
 
-def _calculate_single_row_hours(row):
+def _carregar_planilhas(file_paths, config, guardar_no_banco, escala=None, progresso=None):
     """
-    Calcula horas devidas, extras, valor de hora extra e notas para uma única linha de dados.
-
-    A função processa os horários de entrada, saída e almoço para determinar o tempo
-    trabalhado. Compara este tempo com as horas normais configuradas para calcular
-    diferenças (devidas ou extras). Também calcula o valor monetário das horas extras
-    com base no salário base e multiplicador configurados. Adiciona notas sobre
-    erros de formato ou sequência de horários.
+    Lê uma planilha (com cache) ou junta várias; roda na thread de trabalho.
 
     Args:
-        row (pd.Series): Uma linha do DataFrame contendo, no mínimo, as colunas:
-                         COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA (como strings "HH:MM" ou vazias),
-                         COL_SALARIO_BASE (como float ou NaN),
-                         COL_NOTA (como string).
+        file_paths (list): Caminhos dos arquivos Excel, na ordem de prioridade.
+        config (dict): Configuração de cálculo.
+        guardar_no_banco (bool): Grava as linhas lidas no banco local.
+        escala (pd.DataFrame, optional): Escala de trabalho aplicada às linhas lidas.
+        progresso (callable, optional): Callback de progresso da tarefa.
 
     Returns:
-        pd.Series: Uma Series contendo os resultados calculados para as colunas:
-                   COL_HORAS_DEVIDAS (str "HH:MM" ou código de erro),
-                   COL_HORAS_EXTRAS (str "HH:MM" ou código de erro),
-                   COL_NOTA (str, potencialmente atualizada com mensagens de erro),
-                   COL_VALOR_HORA_EXTRA (float).
-    """
-
-    horas_normais_h_config = app_config["horas_normais_h"]
-    multiplicador = app_config["multiplicador_hora_extra"]
-
-    entrada_str = str(row[COL_ENTRADA]).strip()
-    saida_almoco_str = str(row[COL_SAIDA_ALMOCO]).strip()
-    volta_almoco_str = str(row[COL_VOLTA_ALMOCO]).strip()
-    saida_final_str = str(row[COL_SAIDA]).strip()
-
-    # Normalização mais robusta para omissão e nan
-    entrada_str = "" if entrada_str.lower() in OMISSAO_VALS or entrada_str.lower() == 'nan' else entrada_str
-    saida_almoco_str = "" if saida_almoco_str.lower() in OMISSAO_VALS or saida_almoco_str.lower() == 'nan' else saida_almoco_str
-    volta_almoco_str = "" if volta_almoco_str.lower() in OMISSAO_VALS or volta_almoco_str.lower() == 'nan' else volta_almoco_str
-    saida_final_str = "" if saida_final_str.lower() in OMISSAO_VALS or saida_final_str.lower() == 'nan' else saida_final_str
-    
-    nota_final = str(row[COL_NOTA]) if pd.notna(row[COL_NOTA]) else ""
-    horas_devidas_output = ""
-    horas_extras_output = ""
-    valor_hora_extra_output = 0.0
-
-    try:
-        entrada_dt = pd.to_datetime(entrada_str, format='%H:%M', errors="raise") if entrada_str else pd.NaT
-        saida_almoco_dt = pd.to_datetime(saida_almoco_str, format='%H:%M', errors="raise") if saida_almoco_str else pd.NaT
-        volta_almoco_dt = pd.to_datetime(volta_almoco_str, format='%H:%M', errors="raise") if volta_almoco_str else pd.NaT
-        saida_final_dt = pd.to_datetime(saida_final_str, format='%H:%M', errors="raise") if saida_final_str else pd.NaT
-    except ValueError:
-        horas_devidas_output = ERRO_FORMATO
-        horas_extras_output = ERRO_FORMATO
-        nota_final = f"{nota_final} (Erro: Formato de horário inválido)".strip()
-        return pd.Series({
-            COL_HORAS_DEVIDAS: horas_devidas_output, COL_HORAS_EXTRAS: horas_extras_output,
-            COL_NOTA: nota_final, COL_VALOR_HORA_EXTRA: valor_hora_extra_output
-        })
-
-    total_trabalhado_s = 0
-    # CASO 1: Sem almoço OU almoço zerado (00:00)
-    if pd.notna(entrada_dt) and pd.notna(saida_final_dt) and \
-       ((pd.isna(saida_almoco_dt) and pd.isna(volta_almoco_dt)) or \
-        (saida_almoco_str == HORA_ZERO and volta_almoco_str == HORA_ZERO)):
-        
-        if entrada_str == HORA_ZERO and saida_final_str == HORA_ZERO and \
-           (saida_almoco_str == HORA_ZERO or saida_almoco_str == "") and \
-           (volta_almoco_str == HORA_ZERO or volta_almoco_str == ""):
-            return pd.Series({
-                COL_HORAS_DEVIDAS: "", COL_HORAS_EXTRAS: "",
-                COL_NOTA: nota_final, COL_VALOR_HORA_EXTRA: 0.0
-            })
-
-        if saida_final_dt < entrada_dt: saida_final_dt += pd.Timedelta(days=1)
-        
-        if entrada_dt >= saida_final_dt:
-            horas_devidas_output = ERRO_SEQUENCIA
-            horas_extras_output = ERRO_SEQUENCIA
-            nota_final = f"{nota_final} (Erro Seq: E>=S s/almoço)".strip()
-        else:
-            total_trabalhado_s = (saida_final_dt - entrada_dt).total_seconds()
-            
-    # CASO 2: Com almoço
-    elif pd.notna(entrada_dt) and pd.notna(saida_almoco_dt) and pd.notna(volta_almoco_dt) and pd.notna(saida_final_dt):
-        if saida_almoco_dt < entrada_dt: saida_almoco_dt += pd.Timedelta(days=1)
-        if volta_almoco_dt < saida_almoco_dt: volta_almoco_dt += pd.Timedelta(days=1) # Volta pode ser no dia seguinte
-        if saida_final_dt < volta_almoco_dt: saida_final_dt += pd.Timedelta(days=1) # Saída pode ser no dia seguinte
-
-        # Permitir almoço de duração zero (SaidaAlmoco == VoltaAlmoco)
-        if not (entrada_dt <= saida_almoco_dt and saida_almoco_dt <= volta_almoco_dt and volta_almoco_dt <= saida_final_dt and entrada_dt < saida_final_dt):
-            horas_devidas_output = ERRO_SEQUENCIA
-            horas_extras_output = ERRO_SEQUENCIA
-            nota_final = f"{nota_final} (Erro Seq: c/almoço)".strip()
-        else:
-            periodo_manha_s = (saida_almoco_dt - entrada_dt).total_seconds()
-            periodo_tarde_s = (saida_final_dt - volta_almoco_dt).total_seconds()
-            total_trabalhado_s = periodo_manha_s + periodo_tarde_s
-    # CASO 3: Horários incompletos para cálculo
+        tuple: (DataFrame, veio_do_cache); várias planilhas nunca vêm do cache.
+    """
+    if len(file_paths) == 1:
+        resultado = cache.carregar_planilha_com_cache(file_paths[0], config, progresso=progresso)
     else:
-        if any(s for s in [entrada_str, saida_almoco_str, volta_almoco_str, saida_final_str]): # Se algum campo foi preenchido
-             nota_final = f"{nota_final} (Horários incompletos)".strip()
-        # Se todos os campos de horário estiverem vazios, considera-se ausência, sem nota adicional aqui.
-        return pd.Series({
-            COL_HORAS_DEVIDAS: "", COL_HORAS_EXTRAS: "",
-            COL_NOTA: nota_final, COL_VALOR_HORA_EXTRA: 0.0
-        })
-
-    # Se já houve erro de sequência, retorna
-    if horas_devidas_output == ERRO_SEQUENCIA:
-         return pd.Series({
-            COL_HORAS_DEVIDAS: horas_devidas_output, COL_HORAS_EXTRAS: horas_extras_output,
-            COL_NOTA: nota_final, COL_VALOR_HORA_EXTRA: 0.0
-        })
-
-    # Cálculo de horas devidas/extras
-    if total_trabalhado_s > 0: # Só calcula se houve tempo trabalhado válido
-        total_trabalhado_h = total_trabalhado_s / 3600.0
-        diff_total_s = total_trabalhado_s - (horas_normais_h_config * 3600.0)
-
-        if diff_total_s < -1: # Deu horas a menos (considera uma pequena margem para arredondamento)
-            segundos_devidos = abs(diff_total_s)
-            horas_dev = int(segundos_devidos // 3600)
-            minutos_dev = int((segundos_devidos % 3600) // 60)
-            horas_devidas_output = f"{horas_dev:02}:{minutos_dev:02}"
-            horas_extras_output = HORA_ZERO
-        else: # Cumpriu ou fez horas extras
-            segundos_extras = diff_total_s if diff_total_s > 0 else 0
-            horas_ext = int(segundos_extras // 3600)
-            minutos_ext = int((segundos_extras % 3600) // 60)
-            horas_extras_output = f"{horas_ext:02}:{minutos_ext:02}"
-            horas_devidas_output = HORA_ZERO
-    # Se total_trabalhado_s == 0 e não houve erro de formatação ou sequência, não faz nada (ausência)
-    elif total_trabalhado_s == 0 and not horas_devidas_output and not horas_extras_output:
-        pass # Mantém horas devidas/extras como ""
-
-    # Cálculo do valor da hora extra
-    salario_base_val = row[COL_SALARIO_BASE] # Já deve ser float ou NaN
-    if pd.notna(salario_base_val) and salario_base_val > 0 and \
-       horas_extras_output and horas_extras_output != HORA_ZERO and \
-       horas_extras_output not in [ERRO_FORMATO, ERRO_SEQUENCIA] and ":" in horas_extras_output:
+        resultado = (mesclagem.juntar_planilhas(file_paths, config, progresso=progresso), False)
+    if escala is not None:
+        escalas.aplicar_escala(resultado[0], escala, config)
+    if guardar_no_banco:
+        conexao = armazenamento.abrir_banco(BANCO_FILE)
         try:
-            valor_hora = salario_base_val / 220.0 # Carga horária mensal padrão CLT
-            h_extra, m_extra = map(int, horas_extras_output.split(':'))
-            horas_extras_dec = h_extra + (m_extra / 60.0)
-            valor_hora_extra_output = round(valor_hora * multiplicador * horas_extras_dec, 2)
-        except ValueError:
-            valor_hora_extra_output = 0.0 
-            nota_final = f"{nota_final} (Erro calc. Vlr HE)".strip()
-    
-    return pd.Series({
-        COL_HORAS_DEVIDAS: horas_devidas_output,
-        COL_HORAS_EXTRAS: horas_extras_output,
-        COL_NOTA: nota_final,
-        COL_VALOR_HORA_EXTRA: valor_hora_extra_output
-    })
+            armazenamento.gravar_linhas(conexao, resultado[0], progresso=progresso)
+        finally:
+            conexao.close()
+    return resultado
+
+
+def _carregar_periodo_do_banco(config, inicio, fim, escala=None, progresso=None):
+    """Lê um período do banco local na thread de trabalho (ver `armazenamento.carregar_periodo`)."""
+    conexao = armazenamento.abrir_banco(BANCO_FILE)
+    try:
+        periodo = armazenamento.carregar_periodo(conexao, config, inicio, fim)
+    finally:
+        conexao.close()
+    if escala is not None:
+        escalas.aplicar_escala(periodo, escala, config)
+    return periodo
 
-def calcular_todas_horas_e_extras():
+
+def _no_banco(funcao, *args):
     """
-    Aplica o cálculo de horas (_calculate_single_row_hours) para todas as linhas
-    do DataFrame global `df`.
+    Executa uma operação de `armazenamento` no banco local, se ele estiver ligado.
 
-    Garante que as colunas necessárias para o cálculo existam e tenham tipos
-    adequados antes de aplicar a função de cálculo por linha.
+    Usada pelas edições (rápidas, na própria thread do Tk). Uma falha no banco
+    não desfaz a edição em `df`: só é avisada na barra de status.
 
-    Side Effects:
-        Modifica as colunas COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_NOTA,
-        e COL_VALOR_HORA_EXTRA no DataFrame global `df`.
+    Args:
+        funcao (callable): Função de `armazenamento` que recebe a conexão como 1º argumento.
+        *args: Demais argumentos.
+
+    Returns:
+        O resultado de `funcao`, ou None se o banco estiver desligado ou falhar.
     """
-    global df
-    if df.empty: return
+    if not app_preferencias["banco_local"]:
+        return None
+    try:
+        conexao = armazenamento.abrir_banco(BANCO_FILE)
+        try:
+            return funcao(conexao, *args)
+        finally:
+            conexao.close()
+    except Exception as e:
+        lbl_status.config(text=f"⚠️ Alteração não gravada no banco local: {e}", foreground="orange")
+        return None
 
-    cols_horarios = [COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA]
-    for col in cols_horarios:
-        if col not in df.columns: df[col] = ""
-        df[col] = df[col].astype(str).fillna("")
 
-    if COL_NOTA not in df.columns: df[COL_NOTA] = ""
-    df[COL_NOTA] = df[COL_NOTA].astype(str).fillna("")
+def abrir_periodo_do_banco():
+    """
+    Abre um período guardado no banco local, sem ler a planilha original.
 
-    if COL_SALARIO_BASE not in df.columns: df[COL_SALARIO_BASE] = np.nan
-    df[COL_SALARIO_BASE] = pd.to_numeric(df[COL_SALARIO_BASE], errors='coerce')
-    
-    # Garantir que COL_VALOR_HORA_EXTRA exista antes de ser preenchida
-    if COL_VALOR_HORA_EXTRA not in df.columns: df[COL_VALOR_HORA_EXTRA] = np.nan
-    df[COL_VALOR_HORA_EXTRA] = pd.to_numeric(df[COL_VALOR_HORA_EXTRA], errors='coerce')
+    Pede o intervalo de datas ("DD/MM/AAAA a DD/MM/AAAA"; vazio abre tudo) e
+    lê as linhas numa thread de trabalho, recalculadas com a configuração atual.
+
+    Side Effects:
+        Substitui o DataFrame global `df` quando a leitura termina.
+        Atualiza `lbl_status` e a tabela.
+    """
+    try:
+        conexao = armazenamento.abrir_banco(BANCO_FILE)
+        try:
+            registros, primeira, ultima = armazenamento.resumo_banco(conexao)
+        finally:
+            conexao.close()
+    except Exception as e:
+        messagebox.showerror("Banco Local", f"Não foi possível abrir o banco local:\n{e}")
+        return
+    if not registros:
+        messagebox.showinfo("Banco Local", "O banco local ainda não tem registros. Abra uma planilha para guardá-la.")
+        return
+
+    periodo_str = simpledialog.askstring(
+        "Abrir do Banco Local",
+        f"{registros:n} registro(s) de {primeira:%d/%m/%Y} a {ultima:%d/%m/%Y}.\n\n"
+        "Período a abrir (DD/MM/AAAA a DD/MM/AAAA), ou vazio para tudo:")
+    if periodo_str is None:
+        lbl_status.config(text="ℹ️ Abertura do banco cancelada.", foreground="blue")
+        return
+    try:
+        partes = [p.strip() for p in re.split(r"\s+a\s+|\s*-\s*", periodo_str.strip()) if p.strip()]
+        datas = [pd.to_datetime(p, dayfirst=True, errors="raise") for p in partes]
+        if len(datas) > 2:
+            raise ValueError(periodo_str)
+    except ValueError:
+        messagebox.showerror("Erro", "Período inválido. Use DD/MM/AAAA a DD/MM/AAAA.")
+        return
+    inicio = datas[0] if datas else None
+    fim = datas[-1] if datas else None
+
+    def concluir(novo_df):
+        global df
+        df = novo_df
+        historico_edicoes.limpar()
+        marcar_dados_alterados()
+        _atualizar_banco_horas(atualizar_itens=False)
+        aplicar_filtros()
+        lbl_status.config(text=f"✅ {len(df):n} registro(s) abertos do banco local.", foreground="green")
 
+    def falhar(e):
+        lbl_status.config(text=f"❌ Erro ao ler o banco local: {e}", foreground="red")
+        messagebox.showerror("Banco Local", f"Ocorreu um erro: {e}")
 
-    calculated_data = df.apply(_calculate_single_row_hours, axis=1)
-    df[[COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_NOTA, COL_VALOR_HORA_EXTRA]] = calculated_data
+    iniciar_tarefa("Lendo o banco local", _carregar_periodo_do_banco, (dict(app_config), inicio, fim, escala_trabalho),
+                   concluir, falhar)
 
 
 def atualizar_tabela(data_frame_exibir=None):
@@ -428,62 +469,190 @@ def atualizar_tabela(data_frame_exibir=None):
     Atualiza o widget Treeview (tabela) da interface com os dados fornecidos.
 
     Se `data_frame_exibir` for None, usa o DataFrame global `df`.
-    Formata valores monetários e datas para exibição.
+    A tabela é paginada: só a primeira página (TAMANHO_PAGINA_TABELA linhas)
+    é formatada e inserida agora; as seguintes entram conforme o usuário rola
+    (`_inserir_proxima_pagina`). O iid de cada item é o rótulo da linha no
+    DataFrame, estável entre edições e exclusões; só os rótulos são guardados, e cada página é
+    formatada a partir de `df`, então linhas editadas depois do filtro já
+    aparecem com os valores novos.
 
     Args:
-        data_frame_exibir (pd.DataFrame, optional): O DataFrame a ser exibido.
-                                                   Padrão é None (usa o `df` global).
+        data_frame_exibir (pd.DataFrame, optional): Linhas de `df` a exibir (ex: resultado
+                                                   do filtro). Padrão é None (usa o `df` global).
     Side Effects:
         Limpa e repopula o widget `tabela` da UI.
+        Atualiza `_tabela_rotulos` e `_tabela_inseridas`.
         Atualiza o estado dos botões através de `update_button_states()`.
     """
-    current_df = data_frame_exibir if data_frame_exibir is not None else df.copy()
-    for item_view in tabela.get_children():
-        tabela.delete(item_view)
+    global _tabela_rotulos, _tabela_inseridas
+    current_df = data_frame_exibir if data_frame_exibir is not None else df
+    with diagnostico.etapa("atualizacao_tabela", len(current_df)):
+        tabela.delete(*tabela.get_children())
+        _tabela_rotulos = current_df.index
+        _tabela_inseridas = 0
+
+        if current_df.empty:
+            tabela["columns"] = []
+            # lbl_status já é atualizado por aplicar_filtros se df_filtrado for vazio
+            return
+
+        colunas = exibicao.colunas_visiveis(current_df)
+        if list(tabela["columns"]) != colunas:
+            tabela["columns"] = colunas
+            tabela["show"] = "headings"
+
+            col_widths = {
+                COL_ID: 60, COL_NOME: 220, COL_AREA: 120, COL_DATA: 90, COL_SEMANA: 100,
+                COL_ENTRADA: 70, COL_SAIDA_ALMOCO: 70, COL_VOLTA_ALMOCO: 70, COL_SAIDA: 70,
+                COL_HORAS_DEVIDAS: 70, COL_HORAS_EXTRAS: 70, COL_HORAS_NORMAIS: 70, COL_BANCO_HORAS: 90,
+                COL_SALARIO_BASE: 100, COL_VALOR_HORA_EXTRA: 110, COL_NOTA: 250
+            }
+            col_anchors = {
+                COL_SALARIO_BASE: "e", COL_VALOR_HORA_EXTRA: "e",
+                COL_ID: "center", COL_DATA: "center", COL_ENTRADA: "center", COL_SAIDA_ALMOCO: "center",
+                COL_VOLTA_ALMOCO: "center", COL_SAIDA: "center", COL_HORAS_DEVIDAS: "center",
+                COL_HORAS_EXTRAS: "center", COL_HORAS_NORMAIS: "center", COL_BANCO_HORAS: "center"
+            }
+
+            for col in colunas:
+                width = col_widths.get(col, 100)
+                anchor = col_anchors.get(col, "w") # Default anchor "w" (west/esquerda)
+                tabela.column(col, anchor=anchor, width=width, minwidth=40)
+                tabela.heading(col, text=col)
+
+        _inserir_proxima_pagina()
+    tabela.yview_moveto(0)
+    update_button_states() # Atualiza botões após popular a tabela
+
+
+def _inserir_proxima_pagina():
+    """
+    Formata e insere na tabela a próxima página de `_tabela_rotulos`.
+
+    Side Effects:
+        Insere até TAMANHO_PAGINA_TABELA itens no widget `tabela`.
+        Atualiza `_tabela_inseridas`.
+    """
+    global _tabela_inseridas
+    inicio = _tabela_inseridas
+    fim = min(inicio + TAMANHO_PAGINA_TABELA, len(_tabela_rotulos))
+    if inicio >= fim:
+        return
+    pagina = df.loc[_tabela_rotulos[inicio:fim]]
+    for indice, valores in zip(pagina.index, exibicao.formatar_linhas(pagina)):
+        tabela.insert("", "end", iid=indice, values=valores)
+    _tabela_inseridas = fim
 
-    if current_df.empty:
+
+def _atualizar_itens_tabela(rotulos):
+    """
+    Reformata só os itens da tabela das linhas indicadas (após uma edição).
+
+    Linhas ainda não inseridas (páginas não roladas) não precisam de nada:
+    serão formatadas de `df` quando entrarem na tabela.
+
+    Args:
+        rotulos (list): Rótulos das linhas alteradas em `df`.
+
+    Side Effects:
+        Chama `tabela.item(iid, values=...)` para cada item existente.
+    """
+    visiveis = [r for r in rotulos if tabela.exists(str(r))]
+    if not visiveis:
+        return
+    with diagnostico.etapa("atualizacao_itens_tabela", len(visiveis)):
+        for indice, valores in zip(visiveis, exibicao.formatar_linhas(df.loc[visiveis])):
+            tabela.item(str(indice), values=valores)
+
+
+def _remover_itens_tabela(rotulos):
+    """
+    Tira da tabela só os itens das linhas removidas de `df`.
+
+    Os rótulos das demais linhas não mudam (o índice de `df` não é
+    renumerado), então nenhum outro item precisa ser refeito.
+
+    Args:
+        rotulos (list or pd.Index): Rótulos das linhas removidas.
+
+    Side Effects:
+        Remove itens do widget `tabela`.
+        Atualiza `_tabela_rotulos` e `_tabela_inseridas`.
+    """
+    global _tabela_rotulos, _tabela_inseridas
+    removida = _tabela_rotulos.isin(rotulos)
+    if not removida.any():
+        return
+    with diagnostico.etapa("remocao_itens_tabela", int(removida.sum())):
+        inseridas = _tabela_rotulos[:_tabela_inseridas][removida[:_tabela_inseridas]]
+        if len(inseridas):
+            tabela.delete(*[str(r) for r in inseridas])
+        _tabela_inseridas -= len(inseridas)
+        _tabela_rotulos = _tabela_rotulos[~removida]
+    if df.empty:
         tabela["columns"] = []
-        # lbl_status já é atualizado por aplicar_filtros se df_filtrado for vazio
+
+
+def _atualizar_banco_horas(atualizar_itens=True):
+    """
+    Recalcula a coluna Banco de Horas de `df`, se ligada nas configurações.
+
+    O saldo de um dia depende de todos os dias anteriores do funcionário,
+    então a coluna inteira é recalculada (uma ordenação e uma soma acumulada
+    agrupada, ver `banco_horas`), mas só os itens da tabela cujo saldo mudou
+    são reformatados. Com o banco local ligado, os saldos de abertura de cada
+    mês são lidos e gravados nele: um mês aberto sozinho continua do saldo
+    do mês anterior.
+
+    Deve ser chamada depois de cada alteração já registrada em
+    `historico_edicoes` (o saldo não entra nos deltas).
+
+    Args:
+        atualizar_itens (bool, optional): False quando a tabela vai ser redesenhada
+                                          em seguida (nova planilha ou período).
+    Side Effects:
+        Cria, atualiza ou remove a coluna COL_BANCO_HORAS do DataFrame global `df`.
+        Lê e grava saldos de abertura no banco local (se ligado).
+        Reformata os itens alterados ou redesenha a tabela (`aplicar_filtros()`) se a coluna surgiu ou saiu.
+    """
+    if df.empty:
+        return
+    tinha_coluna = COL_BANCO_HORAS in df.columns
+    if not app_preferencias["banco_horas"]:
+        if tinha_coluna:
+            df.drop(columns=COL_BANCO_HORAS, inplace=True)
+            if atualizar_itens:
+                aplicar_filtros()
         return
 
-    tabela["columns"] = list(current_df.columns)
-    tabela["show"] = "headings"
-
-    col_widths = {
-        COL_ID: 60, COL_NOME: 220, COL_AREA: 120, COL_DATA: 90, COL_SEMANA: 100,
-        COL_ENTRADA: 70, COL_SAIDA_ALMOCO: 70, COL_VOLTA_ALMOCO: 70, COL_SAIDA: 70,
-        COL_HORAS_DEVIDAS: 70, COL_HORAS_EXTRAS: 70, COL_HORAS_NORMAIS: 70,
-        COL_SALARIO_BASE: 100, COL_VALOR_HORA_EXTRA: 110, COL_NOTA: 250
-    }
-    col_anchors = {
-        COL_SALARIO_BASE: "e", COL_VALOR_HORA_EXTRA: "e",
-        COL_ID: "center", COL_DATA: "center", COL_ENTRADA: "center", COL_SAIDA_ALMOCO: "center",
-        COL_VOLTA_ALMOCO: "center", COL_SAIDA: "center", COL_HORAS_DEVIDAS: "center",
-        COL_HORAS_EXTRAS: "center", COL_HORAS_NORMAIS: "center"
-    }
-
-    for col in current_df.columns:
-        width = col_widths.get(col, 100)
-        anchor = col_anchors.get(col, "w") # Default anchor "w" (west/esquerda)
-        tabela.column(col, anchor=anchor, width=width, minwidth=40)
-        tabela.heading(col, text=col)
-
-    for index, row in current_df.iterrows():
-        formatted_values = []
-        for col_name, val in row.items():
-            if pd.isna(val) or str(val).strip() == "":
-                formatted_values.append("")
-            elif isinstance(val, float) and (col_name == COL_SALARIO_BASE or col_name == COL_VALOR_HORA_EXTRA):
-                try:
-                    formatted_values.append(locale.format_string("%.2f", val, grouping=True))
-                except (TypeError, ValueError):
-                    formatted_values.append(str(val))
-            elif isinstance(val, pd.Timestamp):
-                formatted_values.append(val.strftime('%d/%m/%Y'))
-            else:
-                formatted_values.append(str(val))
-        tabela.insert("", "end", iid=index, values=formatted_values)
-    update_button_states() # Atualiza botões após popular a tabela
+    anterior = df[COL_BANCO_HORAS].copy() if tinha_coluna else None
+    aberturas = _no_banco(armazenamento.ler_saldos_abertura, df[COL_ID].dropna().unique()) or {}
+    novas = banco_horas.calcular_banco_horas(df, app_preferencias["validade_banco_horas_meses"], aberturas)
+    _no_banco(armazenamento.gravar_saldos_abertura, novas)
+    if not atualizar_itens:
+        return
+    if anterior is None:
+        aplicar_filtros()
+    else:
+        mudou = (anterior != df[COL_BANCO_HORAS]).fillna(True).to_numpy(dtype=bool)
+        _atualizar_itens_tabela(list(df.index[mudou]))
+
+
+def _on_tabela_yscroll(first, last):
+    """
+    Callback de rolagem vertical da tabela: atualiza a barra e, perto do fim
+    das linhas já inseridas, carrega a próxima página.
+
+    Args:
+        first (str): Fração do topo visível (enviada pelo Treeview).
+        last (str): Fração do fim visível (enviada pelo Treeview).
+
+    Side Effects:
+        Atualiza `scrollbar_y` e pode chamar `_inserir_proxima_pagina()`.
+    """
+    scrollbar_y.set(first, last)
+    if float(last) >= LIMIAR_NOVA_PAGINA and _tabela_inseridas < len(_tabela_rotulos):
+        _inserir_proxima_pagina()
 
 
 def editar_celula():
@@ -493,17 +662,24 @@ def editar_celula():
     Abre diálogos para selecionar a coluna e inserir o novo valor.
     Valida a entrada de acordo com o tipo da coluna (hora, salário, nota, etc.).
     Se a edição for em uma coluna que afeta cálculos (horários, salário),
-    recalcula a linha modificada e atualiza a tabela.
+    recalcula a linha modificada. Só os itens alterados da tabela são
+    reformatados; a linha continua exibida mesmo que deixe de atender ao
+    filtro, até o próximo filtro.
 
     Side Effects:
-        Modifica o DataFrame global `df` na linha e coluna editada.
-        Pode chamar `_calculate_single_row_hours` e `aplicar_filtros()`.
-        Atualiza `lbl_status`.
+        Modifica o DataFrame global `df` na linha e coluna editada e registra a
+        alteração em `historico_edicoes`. Pode chamar `calculos.recalcular_linhas`
+        e `calculos.recalcular_valor_hora_extra`, ou `escalas.aplicar_escala` se a
+        jornada da escala depender da coluna editada. Com o banco local ligado, regrava
+        só as linhas alteradas. Atualiza os itens alterados da tabela e `lbl_status`.
     """
     global df
     if df.empty or not tabela.selection():
         messagebox.showwarning("Aviso", "Nenhuma planilha carregada ou nenhuma linha selecionada para edição.")
         return
+    if len(tabela.selection()) > 1:
+        messagebox.showwarning("Aviso", "Selecione uma única linha para editar a célula, ou use \"Editar em massa\" para as linhas selecionadas.")
+        return
 
     item_selecionado = tabela.selection()[0]
     indice_df_original = int(item_selecionado)
@@ -512,7 +688,7 @@ def editar_celula():
         messagebox.showerror("Erro Crítico", "Índice da linha selecionada não encontrado no DataFrame. Sincronia perdida.")
         return
 
-    colunas_treeview = list(df.columns)
+    colunas_treeview = exibicao.colunas_visiveis(df)
     col_options_str = "\n".join([f"{i+1}. {col}" for i, col in enumerate(colunas_treeview)])
     coluna_idx_str = simpledialog.askstring("Selecionar Coluna para Editar",
                                             f"Linha (Índice DF: {indice_df_original})\nDigite o nº da coluna para editar (1 a {len(colunas_treeview)}):\n\n{col_options_str}")
@@ -531,8 +707,7 @@ def editar_celula():
         messagebox.showerror("Erro", "Entrada inválida para número da coluna.")
         return
 
-    valor_atual_df = df.loc[indice_df_original, coluna_para_editar]
-    display_valor_atual = str(valor_atual_df) if pd.notna(valor_atual_df) else ""
+    display_valor_atual = exibicao.formatar_valor(df, indice_df_original, coluna_para_editar)
     
     novo_valor_str = simpledialog.askstring(f"Editar: {coluna_para_editar}", 
                                        f"Linha (Índice DF: {indice_df_original}), Coluna: '{coluna_para_editar}'\nValor Atual: {display_valor_atual}\n\nNovo valor:")
@@ -543,19 +718,20 @@ def editar_celula():
 
     novo_valor_strip = novo_valor_str.strip()
     mudancas_feitas = False
+    linhas_alteradas = [indice_df_original]
+    chaves_anteriores = armazenamento.chaves_linhas(df, linhas_alteradas)  # Para o banco, se o ID ou a Data mudar
+    if coluna_para_editar == COL_SALARIO_BASE:  # O valor da HE muda em todas as linhas do ID
+        antes = historico.capturar(df, df.index[df[COL_ID] == df.loc[indice_df_original, COL_ID]])
+    else:
+        antes = historico.capturar(df, linhas_alteradas)
 
     # --- Lógica de edição por coluna ---
     if coluna_para_editar in [COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA]:
-        if novo_valor_strip == "":
-            df.loc[indice_df_original, coluna_para_editar] = ""
+        # Mesmo interpretador da leitura: aceita "8:00", "08h00" etc.; vazio apaga a marcação
+        try:
+            esquema.atribuir(df, indice_df_original, coluna_para_editar, novo_valor_strip)
             mudancas_feitas = True
-        elif re.fullmatch(r"\d{1,2}:\d{2}", novo_valor_strip):
-            h, m = map(int, novo_valor_strip.split(':'))
-            if 0 <= h <= 23 and 0 <= m <= 59:
-                df.loc[indice_df_original, coluna_para_editar] = f"{h:02}:{m:02}"
-                mudancas_feitas = True
-            else: messagebox.showerror("Erro", "Hora/minuto inválido.")
-        else: messagebox.showerror("Erro", f"Formato para {coluna_para_editar} deve ser HH:MM ou vazio.")
+        except ValueError: messagebox.showerror("Erro", f"Formato para {coluna_para_editar} deve ser HH:MM ou vazio.")
 
     elif coluna_para_editar == COL_SALARIO_BASE:
         if novo_valor_strip == "":
@@ -567,29 +743,30 @@ def editar_celula():
                 if val_float < 0: messagebox.showerror("Erro", "Salário não pode ser negativo.")
                 else:
                     id_func = df.loc[indice_df_original, COL_ID]
-                    df.loc[df[COL_ID] == id_func, COL_SALARIO_BASE] = val_float
+                    linhas_alteradas = df.index[df[COL_ID] == id_func].tolist()
+                    df.loc[linhas_alteradas, COL_SALARIO_BASE] = val_float
                     mudancas_feitas = True
             except ValueError: messagebox.showerror("Erro", "Salário inválido.")
 
     elif coluna_para_editar == COL_NOTA:
-        df.loc[indice_df_original, COL_NOTA] = novo_valor_strip
+        esquema.atribuir(df, indice_df_original, COL_NOTA, novo_valor_strip)
         mudancas_feitas = True
     
     # Adicione outras colunas editáveis aqui (ID, Nome, Área, Data)
     elif coluna_para_editar == COL_ID:
         if novo_valor_strip: 
-            df.loc[indice_df_original, COL_ID] = novo_valor_strip
+            esquema.atribuir(df, indice_df_original, COL_ID, novo_valor_strip)
             mudancas_feitas = True
         else: messagebox.showerror("Erro", "ID não pode ser vazio.")
 
     elif coluna_para_editar == COL_NOME:
         if novo_valor_strip:
-            df.loc[indice_df_original, COL_NOME] = novo_valor_strip
+            esquema.atribuir(df, indice_df_original, COL_NOME, novo_valor_strip)
             mudancas_feitas = True
         else: messagebox.showerror("Erro", "Nome não pode ser vazio.")
     
     elif coluna_para_editar == COL_AREA:
-        df.loc[indice_df_original, COL_AREA] = novo_valor_strip
+        esquema.atribuir(df, indice_df_original, COL_AREA, novo_valor_strip)
         mudancas_feitas = True
 
     elif coluna_para_editar == COL_DATA:
@@ -600,24 +777,125 @@ def editar_celula():
             try:
                 nova_data = pd.to_datetime(novo_valor_strip, dayfirst=True, errors='raise')
                 df.loc[indice_df_original, COL_DATA] = nova_data
-                df.loc[indice_df_original, COL_SEMANA] = nova_data.strftime("%A").str.capitalize()
+                esquema.atribuir(df, indice_df_original, COL_SEMANA, calendario.nome_dia_semana(nova_data))
                 mudancas_feitas = True
             except ValueError: messagebox.showerror("Erro", "Formato de data inválido. Use DD/MM/AAAA.")
     else:
         messagebox.showinfo("Informação", f"Coluna '{coluna_para_editar}' não é diretamente editável ou não possui lógica de edição definida.")
 
     if mudancas_feitas:
-        if coluna_para_editar in [COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA, COL_SALARIO_BASE, COL_DATA]:
+        marcar_dados_alterados(afeta_busca=coluna_para_editar in [COL_ID, COL_NOME, COL_AREA])
+        if coluna_para_editar == COL_SALARIO_BASE:
+            # O salário vale para todas as linhas do ID: só o valor da HE muda
+            calculos.recalcular_valor_hora_extra(df, app_config)
+        elif escala_trabalho is not None and coluna_para_editar in [COL_ID, COL_AREA, COL_DATA]:
+            # A jornada da escala depende do ID, da Área e do dia da semana (recalcula a linha)
+            escalas.aplicar_escala(df, escala_trabalho, app_config, [indice_df_original])
+        elif coluna_para_editar in [COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA, COL_DATA]:
             # Recalcular a linha modificada
-             updated_row_series = _calculate_single_row_hours(df.loc[indice_df_original])
-             df.loc[indice_df_original, [COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_NOTA, COL_VALOR_HORA_EXTRA]] = updated_row_series
+            calculos.recalcular_linhas(df, [indice_df_original], app_config)
+        _no_banco(armazenamento.atualizar_linhas, df, linhas_alteradas, chaves_anteriores)
+        historico_edicoes.registrar(historico.AlteracaoLinhas(f"Editar {coluna_para_editar}", antes, df))
+        _atualizar_banco_horas()
         
-        aplicar_filtros()
+        _atualizar_itens_tabela(linhas_alteradas)
+        update_button_states()
         lbl_status.config(text=f"✅ Linha {indice_df_original}, Coluna '{coluna_para_editar}' atualizada.", foreground="green")
     elif novo_valor_str is not None: # Se não cancelou, mas também não houve mudança válida
         lbl_status.config(text="ℹ️ Nenhuma alteração aplicada.", foreground="blue")
 
 
+def editar_em_massa():
+    """
+    Grava o mesmo valor em uma coluna de várias linhas de uma vez.
+
+    Pergunta o conjunto de linhas (seleção da tabela, resultado do filtro ou
+    lista de IDs), a coluna (`edicao.COLUNAS_EM_MASSA`) e o valor; o Salário
+    Base vale para todas as linhas dos IDs do conjunto. A gravação
+    é uma só atribuição vetorizada, só essas linhas são recalculadas e só os
+    itens correspondentes da tabela são reformatados.
+
+    Side Effects:
+        Modifica o DataFrame global `df` e registra a alteração em `historico_edicoes`.
+        Com o banco local ligado, regrava só as linhas alteradas.
+        Atualiza os itens alterados da tabela e `lbl_status`.
+    """
+    global df
+    if df.empty:
+        messagebox.showwarning("Aviso", "Nenhuma planilha carregada.")
+        return
+
+    selecionadas = [int(iid) for iid in tabela.selection()]
+    conjunto_str = simpledialog.askstring(
+        "Edição em Massa",
+        "Aplicar em quais linhas?\n\n"
+        f"1. Linhas selecionadas ({len(selecionadas)})\n"
+        f"2. Linhas exibidas pelo filtro ({len(_tabela_rotulos)})\n"
+        "3. Todas as linhas de IDs digitados")
+    if not conjunto_str:
+        lbl_status.config(text="ℹ️ Edição em massa cancelada.", foreground="blue")
+        return
+
+    conjunto = conjunto_str.strip()
+    if conjunto == "1":
+        rotulos = selecionadas
+    elif conjunto == "2":
+        rotulos = list(_tabela_rotulos)
+    elif conjunto == "3":
+        ids_str = simpledialog.askstring("Edição em Massa", "Digite os IDs, separados por vírgula:")
+        if not ids_str:
+            lbl_status.config(text="ℹ️ Edição em massa cancelada.", foreground="blue")
+            return
+        rotulos = list(edicao.linhas_dos_ids(df, ids_str.split(",")))
+    else:
+        messagebox.showerror("Erro", "Opção inválida. Digite 1, 2 ou 3.")
+        return
+    if not rotulos:
+        messagebox.showinfo("Edição em Massa", "Nenhuma linha no conjunto escolhido.")
+        return
+
+    col_options_str = "\n".join(f"{i+1}. {col}" for i, col in enumerate(edicao.COLUNAS_EM_MASSA))
+    coluna_idx_str = simpledialog.askstring("Edição em Massa",
+                                            f"{len(rotulos)} linha(s). Digite o nº da coluna:\n\n{col_options_str}")
+    if not coluna_idx_str:
+        lbl_status.config(text="ℹ️ Edição em massa cancelada.", foreground="blue")
+        return
+    try:
+        coluna_idx = int(coluna_idx_str) - 1
+        if not (0 <= coluna_idx < len(edicao.COLUNAS_EM_MASSA)):
+            messagebox.showerror("Erro", "Número da coluna inválido.")
+            return
+        coluna = edicao.COLUNAS_EM_MASSA[coluna_idx]
+    except ValueError:
+        messagebox.showerror("Erro", "Entrada inválida para número da coluna.")
+        return
+
+    rotulos = edicao.linhas_afetadas(df, rotulos, coluna)  # Salário Base: todas as linhas dos IDs
+    novo_valor_str = simpledialog.askstring(f"Edição em Massa: {coluna}",
+                                            f"Novo valor de '{coluna}' para {len(rotulos)} linha(s) (vazio apaga):")
+    if novo_valor_str is None:
+        lbl_status.config(text="ℹ️ Edição em massa cancelada.", foreground="blue")
+        return
+
+    antes = historico.capturar(df, rotulos)
+    chaves_anteriores = armazenamento.chaves_linhas(df, rotulos)
+    try:
+        alteradas = edicao.editar_em_massa(df, rotulos, coluna, novo_valor_str, app_config)
+    except ValueError as e:
+        messagebox.showerror("Erro", str(e))
+        return
+    if escala_trabalho is not None and coluna == COL_AREA:
+        escalas.aplicar_escala(df, escala_trabalho, app_config, alteradas)
+
+    historico_edicoes.registrar(historico.AlteracaoLinhas(f"Editar {coluna} em {len(alteradas)} linha(s)", antes, df))
+    _no_banco(armazenamento.atualizar_linhas, df, alteradas, chaves_anteriores)
+    marcar_dados_alterados(afeta_busca=coluna in [COL_NOME, COL_AREA])
+    _atualizar_banco_horas()
+    _atualizar_itens_tabela(alteradas)
+    update_button_states()
+    lbl_status.config(text=f"✅ Coluna '{coluna}' atualizada em {len(alteradas)} linha(s).", foreground="green")
+
+
 def excluir_funcionario_por_id():
     """
     Remove todos os registros de funcionários com os IDs fornecidos pelo usuário.
@@ -626,8 +904,8 @@ def excluir_funcionario_por_id():
     Confirma a exclusão antes de remover os dados do DataFrame global `df`.
 
     Side Effects:
-        Modifica o DataFrame global `df`.
-        Chama `aplicar_filtros()` para atualizar a UI.
+        Modifica o DataFrame global `df` e registra a remoção em `historico_edicoes`.
+        Remove da tabela só os itens excluídos (`_remover_itens_tabela()`).
         Atualiza `lbl_status` e `update_button_states()`.
     """
     global df
@@ -659,12 +937,16 @@ def excluir_funcionario_por_id():
     confirmar = messagebox.askyesno("Confirmar Exclusão", 
                                      f"Remover todos os registros dos IDs: {', '.join(ids_a_remover)}?\n{msg_nao_encontrados}")
     if confirmar:
-        df = df[~df[COL_ID].isin(ids_a_remover)].reset_index(drop=True)
-        aplicar_filtros()
+        df, remocao = historico.remover_linhas(df, df.index[df[COL_ID].isin(ids_a_remover)],
+                                               f"Excluir IDs {', '.join(ids_a_remover)}")
+        _no_banco(armazenamento.excluir_linhas, armazenamento.chaves_linhas(remocao.bloco))
+        historico_edicoes.registrar(remocao)
+        marcar_dados_alterados()
+        _remover_itens_tabela(remocao.bloco.index)
+        _atualizar_banco_horas()
         status_msg = f"✅ IDs removidos: {', '.join(ids_a_remover)}. {msg_nao_encontrados}"
-        lbl_status.config(text=status_msg.strip(), fg="green")
-        if df.empty: # Se todos os dados foram removidos
-            update_button_states() # Desabilitar botões
+        lbl_status.config(text=status_msg.strip(), foreground="green")
+        update_button_states()
     else:
         lbl_status.config(text="ℹ️ Exclusão cancelada.", foreground="blue")
 
@@ -673,12 +955,12 @@ def remover_sabado_domingo_manual():
     """
     Remove as linhas selecionadas na tabela que correspondem a Sábados ou Domingos.
 
-    Verifica a coluna 'Semana' das linhas selecionadas.
-    Pede confirmação ao usuário antes de remover as linhas do DataFrame global `df`.
+    O dia é verificado pelo número do dia da semana da coluna Data (não pelo
+    texto da coluna Semana, que dependia do locale). Pede confirmação ao usuário antes de remover as linhas do DataFrame global `df`.
 
     Side Effects:
-        Modifica o DataFrame global `df`.
-        Chama `aplicar_filtros()` para atualizar a UI.
+        Modifica o DataFrame global `df` e registra a remoção em `historico_edicoes`.
+        Remove da tabela só os itens excluídos (`_remover_itens_tabela()`).
         Atualiza `lbl_status` e `update_button_states()`.
     """
     global df
@@ -691,25 +973,10 @@ def remover_sabado_domingo_manual():
         f"Remover os {len(selecionados_iids_treeview)} registro(s) selecionado(s) que sejam Sábados ou Domingos?")
 
     if confirmar:
-        indices_df_para_remover = []
-        indices_nao_removidos = []
-        dias_para_remover_norm = {"sabado", "domingo"}
-
-        def normalize_text_simple(text):
-            if pd.isna(text): return ""
-            return unicodedata.normalize('NFKD', str(text)).encode('ASCII', 'ignore').decode('utf-8').lower().strip()
-
-        for item_iid_str in selecionados_iids_treeview:
-            indice_df = int(item_iid_str)
-            if indice_df in df.index:
-                dia_semana = normalize_text_simple(df.loc[indice_df, COL_SEMANA])
-                if dia_semana in dias_para_remover_norm:
-                    indices_df_para_remover.append(indice_df)
-                else:
-                    indices_nao_removidos.append(str(indice_df))
-            else: # Segurança, caso o índice não exista mais no df
-                print(f"Aviso: Índice {indice_df} da seleção não encontrado no DataFrame durante remoção S/D.")
-
+        selecionadas = df.index.intersection([int(iid) for iid in selecionados_iids_treeview], sort=False)
+        fim_de_semana = calendario.mascara_sem_expediente(df.loc[selecionadas, COL_DATA])
+        indices_df_para_remover = list(selecionadas[fim_de_semana])
+        indices_nao_removidos = [str(i) for i in selecionadas[~fim_de_semana]]
 
         if indices_nao_removidos:
             messagebox.showwarning("Aviso Parcial", f"Algumas linhas selecionadas não eram Sábados/Domingos e não foram removidas (Índices: {', '.join(indices_nao_removidos)}).")
@@ -719,15 +986,150 @@ def remover_sabado_domingo_manual():
             if not indices_nao_removidos: messagebox.showinfo("Informação", "Nenhuma linha válida (Sábado/Domingo) foi selecionada.")
             return
         
-        df.drop(indices_df_para_remover, inplace=True)
-        df.reset_index(drop=True, inplace=True)
-        aplicar_filtros()
-        lbl_status.config(text=f"✅ {len(indices_df_para_remover)} registro(s) de Sábado/Domingo removido(s).", fg="green")
-        if df.empty: update_button_states()
+        df, remocao = historico.remover_linhas(df, indices_df_para_remover, "Remover Sáb/Dom")
+        _no_banco(armazenamento.excluir_linhas, armazenamento.chaves_linhas(remocao.bloco))
+        historico_edicoes.registrar(remocao)
+        marcar_dados_alterados()
+        _remover_itens_tabela(remocao.bloco.index)
+        _atualizar_banco_horas()
+        lbl_status.config(text=f"✅ {len(indices_df_para_remover)} registro(s) de Sábado/Domingo removido(s).", foreground="green")
+        update_button_states()
     else:
         lbl_status.config(text="ℹ️ Remoção de Sábado/Domingo cancelada.", foreground="blue")
 
 
+def tratar_fins_de_semana_e_feriados():
+    """
+    Remove ou marca na Nota, de uma vez, todas as linhas em fins de semana e feriados.
+
+    Os feriados vêm, opcionalmente, de um arquivo de calendário
+    (`calendario.ler_feriados`), lembrado em `app_preferencias`. As linhas
+    são encontradas por uma única máscara vetorizada sobre a coluna Data.
+
+    Side Effects:
+        Modifica o DataFrame global `df` e registra a ação em `historico_edicoes`.
+        Pode gravar `app_preferencias` (`save_config()`) e o banco local.
+        Atualiza só os itens afetados da tabela e `lbl_status`.
+    """
+    global df
+    if df.empty:
+        messagebox.showwarning("Aviso", "Nenhuma planilha carregada.")
+        return
+
+    usar_feriados = messagebox.askyesnocancel("Fins de Semana e Feriados",
+                                              "Incluir os feriados de um arquivo de calendário?\n"
+                                              "(Não = só sábados e domingos)")
+    if usar_feriados is None:
+        lbl_status.config(text="ℹ️ Operação cancelada.", foreground="blue")
+        return
+    feriados = None
+    if usar_feriados:
+        anterior = app_preferencias["arquivo_feriados"]
+        caminho = filedialog.askopenfilename(title="Calendário de Feriados",
+                                             initialdir=os.path.dirname(anterior) or None,
+                                             initialfile=os.path.basename(anterior) or None,
+                                             filetypes=[("Calendário", "*.csv;*.txt"), ("Todos", "*.*")])
+        if not caminho:
+            lbl_status.config(text="ℹ️ Operação cancelada.", foreground="blue")
+            return
+        try:
+            feriados = calendario.ler_feriados(caminho)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Calendário de Feriados", f"Não foi possível ler o calendário:\n{e}")
+            return
+        if caminho != anterior:
+            app_preferencias["arquivo_feriados"] = caminho
+            save_config()
+
+    rotulos = df.index[calendario.mascara_sem_expediente(df[COL_DATA], feriados=feriados)]
+    if rotulos.empty:
+        messagebox.showinfo("Fins de Semana e Feriados", "Nenhuma linha em fim de semana ou feriado.")
+        return
+
+    acao = simpledialog.askstring("Fins de Semana e Feriados",
+                                  f"{len(rotulos)} linha(s) em fins de semana ou feriados.\n\n"
+                                  "1. Remover as linhas\n2. Marcar na Nota")
+    if not acao or acao.strip() not in ("1", "2"):
+        lbl_status.config(text="ℹ️ Operação cancelada.", foreground="blue")
+        return
+
+    if acao.strip() == "1":
+        df, remocao = historico.remover_linhas(df, rotulos, "Remover fins de semana/feriados")
+        _no_banco(armazenamento.excluir_linhas, armazenamento.chaves_linhas(remocao.bloco))
+        historico_edicoes.registrar(remocao)
+        marcar_dados_alterados()
+        _remover_itens_tabela(rotulos)
+        _atualizar_banco_horas()
+        lbl_status.config(text=f"✅ {len(rotulos)} registro(s) de fins de semana/feriados removido(s).", foreground="green")
+    else:
+        antes = historico.capturar(df, rotulos, [COL_NOTA])
+        calendario.marcar_sem_expediente(df, rotulos, feriados)
+        historico_edicoes.registrar(historico.AlteracaoLinhas("Marcar fins de semana/feriados", antes, df))
+        _no_banco(armazenamento.atualizar_linhas, df, list(rotulos))
+        marcar_dados_alterados(afeta_busca=False)
+        _atualizar_itens_tabela(rotulos)
+        lbl_status.config(text=f"✅ {len(rotulos)} registro(s) de fins de semana/feriados marcado(s) na Nota.", foreground="green")
+    update_button_states()
+
+
+def _aplicar_historico(refazer):
+    """
+    Desfaz ou refaz a última ação de `historico_edicoes` e sincroniza o banco local.
+
+    Só as células e linhas guardadas no delta são regravadas (ver `historico`),
+    e a tabela só reformata ou remove os itens correspondentes. Desfazer uma
+    remoção refaz o filtro, pois as linhas de volta podem ou não atendê-lo.
+
+    Args:
+        refazer (bool): True para refazer, False para desfazer.
+
+    Side Effects:
+        Modifica o DataFrame global `df` e o banco local (se ligado).
+        Atualiza a tabela e `lbl_status`.
+    """
+    global df
+    if tarefa_atual is not None:
+        return
+    proxima = historico_edicoes.proxima_refazer() if refazer else historico_edicoes.proxima_desfazer()
+    if proxima is None:
+        lbl_status.config(text=f"ℹ️ Nada para {'refazer' if refazer else 'desfazer'}.", foreground="blue")
+        return
+
+    if isinstance(proxima, historico.AlteracaoLinhas):  # Para o banco, se o ID ou a Data voltar atrás
+        chaves_anteriores = armazenamento.chaves_linhas(df, proxima.rotulos)
+    df, delta = historico_edicoes.refazer(df) if refazer else historico_edicoes.desfazer(df)
+
+    if isinstance(delta, historico.AlteracaoLinhas):
+        _no_banco(armazenamento.atualizar_linhas, df, delta.rotulos, chaves_anteriores)
+        marcar_dados_alterados(afeta_busca=bool({COL_ID, COL_NOME, COL_AREA} & set(delta.antes.columns)))
+        _atualizar_banco_horas()
+        _atualizar_itens_tabela(delta.rotulos)
+    elif refazer:
+        _no_banco(armazenamento.excluir_linhas, armazenamento.chaves_linhas(delta.bloco))
+        marcar_dados_alterados()
+        _remover_itens_tabela(delta.bloco.index)
+        _atualizar_banco_horas()
+    else:
+        _no_banco(armazenamento.gravar_linhas, delta.bloco)
+        marcar_dados_alterados()
+        _atualizar_banco_horas(atualizar_itens=False)
+        aplicar_filtros()
+
+    update_button_states()
+    acao = "refeito" if refazer else "desfeito"
+    lbl_status.config(text=f"↩️ {delta.descricao}: {acao}.", foreground="green")
+
+
+def desfazer_edicao(event=None):
+    """Desfaz a última edição ou exclusão (botão "Desfazer" e Ctrl+Z)."""
+    _aplicar_historico(refazer=False)
+
+
+def refazer_edicao(event=None):
+    """Refaz a última ação desfeita (botão "Refazer" e Ctrl+Y)."""
+    _aplicar_historico(refazer=True)
+
+
 def calcular_totais_funcionario():
     """
     Calcula os totais de horas normais, extras, devidas e valor de HE por funcionário.
@@ -738,70 +1140,44 @@ def calcular_totais_funcionario():
     Side Effects:
         Mostra uma janela de resumo (`exibir_resumo_totais`).
         Atualiza `lbl_status`.
-        Pode modificar o DataFrame `df` para garantir tipos corretos antes da soma.
+        Guarda o resultado em `resumo_totais` até a próxima alteração dos dados.
+        O cálculo roda numa thread de trabalho (`iniciar_tarefa`).
     """
-    global df
     if df.empty:
         messagebox.showwarning("Aviso", "Nenhuma planilha carregada para calcular totais.")
         return
 
-    root.config(cursor="watch"); root.update_idletasks()
-    try:
-        for col_hora in [COL_HORAS_NORMAIS, COL_HORAS_EXTRAS, COL_HORAS_DEVIDAS]:
-            if col_hora not in df.columns: df[col_hora] = HORA_ZERO
-            df[col_hora] = df[col_hora].astype(str).fillna(HORA_ZERO)
-        if COL_VALOR_HORA_EXTRA not in df.columns: df[COL_VALOR_HORA_EXTRA] = 0.0
-        df[COL_VALOR_HORA_EXTRA] = pd.to_numeric(df[COL_VALOR_HORA_EXTRA], errors='coerce').fillna(0.0)
-
-        resumo_funcionarios = {}
-        nomes_unicos = [n for n in df[COL_NOME].unique() if pd.notna(n) and str(n).strip() != ""]
-
-        for nome in nomes_unicos:
-            df_f = df[df[COL_NOME] == nome]
-            total_hn_td = pd.to_timedelta(df_f[COL_HORAS_NORMAIS].replace(['',ERRO_FORMATO,ERRO_SEQUENCIA,'nan','NaT'], HORA_ZERO), errors='coerce').sum()
-            total_he_td = pd.to_timedelta(df_f[COL_HORAS_EXTRAS].replace(['',ERRO_FORMATO,ERRO_SEQUENCIA,'nan','NaT'], HORA_ZERO), errors='coerce').sum()
-            total_hd_td = pd.to_timedelta(df_f[COL_HORAS_DEVIDAS].replace(['',ERRO_FORMATO,ERRO_SEQUENCIA,'nan','NaT'], HORA_ZERO), errors='coerce').sum()
-            total_valor_he = df_f[COL_VALOR_HORA_EXTRA].sum()
-
-            def fmt_td(td):
-                if pd.isna(td): return "00:00"
-                s, h, m = int(td.total_seconds()), 0, 0
-                sign = "-" if s < 0 else ""
-                s = abs(s)
-                h = s // 3600
-                m = (s % 3600) // 60
-                return f"{sign}{h:02d}:{m:02d}"
-
-            resumo_funcionarios[nome] = {
-                "Total Horas Normais": fmt_td(total_hn_td),
-                "Total Horas Extras": fmt_td(total_he_td),
-                "Total Horas Devidas": fmt_td(total_hd_td),
-                "Total a Receber Horas Extras": locale.format_string("%.2f", total_valor_he, grouping=True)
-            }
-        
+    def concluir(resumo_funcionarios):
+        global resumo_totais
+        resumo_totais = resumo_funcionarios
+        lbl_status.config(text="✅ Cálculo de totais por funcionário realizado.", foreground="green")
         if not resumo_funcionarios: messagebox.showinfo("Resumo", "Nenhum dado para resumir.")
         else: exibir_resumo_totais(resumo_funcionarios)
-        lbl_status.config(text="✅ Cálculo de totais por funcionário realizado.", fg="green")
-    except Exception as e:
-        lbl_status.config(text=f"❌ Erro ao calcular totais: {e}", fg="red")
+
+    def falhar(e):
+        lbl_status.config(text=f"❌ Erro ao calcular totais: {e}", foreground="red")
         messagebox.showerror("Erro no Cálculo", f"Ocorreu um erro: {e}")
-    finally:
-        root.config(cursor="")
+
+    if resumo_totais is not None:
+        concluir(resumo_totais)
+        return
+    iniciar_tarefa("Calculando totais", totais.calcular_totais_funcionario, (df,),
+                   concluir, falhar)
 
 def exibir_resumo_totais(resumo_data):
     """
     Exibe uma nova janela (Toplevel) com o resumo dos totais por funcionário.
 
     Args:
-        resumo_data (dict): Um dicionário onde as chaves são nomes de funcionários
-                            e os valores são dicionários com seus totais calculados.
+        resumo_data (dict): Um dicionário onde as chaves são IDs de funcionários
+                            e os valores são dicionários com o nome e os totais calculados.
     Side Effects:
         Cria e mostra uma nova janela Toplevel.
         Bloqueia interação com a janela principal até ser fechada.
     """
     total_window = tk.Toplevel(root)
     total_window.title("Resumo de Totais por Funcionário")
-    total_window.geometry("800x550")
+    total_window.geometry("870x550")
     total_window.transient(root); total_window.grab_set()
     
     style_resumo = ttk.Style(total_window)
@@ -812,23 +1188,23 @@ def exibir_resumo_totais(resumo_data):
     frame_resumo = ttk.Frame(total_window, padding="10")
     frame_resumo.pack(fill="both", expand=True)
 
-    cols_r = ("Funcionário", "H. Normais", "H. Extras", "H. Devidas", "Valor HE (R$)")
+    cols_r = ("ID", "Funcionário", "H. Normais", "H. Extras", "H. Devidas", "Valor HE (R$)")
     tree_r = ttk.Treeview(frame_resumo, columns=cols_r, show="headings", style='Resumo.Treeview')
     tree_r.pack(side="left", fill="both", expand=True)
     scrolly_r = ttk.Scrollbar(frame_resumo, orient="vertical", command=tree_r.yview)
     scrolly_r.pack(side="right", fill="y")
     tree_r.config(yscrollcommand=scrolly_r.set)
 
-    col_widths_r = {"Funcionário": 220, "H. Normais":100, "H. Extras":100, "H. Devidas":100, "Valor HE (R$)":130}
+    col_widths_r = {"ID": 70, "Funcionário": 220, "H. Normais":100, "H. Extras":100, "H. Devidas":100, "Valor HE (R$)":130}
     col_anchors_r = {"Funcionário": "w", "Valor HE (R$)": "e"}
     for col in cols_r:
         tree_r.heading(col, text=col)
         tree_r.column(col, width=col_widths_r.get(col, 100), anchor=col_anchors_r.get(col, "center"), minwidth=60)
 
-    for nome, totais in resumo_data.items():
+    for id_func, resumo in resumo_data.items():
         tree_r.insert("", "end", values=(
-            nome, totais["Total Horas Normais"], totais["Total Horas Extras"],
-            totais["Total Horas Devidas"], totais["Total a Receber Horas Extras"]
+            id_func, resumo["Nome"], resumo["Total Horas Normais"], resumo["Total Horas Extras"],
+            resumo["Total Horas Devidas"], resumo["Total a Receber Horas Extras"]
         ))
     
     ttk.Button(total_window, text="Fechar", command=total_window.destroy).pack(pady=10)
@@ -847,12 +1223,14 @@ def salvar_planilha():
     funcionário, incluindo um resumo de horas e valores no final de cada aba individual.
     Exibe notificações de sucesso ou falha.
 
+    A gravação roda numa thread de trabalho (`iniciar_tarefa`); se for
+    cancelada, o arquivo de destino não é alterado.
+
     Side Effects:
         Cria um arquivo Excel no local especificado pelo usuário.
         Atualiza `lbl_status`.
         Exibe `messagebox` de informação ou erro.
     """
-    global df
     if df.empty:
         messagebox.showinfo("Salvar", "Não há dados para salvar.")
         return
@@ -865,64 +1243,41 @@ def salvar_planilha():
         filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
         title="Salvar Planilha Modificada Como..."
     )
+    root.config(cursor="")
     if file_path:
-        try:
-            with pd.ExcelWriter(file_path) as writer:
-                df_to_save = df.copy()
-                df_to_save[COL_SALARIO_BASE] = pd.to_numeric(df_to_save[COL_SALARIO_BASE], errors='coerce')
-                df_to_save[COL_VALOR_HORA_EXTRA] = pd.to_numeric(df_to_save[COL_VALOR_HORA_EXTRA], errors='coerce')
-                
-                # Substituir np.nan e strings de erro por vazio para exportação
-                df_to_save.replace({np.nan: '', ERRO_FORMATO: "", ERRO_SEQUENCIA: ""}, inplace=True) 
-
-                for col_monetary in [COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA]:
-                    df_to_save[col_monetary] = df_to_save[col_monetary].apply(
-                        lambda x: f"{x:.2f}".replace('.', ',') if isinstance(x, (float, int)) else x
-                    )
-
-                df_to_save.to_excel(writer, sheet_name="Consolidado", index=False)
-
-                for nome in df[COL_NOME].unique():
-                    clean_nome = re.sub(r'[\\/*?:"<>|]', '', nome)[:30]
-                    df_funcionario = df[df[COL_NOME] == nome].copy()
-                    
-                    df_funcionario[COL_SALARIO_BASE] = pd.to_numeric(df_funcionario[COL_SALARIO_BASE], errors='coerce')
-                    df_funcionario[COL_VALOR_HORA_EXTRA] = pd.to_numeric(df_funcionario[COL_VALOR_HORA_EXTRA], errors='coerce')
-
-                    df_funcionario.replace({np.nan: '', ERRO_FORMATO: "", ERRO_SEQUENCIA: ""}, inplace=True)
-                    for col_monetary in [COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA]:
-                        df_funcionario[col_monetary] = df_funcionario[col_monetary].apply(
-                            lambda x: f"{x:.2f}".replace('.', ',') if isinstance(x, (float, int)) else x
-                        )
-
-                    df_funcionario.to_excel(writer, sheet_name=clean_nome, index=False)
-
-            lbl_status.config(text=f"Planilha salva com sucesso em: {file_path}", fg="green")
+        def concluir(_):
+            lbl_status.config(text=f"Planilha salva com sucesso em: {file_path}", foreground="green")
             messagebox.showinfo("Sucesso ao Salvar", f"Planilha salva com sucesso em:\n{file_path}")
-        except Exception as e:
-            lbl_status.config(text=f"Erro ao salvar planilha: {e}", fg="red")
+
+        def falhar(e):
+            lbl_status.config(text=f"Erro ao salvar planilha: {e}", foreground="red")
             messagebox.showerror("Erro ao Salvar", f"Não foi possível salvar a planilha:\n{e}")
-        finally:
-            root.config(cursor="")
+
+        iniciar_tarefa("Salvando planilha", exportacao.salvar_planilha, (df, file_path), concluir, falhar)
     else:
-        root.config(cursor="")
-        lbl_status.config(text="Operação de salvar cancelada.", fg="orange")
+        lbl_status.config(text="Operação de salvar cancelada.", foreground="orange")
 
 def abrir_configuracoes():
     """
     Abre uma janela Toplevel para o usuário editar as configurações da aplicação.
 
-    Permite alterar horas normais de trabalho e multiplicador de hora extra.
-    As alterações são salvas em `config.json` e aplicadas ao DataFrame atual.
+    Permite alterar horas normais de trabalho, multiplicador de hora extra,
+    o uso do banco local, o banco de horas (coluna e validade dos créditos)
+    e o arquivo da escala de trabalho (`escalas.ler_escalas`). As alterações
+    são salvas em `config.json` e aplicadas ao DataFrame atual.
 
     Side Effects:
         Cria e mostra uma nova janela Toplevel.
         Pode modificar `app_config`, `config.json`, e o DataFrame global `df`.
-        Pode chamar `save_config()`, `calcular_todas_horas_e_extras()`, `aplicar_filtros()`.
+        Pode chamar `save_config()`, `calculos.recalcular_configuracao()`, `aplicar_filtros()`.
+        Pode remover as planilhas do cache em disco (`cache.limpar_cache()`).
+        Pode ligar ou desligar o banco local (`app_preferencias["banco_local"]`).
+        Pode ligar, desligar ou recalcular a coluna Banco de Horas (`_atualizar_banco_horas()`).
+        Pode trocar ou remover a escala de trabalho (`escala_trabalho`, `escalas.aplicar_escala()`).
     """
     config_window = tk.Toplevel(root)
     config_window.title("Configurações")
-    config_window.geometry("480x280")
+    config_window.geometry("480x420")
     config_window.resizable(False, False)
     config_window.transient(root); config_window.grab_set()
 
@@ -945,7 +1300,46 @@ def abrir_configuracoes():
     entry_mult.insert(0, str(app_config["multiplicador_hora_extra"]).replace('.', ','))
     ttk.Label(frame_cfg, text="(Ex: 1.5 para 50% adicional)").grid(row=3, column=0, columnspan=2, sticky="w", padx=5, pady=(0,10))
 
+    var_banco = tk.BooleanVar(value=app_preferencias["banco_local"])
+    ttk.Checkbutton(frame_cfg, text="Guardar planilhas e edições no banco local (ponto.sqlite3)",
+                    variable=var_banco).grid(row=4, column=0, columnspan=2, sticky="w", pady=(5, 0))
+
+    var_banco_horas = tk.BooleanVar(value=app_preferencias["banco_horas"])
+    ttk.Checkbutton(frame_cfg, text="Mostrar a coluna Banco de Horas (saldo acumulado)",
+                    variable=var_banco_horas).grid(row=5, column=0, columnspan=2, sticky="w", pady=(5, 0))
+    ttk.Label(frame_cfg, text="Validade dos créditos do banco (meses, 0 = não vencem):").grid(row=6, column=0, sticky="w", pady=5)
+    entry_validade = ttk.Entry(frame_cfg, width=10)
+    entry_validade.grid(row=6, column=1, sticky="e", pady=5, padx=(10,0))
+    entry_validade.insert(0, str(app_preferencias["validade_banco_horas_meses"]))
+
+    # Escala escolhida nesta janela (só vale ao salvar)
+    escolha_escala = {"caminho": app_preferencias["arquivo_escalas"], "escala": escala_trabalho}
+
+    def texto_escala():
+        return os.path.basename(escolha_escala["caminho"]) or "Nenhuma (jornada única)"
+
+    def escolher_escala():
+        caminho = filedialog.askopenfilename(parent=config_window, title="Selecione a Escala de Trabalho",
+                                             filetypes=[("Texto ou CSV", "*.txt;*.csv"), ("Todos", "*.*")])
+        if not caminho:
+            if escolha_escala["caminho"] and messagebox.askyesno(
+                    "Escala de Trabalho", "Remover a escala atual e usar a jornada única?", parent=config_window):
+                escolha_escala.update(caminho="", escala=None)
+                btn_escala.config(text=texto_escala())
+            return
+        try:
+            escolha_escala.update(caminho=caminho, escala=escalas.ler_escalas(caminho))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Escala de Trabalho", f"Não foi possível ler a escala:\n{e}", parent=config_window)
+            return
+        btn_escala.config(text=texto_escala())
+
+    ttk.Label(frame_cfg, text="Escala de trabalho (jornada por ID/Área):").grid(row=7, column=0, sticky="w", pady=5)
+    btn_escala = ttk.Button(frame_cfg, text=texto_escala(), command=escolher_escala)
+    btn_escala.grid(row=7, column=1, sticky="e", pady=5, padx=(10,0))
+
     def salvar_cfg_local():
+        global escala_trabalho
         try:
             hn_str = entry_hn.get().replace(',', '.')
             mult_str = entry_mult.get().replace(',', '.')
@@ -962,17 +1356,39 @@ def abrir_configuracoes():
             if novo_mult <= 0:
                 messagebox.showerror("Erro", "Multiplicador deve ser positivo.", parent=config_window)
                 return
+            nova_validade = int(entry_validade.get().strip() or 0)
+            if nova_validade < 0:
+                messagebox.showerror("Erro", "Validade do banco de horas não pode ser negativa.", parent=config_window)
+                return
 
+            config_anterior = dict(app_config)
             app_config["horas_normais_h"] = novas_hn
             app_config["multiplicador_hora_extra"] = novo_mult
+            ligou_banco = var_banco.get() and not app_preferencias["banco_local"]
+            app_preferencias["banco_local"] = bool(var_banco.get())
+            app_preferencias["banco_horas"] = bool(var_banco_horas.get())
+            app_preferencias["validade_banco_horas_meses"] = nova_validade
+            escala_mudou = escolha_escala["caminho"] != app_preferencias["arquivo_escalas"] or \
+                escolha_escala["escala"] is not escala_trabalho
+            app_preferencias["arquivo_escalas"] = escolha_escala["caminho"]
+            escala_trabalho = escolha_escala["escala"]
             save_config()
+            if ligou_banco and not df.empty:
+                _no_banco(armazenamento.gravar_linhas, df)  # Guarda o que já está aberto
+            update_button_states()
             
             if not df.empty:
-                h_int = int(app_config["horas_normais_h"])
-                m_int = int((app_config["horas_normais_h"] * 60) % 60)
-                df[COL_HORAS_NORMAIS] = f"{h_int:02}:{m_int:02}"
-                calcular_todas_horas_e_extras()
-                aplicar_filtros()
+                if escala_mudou or (escala_trabalho is not None and config_anterior != app_config):
+                    # Jornada de cada linha pela escala (ou pela configuração, sem escala) e valor da HE
+                    escalas.aplicar_escala(df, escala_trabalho, app_config)
+                else:
+                    # Recalcula só o que depende do que mudou (jornada ou multiplicador)
+                    calculos.recalcular_configuracao(df, config_anterior, app_config, escala_trabalho)
+                if config_anterior != app_config or escala_mudou:
+                    historico_edicoes.limpar()  # Os deltas guardam valores da configuração antiga
+                marcar_dados_alterados(afeta_busca=False)
+                _atualizar_itens_tabela(_tabela_rotulos[:_tabela_inseridas])  # As linhas exibidas são as mesmas
+                _atualizar_banco_horas()
             
             messagebox.showinfo("Sucesso", "Configurações salvas!", parent=config_window)
             config_window.destroy()
@@ -981,8 +1397,17 @@ def abrir_configuracoes():
         except Exception as e_cfg:
             messagebox.showerror("Erro", f"Erro ao salvar: {e_cfg}", parent=config_window)
 
+    def limpar_cache_local():
+        removidas = cache.limpar_cache()
+        btn_limpar_cache.config(text="Limpar Cache (0,0 MB)")
+        messagebox.showinfo("Cache", f"{removidas} planilha(s) removida(s) do cache.", parent=config_window)
+
+    tamanho_mb = cache.tamanho_cache() / (1024 * 1024)
+    btn_limpar_cache = ttk.Button(frame_cfg, text=f"Limpar Cache ({tamanho_mb:.1f} MB)".replace('.', ','), command=limpar_cache_local)
+    btn_limpar_cache.grid(row=8, column=0, sticky="w", pady=(20,0))
+
     frame_botoes_cfg = ttk.Frame(frame_cfg)
-    frame_botoes_cfg.grid(row=4, column=0, columnspan=2, pady=(20,0), sticky="e")
+    frame_botoes_cfg.grid(row=8, column=1, pady=(20,0), sticky="e")
     ttk.Button(frame_botoes_cfg, text="Salvar", command=salvar_cfg_local).pack(side="left", padx=5)
     ttk.Button(frame_botoes_cfg, text="Cancelar", command=config_window.destroy).pack(side="left")
     
@@ -993,6 +1418,124 @@ def abrir_configuracoes():
     root.wait_window(config_window)
 
 
+def abrir_diagnostico():
+    """
+    Abre uma janela Toplevel com os tempos das últimas etapas do processamento.
+
+    Mostra, para cada execução registrada por `pontoknup1028.diagnostico`
+    (leitura, normalização, cálculo, busca, tabela, totais, exportação), o
+    número de linhas, o tempo e o pico de memória. Permite ligar a medição de
+    memória e a gravação dos registros em `diagnostico.jsonl` (ambas
+    desligadas por padrão).
+
+    Side Effects:
+        Cria e mostra uma nova janela Toplevel.
+        Pode alterar o estado da instrumentação (`diagnostico.ativar()`).
+    """
+    diag_window = tk.Toplevel(root)
+    diag_window.title("Diagnóstico de Desempenho")
+    diag_window.geometry("760x450")
+    diag_window.transient(root)
+
+    frame_diag = ttk.Frame(diag_window, padding="10")
+    frame_diag.pack(fill="both", expand=True)
+
+    cols_d = ("Etapa", "Linhas", "Tempo (s)", "Pico Memória (MB)", "Início")
+    tree_d = ttk.Treeview(frame_diag, columns=cols_d, show="headings")
+    tree_d.pack(side="left", fill="both", expand=True)
+    scrolly_d = ttk.Scrollbar(frame_diag, orient="vertical", command=tree_d.yview)
+    scrolly_d.pack(side="right", fill="y")
+    tree_d.config(yscrollcommand=scrolly_d.set)
+
+    col_widths_d = {"Etapa": 170, "Linhas": 90, "Tempo (s)": 90, "Pico Memória (MB)": 130, "Início": 200}
+    for col in cols_d:
+        tree_d.heading(col, text=col)
+        tree_d.column(col, width=col_widths_d[col], anchor="w" if col == "Etapa" else "center", minwidth=60)
+
+    def atualizar_lista():
+        tree_d.delete(*tree_d.get_children())
+        for registro in reversed(diagnostico.registros()):  # Mais recentes primeiro
+            pico = registro["pico_memoria_mb"]
+            tree_d.insert("", "end", values=(
+                registro["etapa"] + (f" ({registro['erro']})" if registro["erro"] else ""),
+                "" if registro["linhas"] is None else f"{registro['linhas']:,}".replace(',', '.'),
+                f"{registro['segundos']:.3f}".replace('.', ','),
+                "-" if pico is None else f"{pico:.1f}".replace('.', ','),
+                registro["inicio"].replace('T', ' '),
+            ))
+
+    estado_atual = diagnostico.estado()
+    var_memoria = tk.BooleanVar(value=estado_atual["memoria"])
+    var_log = tk.BooleanVar(value=bool(estado_atual["caminho_log"]))
+
+    def aplicar_opcoes():
+        diagnostico.ativar(memoria=var_memoria.get(),
+                           caminho_log=(estado_atual["caminho_log"] or DIAGNOSTICO_LOG_FILE) if var_log.get() else None)
+
+    def limpar_lista():
+        diagnostico.limpar()
+        atualizar_lista()
+
+    frame_opcoes_d = ttk.Frame(diag_window, padding="10 0 10 10")
+    frame_opcoes_d.pack(fill="x")
+    ttk.Checkbutton(frame_opcoes_d, text="Medir pico de memória (mais lento)", variable=var_memoria,
+                    command=aplicar_opcoes).pack(side="left")
+    ttk.Checkbutton(frame_opcoes_d, text="Gravar log (diagnostico.jsonl)", variable=var_log,
+                    command=aplicar_opcoes).pack(side="left", padx=10)
+    ttk.Button(frame_opcoes_d, text="Fechar", command=diag_window.destroy).pack(side="right")
+    ttk.Button(frame_opcoes_d, text="Limpar", command=limpar_lista).pack(side="right", padx=5)
+    ttk.Button(frame_opcoes_d, text="Atualizar", command=atualizar_lista).pack(side="right")
+
+    atualizar_lista()
+    diag_window.update_idletasks()
+    x = (diag_window.winfo_screenwidth() // 2) - (diag_window.winfo_width() // 2)
+    y = (diag_window.winfo_screenheight() // 2) - (diag_window.winfo_height() // 2)
+    diag_window.geometry(f'+{x}+{y}')
+
+
+def marcar_dados_alterados(afeta_busca=True):
+    """
+    Descarta os resultados derivados de `df` (totais e índice de busca).
+
+    Deve ser chamada sempre que as linhas de `df` mudarem; eles são recriados
+    sob demanda pelo próximo `aplicar_filtros()` ou "Calcular Totais".
+
+    Args:
+        afeta_busca (bool, optional): False quando ID, Nome e Área não mudaram,
+                                      mantendo o índice de busca.
+    Side Effects:
+        Modifica as variáveis globais `resumo_totais` e `indice_busca`.
+    """
+    global indice_busca, resumo_totais
+    resumo_totais = None
+    if afeta_busca:
+        indice_busca = None
+
+
+def agendar_filtros(event=None):
+    """
+    Agenda `aplicar_filtros()` para depois da última tecla digitada.
+
+    Cada tecla cancela o agendamento anterior, então digitar um nome inteiro
+    filtra uma única vez em vez de uma vez por caractere.
+
+    Args:
+        event (tk.Event, optional): Evento `<KeyRelease>` dos campos de filtro.
+    Side Effects:
+        Modifica a variável global `_filtro_agendado` e agenda um callback em `root`.
+    """
+    global _filtro_agendado
+    if _filtro_agendado is not None:
+        root.after_cancel(_filtro_agendado)
+    _filtro_agendado = root.after(ATRASO_FILTRO_MS, _executar_filtro_agendado)
+
+
+def _executar_filtro_agendado():
+    global _filtro_agendado
+    _filtro_agendado = None
+    aplicar_filtros()
+
+
 def aplicar_filtros(event=None):
     """
     Aplica os filtros de ID, Nome e Área ao DataFrame global `df`
@@ -1003,28 +1546,22 @@ def aplicar_filtros(event=None):
                                    Não utilizado diretamente pela função, mas permite
                                    que ela seja usada como callback de evento.
     Side Effects:
+        Recria `indice_busca` se tiver sido invalidado.
         Chama `atualizar_tabela()` com o DataFrame filtrado.
         Atualiza `lbl_status`.
     """
+    global indice_busca
     if df.empty:
         atualizar_tabela()
         lbl_status.config(text="ℹ️ Nenhuma planilha carregada para filtrar.", foreground="blue")
         return
 
-    df_filtrado = df.copy()
+    if indice_busca is None or indice_busca.n_linhas != len(df):
+        indice_busca = filtros.IndiceBusca(df)
     id_f = entry_filtro_id.get().strip().lower()
-    nome_f = unicodedata.normalize('NFKD', entry_filtro_nome.get().strip().lower()).encode('ASCII', 'ignore').decode('utf-8')
-    area_f = unicodedata.normalize('NFKD', entry_filtro_area.get().strip().lower()).encode('ASCII', 'ignore').decode('utf-8')
-
-    if id_f: df_filtrado = df_filtrado[df_filtrado[COL_ID].str.lower().str.contains(id_f, na=False)]
-    if nome_f:
-        df_filtrado = df_filtrado[df_filtrado[COL_NOME].astype(str).apply(
-            lambda x: unicodedata.normalize('NFKD', x.lower()).encode('ASCII', 'ignore').decode('utf-8')
-        ).str.contains(nome_f, na=False)]
-    if area_f:
-        df_filtrado = df_filtrado[df_filtrado[COL_AREA].astype(str).apply(
-            lambda x: unicodedata.normalize('NFKD', x.lower()).encode('ASCII', 'ignore').decode('utf-8')
-        ).str.contains(area_f, na=False)]
+    nome_f = filtros.normalizar_texto(entry_filtro_nome.get())
+    area_f = filtros.normalizar_texto(entry_filtro_area.get())
+    df_filtrado = filtros.filtrar_com_indice(df, indice_busca, id_f, nome_f, area_f)
 
     atualizar_tabela(df_filtrado)
     if df_filtrado.empty and (id_f or nome_f or area_f):
@@ -1106,15 +1643,21 @@ icon_save_action = None
 frame_acoes_topo = ttk.Frame(root, padding="10 5 10 5") # E, C, D, B
 frame_acoes_topo.pack(fill='x')
 
-btn_selecionar = ttk.Button(frame_acoes_topo, text="Selecionar Arquivo", command=selecionar_arquivo, image=icon_folder, compound="left")
+btn_selecionar = ttk.Button(frame_acoes_topo, text="Selecionar Arquivo(s)", command=selecionar_arquivo, image=icon_folder, compound="left")
 btn_selecionar.pack(side="left", padx=(0,5)) # (padx_esq, padx_dir)
 
+btn_abrir_banco = ttk.Button(frame_acoes_topo, text="Abrir do Banco Local", command=abrir_periodo_do_banco, state="disabled")
+btn_abrir_banco.pack(side="left", padx=5)
+
 btn_salvar = ttk.Button(frame_acoes_topo, text="Salvar como Excel", command=salvar_planilha, state="disabled", image=icon_save_action, compound="left")
 btn_salvar.pack(side="left", padx=5)
 
 btn_config = ttk.Button(frame_acoes_topo, text="Configurações", command=abrir_configuracoes)
 btn_config.pack(side="right", padx=5) # Alinha à direita
 
+btn_diagnostico = ttk.Button(frame_acoes_topo, text="Diagnóstico", command=abrir_diagnostico)
+btn_diagnostico.pack(side="right", padx=5)
+
 
 # 2. Frame para Filtros
 frame_filtros_ui = ttk.LabelFrame(root, text="Filtros de Exibição", padding="10 10 10 10")
@@ -1123,17 +1666,17 @@ frame_filtros_ui.pack(fill='x', padx=10, pady=5)
 ttk.Label(frame_filtros_ui, text="ID:").pack(side="left", padx=(0,2))
 entry_filtro_id = ttk.Entry(frame_filtros_ui, width=12)
 entry_filtro_id.pack(side="left", padx=(0,10))
-entry_filtro_id.bind("<KeyRelease>", aplicar_filtros)
+entry_filtro_id.bind("<KeyRelease>", agendar_filtros)
 
 ttk.Label(frame_filtros_ui, text="Nome:").pack(side="left", padx=(0,2))
 entry_filtro_nome = ttk.Entry(frame_filtros_ui, width=25)
 entry_filtro_nome.pack(side="left", padx=(0,10))
-entry_filtro_nome.bind("<KeyRelease>", aplicar_filtros)
+entry_filtro_nome.bind("<KeyRelease>", agendar_filtros)
 
 ttk.Label(frame_filtros_ui, text="Área:").pack(side="left", padx=(0,2))
 entry_filtro_area = ttk.Entry(frame_filtros_ui, width=18)
 entry_filtro_area.pack(side="left", padx=(0,15))
-entry_filtro_area.bind("<KeyRelease>", aplicar_filtros)
+entry_filtro_area.bind("<KeyRelease>", agendar_filtros)
 
 btn_limpar_filtros = ttk.Button(frame_filtros_ui, text="Limpar Filtros", command=limpar_filtros)
 btn_limpar_filtros.pack(side="left")
@@ -1143,12 +1686,12 @@ btn_limpar_filtros.pack(side="left")
 frame_tabela_ui = ttk.Frame(root, padding=(10, 0, 10, 5)) # (E, C, D, B)
 frame_tabela_ui.pack(fill='both', expand=True)
 
-tabela = ttk.Treeview(frame_tabela_ui, selectmode='browse') # browse = seleciona uma linha
+tabela = ttk.Treeview(frame_tabela_ui, selectmode='extended') # extended = Ctrl/Shift selecionam várias linhas
 tabela.bind("<<TreeviewSelect>>", on_treeview_select) # Chama a função ao selecionar
 
 scrollbar_y = ttk.Scrollbar(frame_tabela_ui, orient="vertical", command=tabela.yview)
 scrollbar_y.pack(side="right", fill="y")
-tabela.configure(yscrollcommand=scrollbar_y.set)
+tabela.configure(yscrollcommand=_on_tabela_yscroll) # Carrega mais linhas ao rolar
 
 scrollbar_x = ttk.Scrollbar(frame_tabela_ui, orient="horizontal", command=tabela.xview)
 scrollbar_x.pack(side="bottom", fill="x")
@@ -1164,12 +1707,27 @@ frame_acoes_edicao_calc.pack(fill='x')
 btn_editar = ttk.Button(frame_acoes_edicao_calc, text="Editar Célula Sel.", command=editar_celula, state="disabled")
 btn_editar.pack(side="left", padx=(0,5))
 
+btn_editar_massa = ttk.Button(frame_acoes_edicao_calc, text="Editar em Massa", command=editar_em_massa, state="disabled")
+btn_editar_massa.pack(side="left", padx=5)
+
 btn_excluir_id = ttk.Button(frame_acoes_edicao_calc, text="Excluir por ID Digitado", command=excluir_funcionario_por_id, state="disabled")
 btn_excluir_id.pack(side="left", padx=5)
 
 btn_remover_fds = ttk.Button(frame_acoes_edicao_calc, text="Remover Sab/Dom Sel.", command=remover_sabado_domingo_manual, state="disabled")
 btn_remover_fds.pack(side="left", padx=5)
 
+btn_desfazer = ttk.Button(frame_acoes_edicao_calc, text="Desfazer", command=desfazer_edicao, state="disabled")
+btn_desfazer.pack(side="left", padx=(15,5))
+
+btn_refazer = ttk.Button(frame_acoes_edicao_calc, text="Refazer", command=refazer_edicao, state="disabled")
+btn_refazer.pack(side="left", padx=5)
+
+root.bind("<Control-z>", desfazer_edicao)
+root.bind("<Control-y>", refazer_edicao)
+
+btn_fds_feriados = ttk.Button(frame_acoes_edicao_calc, text="Fins de Semana/Feriados", command=tratar_fins_de_semana_e_feriados, state="disabled")
+btn_fds_feriados.pack(side="left", padx=5)
+
 btn_calcular_totais = ttk.Button(frame_acoes_edicao_calc, text="Calcular Totais (GUI)", command=calcular_totais_funcionario, state="disabled")
 btn_calcular_totais.pack(side="right", padx=5) # À direita
 
@@ -1178,9 +1736,22 @@ btn_calcular_totais.pack(side="right", padx=5) # À direita
 lbl_status = ttk.Label(root, text="ℹ️ Pronto. Carregue uma planilha para começar.", relief=tk.SUNKEN, anchor='w', padding=5)
 lbl_status.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
 
+# 6. Progresso de operações longas (exibido só durante a operação, acima do status)
+frame_progresso = ttk.Frame(root)
+lbl_progresso = ttk.Label(frame_progresso, text="", anchor='w', width=45)
+lbl_progresso.pack(side="left", padx=(0, 10))
+barra_progresso = ttk.Progressbar(frame_progresso, orient="horizontal", mode="indeterminate", maximum=100)
+barra_progresso.pack(side="left", fill="x", expand=True)
+btn_cancelar_tarefa = ttk.Button(frame_progresso, text="Cancelar", command=cancelar_tarefa)
+btn_cancelar_tarefa.pack(side="left", padx=(10, 0))
+
 
 # --- INICIALIZAÇÃO ---
 load_config()
+carregar_escala_preferida()
+# Tempos das etapas sempre registrados em memória (custo desprezível); memória e log
+# ficam desligados, salvo se PONTOKNUP_DIAGNOSTICO_LOG indicar um arquivo de log.
+diagnostico.ativar(caminho_log=os.environ.get(diagnostico.VARIAVEL_AMBIENTE_LOG))
 aplicar_filtros() # Para configurar a tabela e status inicial
 update_button_states() # Define o estado inicial dos botões
 
@@ -0,0 +1,56 @@
+# pontoknup1028/__init__.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Núcleo da Calculadora de Ponto e Horas Extras, sem interface gráfica.
+
+Reúne leitura da planilha do Knup 1028, cálculo de horas, totais, filtros e
+exportação. Pode ser usado por scripts e testes sem display; a aplicação Tk
+(`calculadora_ponto_main.py`) é apenas uma camada sobre estas funções.
+
+As funções são carregadas sob demanda: `import pontoknup1028` não importa
+pandas, e cada submódulo só é importado no primeiro acesso ao nome exportado.
+O custo de importação pode ser medido com:
+
+    python -X importtime -c "import pontoknup1028.calculos"
+"""
+
+import importlib
+
+from pontoknup1028.constantes import *  # noqa: F401,F403
+from pontoknup1028.config import CONFIG_PADRAO, nova_config, ler_config, salvar_config, formatar_horas_normais, minutos_horas_normais
+
+_EXPORTACOES_SOB_DEMANDA = {
+    "calcular_todas_horas_e_extras": "pontoknup1028.calculos",
+    "calcular_horas_vetorizado": "pontoknup1028.calculos",
+    "carregar_planilha": "pontoknup1028.carregamento",
+    "normalizar_planilha": "pontoknup1028.carregamento",
+    "carregar_planilha_em_blocos": "pontoknup1028.carregamento",
+    "carregar_planilha_com_cache": "pontoknup1028.cache",
+    "juntar_planilhas": "pontoknup1028.mesclagem",
+    "calcular_totais_funcionario": "pontoknup1028.totais",
+    "totais_por_id": "pontoknup1028.totais",
+    "abrir_banco": "pontoknup1028.armazenamento",
+    "carregar_periodo": "pontoknup1028.armazenamento",
+    "editar_em_massa": "pontoknup1028.edicao",
+    "calcular_banco_horas": "pontoknup1028.banco_horas",
+    "ler_escalas": "pontoknup1028.escalas",
+    "aplicar_escala": "pontoknup1028.escalas",
+    "filtrar": "pontoknup1028.filtros",
+    "textos_coluna": "pontoknup1028.esquema",
+    "salvar_planilha": "pontoknup1028.exportacao",
+}
+
+
+def __getattr__(nome):
+    modulo = _EXPORTACOES_SOB_DEMANDA.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(modulo), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTACOES_SOB_DEMANDA))
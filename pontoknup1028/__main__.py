@@ -0,0 +1,12 @@
+# pontoknup1028/__main__.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""Permite executar o processamento em lote com `python -m pontoknup1028`."""
+
+import sys
+
+from pontoknup1028.lote import main
+
+if __name__ == "__main__":
+    sys.exit(main())
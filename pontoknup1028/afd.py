@@ -0,0 +1,245 @@
+# pontoknup1028/afd.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Leitura do AFD (Arquivo Fonte de Dados) dos relógios de ponto.
+
+O AFD é um arquivo de texto com um registro por linha; o 10º caractere é o
+tipo do registro. São usados:
+
+- tipo 3 (marcação de ponto) e tipo 7 (marcação do REP-P);
+- tipo 5 (inclusão/alteração de empregado), de onde vem o Nome.
+
+Os dois leiautes são aceitos: o da Portaria 1510/2009 (data DDMMAAAA, hora
+HHMM e PIS) e o da Portaria 671/2021 (data e hora "AAAA-MM-DDThh:mm:00-0300"
+e CPF). O ID de cada linha é o PIS/CPF com 11 dígitos.
+
+O arquivo é lido em blocos de linhas: os campos de largura fixa de todas as
+marcações do bloco são convertidos de uma vez (matriz de bytes do NumPy), e
+só três arrays compactos por marcação (funcionário, dia, minuto) são
+guardados. Esse formato longo é ordenado uma única vez por (funcionário,
+dia, hora), separado em jornadas e pareado em intervalos (`marcacoes`):
+cada jornada vira uma linha com a Data do dia em que começou, os minutos
+trabalhados somados de todos os intervalos e uma visão em Entrada,
+Saída-Almoço, Volta-Almoço e Saída:
+
+- 2 marcações: Entrada e Saída (dia sem almoço);
+- quantidade ímpar: as primeiras colunas, sem Saída (horários incompletos);
+- 4 ou mais: a primeira e a última, e as pontas da maior pausa; acima de 4,
+  a quantidade vai para a Nota.
+
+Memória: um AFD não precisa estar em ordem cronológica, então uma jornada
+só está completa depois da última linha do arquivo. Por isso as marcações
+do arquivo inteiro ficam em memória, mas só como os três arrays (cerca de
+14 bytes por marcação, ~28 MB para 2 milhões), e o agrupamento produz
+arrays por jornada (~40 bytes cada). Os DataFrames só são montados bloco a
+bloco em `iterar_blocos_afd`, com no máximo `tamanho_bloco` linhas de cada
+vez; o custo em memória cresce, portanto, com o total de marcações.
+
+Marcações repetidas no mesmo minuto contam uma vez. O resultado tem as
+colunas da planilha do Knup 1028 e segue a mesma normalização e cálculo
+(`carregamento`).
+"""
+
+import os
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import marcacoes
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_AREA, COL_DATA, COL_NOTA, COL_MINUTOS_MARCACOES, COLUNAS_HORARIOS
+)
+from pontoknup1028.tarefas import avisar_progresso
+
+EXTENSOES_AFD = (".txt", ".afd")
+CABECALHO_AFD = b"0000000001"  # NSR zero seguido do tipo 1 (cabeçalho)
+LINHAS_POR_LEITURA = 100_000   # Linhas do arquivo convertidas de uma vez
+TIPOS_MARCACAO = (b"3", b"7")
+TIPO_EMPREGADO = b"5"
+
+# Posições dos campos (início, fim) em cada leiaute
+_CAMPOS_1510 = {"largura": 34, "dia": (10, 12), "mes": (12, 14), "ano": (14, 18),
+                "hora": (18, 20), "minuto": (20, 22), "pessoa": (22, 34)}
+_CAMPOS_671 = {"largura": 46, "ano": (10, 14), "mes": (15, 17), "dia": (18, 20),
+               "hora": (21, 23), "minuto": (24, 26), "pessoa": (34, 46)}
+
+
+def eh_arquivo_afd(caminho):
+    """
+    Indica se o arquivo é um AFD: extensão de texto e cabeçalho (NSR zero, tipo 1).
+
+    Args:
+        caminho (str): Arquivo a verificar.
+
+    Returns:
+        bool: True para AFD.
+    """
+    if os.path.splitext(str(caminho))[1].lower() not in EXTENSOES_AFD:
+        return False
+    try:
+        with open(caminho, "rb") as f:
+            return f.read(len(CABECALHO_AFD)) == CABECALHO_AFD
+    except OSError:
+        return False
+
+
+def _numeros(matriz, inicio, fim):
+    """Campo numérico de largura fixa de cada linha da matriz de bytes, e a máscara dos campos só com dígitos."""
+    digitos = matriz[:, inicio:fim].astype(np.int64) - ord("0")
+    validos = ((digitos >= 0) & (digitos <= 9)).all(axis=1)
+    return digitos @ (10 ** np.arange(fim - inicio - 1, -1, -1, dtype=np.int64)), validos
+
+
+def _converter_marcacoes(linhas, campos):
+    """
+    Converte de uma vez as linhas de marcação de um leiaute.
+
+    Returns:
+        tuple: Arrays (pessoa int64, dia desde 1970 int32, minuto int16) só das linhas válidas.
+    """
+    largura = campos["largura"]
+    matriz = np.frombuffer(b"".join(linha[:largura].ljust(largura) for linha in linhas),
+                           dtype=np.uint8).reshape(-1, largura)
+    valores, validas = {}, np.ones(len(linhas), dtype=bool)
+    for nome in ("ano", "mes", "dia", "hora", "minuto", "pessoa"):
+        valores[nome], validos = _numeros(matriz, *campos[nome])
+        validas &= validos
+    validas &= (valores["mes"] >= 1) & (valores["mes"] <= 12) & (valores["dia"] >= 1) & (valores["dia"] <= 31)
+    validas &= (valores["hora"] < 24) & (valores["minuto"] < 60)
+    meses = np.where(validas, (valores["ano"] - 1970) * 12 + valores["mes"] - 1, 0).astype("datetime64[M]")
+    dias = meses.astype("datetime64[D]") + np.where(validas, valores["dia"] - 1, 0).astype("timedelta64[D]")
+    validas &= dias.astype("datetime64[M]") == meses  # Ex: 31/02 passaria para março
+    return (valores["pessoa"][validas], dias[validas].astype(np.int32),
+            (valores["hora"] * 60 + valores["minuto"])[validas].astype(np.int16))
+
+
+def _nome_empregado(linha):
+    """(PIS/CPF, nome) de um registro tipo 5, ou None se o registro não tiver esse formato."""
+    if linha[14:15] == b"-":  # Portaria 671: data e hora com 24 caracteres
+        pessoa, nome = linha[35:47], linha[47:99]
+    else:
+        pessoa, nome = linha[23:35], linha[35:87]
+    if not pessoa.isdigit():
+        return None
+    return int(pessoa), nome.decode("latin-1").strip()
+
+
+def ler_marcacoes_afd(caminho, progresso=None):
+    """
+    Lê as marcações de um AFD, bloco a bloco.
+
+    Linhas de marcação com data, hora ou PIS/CPF inválidos são ignoradas.
+
+    Args:
+        caminho (str): Arquivo AFD.
+        progresso (callable, optional): Recebe (linhas lidas, None) a cada bloco.
+
+    Returns:
+        tuple: (pessoa, dia, minuto) arrays por marcação, na ordem do arquivo,
+               e o dicionário PIS/CPF (int) -> nome dos registros tipo 5.
+    """
+    pessoas, dias, minutos, nomes = [], [], [], {}
+    lidas = 0
+    with open(caminho, "rb") as f:
+        while True:
+            linhas = list(islice(f, LINHAS_POR_LEITURA))
+            if not linhas:
+                break
+            lidas += len(linhas)
+            por_leiaute = {"1510": [], "671": []}
+            for linha in linhas:
+                tipo = linha[9:10]
+                if tipo in TIPOS_MARCACAO:
+                    por_leiaute["671" if linha[14:15] == b"-" else "1510"].append(linha)
+                elif tipo == TIPO_EMPREGADO:
+                    empregado = _nome_empregado(linha)
+                    if empregado:
+                        nomes[empregado[0]] = empregado[1]
+            for leiaute, campos in (("1510", _CAMPOS_1510), ("671", _CAMPOS_671)):
+                if por_leiaute[leiaute]:
+                    pessoa, dia, minuto = _converter_marcacoes(por_leiaute[leiaute], campos)
+                    pessoas.append(pessoa)
+                    dias.append(dia)
+                    minutos.append(minuto)
+            avisar_progresso(progresso, lidas)
+    if not pessoas:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int32), np.array([], dtype=np.int16), nomes
+    return np.concatenate(pessoas), np.concatenate(dias), np.concatenate(minutos), nomes
+
+
+def _jornadas(pessoa, dia, minuto):
+    """
+    Agrupa as marcações em jornadas (`marcacoes`).
+
+    Returns:
+        tuple: Por jornada, (pessoa, dia de início, quantidade de marcações,
+               minutos trabalhados e visão em quatro colunas de `parear_marcacoes`).
+    """
+    pessoa, dia, minuto = marcacoes.ordenar_marcacoes(pessoa, dia, minuto)
+    inicio = marcacoes.separar_jornadas(pessoa, dia, minuto)
+    quantidade, trabalhado, visao = marcacoes.parear_marcacoes(minuto, inicio)
+    inicios = np.flatnonzero(inicio)
+    return pessoa[inicios], dia[inicios], quantidade, trabalhado, visao
+
+
+def _linhas_das_jornadas(pessoa, dia, quantidade, trabalhado, visao, nomes):
+    """Monta o DataFrame de `agrupar_marcacoes` a partir dos arrays por jornada de `_jornadas`."""
+    pessoas, codigos = np.unique(pessoa, return_inverse=True)
+    df = pd.DataFrame({
+        COL_ID: np.array([f"{p:011d}" for p in pessoas], dtype=object)[codigos],
+        COL_NOME: np.array([nomes.get(int(p), "") for p in pessoas], dtype=object)[codigos],
+        COL_AREA: "",
+        COL_DATA: dia.astype("datetime64[D]").astype("datetime64[ns]"),
+    })
+    for k, col in enumerate(COLUNAS_HORARIOS):
+        valores = pd.array(visao[:, k], dtype="Int16")
+        valores[visao[:, k] == marcacoes.SEM_MARCACAO] = pd.NA
+        df[col] = valores
+    notas = np.full(len(pessoa), "", dtype=object)
+    excedente = quantidade > marcacoes.COLUNAS_VISAO
+    notas[excedente] = [f"{q} marcações" for q in quantidade[excedente]]
+    df[COL_NOTA] = notas
+    somados = pd.array(np.where(trabalhado < 0, 0, trabalhado), dtype="Int16")
+    somados[trabalhado < 0] = pd.NA
+    df[COL_MINUTOS_MARCACOES] = somados
+    return df
+
+
+def agrupar_marcacoes(pessoa, dia, minuto, nomes=None):
+    """
+    Agrupa as marcações em jornadas e monta uma linha por jornada.
+
+    Args:
+        pessoa (np.ndarray): PIS/CPF (int64) por marcação.
+        dia (np.ndarray): Dias desde 1970 (int32) por marcação.
+        minuto (np.ndarray): Minuto do dia (int16) por marcação.
+        nomes (dict, optional): PIS/CPF -> nome.
+
+    Returns:
+        pd.DataFrame: Uma linha por jornada, ordenadas por ID e Data, com ID,
+                      Nome, Área (vazia), Data, a visão das marcações em minutos
+                      (Int16), Nota e COL_MINUTOS_MARCACOES (NA se ímpar).
+    """
+    return _linhas_das_jornadas(*_jornadas(pessoa, dia, minuto), nomes or {})
+
+
+def iterar_blocos_afd(caminho, tamanho_bloco, progresso=None):
+    """
+    Lê um AFD e entrega as linhas (funcionário, dia) em blocos, como `carregamento.iterar_linhas_planilha`.
+
+    Args:
+        caminho (str): Arquivo AFD.
+        tamanho_bloco (int): Número máximo de linhas por bloco.
+        progresso (callable, optional): Callback de progresso da leitura.
+
+    Yields:
+        pd.DataFrame: Blocos com as colunas de `agrupar_marcacoes`.
+    """
+    pessoa, dia, minuto, nomes = ler_marcacoes_afd(caminho, progresso)
+    jornadas = _jornadas(pessoa, dia, minuto)
+    del pessoa, dia, minuto  # Daqui em diante só os arrays por jornada
+    for inicio in range(0, len(jornadas[0]), tamanho_bloco):
+        yield _linhas_das_jornadas(*(array[inicio:inicio + tamanho_bloco] for array in jornadas), nomes)
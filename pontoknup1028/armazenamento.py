@@ -0,0 +1,346 @@
+# pontoknup1028/armazenamento.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Banco local (SQLite) com as marcações já normalizadas e calculadas.
+
+Cada linha do DataFrame de trabalho vira um registro da tabela `marcacoes`,
+identificado por (ID, Data). Importar uma planilha é um upsert (o registro
+do mesmo funcionário e dia é substituído), editar uma célula regrava só as
+linhas alteradas e abrir um período é uma consulta indexada por data (e,
+opcionalmente, por Área ou ID), sem passar pelo Excel.
+
+As horas devidas/extras e o valor da HE são gravados para consultas diretas
+ao banco, mas `carregar_periodo` sempre os recalcula com a configuração
+atual a partir das marcações. Linhas sem ID ou sem data válida não têm chave
+e não são gravadas.
+
+A tabela `saldos_abertura` guarda os saldos de abertura do banco de horas
+por (ID, mês) (ver `banco_horas`), para que um mês novo continue do saldo
+do anterior sem recalcular o histórico.
+"""
+
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import calendario, diagnostico, esquema
+from pontoknup1028.calculos import calcular_todas_horas_e_extras
+from pontoknup1028.config import minutos_horas_normais
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_AREA, COL_DATA, COL_SEMANA, COL_ENTRADA, COL_SAIDA_ALMOCO,
+    COL_VOLTA_ALMOCO, COL_SAIDA, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_HORAS_NORMAIS,
+    COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA, COL_NOTA, COL_TEXTOS_INVALIDOS,
+    COL_MINUTOS_TRABALHADOS, COL_MINUTOS_MARCACOES, COL_STATUS, COLUNAS_INTERNAS, ORDEM_COLUNAS
+)
+from pontoknup1028.tarefas import PASSO_PROGRESSO, avisar_progresso
+
+VERSAO_ESQUEMA = 3  # PRAGMA user_version do arquivo (2: tabela saldos_abertura; 3: minutos_marcacoes)
+
+# Coluna do DataFrame -> coluna da tabela `marcacoes`
+COLUNAS_SQL = {
+    COL_ID: "id",
+    COL_DATA: "data",
+    COL_NOME: "nome",
+    COL_AREA: "area",
+    COL_SEMANA: "semana",
+    COL_ENTRADA: "entrada",
+    COL_SAIDA_ALMOCO: "saida_almoco",
+    COL_VOLTA_ALMOCO: "volta_almoco",
+    COL_SAIDA: "saida",
+    COL_HORAS_DEVIDAS: "horas_devidas",
+    COL_HORAS_EXTRAS: "horas_extras",
+    COL_HORAS_NORMAIS: "horas_normais",
+    COL_SALARIO_BASE: "salario_base",
+    COL_VALOR_HORA_EXTRA: "valor_hora_extra",
+    COL_NOTA: "nota",
+    COL_TEXTOS_INVALIDOS: "textos_invalidos",
+    COL_MINUTOS_TRABALHADOS: "minutos_trabalhados",
+    COL_STATUS: "status",
+    COL_MINUTOS_MARCACOES: "minutos_marcacoes",
+}
+_COLUNAS_MINUTOS = [COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA, COL_HORAS_DEVIDAS,
+                    COL_HORAS_EXTRAS, COL_HORAS_NORMAIS, COL_MINUTOS_TRABALHADOS, COL_MINUTOS_MARCACOES]
+
+_ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS marcacoes (
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,              -- AAAA-MM-DD
+    nome TEXT, area TEXT, semana TEXT,
+    entrada INTEGER, saida_almoco INTEGER, volta_almoco INTEGER, saida INTEGER,
+    horas_devidas INTEGER, horas_extras INTEGER, horas_normais INTEGER,
+    salario_base REAL, valor_hora_extra REAL,
+    nota TEXT, textos_invalidos TEXT,
+    minutos_trabalhados INTEGER, status INTEGER,
+    minutos_marcacoes INTEGER,       -- Soma dos intervalos de todas as marcações (AFD)
+    PRIMARY KEY (id, data)
+);
+CREATE INDEX IF NOT EXISTS marcacoes_data ON marcacoes (data);
+CREATE INDEX IF NOT EXISTS marcacoes_area ON marcacoes (area, data);
+CREATE TABLE IF NOT EXISTS saldos_abertura (
+    id TEXT NOT NULL,
+    mes TEXT NOT NULL,               -- AAAA-MM
+    lotes TEXT NOT NULL,             -- JSON: [["AAAA-MM", minutos], ...]
+    PRIMARY KEY (id, mes)
+);
+"""
+
+_CHAVE = ("id", "data")
+_UPSERT_SQL = "INSERT INTO marcacoes ({colunas}) VALUES ({marcadores}) ON CONFLICT (id, data) DO UPDATE SET {novos}".format(
+    colunas=", ".join(COLUNAS_SQL.values()),
+    marcadores=", ".join("?" * len(COLUNAS_SQL)),
+    novos=", ".join(f"{c} = excluded.{c}" for c in COLUNAS_SQL.values() if c not in _CHAVE),
+)
+
+
+def abrir_banco(caminho):
+    """
+    Abre (ou cria) o banco local e garante a tabela e os índices; arquivos
+    de versões anteriores recebem as colunas novas.
+
+    Args:
+        caminho (str): Caminho do arquivo SQLite.
+
+    Returns:
+        sqlite3.Connection: Conexão aberta (fechar com `.close()`). Só pode
+                            ser usada na thread que a abriu.
+    """
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("PRAGMA journal_mode = WAL")
+    conexao.execute("PRAGMA synchronous = NORMAL")
+    versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+    with conexao:
+        conexao.executescript(_ESQUEMA_SQL)
+        if 0 < versao < 3:  # Arquivo anterior à coluna minutos_marcacoes
+            conexao.execute("ALTER TABLE marcacoes ADD COLUMN minutos_marcacoes INTEGER")
+        conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+    return conexao
+
+
+def _valores_sql(df):
+    """
+    Colunas do DataFrame convertidas para valores aceitos pelo sqlite3.
+
+    Args:
+        df (pd.DataFrame): Linhas a gravar.
+
+    Returns:
+        tuple: (lista de colunas em listas Python, máscara das linhas com chave).
+    """
+    colunas = []
+    for coluna in COLUNAS_SQL:
+        if coluna not in df.columns:
+            colunas.append([None] * len(df))
+            continue
+        serie = df[coluna]
+        if coluna == COL_DATA:
+            valores = pd.to_datetime(serie, errors="coerce").dt.strftime("%Y-%m-%d")
+        elif coluna == COL_ID:
+            valores = serie.astype(object).where(serie.notna(), None).map(lambda v: v if v is None else str(v).strip())
+        else:
+            valores = serie.astype(object)
+        valores = valores.astype(object).where(valores.notna(), None)
+        if pd.api.types.is_integer_dtype(serie.dtype) or coluna == COL_STATUS:
+            valores = [None if v is None else int(v) for v in valores]
+        elif coluna in (COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA):
+            valores = [None if v is None else float(v) for v in valores]
+        else:
+            valores = valores.tolist()
+        colunas.append(valores)
+    ids, datas = colunas[0], colunas[1]
+    com_chave = np.fromiter((i not in (None, "") and d is not None for i, d in zip(ids, datas)),
+                            dtype=bool, count=len(df))
+    return colunas, com_chave
+
+
+def gravar_linhas(conexao, df, progresso=None):
+    """
+    Grava as linhas no banco (upsert por ID e Data), numa única transação.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão de `abrir_banco`.
+        df (pd.DataFrame): DataFrame de trabalho (ou parte dele).
+        progresso (callable, optional): Recebe (linhas gravadas, total); pode
+                                        levantar `OperacaoCancelada`, desfazendo a gravação.
+
+    Returns:
+        int: Número de linhas gravadas (as linhas sem chave são ignoradas).
+    """
+    with diagnostico.etapa("gravacao_banco", len(df)):
+        colunas, com_chave = _valores_sql(df)
+        registros = [r for r, ok in zip(zip(*colunas), com_chave) if ok]
+        with conexao:
+            for inicio in range(0, len(registros), PASSO_PROGRESSO):
+                avisar_progresso(progresso, inicio, len(registros))
+                conexao.executemany(_UPSERT_SQL, registros[inicio:inicio + PASSO_PROGRESSO])
+    return len(registros)
+
+
+def chaves_linhas(df, indices=None):
+    """
+    Chaves (ID, Data ISO) das linhas, como gravadas no banco.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+        indices (list, optional): Rótulos das linhas; todas se None.
+
+    Returns:
+        list: Tuplas (id, data); linhas sem chave ficam de fora.
+    """
+    linhas = df if indices is None else df.loc[list(indices), [COL_ID, COL_DATA]]
+    colunas, com_chave = _valores_sql(linhas[[COL_ID, COL_DATA]])
+    return [chave for chave, ok in zip(zip(colunas[0], colunas[1]), com_chave) if ok]
+
+
+def atualizar_linhas(conexao, df, indices, chaves_anteriores=()):
+    """
+    Regrava só as linhas editadas.
+
+    Se a edição mudou o ID ou a Data, passe as chaves que as linhas tinham
+    antes (`chaves_linhas` antes de editar): os registros antigos são removidos.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão de `abrir_banco`.
+        df (pd.DataFrame): DataFrame de trabalho já editado.
+        indices (list): Rótulos das linhas alteradas.
+        chaves_anteriores (list, optional): Chaves (id, data) anteriores à edição.
+
+    Returns:
+        int: Número de linhas gravadas.
+    """
+    novas = set(chaves_linhas(df, indices))
+    obsoletas = [chave for chave in chaves_anteriores if chave not in novas]
+    with conexao:
+        conexao.executemany("DELETE FROM marcacoes WHERE id = ? AND data = ?", obsoletas)
+        return gravar_linhas(conexao, df.loc[list(indices)])
+
+
+def excluir_linhas(conexao, chaves):
+    """
+    Remove registros pelas chaves (id, data).
+
+    Args:
+        conexao (sqlite3.Connection): Conexão de `abrir_banco`.
+        chaves (list): Tuplas de `chaves_linhas`.
+
+    Returns:
+        int: Número de registros removidos.
+    """
+    with conexao:
+        return conexao.executemany("DELETE FROM marcacoes WHERE id = ? AND data = ?", list(chaves)).rowcount
+
+
+def excluir_ids(conexao, ids):
+    """
+    Remove todos os registros dos IDs informados.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão de `abrir_banco`.
+        ids (list): IDs dos funcionários.
+
+    Returns:
+        int: Número de registros removidos.
+    """
+    with conexao:
+        return conexao.executemany("DELETE FROM marcacoes WHERE id = ?", [(str(i),) for i in ids]).rowcount
+
+
+def gravar_saldos_abertura(conexao, aberturas):
+    """
+    Grava (ou substitui) saldos de abertura do banco de horas.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão de `abrir_banco`.
+        aberturas (dict): {(id, "AAAA-MM"): lotes}, como devolvido por
+                          `banco_horas.calcular_banco_horas`.
+
+    Returns:
+        int: Número de aberturas gravadas.
+    """
+    registros = [(str(id_func), mes, json.dumps([[origem, int(minutos)] for origem, minutos in lotes]))
+                 for (id_func, mes), lotes in aberturas.items()]
+    with conexao:
+        conexao.executemany("INSERT INTO saldos_abertura (id, mes, lotes) VALUES (?, ?, ?) "
+                            "ON CONFLICT (id, mes) DO UPDATE SET lotes = excluded.lotes", registros)
+    return len(registros)
+
+
+def ler_saldos_abertura(conexao, ids=None):
+    """
+    Lê os saldos de abertura do banco de horas.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão de `abrir_banco`.
+        ids (list, optional): Só estes IDs; todos se None.
+
+    Returns:
+        dict: {(id, "AAAA-MM"): [(origem "AAAA-MM", minutos), ...]}.
+    """
+    linhas = conexao.execute("SELECT id, mes, lotes FROM saldos_abertura").fetchall()
+    if ids is not None:
+        procurados = {str(i) for i in ids}
+        linhas = [linha for linha in linhas if linha[0] in procurados]
+    return {(id_func, mes): [(origem, minutos) for origem, minutos in json.loads(lotes)]
+            for id_func, mes, lotes in linhas}
+
+
+def resumo_banco(conexao):
+    """
+    Quantidade de registros e intervalo de datas guardados.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão de `abrir_banco`.
+
+    Returns:
+        tuple: (registros, primeira data, última data); datas são pd.Timestamp ou None.
+    """
+    total, primeira, ultima = conexao.execute("SELECT COUNT(*), MIN(data), MAX(data) FROM marcacoes").fetchone()
+    return total, (pd.Timestamp(primeira) if primeira else None), (pd.Timestamp(ultima) if ultima else None)
+
+
+def carregar_periodo(conexao, config, inicio=None, fim=None, areas=None, ids=None, progresso=None):
+    """
+    Lê do banco as linhas de um período, já no esquema compacto e calculadas.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão de `abrir_banco`.
+        config (dict): Configuração de cálculo aplicada às linhas lidas.
+        inicio (date-like, optional): Primeira data (inclusive).
+        fim (date-like, optional): Última data (inclusive).
+        areas (list, optional): Só as linhas destas Áreas.
+        ids (list, optional): Só as linhas destes IDs.
+        progresso (callable, optional): Aceito por compatibilidade com `tarefas.Tarefa`.
+
+    Returns:
+        pd.DataFrame: DataFrame de trabalho, na ordem em que as linhas foram gravadas.
+    """
+    condicoes, parametros = [], []
+    if inicio is not None:
+        condicoes.append("data >= ?"); parametros.append(pd.Timestamp(inicio).strftime("%Y-%m-%d"))
+    if fim is not None:
+        condicoes.append("data <= ?"); parametros.append(pd.Timestamp(fim).strftime("%Y-%m-%d"))
+    for coluna, valores in (("area", areas), ("id", ids)):
+        if valores:
+            condicoes.append(f"{coluna} IN ({', '.join('?' * len(valores))})"); parametros.extend(str(v) for v in valores)
+    onde = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+    with diagnostico.etapa("leitura_banco") as medicao:
+        sql = f"SELECT {', '.join(COLUNAS_SQL.values())} FROM marcacoes{onde} ORDER BY rowid"
+        lido = pd.read_sql_query(sql, conexao, params=parametros)
+        medicao.linhas = len(lido)
+
+    df = pd.DataFrame({coluna: lido[nome] for coluna, nome in COLUNAS_SQL.items()})
+    df[COL_DATA] = pd.to_datetime(df[COL_DATA], format="%Y-%m-%d")
+    df[COL_SEMANA] = calendario.semana_das_datas(df[COL_DATA])  # Independe do locale de quem gravou
+    for coluna in _COLUNAS_MINUTOS:
+        df[coluna] = df[coluna].astype(esquema.TIPO_MINUTOS)
+    for coluna in (COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA):
+        df[coluna] = df[coluna].astype(float)
+    df[COL_STATUS] = df[COL_STATUS].fillna(0).astype(esquema.TIPO_STATUS)
+    df[COL_HORAS_NORMAIS] = pd.array(np.full(len(df), minutos_horas_normais(config["horas_normais_h"])),
+                                     dtype=esquema.TIPO_MINUTOS)
+    df = esquema.compactar(df[ORDEM_COLUNAS + COLUNAS_INTERNAS])
+    return calcular_todas_horas_e_extras(df, config)
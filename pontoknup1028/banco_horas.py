@@ -0,0 +1,187 @@
+# pontoknup1028/banco_horas.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Banco de horas: saldo acumulado de cada funcionário, dia a dia.
+
+Cada dia calculado lança no banco as Horas Extras menos as Horas Devidas.
+As linhas são ordenadas uma única vez por (ID, Data) e o saldo de cada dia
+é o saldo de abertura do mês somado à soma acumulada dos lançamentos do
+mês, agrupada por (ID, mês) sem laço por linha.
+
+O saldo é guardado em lotes mensais: o crédito gerado em um mês vale por
+`validade_meses` meses e, ao virar o mês, os lotes vencidos são descontados
+(vencimento só na virada do mês). Débitos consomem primeiro os créditos mais
+antigos; um saldo negativo não vence. Só esse acerto mensal percorre os
+(funcionário, mês) em Python.
+
+Os lotes em aberto no início de cada mês são os saldos de abertura
+(`{(ID, "AAAA-MM"): [("AAAA-MM", minutos), ...]}`). Guardados (ex: no banco
+local, `armazenamento.gravar_saldos_abertura`), permitem calcular um mês novo
+continuando do anterior, sem reabrir o histórico.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import diagnostico, esquema
+from pontoknup1028.constantes import (
+    COL_ID, COL_DATA, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_HORAS_NORMAIS, COL_BANCO_HORAS,
+    COL_STATUS, STATUS_CALCULADO
+)
+from pontoknup1028.totais import ids_validos
+
+VALIDADE_PADRAO_MESES = 6  # Meses em que um crédito pode ser compensado antes de vencer
+
+
+def texto_mes(mes):
+    """Número do mês (ano * 12 + mês - 1) como "AAAA-MM"."""
+    return f"{mes // 12:04d}-{mes % 12 + 1:02d}"
+
+
+def mes_do_texto(texto):
+    """Inverso de `texto_mes`."""
+    return int(texto[:4]) * 12 + int(texto[5:7]) - 1
+
+
+def lancamentos_diarios(df):
+    """
+    Minutos que cada linha lança no banco: Horas Extras - Horas Devidas.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho já calculado.
+
+    Returns:
+        np.ndarray: Minutos (int64) por linha; 0 nas linhas sem cálculo ou com erro.
+    """
+    extras = df[COL_HORAS_EXTRAS].to_numpy(dtype=np.int64, na_value=0)
+    devidas = df[COL_HORAS_DEVIDAS].to_numpy(dtype=np.int64, na_value=0)
+    calculada = df[COL_STATUS].to_numpy() == STATUS_CALCULADO
+    return np.where(calculada, extras - devidas, 0)
+
+
+def saldo_dos_lotes(lotes):
+    """Saldo (minutos) de uma lista de lotes."""
+    return sum(minutos for _, minutos in lotes)
+
+
+def _vencer(lotes, mes, validade_meses):
+    """Lotes de crédito ainda válidos no início de `mes` (débitos não vencem)."""
+    if not validade_meses:
+        return lotes
+    return [(origem, minutos) for origem, minutos in lotes if minutos < 0 or mes - origem < validade_meses]
+
+
+def _lancar(lotes, mes, minutos):
+    """
+    Lança o total do mês nos lotes (débito consome os créditos mais antigos;
+    crédito quita primeiro o saldo negativo).
+    """
+    if minutos == 0:
+        return lotes
+    lotes = list(lotes)
+    if minutos > 0:
+        if lotes and lotes[0][1] < 0:
+            origem, divida = lotes.pop(0)
+            minutos += divida
+            if minutos <= 0:
+                return [(origem, minutos)] if minutos else []
+        return lotes + [(mes, minutos)]
+    while lotes and minutos < 0:
+        origem, credito = lotes[0]
+        if credito <= 0:
+            break
+        usado = min(credito, -minutos)
+        minutos += usado
+        lotes = lotes[1:] if usado == credito else [(origem, credito - usado)] + lotes[1:]
+    if minutos < 0:
+        divida = lotes.pop(0)[1] if lotes and lotes[0][1] < 0 else 0
+        lotes = [(mes, divida + minutos)] + lotes
+    return lotes
+
+
+def _indexar_aberturas(aberturas):
+    """ID -> lista de (mês, lotes) ordenada por mês, com os meses e origens numéricos."""
+    por_id = {}
+    for (id_func, mes), lotes in aberturas.items():
+        lotes_num = [(mes_do_texto(origem), int(minutos)) for origem, minutos in lotes]
+        por_id.setdefault(str(id_func), []).append((mes_do_texto(mes), lotes_num))
+    for lista in por_id.values():
+        lista.sort(key=lambda par: par[0])
+    return por_id
+
+
+def _abertura_ate(lista, mes):
+    """Lotes da abertura mais recente até `mes` (inclusive), ou nenhum lote."""
+    lotes = []
+    for mes_abertura, lotes_abertura in lista:
+        if mes_abertura > mes:
+            break
+        lotes = lotes_abertura
+    return lotes
+
+
+def calcular_banco_horas(df, validade_meses=VALIDADE_PADRAO_MESES, aberturas=None):
+    """
+    Calcula a coluna Banco de Horas (saldo acumulado ao fim de cada dia).
+
+    O primeiro mês de cada funcionário começa da abertura guardada mais
+    recente até ele em `aberturas` (zero se não houver). Linhas sem ID ou sem
+    data ficam com saldo ausente. A coluna é criada após Horas Normais ou
+    substituída, se já existir.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho já calculado (modificado no lugar).
+        validade_meses (int, optional): Meses de validade de um crédito; 0 ou None para nunca vencer.
+        aberturas (dict, optional): Saldos de abertura de cálculos anteriores.
+
+    Returns:
+        dict: Saldos de abertura do mês seguinte a cada mês presente em `df`,
+              no formato de `aberturas` (para gravar e continuar depois).
+    """
+    with diagnostico.etapa("banco_horas", len(df)):
+        datas = df[COL_DATA].to_numpy(dtype="datetime64[ns]")
+        validas = np.flatnonzero(ids_validos(df[COL_ID]) & ~np.isnat(datas))
+        codigos, ids = pd.factorize(df[COL_ID].to_numpy(dtype=object)[validas])
+
+        posicoes = np.lexsort((datas[validas], codigos))  # Estável: mesmo dia mantém a ordem das linhas
+        ordem, codigos = validas[posicoes], codigos[posicoes]
+        meses = datas[ordem].astype("datetime64[M]").astype(np.int64) + 1970 * 12
+        lancamentos = lancamentos_diarios(df)[ordem]
+
+        # Grupos (ID, mês) consecutivos após a ordenação
+        inicio_grupo = np.ones(len(ordem), dtype=bool)
+        inicio_grupo[1:] = (codigos[1:] != codigos[:-1]) | (meses[1:] != meses[:-1])
+        inicios = np.flatnonzero(inicio_grupo)
+        grupo = np.cumsum(inicio_grupo) - 1
+        acumulado = np.cumsum(lancamentos)
+        acumulado -= (acumulado - lancamentos)[inicios][grupo]
+        totais_mes = np.add.reduceat(lancamentos, inicios) if len(inicios) else np.array([], dtype=np.int64)
+
+        # Acerto mensal dos lotes: um passo por (funcionário, mês)
+        anteriores = _indexar_aberturas(aberturas or {})
+        abertura_grupo = np.zeros(len(inicios), dtype=np.int64)
+        novas = {}
+        lotes = []
+        for k, inicio in enumerate(inicios):
+            id_func, mes = str(ids[codigos[inicio]]), int(meses[inicio])
+            if k == 0 or codigos[inicio] != codigos[inicios[k - 1]]:
+                lotes = _abertura_ate(anteriores.get(id_func, []), mes)
+            lotes = _vencer(lotes, mes, validade_meses)
+            abertura_grupo[k] = saldo_dos_lotes(lotes)
+            lotes = _lancar(lotes, mes, int(totais_mes[k]))
+            novas[(id_func, texto_mes(mes + 1))] = [(texto_mes(origem), minutos) for origem, minutos in lotes]
+
+        saldos = np.zeros(len(df), dtype=np.int64)
+        saldos[ordem] = abertura_grupo[grupo] + acumulado
+        sem_saldo = np.ones(len(df), dtype=bool)
+        sem_saldo[ordem] = False
+        coluna = pd.array(saldos, dtype=esquema.TIPO_SALDO)
+        coluna[sem_saldo] = pd.NA
+        if COL_BANCO_HORAS in df.columns:
+            df.isetitem(df.columns.get_loc(COL_BANCO_HORAS), coluna)
+        else:
+            posicao = df.columns.get_loc(COL_HORAS_NORMAIS) + 1 if COL_HORAS_NORMAIS in df.columns else len(df.columns)
+            df.insert(posicao, COL_BANCO_HORAS, coluna)
+    return novas
@@ -0,0 +1,206 @@
+# pontoknup1028/benchmark.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Benchmark reproduzível das etapas do processamento.
+
+Gera (uma vez, reaproveitando nas execuções seguintes) planilhas sintéticas
+de cada tamanho e mede carregar, calcular, índice de busca, filtrar, totais
+e exportar. O resultado é gravado em JSON junto com o commit e as versões
+das bibliotecas, e pode ser comparado com um JSON anterior.
+
+Uso:
+    python -m pontoknup1028.benchmark [--tamanhos 1000 10000 100000 1000000]
+                                      [--saida benchmark.json] [--comparar anterior.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000, 1_000_000]
+ETAPAS = ["carregar", "calcular", "indice_busca", "filtrar", "totais", "exportar"]
+FILTROS_BENCHMARK = [("", "silva", ""), ("", "", "producao"), ("1", "ana", "")]
+
+
+def pasta_planilhas_padrao():
+    """Pasta onde as planilhas sintéticas geradas ficam guardadas entre execuções."""
+    return os.path.join(tempfile.gettempdir(), "pontoknup1028-benchmark")
+
+
+def commit_atual():
+    """
+    Hash curto do commit do repositório, se houver git disponível.
+
+    Returns:
+        str or None: Hash do HEAD (com "+" se houver alterações não commitadas).
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=raiz,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        alterado = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=raiz,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("+" if alterado else "")
+
+
+def planilha_sintetica(n_linhas, pasta, semente=0):
+    """
+    Caminho da planilha sintética de `n_linhas`, gerando-a se ainda não existir.
+
+    Args:
+        n_linhas (int): Número de linhas de dados.
+        pasta (str): Pasta das planilhas geradas.
+        semente (int, optional): Semente do gerador.
+
+    Returns:
+        str: Caminho do arquivo .xlsx.
+    """
+    from pontoknup1028.sintetico import VERSAO_GERADOR, escrever_planilha_sintetica
+
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f"ponto_{n_linhas}_s{semente}_v{VERSAO_GERADOR}.xlsx")
+    if not os.path.exists(caminho):
+        temporario = caminho + ".tmp.xlsx"
+        escrever_planilha_sintetica(temporario, n_linhas, semente=semente)
+        os.replace(temporario, caminho)
+    return caminho
+
+
+def _cronometrar(funcao, repeticoes):
+    """Executa `funcao` `repeticoes` vezes; devolve (menor tempo em segundos, último resultado)."""
+    melhor, resultado = None, None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, resultado
+
+
+def medir(caminho, config, repeticoes=1, pasta_saida=None):
+    """
+    Mede cada etapa do processamento para uma planilha.
+
+    Args:
+        caminho (str): Planilha de entrada.
+        config (dict): Configuração de cálculo.
+        repeticoes (int, optional): Repetições por etapa (vale o menor tempo).
+        pasta_saida (str, optional): Pasta do arquivo exportado (padrão: temporária).
+
+    Returns:
+        dict: "linhas", "funcionarios" e "etapas" (etapa -> segundos, na ordem de ETAPAS).
+    """
+    from pontoknup1028.calculos import calcular_todas_horas_e_extras
+    from pontoknup1028.carregamento import carregar_planilha
+    from pontoknup1028.exportacao import salvar_planilha
+    from pontoknup1028.filtros import IndiceBusca, filtrar_com_indice
+    from pontoknup1028.totais import calcular_totais_funcionario
+
+    tempos = {}
+    tempos["carregar"], df = _cronometrar(lambda: carregar_planilha(caminho, config), repeticoes)
+    tempos["calcular"], _ = _cronometrar(lambda: calcular_todas_horas_e_extras(df.copy(), config), repeticoes)
+    tempos["indice_busca"], indice = _cronometrar(lambda: IndiceBusca(df), repeticoes)
+    tempos["filtrar"], _ = _cronometrar(
+        lambda: [filtrar_com_indice(df, indice, *filtro) for filtro in FILTROS_BENCHMARK], repeticoes)
+    tempos["totais"], _ = _cronometrar(lambda: calcular_totais_funcionario(df), repeticoes)
+    with tempfile.TemporaryDirectory(dir=pasta_saida) as pasta:
+        destino = os.path.join(pasta, "saida.xlsx")
+        tempos["exportar"], _ = _cronometrar(lambda: salvar_planilha(df, destino), repeticoes)
+    return {"linhas": len(df), "funcionarios": int(df["ID"].nunique()),
+            "etapas": {etapa: round(tempos[etapa], 4) for etapa in ETAPAS}}
+
+
+def ambiente():
+    """Informações do ambiente gravadas junto com os resultados."""
+    import numpy
+    import pandas
+
+    return {
+        "commit": commit_atual(),
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def comparar(atual, anterior, saida=None):
+    """
+    Mostra a razão atual/anterior de cada etapa para os tamanhos em comum.
+
+    Args:
+        atual (dict): Resultado desta execução.
+        anterior (dict): Resultado carregado de um JSON anterior.
+        saida (file, optional): Onde escrever a comparação (padrão: sys.stdout).
+    """
+    saida = saida or sys.stdout
+    anteriores = {r["linhas"]: r["etapas"] for r in anterior.get("resultados", [])}
+    print(f"Comparação com {anterior.get('commit') or '?'} (razão atual/anterior; >1 = mais lento):", file=saida)
+    for resultado in atual["resultados"]:
+        base = anteriores.get(resultado["linhas"])
+        if base is None:
+            continue
+        razoes = [f"{etapa}={resultado['etapas'][etapa] / base[etapa]:.2f}x"
+                  for etapa in ETAPAS if base.get(etapa)]
+        print(f"  {resultado['linhas']:>9} linhas: " + " ".join(razoes), file=saida)
+
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Args:
+        argv (list, optional): Argumentos (padrão: sys.argv[1:]).
+
+    Returns:
+        int: Código de saída (0 = sucesso).
+    """
+    from pontoknup1028.config import nova_config
+
+    parser = argparse.ArgumentParser(prog="python -m pontoknup1028.benchmark",
+                                     description="Mede as etapas do processamento em planilhas sintéticas.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO,
+                        help="Números de linhas a medir (padrão: 1000 10000 100000 1000000).")
+    parser.add_argument("--saida", default="benchmark.json", help="Arquivo JSON de resultados.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar.")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Repetições por etapa (vale o menor tempo).")
+    parser.add_argument("--pasta", default=pasta_planilhas_padrao(),
+                        help="Pasta onde as planilhas sintéticas são geradas e reaproveitadas.")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do gerador de planilhas.")
+    args = parser.parse_args(argv)
+    if args.comparar and not os.path.isfile(args.comparar):
+        parser.error(f"arquivo para comparação não encontrado: {args.comparar}")
+
+    config = nova_config()
+    resultado = {**ambiente(), "config": config, "resultados": []}
+    for n_linhas in args.tamanhos:
+        caminho = planilha_sintetica(n_linhas, args.pasta, args.semente)
+        medicao = medir(caminho, config, args.repeticoes)
+        resultado["resultados"].append(medicao)
+        etapas = " ".join(f"{etapa}={segundos:.3f}s" for etapa, segundos in medicao["etapas"].items())
+        print(f"{n_linhas:>9} linhas: {etapas}")
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(resultado, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+# pontoknup1028/cache.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Cache em disco das planilhas já lidas e calculadas.
+
+A chave combina o hash SHA-256 do conteúdo do arquivo, a versão do carregador
+(`VERSAO_CARREGADOR`) e a configuração de cálculo; reabrir uma planilha
+inalterada com a mesma configuração não passa pelo Excel. As entradas são
+gravadas em Parquet (pyarrow, dependência do projeto; sem ele, em pickle) e
+o cache é limitado em bytes, descartando primeiro as entradas usadas há
+mais tempo (LRU pela data de modificação do arquivo).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import diagnostico
+from pontoknup1028.carregamento import VERSAO_CARREGADOR, carregar_planilha
+
+LIMITE_PADRAO_BYTES = 512 * 1024 * 1024
+EXTENSOES_CACHE = (".parquet", ".pkl")
+
+try:
+    import pyarrow
+    FORMATO_PADRAO = ".parquet"
+    _ERROS_PARQUET = (TypeError, ValueError, pyarrow.lib.ArrowException)
+except ImportError:
+    FORMATO_PADRAO = ".pkl"
+    _ERROS_PARQUET = (TypeError, ValueError)
+
+
+def pasta_cache_padrao():
+    """
+    Pasta de cache do usuário (%LOCALAPPDATA% no Windows, ~/.cache nos demais).
+
+    Returns:
+        str: Caminho da pasta (pode ainda não existir).
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pontoknup1028")
+
+
+def hash_arquivo(file_path, tamanho_bloco=1024 * 1024):
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo, lendo em blocos.
+
+    Args:
+        file_path (str): Caminho do arquivo.
+        tamanho_bloco (int, optional): Bytes lidos por vez.
+
+    Returns:
+        str: Hash em hexadecimal.
+    """
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def chave_cache(file_path, config):
+    """
+    Gera a chave de cache de uma planilha.
+
+    Args:
+        file_path (str): Caminho da planilha.
+        config (dict): Configuração de cálculo.
+
+    Returns:
+        str: Chave hexadecimal (conteúdo + versão do carregador + configuração).
+    """
+    partes = [hash_arquivo(file_path), str(VERSAO_CARREGADOR), json.dumps(config, sort_keys=True)]
+    return hashlib.sha256("|".join(partes).encode("utf-8")).hexdigest()
+
+
+def _entradas(pasta):
+    """Lista (caminho, tamanho, mtime) das entradas do cache."""
+    if not os.path.isdir(pasta):
+        return []
+    entradas = []
+    for nome in os.listdir(pasta):
+        if not nome.endswith(EXTENSOES_CACHE):
+            continue
+        caminho = os.path.join(pasta, nome)
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            continue
+        entradas.append((caminho, info.st_size, info.st_mtime))
+    return entradas
+
+
+def _ler_entrada(caminho):
+    """Lê uma entrada do cache, restaurando NaN nas colunas de texto lidas do Parquet."""
+    if caminho.endswith(".parquet"):
+        df = pd.read_parquet(caminho)
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+        return df
+    return pd.read_pickle(caminho)
+
+
+def _gravar_entrada(df, pasta, chave):
+    """
+    Grava uma entrada de forma atômica (arquivo temporário + os.replace).
+
+    Colunas de texto com tipos mistos não são aceitas pelo Parquet; nesse caso
+    a entrada é gravada em pickle.
+    """
+    fd, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    os.close(fd)
+    try:
+        extensao = FORMATO_PADRAO
+        if extensao == ".parquet":
+            try:
+                df.to_parquet(temporario, index=False)
+            except _ERROS_PARQUET:
+                extensao = ".pkl"
+        if extensao == ".pkl":
+            df.to_pickle(temporario)
+        os.replace(temporario, os.path.join(pasta, chave + extensao))
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def obter(chave, pasta=None):
+    """
+    Busca um DataFrame no cache e marca a entrada como usada agora.
+
+    Args:
+        chave (str): Chave gerada por `chave_cache`.
+        pasta (str, optional): Pasta do cache. Padrão é `pasta_cache_padrao()`.
+
+    Returns:
+        pd.DataFrame or None: Cópia independente do DataFrame, ou None se não houver entrada.
+    """
+    pasta = pasta or pasta_cache_padrao()
+    for extensao in EXTENSOES_CACHE:
+        caminho = os.path.join(pasta, chave + extensao)
+        if os.path.exists(caminho):
+            try:
+                df = _ler_entrada(caminho)
+                os.utime(caminho)
+                return df
+            except Exception:
+                # Entrada corrompida ou removida por outro processo: trata como ausente
+                return None
+    return None
+
+
+def guardar(chave, df, pasta=None, limite_bytes=LIMITE_PADRAO_BYTES):
+    """
+    Grava um DataFrame no cache e aplica o limite de tamanho.
+
+    Args:
+        chave (str): Chave gerada por `chave_cache`.
+        df (pd.DataFrame): DataFrame a guardar.
+        pasta (str, optional): Pasta do cache. Padrão é `pasta_cache_padrao()`.
+        limite_bytes (int, optional): Tamanho máximo do cache.
+    """
+    pasta = pasta or pasta_cache_padrao()
+    os.makedirs(pasta, exist_ok=True)
+    _gravar_entrada(df.reset_index(drop=True), pasta, chave)
+    aplicar_limite(pasta, limite_bytes)
+
+
+def aplicar_limite(pasta=None, limite_bytes=LIMITE_PADRAO_BYTES):
+    """
+    Remove as entradas menos usadas recentemente até o cache caber no limite.
+
+    Args:
+        pasta (str, optional): Pasta do cache. Padrão é `pasta_cache_padrao()`.
+        limite_bytes (int, optional): Tamanho máximo do cache.
+
+    Returns:
+        int: Número de entradas removidas.
+    """
+    entradas = sorted(_entradas(pasta or pasta_cache_padrao()), key=lambda e: e[2])
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    removidas = 0
+    for caminho, tamanho, _ in entradas:
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(caminho)
+            removidas += 1
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+    return removidas
+
+
+def tamanho_cache(pasta=None):
+    """
+    Soma o tamanho das entradas do cache.
+
+    Args:
+        pasta (str, optional): Pasta do cache. Padrão é `pasta_cache_padrao()`.
+
+    Returns:
+        int: Total em bytes.
+    """
+    return sum(tamanho for _, tamanho, _ in _entradas(pasta or pasta_cache_padrao()))
+
+
+def limpar_cache(pasta=None):
+    """
+    Remove todas as entradas do cache.
+
+    Args:
+        pasta (str, optional): Pasta do cache. Padrão é `pasta_cache_padrao()`.
+
+    Returns:
+        int: Número de entradas removidas.
+    """
+    return aplicar_limite(pasta, limite_bytes=-1)
+
+
+def carregar_planilha_com_cache(file_path, config, pasta=None, limite_bytes=LIMITE_PADRAO_BYTES, progresso=None):
+    """
+    Igual a `carregar_planilha`, mas reaproveita o resultado de leituras anteriores.
+
+    Args:
+        file_path (str): Caminho da planilha.
+        config (dict): Configuração de cálculo.
+        pasta (str, optional): Pasta do cache. Padrão é `pasta_cache_padrao()`.
+        limite_bytes (int, optional): Tamanho máximo do cache.
+        progresso (callable, optional): Callback de progresso da leitura (ver `carregar_planilha`).
+
+    Returns:
+        tuple: (DataFrame de trabalho, True se veio do cache).
+    """
+    with diagnostico.etapa("leitura_cache") as medicao:
+        chave = chave_cache(file_path, config)
+        df = obter(chave, pasta)
+        if df is None:
+            medicao.descartar()
+        else:
+            medicao.linhas = len(df)
+    if df is not None:
+        return df, True
+    df = carregar_planilha(file_path, config, progresso=progresso)
+    try:
+        guardar(chave, df, pasta, limite_bytes)
+    except OSError:
+        pass  # Sem permissão de escrita ou disco cheio: segue sem cache
+    return df, False
@@ -0,0 +1,583 @@
+# pontoknup1028/calculos.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Cálculo de horas devidas, horas extras e valor de hora extra.
+
+Contém o motor colunar usado em produção (`calcular_horas_vetorizado`) e a
+implementação linha a linha original (`_calculate_single_row_hours`), mantida
+como referência para testes e comparação.
+
+Os resultados seguem o esquema compacto (`pontoknup1028.esquema`): horas
+devidas e extras em minutos Int16 e a situação de cada linha em COL_STATUS,
+sem textos "HH:MM" nem mensagens de erro na Nota. O motor guarda também os
+minutos trabalhados, então mudar o multiplicador ou o salário recalcula só o
+valor da hora extra, e mudar a jornada refaz só a divisão devidas/extras, sem
+reler as marcações (`recalcular_configuracao`).
+
+Nas linhas vindas de um AFD com todas as marcações da jornada pareadas
+(`marcacoes`), os minutos trabalhados são a soma dos intervalos (coluna
+interna COL_MINUTOS_MARCACOES) e as quatro colunas são só a visão exibida.
+
+A jornada esperada de cada linha é a coluna Horas Normais (minutos Int16),
+preenchida com a jornada da configuração ou com a escala do funcionário ou
+da Área (`escalas`); o motor a lê como um array, nunca linha a linha.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import diagnostico, esquema
+from pontoknup1028.config import minutos_horas_normais
+from pontoknup1028.constantes import (
+    COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA,
+    COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_HORAS_NORMAIS, COL_SALARIO_BASE,
+    COL_VALOR_HORA_EXTRA, COL_NOTA, COL_MINUTOS_TRABALHADOS, COL_MINUTOS_MARCACOES,
+    COL_STATUS, COLUNAS_HORARIOS, OMISSAO_VALS, ERRO_FORMATO, ERRO_SEQUENCIA, HORA_ZERO,
+    MINUTOS_VAZIO, MINUTOS_INVALIDO, STATUS_SEM_CALCULO, STATUS_CALCULADO,
+    STATUS_INCOMPLETO, STATUS_ERRO_FORMATO, STATUS_ERRO_SEQ_SEM_ALMOCO,
+    STATUS_ERRO_SEQ_COM_ALMOCO, MENSAGENS_STATUS
+)
+
+def _segundos_jornada_linha(row, horas_normais_h):
+    """Jornada esperada de uma linha em segundos, pela mesma regra de `_segundos_jornada`."""
+    minutos = row.get(COL_HORAS_NORMAIS)
+    if isinstance(minutos, (int, np.integer)) and minutos != minutos_horas_normais(horas_normais_h):
+        return minutos * 60.0
+    return horas_normais_h * 3600.0
+
+
+def _calculate_single_row_hours(row, config):
+    """
+    Calcula horas devidas, extras, valor de hora extra e notas para uma única linha de dados.
+
+    A função processa os horários de entrada, saída e almoço para determinar o tempo
+    trabalhado. Compara este tempo com a jornada da linha para calcular diferenças
+    (devidas ou extras): Horas Normais em minutos inteiros (escala) ou, em texto
+    ou vazia, as horas normais configuradas. Também calcula o valor monetário das horas extras
+    com base no salário base e multiplicador configurados. Adiciona notas sobre
+    erros de formato ou sequência de horários. Se a linha tiver
+    COL_MINUTOS_MARCACOES preenchida (AFD), o tempo trabalhado é esse valor.
+
+    Args:
+        row (pd.Series): Uma linha do DataFrame contendo, no mínimo, as colunas:
+                         COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA (como strings "HH:MM" ou vazias),
+                         COL_SALARIO_BASE (como float ou NaN),
+                         COL_NOTA (como string).
+        config (dict): Configuração de cálculo (horas_normais_h, multiplicador_hora_extra).
+
+    Returns:
+        pd.Series: Uma Series contendo os resultados calculados para as colunas:
+                   COL_HORAS_DEVIDAS (str "HH:MM" ou código de erro),
+                   COL_HORAS_EXTRAS (str "HH:MM" ou código de erro),
+                   COL_NOTA (str, potencialmente atualizada com mensagens de erro),
+                   COL_VALOR_HORA_EXTRA (float).
+    """
+
+    horas_normais_h_config = config["horas_normais_h"]
+    multiplicador = config["multiplicador_hora_extra"]
+
+    entrada_str = str(row[COL_ENTRADA]).strip()
+    saida_almoco_str = str(row[COL_SAIDA_ALMOCO]).strip()
+    volta_almoco_str = str(row[COL_VOLTA_ALMOCO]).strip()
+    saida_final_str = str(row[COL_SAIDA]).strip()
+
+    # Normalização mais robusta para omissão e nan
+    entrada_str = "" if entrada_str.lower() in OMISSAO_VALS or entrada_str.lower() == 'nan' else entrada_str
+    saida_almoco_str = "" if saida_almoco_str.lower() in OMISSAO_VALS or saida_almoco_str.lower() == 'nan' else saida_almoco_str
+    volta_almoco_str = "" if volta_almoco_str.lower() in OMISSAO_VALS or volta_almoco_str.lower() == 'nan' else volta_almoco_str
+    saida_final_str = "" if saida_final_str.lower() in OMISSAO_VALS or saida_final_str.lower() == 'nan' else saida_final_str
+    
+    nota_final = str(row[COL_NOTA]) if pd.notna(row[COL_NOTA]) else ""
+    horas_devidas_output = ""
+    horas_extras_output = ""
+    valor_hora_extra_output = 0.0
+
+    try:
+        entrada_dt = pd.to_datetime(entrada_str, format='%H:%M', errors="raise") if entrada_str else pd.NaT
+        saida_almoco_dt = pd.to_datetime(saida_almoco_str, format='%H:%M', errors="raise") if saida_almoco_str else pd.NaT
+        volta_almoco_dt = pd.to_datetime(volta_almoco_str, format='%H:%M', errors="raise") if volta_almoco_str else pd.NaT
+        saida_final_dt = pd.to_datetime(saida_final_str, format='%H:%M', errors="raise") if saida_final_str else pd.NaT
+    except ValueError:
+        horas_devidas_output = ERRO_FORMATO
+        horas_extras_output = ERRO_FORMATO
+        nota_final = f"{nota_final} (Erro: Formato de horário inválido)".strip()
+        return pd.Series({
+            COL_HORAS_DEVIDAS: horas_devidas_output, COL_HORAS_EXTRAS: horas_extras_output,
+            COL_NOTA: nota_final, COL_VALOR_HORA_EXTRA: valor_hora_extra_output
+        })
+
+    total_trabalhado_s = 0
+    minutos_marcacoes = row.get(COL_MINUTOS_MARCACOES)
+    # Linha do AFD com as marcações pareadas: vale a soma dos intervalos, não as quatro colunas
+    if minutos_marcacoes is not None and pd.notna(minutos_marcacoes):
+        total_trabalhado_s = int(minutos_marcacoes) * 60.0
+    # CASO 1: Sem almoço OU almoço zerado (00:00)
+    elif pd.notna(entrada_dt) and pd.notna(saida_final_dt) and \
+       ((pd.isna(saida_almoco_dt) and pd.isna(volta_almoco_dt)) or \
+        (saida_almoco_str == HORA_ZERO and volta_almoco_str == HORA_ZERO)):
+        
+        if entrada_str == HORA_ZERO and saida_final_str == HORA_ZERO and \
+           (saida_almoco_str == HORA_ZERO or saida_almoco_str == "") and \
+           (volta_almoco_str == HORA_ZERO or volta_almoco_str == ""):
+            return pd.Series({
+                COL_HORAS_DEVIDAS: "", COL_HORAS_EXTRAS: "",
+                COL_NOTA: nota_final, COL_VALOR_HORA_EXTRA: 0.0
+            })
+
+        if saida_final_dt < entrada_dt: saida_final_dt += pd.Timedelta(days=1)
+        
+        if entrada_dt >= saida_final_dt:
+            horas_devidas_output = ERRO_SEQUENCIA
+            horas_extras_output = ERRO_SEQUENCIA
+            nota_final = f"{nota_final} (Erro Seq: E>=S s/almoço)".strip()
+        else:
+            total_trabalhado_s = (saida_final_dt - entrada_dt).total_seconds()
+            
+    # CASO 2: Com almoço
+    elif pd.notna(entrada_dt) and pd.notna(saida_almoco_dt) and pd.notna(volta_almoco_dt) and pd.notna(saida_final_dt):
+        if saida_almoco_dt < entrada_dt: saida_almoco_dt += pd.Timedelta(days=1)
+        if volta_almoco_dt < saida_almoco_dt: volta_almoco_dt += pd.Timedelta(days=1) # Volta pode ser no dia seguinte
+        if saida_final_dt < volta_almoco_dt: saida_final_dt += pd.Timedelta(days=1) # Saída pode ser no dia seguinte
+
+        # Permitir almoço de duração zero (SaidaAlmoco == VoltaAlmoco)
+        if not (entrada_dt <= saida_almoco_dt and saida_almoco_dt <= volta_almoco_dt and volta_almoco_dt <= saida_final_dt and entrada_dt < saida_final_dt):
+            horas_devidas_output = ERRO_SEQUENCIA
+            horas_extras_output = ERRO_SEQUENCIA
+            nota_final = f"{nota_final} (Erro Seq: c/almoço)".strip()
+        else:
+            periodo_manha_s = (saida_almoco_dt - entrada_dt).total_seconds()
+            periodo_tarde_s = (saida_final_dt - volta_almoco_dt).total_seconds()
+            total_trabalhado_s = periodo_manha_s + periodo_tarde_s
+    # CASO 3: Horários incompletos para cálculo
+    else:
+        if any(s for s in [entrada_str, saida_almoco_str, volta_almoco_str, saida_final_str]): # Se algum campo foi preenchido
+             nota_final = f"{nota_final} (Horários incompletos)".strip()
+        # Se todos os campos de horário estiverem vazios, considera-se ausência, sem nota adicional aqui.
+        return pd.Series({
+            COL_HORAS_DEVIDAS: "", COL_HORAS_EXTRAS: "",
+            COL_NOTA: nota_final, COL_VALOR_HORA_EXTRA: 0.0
+        })
+
+    # Se já houve erro de sequência, retorna
+    if horas_devidas_output == ERRO_SEQUENCIA:
+         return pd.Series({
+            COL_HORAS_DEVIDAS: horas_devidas_output, COL_HORAS_EXTRAS: horas_extras_output,
+            COL_NOTA: nota_final, COL_VALOR_HORA_EXTRA: 0.0
+        })
+
+    # Cálculo de horas devidas/extras
+    if total_trabalhado_s > 0: # Só calcula se houve tempo trabalhado válido
+        total_trabalhado_h = total_trabalhado_s / 3600.0
+        diff_total_s = total_trabalhado_s - _segundos_jornada_linha(row, horas_normais_h_config)
+
+        if diff_total_s < -1: # Deu horas a menos (considera uma pequena margem para arredondamento)
+            segundos_devidos = abs(diff_total_s)
+            horas_dev = int(segundos_devidos // 3600)
+            minutos_dev = int((segundos_devidos % 3600) // 60)
+            horas_devidas_output = f"{horas_dev:02}:{minutos_dev:02}"
+            horas_extras_output = HORA_ZERO
+        else: # Cumpriu ou fez horas extras
+            segundos_extras = diff_total_s if diff_total_s > 0 else 0
+            horas_ext = int(segundos_extras // 3600)
+            minutos_ext = int((segundos_extras % 3600) // 60)
+            horas_extras_output = f"{horas_ext:02}:{minutos_ext:02}"
+            horas_devidas_output = HORA_ZERO
+    # Se total_trabalhado_s == 0 e não houve erro de formatação ou sequência, não faz nada (ausência)
+    elif total_trabalhado_s == 0 and not horas_devidas_output and not horas_extras_output:
+        pass # Mantém horas devidas/extras como ""
+
+    # Cálculo do valor da hora extra
+    salario_base_val = row[COL_SALARIO_BASE] # Já deve ser float ou NaN
+    if pd.notna(salario_base_val) and salario_base_val > 0 and \
+       horas_extras_output and horas_extras_output != HORA_ZERO and \
+       horas_extras_output not in [ERRO_FORMATO, ERRO_SEQUENCIA] and ":" in horas_extras_output:
+        try:
+            valor_hora = salario_base_val / 220.0 # Carga horária mensal padrão CLT
+            h_extra, m_extra = map(int, horas_extras_output.split(':'))
+            horas_extras_dec = h_extra + (m_extra / 60.0)
+            valor_hora_extra_output = round(valor_hora * multiplicador * horas_extras_dec, 2)
+        except ValueError:
+            valor_hora_extra_output = 0.0 
+            nota_final = f"{nota_final} (Erro calc. Vlr HE)".strip()
+    
+    return pd.Series({
+        COL_HORAS_DEVIDAS: horas_devidas_output,
+        COL_HORAS_EXTRAS: horas_extras_output,
+        COL_NOTA: nota_final,
+        COL_VALOR_HORA_EXTRA: valor_hora_extra_output
+    })
+
+
+def _horarios_para_minutos(data_frame, colunas):
+    """
+    Converte várias colunas de horário em uma matriz de minutos inteiros.
+
+    Colunas já compactas (Int16) são lidas direto; colunas em texto passam por
+    `esquema.minutos_das_marcacoes`, que interpreta cada texto distinto uma vez.
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame com as colunas de horário.
+        colunas (list): Nomes das colunas a converter.
+
+    Returns:
+        np.ndarray: Matriz int32 de formato (linhas, len(colunas)) com minutos,
+                    MINUTOS_VAZIO ou MINUTOS_INVALIDO.
+    """
+    minutos = np.empty((len(data_frame), len(colunas)), dtype=np.int32)
+    for j, coluna in enumerate(colunas):
+        minutos[:, j] = esquema.minutos_das_marcacoes(data_frame[coluna])
+    return minutos
+
+
+def _segundos_jornada(data_frame, config):
+    """
+    Jornada esperada de cada linha, em segundos.
+
+    Vem da coluna Horas Normais quando ela já está em minutos (esquema
+    compacto, jornada da configuração ou da escala); nos DataFrames em texto
+    e nas linhas sem valor vale a jornada da configuração. As linhas cuja
+    jornada é a da configuração usam `horas_normais_h * 3600.0`, como
+    `_calculate_single_row_hours`, e não os minutos truncados da coluna: com
+    8.8 h o produto em ponto flutuante passa de 31680 e o piso dos minutos
+    extras muda, então só assim as duas implementações coincidem.
+
+    Args:
+        data_frame (pd.DataFrame): Linhas a calcular.
+        config (dict): Configuração de cálculo (usa horas_normais_h).
+
+    Returns:
+        np.ndarray or float: Segundos por linha, ou um único valor para todas.
+    """
+    padrao = config["horas_normais_h"] * 3600.0
+    if COL_HORAS_NORMAIS not in data_frame.columns or not pd.api.types.is_integer_dtype(data_frame[COL_HORAS_NORMAIS].dtype):
+        return padrao
+    minutos = data_frame[COL_HORAS_NORMAIS].to_numpy(dtype=float, na_value=np.nan)
+    da_configuracao = np.isnan(minutos) | (minutos == minutos_horas_normais(config["horas_normais_h"]))
+    return np.where(da_configuracao, padrao, minutos * 60.0)
+
+
+def _dividir_jornada(trabalhado_min, jornada_s):
+    """
+    Separa o tempo trabalhado em minutos devidos e extras em relação à jornada.
+
+    Segue `_calculate_single_row_hours`: a diferença é calculada em segundos,
+    tolera 1 segundo de arredondamento e trunca para minutos inteiros.
+
+    Args:
+        trabalhado_min (np.ndarray): Minutos trabalhados (0 = sem cálculo).
+        jornada_s (np.ndarray or float): Jornada esperada em segundos (`_segundos_jornada`).
+
+    Returns:
+        tuple: (máscara das linhas calculadas, minutos devidos, minutos extras).
+    """
+    calculado = trabalhado_min > 0
+    diff_total_s = trabalhado_min * 60.0 - jornada_s
+    deve = calculado & (diff_total_s < -1)
+    minutos_devidos = np.where(deve, np.floor(-diff_total_s / 60.0), 0).astype(np.int64)
+    minutos_extras = np.where(calculado & ~deve, np.floor(np.maximum(diff_total_s, 0) / 60.0), 0).astype(np.int64)
+    return calculado, minutos_devidos, minutos_extras
+
+
+def _valor_hora_extra(salario, minutos_extras, multiplicador):
+    """
+    Calcula o valor das horas extras: (salário / 220) * multiplicador * horas extras.
+
+    Args:
+        salario (np.ndarray): Salário base por linha (NaN = sem salário).
+        minutos_extras (np.ndarray): Minutos extras por linha.
+        multiplicador (float): Multiplicador da hora extra.
+
+    Returns:
+        np.ndarray: Valores arredondados em 2 casas (0.0 sem extras ou sem salário).
+    """
+    com_valor = (minutos_extras > 0) & (salario > 0)
+    valor_hora_extra = np.zeros(len(minutos_extras), dtype=float)
+    valor_hora_extra[com_valor] = np.round(
+        salario[com_valor] / 220.0 * multiplicador * (minutos_extras[com_valor] / 60.0), 2)
+    return valor_hora_extra
+
+
+def calcular_horas_vetorizado(data_frame, config, jornada_s=None):
+    """
+    Versão colunar de `_calculate_single_row_hours` para um DataFrame inteiro.
+
+    As quatro marcações são convertidas em minutos inteiros e os casos
+    (sem almoço, com almoço, virada de meia-noite, incompleto e erros) são
+    resolvidos com máscaras booleanas do NumPy, sem chamar Python por linha.
+    A jornada de cada linha vem de Horas Normais (`_segundos_jornada`).
+    Onde COL_MINUTOS_MARCACOES está preenchida, o tempo trabalhado é esse
+    valor (intervalos de todas as marcações) em vez do das quatro colunas.
+    Em texto ou já compactas, e com a jornada da configuração ou da escala,
+    produz os mesmos resultados da função de referência (formatados por
+    `esquema.textos_coluna`); a única diferença é que "0:00" é tratado como
+    "00:00" na detecção de almoço zerado.
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame com as colunas de horário (texto ou
+                                   minutos Int16) e COL_SALARIO_BASE (numérica).
+        config (dict): Configuração de cálculo (horas_normais_h, multiplicador_hora_extra).
+        jornada_s (np.ndarray or float, optional): Jornada em segundos já resolvida;
+                                                   padrão é `_segundos_jornada(data_frame, config)`.
+
+    Returns:
+        pd.DataFrame: DataFrame com o mesmo índice e as colunas COL_HORAS_DEVIDAS e
+                      COL_HORAS_EXTRAS (minutos Int16, NA sem cálculo),
+                      COL_VALOR_HORA_EXTRA, COL_MINUTOS_TRABALHADOS (usada pelo
+                      recálculo incremental) e COL_STATUS.
+    """
+    multiplicador = config["multiplicador_hora_extra"]
+    n = len(data_frame)
+
+    minutos = _horarios_para_minutos(data_frame, COLUNAS_HORARIOS)
+    entrada, saida_almoco, volta_almoco, saida_final = (minutos[:, i].astype(np.int64) for i in range(4))
+
+    presente = minutos >= 0
+    vazio = minutos == MINUTOS_VAZIO
+    erro_formato = (minutos == MINUTOS_INVALIDO).any(axis=1)
+    p_ent, p_sa, p_va, p_sai = (presente[:, i] for i in range(4))
+    zero_ou_vazio = vazio | (minutos == 0)
+
+    # CASO 1: Sem almoço OU almoço zerado (00:00)
+    almoco_ausente = (vazio[:, 1] & vazio[:, 2]) | ((saida_almoco == 0) & (volta_almoco == 0))
+    caso1 = ~erro_formato & p_ent & p_sai & almoco_ausente
+    todos_zerados = caso1 & (entrada == 0) & (saida_final == 0) & zero_ou_vazio[:, 1] & zero_ou_vazio[:, 2]
+    saida_c1 = saida_final + 1440 * (saida_final < entrada)
+    seq_c1 = caso1 & ~todos_zerados & (entrada >= saida_c1)
+    trabalhado_c1 = saida_c1 - entrada
+
+    # CASO 2: Com almoço (cada marcação pode virar para o dia seguinte)
+    caso2 = ~erro_formato & ~caso1 & p_ent & p_sa & p_va & p_sai
+    sa2 = saida_almoco + 1440 * (saida_almoco < entrada)
+    va2 = volta_almoco + 1440 * (volta_almoco < sa2)
+    sai2 = saida_final + 1440 * (saida_final < va2)
+    sequencia_ok = (entrada <= sa2) & (sa2 <= va2) & (va2 <= sai2) & (entrada < sai2)
+    seq_c2 = caso2 & ~sequencia_ok
+    trabalhado_c2 = (sa2 - entrada) + (sai2 - va2)
+
+    # CASO 3: Horários incompletos para cálculo
+    caso3 = ~erro_formato & ~caso1 & ~caso2
+    incompleto_com_marcacao = caso3 & ~vazio.all(axis=1)
+
+    trabalhado_min = np.select([caso1 & ~todos_zerados & ~seq_c1, caso2 & ~seq_c2],
+                               [trabalhado_c1, trabalhado_c2], default=0)
+    if COL_MINUTOS_MARCACOES in data_frame.columns:
+        pareado = data_frame[COL_MINUTOS_MARCACOES].to_numpy(dtype=np.int64, na_value=-1)
+        somado = pareado >= 0
+        trabalhado_min = np.where(somado, pareado, trabalhado_min)
+        seq_c1, seq_c2 = seq_c1 & ~somado, seq_c2 & ~somado
+        incompleto_com_marcacao &= ~somado
+    if jornada_s is None:
+        jornada_s = _segundos_jornada(data_frame, config)
+    calculado, minutos_devidos, minutos_extras = _dividir_jornada(trabalhado_min, jornada_s)
+
+    salario = pd.to_numeric(data_frame[COL_SALARIO_BASE], errors="coerce").to_numpy(dtype=float)
+    valor_hora_extra = _valor_hora_extra(salario, minutos_extras, multiplicador)
+
+    status = np.full(n, STATUS_SEM_CALCULO, dtype=esquema.TIPO_STATUS)
+    status[calculado] = STATUS_CALCULADO
+    status[erro_formato] = STATUS_ERRO_FORMATO
+    status[seq_c1] = STATUS_ERRO_SEQ_SEM_ALMOCO
+    status[seq_c2] = STATUS_ERRO_SEQ_COM_ALMOCO
+    status[incompleto_com_marcacao] = STATUS_INCOMPLETO
+
+    return pd.DataFrame({
+        COL_HORAS_DEVIDAS: esquema._array_minutos(minutos_devidos, ~calculado),
+        COL_HORAS_EXTRAS: esquema._array_minutos(minutos_extras, ~calculado),
+        COL_VALOR_HORA_EXTRA: valor_hora_extra,
+        COL_MINUTOS_TRABALHADOS: pd.array(trabalhado_min, dtype=esquema.TIPO_MINUTOS),
+        COL_STATUS: status,
+    }, index=data_frame.index)
+
+
+def _resultado_da_referencia(referencia, nota_original):
+    """
+    Converte a saída textual de `_calculate_single_row_hours` nas colunas do esquema compacto.
+
+    Args:
+        referencia (pd.DataFrame): Resultado de `_calculate_single_row_hours` por linha.
+        nota_original (pd.Series): Nota antes do cálculo (para reconhecer a mensagem acrescentada).
+
+    Returns:
+        pd.DataFrame: Colunas COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_VALOR_HORA_EXTRA e COL_STATUS.
+    """
+    nota = nota_original.astype(object).where(nota_original.notna(), "").astype(str)
+    status = np.full(len(referencia), STATUS_SEM_CALCULO, dtype=esquema.TIPO_STATUS)
+    for codigo, mensagem in MENSAGENS_STATUS.items():
+        status[((nota + " " + mensagem).str.strip() == referencia[COL_NOTA].astype(str)).to_numpy()] = codigo
+    devidas = esquema.minutos_das_duracoes(referencia[COL_HORAS_DEVIDAS])
+    extras = esquema.minutos_das_duracoes(referencia[COL_HORAS_EXTRAS])
+    status[(status == STATUS_SEM_CALCULO) & devidas.notna().to_numpy()] = STATUS_CALCULADO
+    return pd.DataFrame({
+        COL_HORAS_DEVIDAS: devidas,
+        COL_HORAS_EXTRAS: extras,
+        COL_VALOR_HORA_EXTRA: referencia[COL_VALOR_HORA_EXTRA].astype(float),
+        COL_STATUS: status,
+    }, index=referencia.index)
+
+
+def calcular_todas_horas_e_extras(data_frame, config, usar_referencia=False):
+    """
+    Calcula horas devidas, extras e valor de HE para todas as linhas de um DataFrame.
+
+    Converte antes o DataFrame para o esquema compacto (`esquema.compactar`):
+    marcações e resultados em minutos Int16, textos em categóricas e a situação
+    de cada linha em COL_STATUS. Por padrão usa o motor colunar
+    (`calcular_horas_vetorizado`); `_calculate_single_row_hours` continua
+    disponível como caminho de referência, linha a linha.
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame de ponto (modificado no lugar).
+        config (dict): Configuração de cálculo (horas_normais_h, multiplicador_hora_extra).
+        usar_referencia (bool, optional): Se True, aplica `_calculate_single_row_hours`
+                                          em cada linha (lento). Padrão é False.
+
+    Returns:
+        pd.DataFrame: O próprio `data_frame`, com as colunas COL_HORAS_DEVIDAS,
+                      COL_HORAS_EXTRAS, COL_VALOR_HORA_EXTRA e COL_STATUS atualizadas.
+    """
+    if data_frame.empty: return data_frame
+
+    with diagnostico.etapa("calculo_horas", len(data_frame)):
+        for col in COLUNAS_HORARIOS:
+            if col not in data_frame.columns: data_frame[col] = ""
+
+        if COL_NOTA not in data_frame.columns: data_frame[COL_NOTA] = ""
+
+        if COL_SALARIO_BASE not in data_frame.columns: data_frame[COL_SALARIO_BASE] = np.nan
+        data_frame[COL_SALARIO_BASE] = pd.to_numeric(data_frame[COL_SALARIO_BASE], errors='coerce')
+
+        # Garantir que COL_VALOR_HORA_EXTRA exista antes de ser preenchida
+        if COL_VALOR_HORA_EXTRA not in data_frame.columns: data_frame[COL_VALOR_HORA_EXTRA] = np.nan
+        data_frame[COL_VALOR_HORA_EXTRA] = pd.to_numeric(data_frame[COL_VALOR_HORA_EXTRA], errors='coerce')
+
+        # Horas Normais em texto é só a cópia exibida: vale a jornada da configuração
+        jornada_s = _segundos_jornada(data_frame, config)
+        esquema.compactar(data_frame)
+        if usar_referencia:
+            textos = {col: esquema.textos_coluna(data_frame, col) for col in COLUNAS_HORARIOS}
+            # Sem jornada por linha (`_segundos_jornada`), a referência também usa a da configuração
+            sem_jornada = [COL_HORAS_NORMAIS] if np.ndim(jornada_s) == 0 else []
+            linhas_texto = data_frame.drop(columns=COLUNAS_HORARIOS + [COL_NOTA] + sem_jornada, errors="ignore").assign(
+                **textos, **{COL_NOTA: data_frame[COL_NOTA].astype(object)})
+            referencia = linhas_texto.apply(_calculate_single_row_hours, axis=1, args=(config,))
+            calculated_data = _resultado_da_referencia(referencia, data_frame[COL_NOTA])
+            # O caminho de referência não produz os minutos; o próximo recálculo incremental será completo
+            data_frame.drop(columns=[COL_MINUTOS_TRABALHADOS], errors="ignore", inplace=True)
+        else:
+            calculated_data = calcular_horas_vetorizado(data_frame, config, jornada_s)
+        for col in calculated_data.columns:
+            data_frame[col] = calculated_data[col]
+    return data_frame
+
+
+def recalcular_linhas(data_frame, indices, config):
+    """
+    Recalcula apenas as linhas indicadas (após edição de horários ou salário).
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame de trabalho já calculado (modificado no lugar).
+        indices (list): Rótulos do índice das linhas a recalcular.
+        config (dict): Configuração de cálculo.
+
+    Returns:
+        pd.DataFrame: O próprio `data_frame`.
+    """
+    if COL_MINUTOS_TRABALHADOS not in data_frame.columns:
+        return calcular_todas_horas_e_extras(data_frame, config)
+    linhas = data_frame.loc[indices]
+    if linhas.empty:
+        return data_frame
+    resultado = calcular_horas_vetorizado(linhas, config)
+    for col in resultado.columns:
+        data_frame.loc[indices, col] = resultado[col]
+    return data_frame
+
+
+def _minutos_extras(data_frame):
+    """Minutos extras por linha (0 nas linhas sem cálculo)."""
+    return data_frame[COL_HORAS_EXTRAS].to_numpy(dtype=np.int64, na_value=0)
+
+
+def recalcular_valor_hora_extra(data_frame, config):
+    """
+    Recalcula só a coluna Valor Hora Extra a partir dos minutos extras guardados.
+
+    Usado quando muda apenas o multiplicador ou o salário base: nenhuma
+    marcação é relida.
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame de trabalho já calculado (modificado no lugar).
+        config (dict): Configuração de cálculo (usa multiplicador_hora_extra).
+
+    Returns:
+        pd.DataFrame: O próprio `data_frame`.
+    """
+    if COL_STATUS not in data_frame.columns:
+        return calcular_todas_horas_e_extras(data_frame, config)
+    salario = pd.to_numeric(data_frame[COL_SALARIO_BASE], errors="coerce").to_numpy(dtype=float)
+    data_frame[COL_VALOR_HORA_EXTRA] = _valor_hora_extra(salario, _minutos_extras(data_frame),
+                                                         config["multiplicador_hora_extra"])
+    return data_frame
+
+
+def recalcular_jornada(data_frame, config, jornada_min=None):
+    """
+    Troca a jornada esperada e refaz a divisão devidas/extras a partir dos
+    minutos trabalhados guardados.
+
+    Usado quando muda `horas_normais_h` ou a escala: linhas com erro,
+    incompletas ou sem marcação não são tocadas, e as notas não mudam.
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame de trabalho já calculado (modificado no lugar).
+        config (dict): Configuração de cálculo.
+        jornada_min (np.ndarray, optional): Minutos esperados por linha (ex:
+                                            `escalas.minutos_esperados`). Padrão é
+                                            a jornada da configuração em todas as linhas.
+
+    Returns:
+        pd.DataFrame: O próprio `data_frame`, com Horas Normais, Horas Devidas,
+                      Horas Extras e Valor Hora Extra atualizados.
+    """
+    if jornada_min is None:
+        jornada_min = np.full(len(data_frame), minutos_horas_normais(config["horas_normais_h"]))
+    data_frame[COL_HORAS_NORMAIS] = pd.array(jornada_min, dtype=esquema.TIPO_MINUTOS)
+    if COL_MINUTOS_TRABALHADOS not in data_frame.columns:
+        return calcular_todas_horas_e_extras(data_frame, config)
+    trabalhado_min = data_frame[COL_MINUTOS_TRABALHADOS].to_numpy(dtype=np.int64, na_value=0)
+    calculado, minutos_devidos, minutos_extras = _dividir_jornada(trabalhado_min, _segundos_jornada(data_frame, config))
+
+    data_frame[COL_HORAS_DEVIDAS] = esquema._array_minutos(minutos_devidos, ~calculado)
+    data_frame[COL_HORAS_EXTRAS] = esquema._array_minutos(minutos_extras, ~calculado)
+    return recalcular_valor_hora_extra(data_frame, config)
+
+
+def recalcular_configuracao(data_frame, config_anterior, config_nova, escala=None):
+    """
+    Aplica uma mudança de configuração recalculando só o que depende dela.
+
+    Se `horas_normais_h` mudar, Horas Normais é refeita por
+    `escalas.minutos_esperados`: as linhas com regra na escala mantêm a
+    jornada da escala e as demais recebem a nova jornada da configuração.
+    Sem `escala`, todas as linhas passam à jornada da configuração.
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame de trabalho já calculado (modificado no lugar).
+        config_anterior (dict): Configuração usada no último cálculo.
+        config_nova (dict): Nova configuração.
+        escala (pd.DataFrame, optional): Regras de `escalas.ler_escalas` aplicadas ao DataFrame.
+
+    Returns:
+        pd.DataFrame: O próprio `data_frame`.
+    """
+    from pontoknup1028.escalas import minutos_esperados
+
+    if data_frame.empty:
+        return data_frame
+    if config_nova["horas_normais_h"] != config_anterior["horas_normais_h"]:
+        return recalcular_jornada(data_frame, config_nova, minutos_esperados(data_frame, escala, config_nova))
+    if config_nova["multiplicador_hora_extra"] != config_anterior["multiplicador_hora_extra"]:
+        return recalcular_valor_hora_extra(data_frame, config_nova)
+    return data_frame
@@ -0,0 +1,162 @@
+# pontoknup1028/calendario.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Dias da semana, fins de semana e feriados.
+
+Tudo parte do número do dia (`dt.dayofweek`, segunda = 0), nunca do texto da
+coluna Semana: o nome do dia vem da tabela fixa `DIAS_SEMANA`, então não
+depende do locale pt_BR estar instalado, e fins de semana e feriados são
+encontrados com uma única máscara vetorizada sobre a coluna Data.
+
+O calendário de feriados é um arquivo de texto (ou CSV) com uma data por
+linha, opcionalmente seguida da descrição:
+
+    # Feriados 2025
+    01/01/2025;Confraternização Universal
+    2025-04-21;Tiradentes
+    25/12/2025
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import esquema
+from pontoknup1028.constantes import COL_DATA, COL_NOTA, DIAS_SEMANA, DIAS_FIM_DE_SEMANA
+
+MARCA_FIM_DE_SEMANA = "Fim de semana"
+MARCA_FERIADO = "Feriado"
+
+_RE_LINHA_FERIADO = re.compile(r"^\s*([^;,\t]+?)\s*(?:[;,\t]\s*(.*?))?\s*$")
+
+
+def semana_das_datas(datas):
+    """
+    Coluna Semana (categórica) a partir das datas.
+
+    Args:
+        datas (pd.Series): Coluna datetime64 (NaT permitido).
+
+    Returns:
+        pd.Series: Nome do dia por linha (categorias `DIAS_SEMANA`), NaN onde a data é NaT.
+    """
+    codigos = datas.dt.dayofweek.fillna(-1).to_numpy(dtype=np.int8)
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=DIAS_SEMANA), index=datas.index)
+
+
+def nome_dia_semana(data):
+    """
+    Nome do dia de uma única data (ex: ao editar a Data de uma linha).
+
+    Args:
+        data (date-like): Data.
+
+    Returns:
+        str: Nome do dia, ou "" se a data for nula.
+    """
+    return "" if pd.isna(data) else DIAS_SEMANA[pd.Timestamp(data).dayofweek]
+
+
+def ler_feriados(caminho):
+    """
+    Lê um calendário de feriados.
+
+    Args:
+        caminho (str): Arquivo com uma data por linha (DD/MM/AAAA ou AAAA-MM-DD),
+                       seguida ou não de ";descrição". Linhas vazias e iniciadas por "#"
+                       são ignoradas.
+
+    Returns:
+        pd.Series: Descrição ("" se não houver) indexada pela data, sem repetições.
+
+    Raises:
+        ValueError: Linha com data inválida (a mensagem indica o número da linha).
+    """
+    datas, descricoes = [], []
+    with open(caminho, "r", encoding="utf-8-sig") as f:
+        for numero, linha in enumerate(f, start=1):
+            if not linha.strip() or linha.lstrip().startswith("#"):
+                continue
+            encontrada = _RE_LINHA_FERIADO.match(linha)
+            if encontrada is None:  # Campo da data vazio (ex: ";Natal")
+                raise ValueError(f"Data inválida na linha {numero} do calendário: {linha.strip()!r}")
+            texto_data, descricao = encontrada.groups()
+            iso = re.fullmatch(r"\d{4}-\d{2}-\d{2}", texto_data) is not None
+            data = pd.to_datetime(texto_data, format="%Y-%m-%d" if iso else "%d/%m/%Y", errors="coerce")
+            if pd.isna(data):
+                raise ValueError(f"Data inválida na linha {numero} do calendário: {texto_data!r}")
+            datas.append(data)
+            descricoes.append(descricao or "")
+    feriados = pd.Series(descricoes, index=pd.DatetimeIndex(datas, name=COL_DATA), dtype=object)
+    return feriados[~feriados.index.duplicated()].sort_index()
+
+
+def mascara_sem_expediente(datas, fins_de_semana=True, feriados=None):
+    """
+    Máscara das linhas em fim de semana e/ou feriado.
+
+    Args:
+        datas (pd.Series): Coluna Data.
+        fins_de_semana (bool, optional): Inclui sábados e domingos.
+        feriados (pd.Series or list, optional): Feriados (`ler_feriados` ou lista de datas).
+
+    Returns:
+        np.ndarray: Máscara booleana por linha (NaT nunca entra).
+    """
+    mascara = np.zeros(len(datas), dtype=bool)
+    if fins_de_semana:
+        mascara |= np.isin(datas.dt.dayofweek.to_numpy(), DIAS_FIM_DE_SEMANA)
+    if feriados is not None and len(feriados):
+        dias = feriados.index if isinstance(feriados, pd.Series) else pd.DatetimeIndex(feriados)
+        mascara |= datas.dt.normalize().isin(dias.normalize()).to_numpy()
+    return mascara
+
+
+def marcas_sem_expediente(datas, feriados=None):
+    """
+    Marca de cada data para a Nota: "Feriado" (com a descrição) ou "Fim de semana".
+
+    Args:
+        datas (pd.Series): Datas das linhas a marcar.
+        feriados (pd.Series, optional): Feriados de `ler_feriados`.
+
+    Returns:
+        np.ndarray: Marca por linha ("" para dias úteis que não são feriado).
+    """
+    marcas = np.where(np.isin(datas.dt.dayofweek.to_numpy(), DIAS_FIM_DE_SEMANA), MARCA_FIM_DE_SEMANA, "")
+    marcas = marcas.astype(object)
+    if feriados is not None and len(feriados):
+        descricoes = feriados.reindex(datas.dt.normalize()).to_numpy()
+        feriado = ~pd.isna(descricoes)
+        marcas[feriado] = [f"{MARCA_FERIADO}: {d}" if d else MARCA_FERIADO for d in descricoes[feriado]]
+    return marcas
+
+
+def _notas_com_marca(notas, marcas):
+    """Acrescenta a marca à Nota, sem repetir uma marca já presente."""
+    notas = notas.astype(object).where(notas.notna(), "").astype(str).to_numpy(dtype=object)
+    marcas = np.asarray(marcas, dtype=object)
+    novas = notas.copy()
+    vazia = notas == ""
+    novas[vazia] = marcas[vazia]
+    acrescentar = ~vazia & (marcas != "")
+    acrescentar[acrescentar] = [m not in n for n, m in zip(notas[acrescentar], marcas[acrescentar])]
+    novas[acrescentar] = notas[acrescentar] + " - " + marcas[acrescentar]
+    return novas
+
+
+def marcar_sem_expediente(df, rotulos, feriados=None):
+    """
+    Acrescenta "Fim de semana" ou "Feriado: descrição" à Nota das linhas indicadas.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho (modificado no lugar).
+        rotulos (list or pd.Index): Rótulos das linhas (ex: de `mascara_sem_expediente`).
+        feriados (pd.Series, optional): Feriados de `ler_feriados`.
+    """
+    linhas = df.loc[rotulos]
+    novas = _notas_com_marca(linhas[COL_NOTA], marcas_sem_expediente(linhas[COL_DATA], feriados))
+    esquema.atribuir(df, rotulos, COL_NOTA, novas)
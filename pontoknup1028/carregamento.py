@@ -0,0 +1,245 @@
+# pontoknup1028/carregamento.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Leitura da planilha padrão do Knup 1028 e normalização para o DataFrame de trabalho.
+
+Arquivos .xlsx são lidos em modo somente leitura do openpyxl, linha a linha:
+apenas a terceira aba é percorrida, as linhas de cabeçalho e as colunas além
+da 12ª são descartadas na origem e os dados chegam ao cálculo em blocos de
+tamanho fixo. Arquivos .xls continuam passando por `pd.read_excel`.
+
+Arquivos AFD dos relógios de ponto (`afd`) entram pelo mesmo caminho: as
+marcações são agrupadas por funcionário e dia e seguem a mesma normalização.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import afd, calendario, diagnostico, esquema
+from pontoknup1028.calculos import calcular_todas_horas_e_extras
+from pontoknup1028.config import minutos_horas_normais
+from pontoknup1028.constantes import (
+    COL_ID, COL_DATA, COL_SEMANA, COL_HORAS_NORMAIS, COL_SALARIO_BASE,
+    COL_VALOR_HORA_EXTRA, COL_NOTA, COL_MINUTOS_MARCACOES, COLUNAS_PLANILHA, ORDEM_COLUNAS
+)
+from pontoknup1028.tarefas import PASSO_PROGRESSO, avisar_progresso
+
+ABA_DADOS = 2          # Terceira aba da planilha
+LINHAS_CABECALHO = 4   # Linhas de cabeçalho descartadas após o título das colunas
+
+
+TAMANHO_BLOCO = 50_000  # Linhas por bloco na leitura em streaming
+VERSAO_CARREGADOR = 6   # Incrementar ao mudar a normalização (invalida o cache em disco)
+
+
+def _normalizar_bloco(df, config):
+    """
+    Normaliza um bloco cujas colunas já têm os nomes de `COLUNAS_PLANILHA`.
+
+    Converte Data, deriva Semana, preenche Horas Normais com a jornada
+    configurada, garante todas as colunas de `ORDEM_COLUNAS` (e os minutos
+    somados das marcações, vazios fora do AFD) e converte o bloco para o
+    esquema compacto (`esquema.compactar`).
+
+    Args:
+        df (pd.DataFrame): Bloco com até 12 colunas nomeadas.
+        config (dict): Configuração de cálculo (usa horas_normais_h).
+
+    Returns:
+        pd.DataFrame: Bloco normalizado, ainda sem os cálculos de horas.
+    """
+    df[COL_ID] = df[COL_ID].astype(str)
+    df[COL_DATA] = pd.to_datetime(df[COL_DATA], dayfirst=True, errors="coerce")
+    df[COL_SEMANA] = calendario.semana_das_datas(df[COL_DATA])
+    df[COL_HORAS_NORMAIS] = pd.array(np.full(len(df), minutos_horas_normais(config["horas_normais_h"])),
+                                     dtype=esquema.TIPO_MINUTOS)
+
+    for col in ORDEM_COLUNAS:
+        if col not in df.columns:
+            if col in [COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA]:
+                 df[col] = np.nan
+                 df[col] = df[col].astype(float)
+            else:
+                df[col] = ""
+    if COL_MINUTOS_MARCACOES not in df.columns:
+        df[COL_MINUTOS_MARCACOES] = pd.array([pd.NA] * len(df), dtype=esquema.TIPO_MINUTOS)
+    df = df[ORDEM_COLUNAS + [COL_MINUTOS_MARCACOES]]
+    df[COL_NOTA] = df[COL_NOTA].fillna("")
+    with pd.option_context("future.no_silent_downcasting", True):
+        df.replace("Omissão", "", inplace=True, regex=True) # regex=True para case-insensitive "Omissão"
+    return esquema.compactar(df)
+
+
+def normalizar_planilha(df_raw, config):
+    """
+    Converte a aba bruta da planilha no DataFrame de trabalho.
+
+    Descarta as linhas de cabeçalho, renomeia as colunas e aplica `_normalizar_bloco`.
+
+    Args:
+        df_raw (pd.DataFrame): Conteúdo da terceira aba, como lido por `pd.read_excel`.
+        config (dict): Configuração de cálculo (usa horas_normais_h).
+
+    Returns:
+        pd.DataFrame: DataFrame normalizado, ainda sem os cálculos de horas.
+    """
+    df = df_raw.iloc[LINHAS_CABECALHO:].reset_index(drop=True)
+
+    colunas_para_renomear = min(len(COLUNAS_PLANILHA), len(df.columns))
+    df = df.iloc[:, :colunas_para_renomear]
+    df.columns = COLUNAS_PLANILHA[:colunas_para_renomear]
+    return _normalizar_bloco(df, config)
+
+
+def iterar_linhas_planilha(file_path, tamanho_bloco=TAMANHO_BLOCO, progresso=None):
+    """
+    Lê a aba de dados em blocos brutos, com as colunas já nomeadas.
+
+    Para .xlsx usa o openpyxl em modo somente leitura: só a terceira aba é
+    percorrida, a partir da primeira linha de dados, e só as 12 primeiras
+    colunas são materializadas. Linhas totalmente vazias são ignoradas.
+    Um arquivo AFD é lido por `afd.iterar_blocos_afd`.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel ou AFD.
+        tamanho_bloco (int, optional): Número máximo de linhas por bloco.
+        progresso (callable, optional): Recebe (linhas lidas, total estimado ou None)
+                                        a cada PASSO_PROGRESSO linhas.
+
+    Yields:
+        pd.DataFrame: Blocos com até `tamanho_bloco` linhas e colunas de `COLUNAS_PLANILHA`.
+    """
+    if afd.eh_arquivo_afd(file_path):
+        yield from afd.iterar_blocos_afd(file_path, tamanho_bloco, progresso)
+        return
+    if os.path.splitext(str(file_path))[1].lower() == ".xls":
+        df = pd.read_excel(file_path, sheet_name=ABA_DADOS).iloc[LINHAS_CABECALHO:]
+        df = df.iloc[:, :len(COLUNAS_PLANILHA)]
+        df.columns = COLUNAS_PLANILHA[:len(df.columns)]
+        for inicio in range(0, len(df), tamanho_bloco):
+            avisar_progresso(progresso, inicio, len(df))
+            yield df.iloc[inicio:inicio + tamanho_bloco].reset_index(drop=True)
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[ABA_DADOS]
+        # Linha 1 é o título das colunas; as LINHAS_CABECALHO seguintes não são dados
+        linhas = worksheet.iter_rows(min_row=LINHAS_CABECALHO + 2, max_col=len(COLUNAS_PLANILHA), values_only=True)
+        total = worksheet.max_row - LINHAS_CABECALHO - 1 if worksheet.max_row else None
+        bloco = []
+        for lidas, linha in enumerate(linhas, start=1):
+            if lidas % PASSO_PROGRESSO == 0:
+                avisar_progresso(progresso, lidas, total)
+            if all(valor is None for valor in linha):
+                continue
+            bloco.append(linha)
+            if len(bloco) == tamanho_bloco:
+                yield _bloco_para_dataframe(bloco)
+                bloco = []
+        if bloco:
+            yield _bloco_para_dataframe(bloco)
+    finally:
+        workbook.close()
+
+
+def _bloco_para_dataframe(linhas):
+    """
+    Monta um DataFrame a partir de tuplas lidas do openpyxl.
+
+    Args:
+        linhas (list): Tuplas de valores das células.
+
+    Returns:
+        pd.DataFrame: Bloco com as colunas de `COLUNAS_PLANILHA` (ID ausente como NaN).
+    """
+    largura = max(len(linha) for linha in linhas)
+    df = pd.DataFrame.from_records(linhas, columns=COLUNAS_PLANILHA[:largura])
+    # As demais colunas tratam None como NaN; o ID vira texto em `_normalizar_bloco`
+    # e precisa chegar como na leitura pelo pandas: sem "None" e sem "1.0" quando
+    # IDs inteiros dividem o bloco com células vazias (o from_records os passa a float)
+    ids = df[COL_ID].to_numpy()
+    if ids.dtype == float:
+        ids = np.array([linha[0] for linha in linhas], dtype=object)
+    ausentes = pd.isna(ids)
+    if ausentes.any():
+        df[COL_ID] = np.where(ausentes, np.nan, ids)
+    return df
+
+
+def carregar_planilha_em_blocos(file_path, config, tamanho_bloco=TAMANHO_BLOCO, progresso=None):
+    """
+    Lê, normaliza e calcula a planilha bloco a bloco, com memória limitada.
+
+    O índice de cada bloco continua a numeração do bloco anterior, de modo que
+    a concatenação dos blocos equivale ao resultado de `carregar_planilha`.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel ou AFD.
+        config (dict): Configuração de cálculo.
+        tamanho_bloco (int, optional): Número máximo de linhas por bloco.
+        progresso (callable, optional): Callback de progresso (ver `iterar_linhas_planilha`).
+
+    Yields:
+        pd.DataFrame: Blocos normalizados e com as horas calculadas.
+    """
+    inicio = 0
+    for bloco in diagnostico.medir_iteracao("leitura_excel", iterar_linhas_planilha(file_path, tamanho_bloco, progresso)):
+        with diagnostico.etapa("normalizacao", len(bloco)):
+            bloco = _normalizar_bloco(bloco, config)
+        bloco.index = pd.RangeIndex(inicio, inicio + len(bloco))
+        inicio += len(bloco)
+        yield calcular_todas_horas_e_extras(bloco, config)
+
+
+def carregar_planilha(file_path, config, tamanho_bloco=TAMANHO_BLOCO, progresso=None):
+    """
+    Lê uma planilha de ponto, normaliza os dados e calcula as horas.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel (.xlsx/.xls) ou AFD.
+        config (dict): Configuração de cálculo.
+        tamanho_bloco (int, optional): Número máximo de linhas por bloco de leitura.
+        progresso (callable, optional): Recebe (linhas lidas, total estimado ou None);
+                                        pode levantar `OperacaoCancelada` para interromper.
+
+    Returns:
+        pd.DataFrame: DataFrame de trabalho com as horas calculadas.
+    """
+    blocos = list(carregar_planilha_em_blocos(file_path, config, tamanho_bloco, progresso))
+    if not blocos:
+        return _normalizar_bloco(pd.DataFrame(columns=COLUNAS_PLANILHA), config)
+    if len(blocos) == 1:
+        return blocos[0]
+    return esquema.unificar_categorias(blocos)
+
+
+def ler_planilha_normalizada(file_path, config, tamanho_bloco=TAMANHO_BLOCO, progresso=None):
+    """
+    Lê e normaliza uma planilha inteira, sem calcular as horas.
+
+    Usada para juntar várias planilhas e calcular o conjunto uma só vez
+    (`pontoknup1028.mesclagem`).
+
+    Args:
+        file_path (str): Caminho do arquivo Excel (.xlsx/.xls) ou AFD.
+        config (dict): Configuração (usa horas_normais_h).
+        tamanho_bloco (int, optional): Número máximo de linhas por bloco de leitura.
+        progresso (callable, optional): Callback de progresso (ver `iterar_linhas_planilha`).
+
+    Returns:
+        pd.DataFrame: DataFrame normalizado no esquema compacto, com índice 0..n-1.
+    """
+    blocos = []
+    for bloco in diagnostico.medir_iteracao("leitura_excel", iterar_linhas_planilha(file_path, tamanho_bloco, progresso)):
+        with diagnostico.etapa("normalizacao", len(bloco)):
+            blocos.append(_normalizar_bloco(bloco, config))
+    if not blocos:
+        return _normalizar_bloco(pd.DataFrame(columns=COLUNAS_PLANILHA), config)
+    return esquema.unificar_categorias(blocos)
@@ -0,0 +1,120 @@
+# pontoknup1028/config.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Leitura e gravação das configurações de cálculo (config.json).
+
+As funções do núcleo recebem a configuração explicitamente como um dicionário
+com as mesmas chaves de `CONFIG_PADRAO`; não existe estado global aqui.
+"""
+
+import json
+
+CONFIG_PADRAO = {
+    "horas_normais_h": 8.8,
+    "multiplicador_hora_extra": 1.5
+}
+
+# Preferências da interface gravadas no mesmo config.json, mas fora da
+# configuração de cálculo (que faz parte da chave do cache de planilhas)
+PREFERENCIAS_PADRAO = {
+    "banco_local": False,   # Guardar planilhas abertas e edições no banco SQLite local
+    "arquivo_feriados": "",  # Último calendário de feriados usado (ver `calendario.ler_feriados`)
+    "banco_horas": False,   # Mostrar a coluna Banco de Horas (saldo acumulado, ver `banco_horas`)
+    "validade_banco_horas_meses": 6,  # Meses até um crédito do banco de horas vencer (0 = não vence)
+    "arquivo_escalas": "",  # Escala de trabalho por ID ou Área (ver `escalas.ler_escalas`)
+}
+
+
+def nova_config(**valores):
+    """
+    Cria um dicionário de configuração a partir dos valores padrão.
+
+    Args:
+        **valores: Chaves de `CONFIG_PADRAO` a sobrescrever.
+
+    Returns:
+        dict: Nova configuração completa.
+    """
+    config = dict(CONFIG_PADRAO)
+    for key, value in valores.items():
+        if key in config:
+            config[key] = value
+    return config
+
+
+def ler_config(caminho):
+    """
+    Lê um arquivo de configuração JSON, ignorando chaves desconhecidas.
+
+    Args:
+        caminho (str): Caminho do arquivo config.json.
+
+    Returns:
+        dict: Configuração completa (padrões + valores do arquivo).
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+        json.JSONDecodeError: Se o conteúdo não for JSON válido.
+    """
+    with open(caminho, "r") as f:
+        return nova_config(**json.load(f))
+
+
+def ler_preferencias(caminho):
+    """
+    Lê as preferências da interface do arquivo de configuração.
+
+    Args:
+        caminho (str): Caminho do arquivo config.json.
+
+    Returns:
+        dict: Preferências completas (padrões + valores do arquivo).
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+        json.JSONDecodeError: Se o conteúdo não for JSON válido.
+    """
+    with open(caminho, "r") as f:
+        valores = json.load(f)
+    return {chave: valores.get(chave, padrao) for chave, padrao in PREFERENCIAS_PADRAO.items()}
+
+
+def salvar_config(config, caminho):
+    """
+    Grava a configuração em um arquivo JSON.
+
+    Args:
+        config (dict): Configuração a salvar.
+        caminho (str): Caminho do arquivo config.json.
+    """
+    with open(caminho, "w") as f:
+        json.dump(config, f, indent=4)
+
+
+def formatar_horas_normais(horas_normais_h):
+    """
+    Converte horas decimais da configuração em texto "HH:MM".
+
+    Args:
+        horas_normais_h (float): Horas normais por dia (ex: 8.8).
+
+    Returns:
+        str: Jornada formatada (ex: "08:48").
+    """
+    minutos = minutos_horas_normais(horas_normais_h)
+    return f"{minutos // 60:02}:{minutos % 60:02}"
+
+
+def minutos_horas_normais(horas_normais_h):
+    """
+    Converte horas decimais da configuração em minutos inteiros (valor da coluna Horas Normais).
+
+    Args:
+        horas_normais_h (float): Horas normais por dia (ex: 8.8).
+
+    Returns:
+        int: Jornada em minutos (ex: 528), truncando frações de minuto.
+    """
+    return int(horas_normais_h) * 60 + int((horas_normais_h * 60) % 60)
@@ -0,0 +1,85 @@
+# pontoknup1028/constantes.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Constantes compartilhadas pelo núcleo e pela interface: nomes de colunas,
+valores de omissão e códigos de erro. Não importa pandas nem tkinter.
+"""
+
+# --- CONSTANTES PARA NOMES DE COLUNAS ---
+COL_ID = "ID"
+COL_NOME = "Nome"
+COL_AREA = "Área"
+COL_DATA = "Data"
+COL_SEMANA = "Semana"
+COL_ENTRADA = "Entrada"
+COL_SAIDA_ALMOCO = "Saída-Almoço"
+COL_VOLTA_ALMOCO = "Volta-Almoço"
+COL_SAIDA = "Saída"
+COL_HORAS_DEVIDAS = "Horas Devidas"
+COL_HORAS_EXTRAS = "Horas Extras"
+COL_HORAS_NORMAIS = "Horas Normais"
+COL_SALARIO_BASE = "Salário Base"
+COL_VALOR_HORA_EXTRA = "Valor Hora Extra"
+COL_NOTA = "Nota"
+COL_BANCO_HORAS = "Banco de Horas"  # Saldo acumulado (opcional, ver `banco_horas`); fora de ORDEM_COLUNAS
+
+# Colunas da terceira aba da planilha do Knup 1028, na ordem em que aparecem
+COLUNAS_PLANILHA = [
+    COL_ID, COL_NOME, COL_AREA, COL_DATA, COL_ENTRADA, COL_SAIDA_ALMOCO,
+    COL_VOLTA_ALMOCO, COL_SAIDA, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS,
+    COL_HORAS_NORMAIS, COL_NOTA
+]
+
+# Ordem das colunas no DataFrame de trabalho (tabela e exportação)
+ORDEM_COLUNAS = [
+    COL_ID, COL_NOME, COL_AREA, COL_DATA, COL_SEMANA, COL_ENTRADA,
+    COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA, COL_HORAS_DEVIDAS,
+    COL_HORAS_EXTRAS, COL_HORAS_NORMAIS, COL_SALARIO_BASE,
+    COL_VALOR_HORA_EXTRA, COL_NOTA
+]
+
+# Colunas internas do motor de cálculo (não aparecem na tabela nem na exportação)
+COL_MINUTOS_MARCACOES = "_minutos_marcacoes"  # Soma dos intervalos de todas as marcações da jornada (AFD)
+COL_TEXTOS_INVALIDOS = "_textos_invalidos"    # Marcações originais das linhas com formato inválido
+COL_MINUTOS_TRABALHADOS = "_minutos_trabalhados"
+COL_STATUS = "_status"                        # Situação do cálculo da linha (STATUS_*)
+COLUNAS_INTERNAS = [COL_MINUTOS_MARCACOES, COL_TEXTOS_INVALIDOS, COL_MINUTOS_TRABALHADOS, COL_STATUS]
+
+COLUNAS_HORARIOS = [COL_ENTRADA, COL_SAIDA_ALMOCO, COL_VOLTA_ALMOCO, COL_SAIDA]
+
+# Nome do dia na coluna Semana, pelo número do dia (segunda = 0, como em `dt.dayofweek`)
+DIAS_SEMANA = ["Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira", "Sexta-feira", "Sábado", "Domingo"]
+DIAS_FIM_DE_SEMANA = [5, 6]  # Sábado e domingo
+
+OMISSAO_VALS = ["omissão", "omissao", "nan", ""]
+ERRO_FORMATO = "INV_FORMATO"
+ERRO_SEQUENCIA = "INV_SEQ"
+HORA_ZERO = "00:00"
+
+MINUTOS_VAZIO = -1      # Marcação ausente (vazio, "Omissão", "nan")
+MINUTOS_INVALIDO = -2   # Marcação fora do formato HH:MM
+
+# Situação do cálculo de cada linha (coluna COL_STATUS)
+STATUS_SEM_CALCULO = 0              # Sem marcações, tudo zerado ou nenhum minuto trabalhado
+STATUS_CALCULADO = 1
+STATUS_INCOMPLETO = 2
+STATUS_ERRO_FORMATO = 3
+STATUS_ERRO_SEQ_SEM_ALMOCO = 4
+STATUS_ERRO_SEQ_COM_ALMOCO = 5
+
+# Mensagem acrescentada à Nota na exibição e na exportação
+MENSAGENS_STATUS = {
+    STATUS_INCOMPLETO: "(Horários incompletos)",
+    STATUS_ERRO_FORMATO: "(Erro: Formato de horário inválido)",
+    STATUS_ERRO_SEQ_SEM_ALMOCO: "(Erro Seq: E>=S s/almoço)",
+    STATUS_ERRO_SEQ_COM_ALMOCO: "(Erro Seq: c/almoço)",
+}
+
+# Texto exibido em Horas Devidas/Extras para cada situação de erro
+CODIGOS_ERRO_STATUS = {
+    STATUS_ERRO_FORMATO: ERRO_FORMATO,
+    STATUS_ERRO_SEQ_SEM_ALMOCO: ERRO_SEQUENCIA,
+    STATUS_ERRO_SEQ_COM_ALMOCO: ERRO_SEQUENCIA,
+}
@@ -0,0 +1,222 @@
+# pontoknup1028/diagnostico.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Instrumentação das etapas do processamento (tempo, linhas e pico de memória).
+
+As etapas do núcleo (leitura do Excel, normalização, cálculo de horas,
+índice de busca, filtragem, totais, exportação) são envolvidas por
+`etapa(nome)`. Desativado (o padrão), `etapa` devolve um objeto vazio
+compartilhado e não mede nada. Ativado, guarda os registros mais recentes em
+memória e, opcionalmente, acrescenta cada um como uma linha JSON num arquivo
+de log. O pico de memória usa `tracemalloc`, que tem custo próprio, por isso
+só é medido quando pedido.
+"""
+
+import collections
+import datetime
+import json
+import threading
+import time
+import tracemalloc
+
+MAX_REGISTROS = 500
+VARIAVEL_AMBIENTE_LOG = "PONTOKNUP_DIAGNOSTICO_LOG"  # Caminho do log JSONL para ativar na inicialização
+
+_estado = {"ativo": False, "memoria": False, "caminho_log": None, "iniciou_tracemalloc": False}
+_registros = collections.deque(maxlen=MAX_REGISTROS)
+_trava = threading.Lock()
+_pilha = threading.local()  # Etapas abertas na thread atual (para o pico de memória aninhado)
+
+
+class _EtapaNula:
+    """Usada quando a instrumentação está desativada: não mede nem registra nada."""
+
+    linhas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass
+
+    def descartar(self):
+        pass
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+class _Etapa:
+    """Mede uma execução de etapa; o registro é gravado ao sair do bloco `with`."""
+
+    def __init__(self, nome, linhas):
+        self.nome = nome
+        self.linhas = linhas
+        self._descartada = False
+        self._pico = 0
+
+    def descartar(self):
+        """Não registra esta execução (ex: a leitura que só detectou o fim do arquivo)."""
+        self._descartada = True
+
+    def __enter__(self):
+        self._inicio_relogio = datetime.datetime.now()
+        if _estado["memoria"] and tracemalloc.is_tracing():
+            pilha = getattr(_pilha, "etapas", None)
+            if pilha is None:
+                pilha = _pilha.etapas = []
+            atual, pico = tracemalloc.get_traced_memory()
+            if pilha:
+                pilha[-1]._pico = max(pilha[-1]._pico, pico - pilha[-1]._memoria_inicial)
+            tracemalloc.reset_peak()
+            self._memoria_inicial = atual
+            pilha.append(self)
+        else:
+            self._memoria_inicial = None
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        segundos = time.perf_counter() - self._inicio
+        pico_mb = None
+        if self._memoria_inicial is not None and tracemalloc.is_tracing():
+            self._pico = max(self._pico, tracemalloc.get_traced_memory()[1] - self._memoria_inicial)
+            pico_mb = round(self._pico / 2**20, 2)
+            pilha = _pilha.etapas
+            pilha.pop()
+            if pilha:
+                pilha[-1]._pico = max(pilha[-1]._pico, self._pico + self._memoria_inicial - pilha[-1]._memoria_inicial)
+        if self._descartada:
+            return False
+        _registrar({
+            "etapa": self.nome,
+            "inicio": self._inicio_relogio.isoformat(timespec="milliseconds"),
+            "segundos": round(segundos, 6),
+            "linhas": None if self.linhas is None else int(self.linhas),
+            "pico_memoria_mb": pico_mb,
+            "thread": threading.current_thread().name,
+            "erro": None if tipo_excecao is None else tipo_excecao.__name__,
+        })
+        return False
+
+
+def _registrar(registro):
+    with _trava:
+        _registros.append(registro)
+        caminho = _estado["caminho_log"]
+        if caminho:
+            try:
+                with open(caminho, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            except OSError:
+                pass  # Log indisponível não pode interromper o processamento
+
+
+def etapa(nome, linhas=None):
+    """
+    Contexto que mede uma etapa do processamento.
+
+    Uso:
+        with diagnostico.etapa("calculo_horas", len(df)):
+            ...
+        with diagnostico.etapa("leitura_excel") as medicao:
+            bloco = ...
+            medicao.linhas = len(bloco)
+
+    Args:
+        nome (str): Nome da etapa.
+        linhas (int, optional): Linhas processadas (pode ser definido depois em `.linhas`).
+
+    Returns:
+        Objeto de contexto; um objeto nulo compartilhado se a instrumentação estiver desativada.
+    """
+    if not _estado["ativo"]:
+        return _ETAPA_NULA
+    return _Etapa(nome, linhas)
+
+
+def ativar(memoria=False, caminho_log=None):
+    """
+    Liga a instrumentação.
+
+    Args:
+        memoria (bool, optional): Mede o pico de memória de cada etapa com tracemalloc
+                                  (deixa o processamento mais lento).
+        caminho_log (str, optional): Arquivo JSONL onde cada registro é acrescentado.
+    """
+    with _trava:
+        _estado["ativo"] = True
+        _estado["caminho_log"] = caminho_log or None
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _estado["iniciou_tracemalloc"] = True
+        elif not memoria and _estado["iniciou_tracemalloc"]:
+            tracemalloc.stop()
+            _estado["iniciou_tracemalloc"] = False
+        _estado["memoria"] = memoria
+
+
+def desativar():
+    """Desliga a instrumentação (os registros já feitos são mantidos)."""
+    ativar(memoria=False)
+    with _trava:
+        _estado["ativo"] = False
+        _estado["caminho_log"] = None
+
+
+def estado():
+    """
+    Configuração atual da instrumentação.
+
+    Returns:
+        dict: "ativo", "memoria" e "caminho_log".
+    """
+    return {chave: _estado[chave] for chave in ("ativo", "memoria", "caminho_log")}
+
+
+def registros():
+    """
+    Registros mais recentes (até MAX_REGISTROS), do mais antigo para o mais novo.
+
+    Returns:
+        list: Dicionários com etapa, inicio, segundos, linhas, pico_memoria_mb, thread e erro.
+    """
+    with _trava:
+        return list(_registros)
+
+
+def limpar():
+    """Apaga os registros em memória (o arquivo de log não é alterado)."""
+    with _trava:
+        _registros.clear()
+
+
+def medir_iteracao(nome, iteravel):
+    """
+    Repassa os itens de `iteravel`, medindo como uma etapa o tempo para obter cada um.
+
+    Útil para geradores de blocos: cada bloco gera um registro com o número de
+    linhas (`len` do item); a chamada que só detecta o fim não é registrada.
+
+    Args:
+        nome (str): Nome da etapa.
+        iteravel: Iterável de itens com `len` (ex: DataFrames).
+
+    Yields:
+        Os itens de `iteravel`.
+    """
+    iterador = iter(iteravel)
+    while True:
+        with etapa(nome) as medicao:
+            try:
+                item = next(iterador)
+            except StopIteration:
+                medicao.descartar()
+                return
+            medicao.linhas = len(item)
+        yield item
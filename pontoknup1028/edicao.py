@@ -0,0 +1,129 @@
+# pontoknup1028/edicao.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Edição em massa: o mesmo valor em uma coluna de várias linhas.
+
+O valor é validado uma vez, gravado em todas as linhas com uma única
+atribuição vetorizada e só essas linhas são recalculadas (ex: preencher a
+Volta-Almoço de uma equipe inteira em uma semana).
+
+O Salário Base é do funcionário, não do dia: como na edição de uma célula,
+vale para todas as linhas dos IDs escolhidos (`linhas_afetadas`).
+"""
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import diagnostico, esquema
+from pontoknup1028.calculos import recalcular_linhas
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_AREA, COL_SALARIO_BASE, COL_NOTA, COLUNAS_HORARIOS, MINUTOS_INVALIDO
+)
+
+# Colunas que aceitam edição em massa (ID e Data identificam a linha e não entram)
+COLUNAS_EM_MASSA = COLUNAS_HORARIOS + [COL_SALARIO_BASE, COL_NOTA, COL_AREA, COL_NOME]
+
+# Colunas cuja alteração exige recalcular as horas ou o valor da HE
+_COLUNAS_CALCULO = COLUNAS_HORARIOS + [COL_SALARIO_BASE]
+
+
+def converter_valor(coluna, texto):
+    """
+    Valida e converte o texto digitado para o valor gravado na coluna.
+
+    Args:
+        coluna (str): Uma das COLUNAS_EM_MASSA.
+        texto (str): Valor digitado ("" apaga marcação, salário e nota).
+
+    Returns:
+        Valor pronto para `esquema.atribuir`.
+
+    Raises:
+        ValueError: Coluna não editável em massa ou valor inválido para ela.
+    """
+    texto = texto.strip()
+    if coluna not in COLUNAS_EM_MASSA:
+        raise ValueError(f"A coluna '{coluna}' não pode ser editada em massa.")
+    if coluna in COLUNAS_HORARIOS:
+        if esquema.minutos_do_horario(texto) == MINUTOS_INVALIDO:
+            raise ValueError(f"Formato para {coluna} deve ser HH:MM ou vazio.")
+        return texto
+    if coluna == COL_SALARIO_BASE:
+        if texto == "":
+            return np.nan
+        try:
+            salario = float(texto.replace(",", "."))
+        except ValueError:
+            raise ValueError("Salário inválido.") from None
+        if salario < 0:
+            raise ValueError("Salário não pode ser negativo.")
+        return salario
+    if coluna == COL_NOME and texto == "":
+        raise ValueError("Nome não pode ser vazio.")
+    return texto
+
+
+def linhas_dos_ids(df, ids):
+    """
+    Rótulos das linhas de uma lista de IDs.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+        ids (list): IDs como texto.
+
+    Returns:
+        pd.Index: Rótulos das linhas, na ordem do DataFrame.
+    """
+    return df.index[df[COL_ID].isin([str(i).strip() for i in ids])]
+
+
+def linhas_afetadas(df, rotulos, coluna):
+    """
+    Rótulos que a edição em massa de `coluna` vai alterar.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+        rotulos (list or pd.Index): Linhas escolhidas.
+        coluna (str): Uma das COLUNAS_EM_MASSA.
+
+    Returns:
+        list: As linhas escolhidas que existem em `df`; para o Salário Base,
+              todas as linhas dos IDs delas, na ordem do DataFrame.
+    """
+    rotulos = pd.Index(rotulos).intersection(df.index, sort=False)
+    if coluna != COL_SALARIO_BASE or rotulos.empty:
+        return list(rotulos)
+    ids = df.loc[rotulos, COL_ID].dropna().unique()
+    return list(df.index[df[COL_ID].isin(ids) | df.index.isin(rotulos)])
+
+
+def editar_em_massa(df, rotulos, coluna, texto, config):
+    """
+    Grava o mesmo valor em uma coluna de várias linhas e recalcula só essas linhas.
+
+    O Salário Base é gravado em todas as linhas dos IDs escolhidos (`linhas_afetadas`).
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho já calculado (modificado no lugar).
+        rotulos (list or pd.Index): Rótulos das linhas a alterar.
+        coluna (str): Uma das COLUNAS_EM_MASSA.
+        texto (str): Valor digitado (validado por `converter_valor`).
+        config (dict): Configuração de cálculo.
+
+    Returns:
+        list: Rótulos das linhas alteradas.
+
+    Raises:
+        ValueError: Coluna ou valor inválido; nesse caso `df` não é alterado.
+    """
+    valor = converter_valor(coluna, texto)
+    rotulos = linhas_afetadas(df, rotulos, coluna)
+    if not rotulos:
+        return []
+    with diagnostico.etapa("edicao_em_massa", len(rotulos)):
+        esquema.atribuir(df, rotulos, coluna, valor)
+        if coluna in _COLUNAS_CALCULO:
+            recalcular_linhas(df, rotulos, config)
+    return rotulos
@@ -0,0 +1,185 @@
+# pontoknup1028/escalas.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Escalas de trabalho: jornada esperada por funcionário ou por Área.
+
+A escala é um arquivo de texto (ou CSV) com uma regra por linha:
+`tipo;chave;jornada[;dias]`. O tipo é "id" ou "area"; a jornada é "HH:MM"
+ou horas decimais ("8,8"); os dias, opcionais, são uma lista de "seg",
+"ter", "qua", "qui", "sex", "sab" e "dom" separados por vírgula:
+
+    # Escalas 2025
+    area;Logística;07:20
+    area;Produção;08:00;seg,ter,qua,qui
+    area;Produção;07:00;sex
+    id;1;06:00
+    id;7;12:00
+
+A regra mais específica vale: ID com dia, ID, Área com dia, Área e, por
+fim, a jornada da configuração. Uma escala 12x36 é só a jornada de 12:00,
+já que os dias de folga não têm marcações.
+
+A escala é lida uma vez e cruzada com o DataFrame por (chave, dia da
+semana) com `reindex`, resultando em um array de minutos esperados por
+linha; o motor de cálculo usa esse array (coluna Horas Normais) em vez do
+valor único da configuração.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import diagnostico
+from pontoknup1028.calculos import recalcular_jornada, recalcular_linhas
+from pontoknup1028.config import minutos_horas_normais
+from pontoknup1028.constantes import COL_ID, COL_AREA, COL_DATA, COL_HORAS_NORMAIS
+from pontoknup1028.filtros import normalizar_texto
+
+TIPO_ID = "id"
+TIPO_AREA = "area"
+TODOS_OS_DIAS = -1
+DIAS_ESCALA = {"seg": 0, "ter": 1, "qua": 2, "qui": 3, "sex": 4, "sab": 5, "dom": 6}
+COLUNAS_ESCALA = ["tipo", "chave", "dia", "minutos"]
+
+_RE_JORNADA = re.compile(r"^(\d{1,2}):(\d{2})$")
+
+
+def chave_escala(tipo, valor):
+    """
+    Forma comparável de um ID (sem espaços nas pontas) ou de uma Área
+    (também sem acentos e em minúsculas).
+    """
+    return normalizar_texto(valor) if tipo == TIPO_AREA else str(valor).strip()
+
+
+def _minutos_da_jornada(texto):
+    """Jornada "HH:MM" ou em horas decimais como minutos, ou None se inválida."""
+    combinacao = _RE_JORNADA.match(texto)
+    if combinacao:
+        horas, minutos = int(combinacao.group(1)), int(combinacao.group(2))
+        total = horas * 60 + minutos
+        return total if minutos < 60 and total <= 24 * 60 else None
+    try:
+        horas = float(texto.replace(",", "."))
+    except ValueError:
+        return None
+    return minutos_horas_normais(horas) if 0 <= horas <= 24 else None
+
+
+def ler_escalas(caminho):
+    """
+    Lê uma tabela de escalas.
+
+    Args:
+        caminho (str): Arquivo com uma regra `tipo;chave;jornada[;dias]` por linha
+                       (tabulação também separa). Linhas vazias e iniciadas por "#"
+                       são ignoradas.
+
+    Returns:
+        pd.DataFrame: Colunas tipo, chave (normalizada por `chave_escala`), dia
+                      (0 = segunda, `TODOS_OS_DIAS` sem dia) e minutos. Regras
+                      repetidas valem pela última linha.
+
+    Raises:
+        ValueError: Linha com tipo, jornada ou dia inválido (a mensagem indica o número da linha).
+    """
+    regras = []
+    with open(caminho, "r", encoding="utf-8-sig") as f:
+        for numero, linha in enumerate(f, start=1):
+            if not linha.strip() or linha.lstrip().startswith("#"):
+                continue
+            campos = [campo.strip() for campo in re.split(r"[;\t]", linha)]
+            if len(campos) < 3 or not campos[1]:
+                raise ValueError(f"Linha {numero} da escala incompleta: {linha.strip()!r}")
+            tipo = normalizar_texto(campos[0])
+            if tipo not in (TIPO_ID, TIPO_AREA):
+                raise ValueError(f"Tipo inválido na linha {numero} da escala: {campos[0]!r} (use id ou area)")
+            minutos = _minutos_da_jornada(campos[2])
+            if minutos is None:
+                raise ValueError(f"Jornada inválida na linha {numero} da escala: {campos[2]!r}")
+            dias = [normalizar_texto(d)[:3] for d in campos[3].split(",") if d.strip()] if len(campos) > 3 else []
+            invalidos = [d for d in dias if d not in DIAS_ESCALA]
+            if invalidos:
+                raise ValueError(f"Dia inválido na linha {numero} da escala: {invalidos[0]!r}")
+            chave = chave_escala(tipo, campos[1])
+            for dia in [DIAS_ESCALA[d] for d in dias] or [TODOS_OS_DIAS]:
+                regras.append((tipo, chave, dia, minutos))
+    escala = pd.DataFrame(regras, columns=COLUNAS_ESCALA)
+    escala = escala.drop_duplicates(subset=["tipo", "chave", "dia"], keep="last")
+    return escala.astype({"dia": np.int8, "minutos": np.int64}).reset_index(drop=True)
+
+
+def _chaves_das_linhas(serie, tipo):
+    """Chave de cada linha, normalizando uma única vez cada valor distinto ("" se ausente)."""
+    codigos, unicos = pd.factorize(serie.to_numpy(dtype=object))
+    tabela = np.array([chave_escala(tipo, valor) for valor in unicos] + [""], dtype=object)
+    return tabela[codigos]  # Código -1 (ausente) cai no "" final
+
+
+def minutos_esperados(df, escala, config):
+    """
+    Jornada esperada de cada linha segundo a escala.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho (ou parte dele).
+        escala (pd.DataFrame): Regras de `ler_escalas` (None ou vazia = só a configuração).
+        config (dict): Configuração de cálculo (jornada das linhas sem regra).
+
+    Returns:
+        np.ndarray: Minutos (int64) por linha.
+    """
+    jornada = np.full(len(df), minutos_horas_normais(config["horas_normais_h"]), dtype=np.int64)
+    if escala is None or escala.empty or df.empty:
+        return jornada
+    dias = df[COL_DATA].dt.dayofweek.to_numpy(dtype=float, na_value=np.nan)
+    dias = np.where(np.isnan(dias), -2, dias).astype(np.int64)  # Sem data: só regras sem dia
+    definida = np.zeros(len(df), dtype=bool)
+    for tipo, coluna in ((TIPO_ID, COL_ID), (TIPO_AREA, COL_AREA)):
+        regras = escala[escala["tipo"] == tipo]
+        if regras.empty or coluna not in df.columns:
+            continue
+        chaves = _chaves_das_linhas(df[coluna], tipo)
+        por_dia = regras["dia"] != TODOS_OS_DIAS
+        buscas = (
+            regras[por_dia].set_index(["chave", "dia"])["minutos"].reindex(pd.MultiIndex.from_arrays([chaves, dias])),
+            regras[~por_dia].set_index("chave")["minutos"].reindex(chaves),
+        )
+        for minutos in buscas:
+            minutos = minutos.to_numpy(dtype=float)
+            nova = ~definida & ~np.isnan(minutos)
+            jornada[nova] = minutos[nova]
+            definida |= nova
+    return jornada
+
+
+def aplicar_escala(df, escala, config, rotulos=None):
+    """
+    Preenche Horas Normais com a jornada da escala e refaz a divisão devidas/extras.
+
+    Sem `rotulos`, todas as linhas recebem a jornada da escala de uma vez
+    (`recalcular_jornada`, sem reler as marcações); com `rotulos`, só essas
+    linhas são atualizadas e recalculadas (ex: depois de editar ID, Área ou Data).
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho já calculado (modificado no lugar).
+        escala (pd.DataFrame): Regras de `ler_escalas` (None = jornada da configuração).
+        config (dict): Configuração de cálculo.
+        rotulos (list, optional): Rótulos das linhas a atualizar.
+
+    Returns:
+        pd.DataFrame: O próprio `df`.
+    """
+    if df.empty:
+        return df
+    with diagnostico.etapa("escala", len(df) if rotulos is None else len(rotulos)):
+        if rotulos is None:
+            return recalcular_jornada(df, config, minutos_esperados(df, escala, config))
+        rotulos = list(rotulos)
+        if not rotulos:
+            return df
+        minutos = minutos_esperados(df.loc[rotulos], escala, config)
+        df.loc[rotulos, COL_HORAS_NORMAIS] = pd.array(minutos, dtype=df[COL_HORAS_NORMAIS].dtype)
+        return recalcular_linhas(df, rotulos, config)
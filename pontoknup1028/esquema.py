@@ -0,0 +1,386 @@
+# pontoknup1028/esquema.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Representação compacta e tipada do DataFrame de trabalho.
+
+- Marcações (Entrada, Saída-Almoço, Volta-Almoço, Saída), Horas Devidas,
+  Horas Extras, Horas Normais e os minutos trabalhados (também os somados
+  das marcações do AFD, `marcacoes`) são minutos inteiros anuláveis (Int16). Marcação vazia é NA; marcação fora do formato vale
+  MINUTOS_INVALIDO, e os textos originais da linha ficam em
+  COL_TEXTOS_INVALIDOS para continuarem visíveis.
+- ID, Nome, Área, Semana e Nota são categóricas.
+- A situação do cálculo (erros de formato, de sequência, horários
+  incompletos) é um código STATUS_* na coluna COL_STATUS (int8); a Nota
+  guarda só a anotação da planilha ou do usuário.
+
+Os textos "HH:MM", os códigos INV_* e as mensagens acrescentadas à Nota só
+são montados na exibição e na exportação (`textos_coluna`).
+"""
+
+import datetime
+import re
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_AREA, COL_SEMANA, COL_NOTA, COL_BANCO_HORAS, COL_HORAS_DEVIDAS,
+    COL_HORAS_EXTRAS, COL_HORAS_NORMAIS, COL_MINUTOS_TRABALHADOS, COL_MINUTOS_MARCACOES,
+    COL_STATUS, COL_TEXTOS_INVALIDOS, COLUNAS_HORARIOS, OMISSAO_VALS, MINUTOS_VAZIO,
+    MINUTOS_INVALIDO, STATUS_CALCULADO, STATUS_SEM_CALCULO, MENSAGENS_STATUS,
+    CODIGOS_ERRO_STATUS
+)
+
+TIPO_MINUTOS = "Int16"
+TIPO_SALDO = "Int32"  # Saldos acumulados (podem passar de 546 horas e ser negativos)
+TIPO_STATUS = np.int8
+
+COLUNAS_CATEGORICAS = [COL_ID, COL_NOME, COL_AREA, COL_SEMANA, COL_NOTA]
+COLUNAS_DURACAO = [COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_HORAS_NORMAIS]
+COLUNAS_RESULTADO = [COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS]  # Dependem de COL_STATUS
+SEPARADOR_TEXTOS_INVALIDOS = "\t"
+
+_RE_DURACAO = re.compile(r"^\s*(\d+):(\d{2})(?::\d{2})?\s*$")
+
+
+def _tabela_horarios():
+    """
+    Todas as grafias aceitas das 1.440 marcações possíveis -> minutos.
+
+    Para cada hora e minuto: "08:05", "8:05", "08:5" e "8:5". As variantes com
+    "h" ("08h05") e com segundos ("08:05:00") são reduzidas a essas formas em
+    `minutos_do_horario` antes da consulta.
+    """
+    tabela = {}
+    for h in range(24):
+        for m in range(60):
+            for hora in {f"{h:02}", str(h)}:
+                for minuto in {f"{m:02}", str(m)}:
+                    tabela[f"{hora}:{minuto}"] = h * 60 + m
+    return tabela
+
+
+_MINUTOS_POR_TEXTO = _tabela_horarios()
+SEGUNDOS_DIA = 24 * 60 * 60
+
+
+def _minutos_do_texto(texto):
+    texto = texto.strip().lower()
+    minutos = _MINUTOS_POR_TEXTO.get(texto)
+    if minutos is not None:
+        return minutos
+    if texto in OMISSAO_VALS:
+        return MINUTOS_VAZIO
+    partes = texto.replace("h", ":", 1).split(":")
+    if len(partes) == 3 and partes[2].isdigit() and int(partes[2]) < 60:
+        partes = partes[:2]  # "08:05:00" -> "08:05"
+    return _MINUTOS_POR_TEXTO.get(":".join(partes), MINUTOS_INVALIDO)
+
+
+def _minutos_da_fracao(fracao):
+    """Fração do dia (hora do Excel) -> minutos; segundos são descartados como em "HH:MM"."""
+    if not 0 <= fracao < 1:
+        return MINUTOS_INVALIDO
+    return int(round(fracao * SEGUNDOS_DIA)) // 60 % 1440
+
+
+def minutos_do_horario(valor):
+    """
+    Converte uma marcação em minutos desde 00:00.
+
+    Textos são consultados em uma tabela pré-calculada com as grafias das
+    1.440 marcações possíveis ("08:00", "8:00", "08h00", "08:00:00"); vazios,
+    NaN e "Omissão" são ausência. Células com hora do Excel também são aceitas:
+    `datetime.time`, `datetime.datetime` (só a hora), `timedelta` menor que um
+    dia e frações do dia (0 <= x < 1). Qualquer outro valor é formato inválido.
+
+    Args:
+        valor: Conteúdo de uma célula de horário.
+
+    Returns:
+        int: Minutos (0 a 1439), MINUTOS_VAZIO ou MINUTOS_INVALIDO.
+    """
+    if isinstance(valor, str):
+        return _minutos_do_texto(valor)
+    if valor is None or valor is pd.NA or valor is pd.NaT:
+        return MINUTOS_VAZIO
+    if isinstance(valor, (datetime.time, datetime.datetime)):
+        return valor.hour * 60 + valor.minute
+    if isinstance(valor, datetime.timedelta):
+        return _minutos_da_fracao(valor.total_seconds() / SEGUNDOS_DIA)
+    if isinstance(valor, (bool, np.bool_)):
+        return MINUTOS_INVALIDO
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        return MINUTOS_VAZIO if np.isnan(valor) else _minutos_da_fracao(float(valor))
+    return _minutos_do_texto(str(valor))
+
+
+def _minutos_por_valor(valores, conversor):
+    """Aplica `conversor` uma vez por valor distinto de `valores` e devolve int32 por posição."""
+    codigos, unicos = pd.factorize(np.asarray(valores, dtype=object), use_na_sentinel=False)
+    tabela = np.fromiter((conversor(u) for u in unicos), dtype=np.int32, count=len(unicos))
+    return tabela[codigos]
+
+
+def minutos_das_marcacoes(serie):
+    """
+    Minutos de uma coluna de marcações, em qualquer formato aceito por
+    `minutos_do_horario` ou já compacta.
+
+    Colunas inteiras já estão em minutos; colunas de data/hora, de duração e
+    de frações do dia são convertidas de forma vetorizada; nas demais cada
+    valor distinto é interpretado uma só vez.
+
+    Args:
+        serie (pd.Series): Marcações (textos, horas do Excel) ou minutos Int16.
+
+    Returns:
+        np.ndarray: int32 com minutos, MINUTOS_VAZIO ou MINUTOS_INVALIDO.
+    """
+    tipo = serie.dtype
+    if pd.api.types.is_integer_dtype(tipo):
+        return serie.to_numpy(dtype=np.int32, na_value=MINUTOS_VAZIO)
+    if pd.api.types.is_datetime64_any_dtype(tipo):
+        minutos = (serie.dt.hour * 60 + serie.dt.minute).to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.where(np.isnan(minutos), MINUTOS_VAZIO, minutos).astype(np.int32)
+    if pd.api.types.is_timedelta64_dtype(tipo):
+        fracoes = serie.dt.total_seconds().to_numpy(dtype=np.float64, na_value=np.nan) / SEGUNDOS_DIA
+        return _minutos_das_fracoes(fracoes)
+    if pd.api.types.is_float_dtype(tipo):
+        return _minutos_das_fracoes(serie.to_numpy(dtype=np.float64, na_value=np.nan))
+    return _minutos_por_valor(serie, minutos_do_horario)
+
+
+def _minutos_das_fracoes(fracoes):
+    """Versão vetorizada de `_minutos_da_fracao`; NaN é ausência."""
+    valida = (fracoes >= 0) & (fracoes < 1)
+    minutos = np.round(np.where(valida, fracoes, 0) * SEGUNDOS_DIA).astype(np.int64) // 60 % 1440
+    minutos = np.where(valida, minutos, MINUTOS_INVALIDO)
+    return np.where(np.isnan(fracoes), MINUTOS_VAZIO, minutos).astype(np.int32)
+
+
+def _minutos_da_duracao(valor):
+    m = _RE_DURACAO.match(str(valor))
+    return int(m.group(1)) * 60 + int(m.group(2)) if m else -1
+
+
+def minutos_das_duracoes(serie):
+    """
+    Minutos de uma coluna de durações (Horas Devidas/Extras/Normais).
+
+    Args:
+        serie (pd.Series): Textos "HH:MM" (vazios e códigos de erro viram NA) ou minutos.
+
+    Returns:
+        pd.Series: Minutos Int16 com o mesmo índice.
+    """
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return serie.astype(TIPO_MINUTOS)
+    minutos = _minutos_por_valor(serie, _minutos_da_duracao)
+    return pd.Series(_array_minutos(minutos, minutos < 0), index=serie.index)
+
+
+def _array_minutos(minutos, ausente):
+    """Array Int16 com `minutos`, NA onde `ausente`."""
+    resultado = pd.array(np.where(ausente, 0, minutos), dtype=TIPO_MINUTOS)
+    resultado[ausente] = pd.NA
+    return resultado
+
+
+def _categorica(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    return serie.astype("category")
+
+
+def compactar(data_frame):
+    """
+    Converte as colunas do DataFrame de trabalho para o esquema compacto.
+
+    Colunas já compactas não são alteradas, então pode ser chamada de novo
+    depois de concatenar blocos (as categorias são unificadas).
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame com marcações em texto ou já compacto.
+
+    Returns:
+        pd.DataFrame: O próprio `data_frame`, com os tipos do esquema.
+    """
+    horarios = [col for col in COLUNAS_HORARIOS if col in data_frame.columns]
+    textuais = [col for col in horarios if not pd.api.types.is_integer_dtype(data_frame[col].dtype)]
+    if textuais:
+        minutos = {col: minutos_das_marcacoes(data_frame[col]) for col in horarios}
+        invalida = np.zeros(len(data_frame), dtype=bool)
+        for col in horarios:
+            invalida |= minutos[col] == MINUTOS_INVALIDO
+        textos = pd.Series(pd.NA, index=data_frame.index, dtype=object)
+        if invalida.any():
+            originais = data_frame.loc[invalida, horarios].astype(str)
+            textos[invalida] = originais.agg(SEPARADOR_TEXTOS_INVALIDOS.join, axis=1).to_numpy()
+        data_frame[COL_TEXTOS_INVALIDOS] = textos
+        for col in horarios:
+            data_frame[col] = _array_minutos(minutos[col], minutos[col] == MINUTOS_VAZIO)
+    elif horarios and COL_TEXTOS_INVALIDOS not in data_frame.columns:
+        data_frame[COL_TEXTOS_INVALIDOS] = pd.Series(pd.NA, index=data_frame.index, dtype=object)
+
+    for col in COLUNAS_DURACAO + [COL_MINUTOS_TRABALHADOS, COL_MINUTOS_MARCACOES]:
+        if col in data_frame.columns and data_frame[col].dtype != TIPO_MINUTOS:
+            data_frame[col] = minutos_das_duracoes(data_frame[col])
+    if COL_STATUS in data_frame.columns and data_frame[COL_STATUS].dtype != TIPO_STATUS:
+        data_frame[COL_STATUS] = data_frame[COL_STATUS].fillna(STATUS_SEM_CALCULO).astype(TIPO_STATUS)
+
+    if COL_NOTA in data_frame.columns and not isinstance(data_frame[COL_NOTA].dtype, pd.CategoricalDtype):
+        nota = data_frame[COL_NOTA]
+        data_frame[COL_NOTA] = nota.where(nota.notna(), "").astype(str)
+    for col in COLUNAS_CATEGORICAS + [COL_TEXTOS_INVALIDOS]:
+        if col in data_frame.columns:
+            data_frame[col] = _categorica(data_frame[col])
+    return data_frame
+
+
+def unificar_categorias(blocos):
+    """
+    Concatena blocos compactos mantendo as colunas categóricas.
+
+    `pd.concat` transforma em objeto as categóricas com categorias diferentes;
+    aqui as categorias de cada coluna são unidas antes.
+
+    Args:
+        blocos (list): DataFrames com as mesmas colunas.
+
+    Returns:
+        pd.DataFrame: Blocos concatenados com índice 0..n-1.
+    """
+    from pandas.api.types import union_categoricals
+
+    colunas = [col for col in blocos[0].columns if isinstance(blocos[0][col].dtype, pd.CategoricalDtype)]
+    unidas = {col: union_categoricals([b[col] for b in blocos], ignore_order=True).categories for col in colunas}
+    ajustados = [b.assign(**{col: b[col].cat.set_categories(unidas[col]) for col in colunas}) for b in blocos]
+    return pd.concat(ajustados, ignore_index=True)
+
+
+def atribuir(data_frame, rotulos, coluna, valor):
+    """
+    Grava `valor` em `data_frame.loc[rotulos, coluna]` respeitando o esquema.
+
+    Em colunas categóricas a categoria é criada se ainda não existir; em
+    colunas de marcação o valor é convertido por `minutos_do_horario`, o
+    mesmo interpretador da leitura da planilha, e a linha deixa de usar os
+    minutos somados das marcações do AFD (passa a valer pelas quatro colunas).
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame de trabalho (modificado no lugar).
+        rotulos: Rótulo, lista de rótulos ou máscara aceitos por `.loc`.
+        coluna (str): Coluna a alterar.
+        valor: Novo valor; fora das colunas de marcação, também uma
+               sequência com um valor por linha.
+    """
+    serie = data_frame[coluna]
+    if coluna in COLUNAS_HORARIOS and pd.api.types.is_integer_dtype(serie.dtype):
+        minutos = minutos_do_horario(valor)
+        if minutos == MINUTOS_INVALIDO:
+            raise ValueError(f"Horário inválido: {valor!r}")
+        valor = pd.NA if minutos == MINUTOS_VAZIO else minutos
+        if COL_MINUTOS_MARCACOES in data_frame.columns:
+            data_frame.loc[rotulos, COL_MINUTOS_MARCACOES] = pd.NA
+    elif isinstance(serie.dtype, pd.CategoricalDtype):
+        candidatos = pd.unique(np.asarray(valor, dtype=object)) if pd.api.types.is_list_like(valor) else [valor]
+        novas = [v for v in candidatos if not pd.isna(v) and v not in serie.cat.categories]
+        if novas:
+            data_frame[coluna] = serie.cat.add_categories(novas)
+    data_frame.loc[rotulos, coluna] = valor
+
+
+def textos_minutos(minutos):
+    """
+    Formata minutos como "HH:MM"; NA e valores negativos viram "".
+
+    Args:
+        minutos (pd.Series or np.ndarray): Minutos (Int16 ou inteiros).
+
+    Returns:
+        np.ndarray: Textos (objeto).
+    """
+    valores = pd.Series(minutos).to_numpy(dtype=np.int64, na_value=-1)
+    if len(valores) == 0:
+        return np.array([], dtype=object)
+    maximo = max(int(valores.max()), 0)
+    tabela = np.array([f"{m // 60:02}:{m % 60:02}" for m in range(maximo + 1)] + [""], dtype=object)
+    return tabela[np.where(valores < 0, maximo + 1, valores)]
+
+
+def textos_saldo(minutos):
+    """
+    Formata saldos em minutos como "HH:MM" com sinal ("-03:15"); NA vira "".
+
+    Args:
+        minutos (pd.Series or np.ndarray): Saldos (Int32 ou inteiros).
+
+    Returns:
+        np.ndarray: Textos (objeto).
+    """
+    valores = pd.Series(minutos).astype("Int64")
+    negativo = valores.lt(0).fillna(False).to_numpy(dtype=bool)
+    textos = textos_minutos(valores.abs())
+    textos[negativo] = "-" + textos[negativo]
+    return textos
+
+
+def _status(data_frame):
+    if COL_STATUS in data_frame.columns:
+        return data_frame[COL_STATUS].to_numpy(dtype=np.int64)
+    return None
+
+
+def textos_coluna(data_frame, coluna):
+    """
+    Textos de exibição de uma coluna do esquema compacto.
+
+    - Marcações: "HH:MM", "" se vazia e o texto original se inválida.
+    - Horas Devidas/Extras: "HH:MM" nas linhas calculadas, INV_FORMATO/INV_SEQ
+      nos erros e "" nas demais.
+    - Horas Normais: "HH:MM".
+    - Banco de Horas: "HH:MM" com sinal (`textos_saldo`).
+    - Nota: a anotação seguida da mensagem da situação da linha, se houver.
+
+    Colunas em texto (DataFrames que não passaram por `compactar`) são
+    devolvidas como estão.
+
+    Args:
+        data_frame (pd.DataFrame): Linhas a formatar.
+        coluna (str): Uma das colunas acima.
+
+    Returns:
+        np.ndarray: Textos (objeto); NaN onde o valor original era ausente em colunas de texto.
+    """
+    serie = data_frame[coluna]
+    status = _status(data_frame)
+    if coluna == COL_NOTA:
+        nota = serie.astype(object).where(serie.notna(), "").astype(str).to_numpy(dtype=object)
+        if status is None:
+            return nota
+        mensagens = np.array([MENSAGENS_STATUS.get(s, "") for s in range(max(MENSAGENS_STATUS) + 1)], dtype=object)
+        sufixo = mensagens[np.clip(status, 0, len(mensagens) - 1)]
+        com_sufixo = sufixo != ""
+        nota = nota.copy()
+        nota[com_sufixo] = [f"{n} {s}".strip() for n, s in zip(nota[com_sufixo], sufixo[com_sufixo])]
+        return nota
+    if not pd.api.types.is_integer_dtype(serie.dtype):
+        return serie.to_numpy(dtype=object)
+
+    if coluna == COL_BANCO_HORAS:
+        return textos_saldo(serie)
+    textos = textos_minutos(serie)
+    if coluna in COLUNAS_HORARIOS:
+        invalida = serie.to_numpy(dtype=np.int64, na_value=0) == MINUTOS_INVALIDO
+        if invalida.any() and COL_TEXTOS_INVALIDOS in data_frame.columns:
+            posicao = COLUNAS_HORARIOS.index(coluna)
+            originais = data_frame[COL_TEXTOS_INVALIDOS].to_numpy(dtype=object)[invalida]
+            textos[invalida] = [str(t).split(SEPARADOR_TEXTOS_INVALIDOS)[posicao] for t in originais]
+    elif coluna in COLUNAS_RESULTADO and status is not None:
+        textos[status != STATUS_CALCULADO] = ""
+        for codigo, texto in CODIGOS_ERRO_STATUS.items():
+            textos[status == codigo] = texto
+    return textos
@@ -0,0 +1,92 @@
+# pontoknup1028/exibicao.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Formatação das linhas do DataFrame para exibição na tabela.
+
+A tabela da interface só formata as linhas que vai inserir (uma página por
+vez), então esta formatação trabalha coluna a coluna sobre uma fatia do
+DataFrame, sem `iterrows`.
+"""
+
+import locale
+
+import pandas as pd
+
+from pontoknup1028 import esquema
+from pontoknup1028.constantes import (
+    COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA, COL_NOTA, COL_BANCO_HORAS, COLUNAS_HORARIOS, COLUNAS_INTERNAS
+)
+
+COLUNAS_MONETARIAS = [COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA]
+COLUNAS_ESQUEMA = COLUNAS_HORARIOS + esquema.COLUNAS_DURACAO + [COL_BANCO_HORAS, COL_NOTA]  # Textos montados por `esquema`
+
+
+def colunas_visiveis(df):
+    """
+    Colunas do DataFrame que aparecem na tabela (sem as colunas internas do cálculo).
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+
+    Returns:
+        list: Nomes das colunas visíveis, na ordem do DataFrame.
+    """
+    return [col for col in df.columns if col not in COLUNAS_INTERNAS]
+
+
+def _formatar_coluna(df, coluna):
+    """
+    Formata uma coluna como textos de exibição.
+
+    Valores ausentes ou em branco viram "", datas viram DD/MM/AAAA, valores
+    monetários usam o separador do locale com 2 casas decimais e as colunas em
+    minutos (marcações, horas, banco de horas) e a Nota são montadas por `esquema.textos_coluna`.
+
+    Args:
+        df (pd.DataFrame): Linhas a exibir.
+        coluna (str): Coluna a formatar.
+
+    Returns:
+        list: Textos formatados.
+    """
+    serie = df[coluna]
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.dt.strftime('%d/%m/%Y').fillna("").tolist()
+    if coluna in COLUNAS_MONETARIAS and pd.api.types.is_float_dtype(serie):
+        return ["" if pd.isna(v) else locale.format_string("%.2f", v, grouping=True) for v in serie]
+    if coluna in COLUNAS_ESQUEMA:
+        serie = pd.Series(esquema.textos_coluna(df, coluna), index=df.index)
+    textos = serie.astype(str)
+    em_branco = serie.isna() | (textos.str.strip() == "")
+    return textos.mask(em_branco, "").tolist()
+
+
+def formatar_linhas(df):
+    """
+    Formata as colunas visíveis de uma fatia do DataFrame para a tabela.
+
+    Args:
+        df (pd.DataFrame): Linhas a exibir (normalmente uma página).
+
+    Returns:
+        list: Uma lista de textos por linha, na ordem de `colunas_visiveis(df)`.
+    """
+    colunas = [_formatar_coluna(df, col) for col in colunas_visiveis(df)]
+    return [list(valores) for valores in zip(*colunas)]
+
+
+def formatar_valor(df, indice, coluna):
+    """
+    Texto de exibição de uma única célula (ex: valor atual mostrado ao editar).
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+        indice: Rótulo da linha.
+        coluna (str): Coluna da célula.
+
+    Returns:
+        str: Texto como aparece na tabela.
+    """
+    return _formatar_coluna(df.loc[[indice]], coluna)[0]
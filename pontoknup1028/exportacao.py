@@ -0,0 +1,298 @@
+# pontoknup1028/exportacao.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Exportação do DataFrame de trabalho para Excel (aba Consolidado + uma aba por funcionário).
+
+As células são gravadas com tipos nativos (datas, durações e valores numéricos
+com formato de número) por um escritor do XlsxWriter em modo de memória
+constante, que descarrega cada linha no disco assim que ela é escrita. As
+linhas são separadas por funcionário (ID) uma única vez, e cada aba individual
+termina com uma linha de totais.
+"""
+
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from pontoknup1028 import diagnostico, esquema
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_DATA, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_HORAS_NORMAIS,
+    COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA, COL_NOTA, COL_BANCO_HORAS, COLUNAS_HORARIOS, COLUNAS_INTERNAS
+)
+from pontoknup1028.tarefas import PASSO_PROGRESSO, avisar_progresso
+from pontoknup1028.totais import (
+    totais_por_id, TOTAL_MINUTOS_DEVIDOS, TOTAL_MINUTOS_EXTRAS, TOTAL_MINUTOS_NORMAIS,
+    TOTAL_VALOR_HORA_EXTRA
+)
+
+ABA_CONSOLIDADO = "Consolidado"
+TAMANHO_BLOCO_EXPORTACAO = 50_000  # Linhas convertidas em células de cada vez
+
+FORMATO_DATA = "dd/mm/yyyy"
+FORMATO_DURACAO = "[hh]:mm"
+FORMATO_SALDO = "[hh]:mm;-[hh]:mm"  # Banco de horas: saldo negativo com sinal
+FORMATO_MONETARIO = "#,##0.00"
+
+COLUNAS_DURACAO = [COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_HORAS_NORMAIS]
+COLUNAS_MONETARIAS = [COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA]
+
+# Coluna da linha de totais -> coluna de `totais_por_id` (durações em minutos)
+COLUNAS_TOTAIS = {
+    COL_HORAS_DEVIDAS: TOTAL_MINUTOS_DEVIDOS,
+    COL_HORAS_EXTRAS: TOTAL_MINUTOS_EXTRAS,
+    COL_HORAS_NORMAIS: TOTAL_MINUTOS_NORMAIS,
+    COL_VALOR_HORA_EXTRA: TOTAL_VALOR_HORA_EXTRA,
+}
+
+_RE_DURACAO = re.compile(r"^\s*(\d+):(\d{2})\s*$")
+_EPOCA_EXCEL = np.datetime64("1899-12-30")
+
+
+def _duracao_em_dias(valor):
+    """Fração de dia de um texto "HH:MM" (formato de duração do Excel); None se não for duração."""
+    m = _RE_DURACAO.match(str(valor))
+    if not m:
+        return None
+    return (int(m.group(1)) * 60 + int(m.group(2))) / 1440
+
+
+def _celulas_duracao(serie):
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        minutos = serie.to_numpy(dtype=float, na_value=np.nan)
+        celulas = (minutos / 1440).astype(object)
+        celulas[np.isnan(minutos)] = None
+        return celulas
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    tabela = np.array([_duracao_em_dias(u) for u in unicos], dtype=object)
+    return tabela[codigos]
+
+
+def _celulas_numericas(serie):
+    valores = pd.to_numeric(serie, errors="coerce").to_numpy(dtype=float)
+    celulas = valores.astype(object)
+    celulas[np.isnan(valores)] = None
+    return celulas
+
+
+def _celulas_data(serie):
+    datas = pd.to_datetime(serie, errors="coerce").to_numpy(dtype="datetime64[ns]")
+    dias = (datas - _EPOCA_EXCEL) / np.timedelta64(1, "D")
+    celulas = dias.astype(object)
+    celulas[np.isnat(datas)] = None
+    return celulas
+
+
+def _celulas_texto(valores):
+    celulas = np.array(valores, dtype=object)
+    celulas[pd.isna(celulas) | (celulas == "")] = None
+    return celulas
+
+
+def _preparar_para_exportacao(data_frame):
+    """
+    Converte as colunas exportadas em valores de célula nativos.
+
+    Datas viram números de série do Excel, durações (minutos ou "HH:MM") e
+    o saldo do banco de horas viram frações de dia (o saldo pode ser
+    negativo) e os valores monetários ficam numéricos; marcações e Nota são
+    gravadas como os textos exibidos na tabela. Valores ausentes e linhas
+    sem cálculo ou com erro ficam como células vazias (None).
+
+    Args:
+        data_frame (pd.DataFrame): Linhas a exportar.
+
+    Returns:
+        tuple: (lista com os nomes das colunas, matriz de objetos linhas x colunas).
+    """
+    colunas = [c for c in data_frame.columns if c not in COLUNAS_INTERNAS]
+    celulas = np.empty((len(data_frame), len(colunas)), dtype=object)
+    for j, coluna in enumerate(colunas):
+        serie = data_frame[coluna]
+        if coluna == COL_DATA:
+            celulas[:, j] = _celulas_data(serie)
+        elif coluna in COLUNAS_DURACAO or coluna == COL_BANCO_HORAS:
+            celulas[:, j] = _celulas_duracao(serie)
+        elif coluna in COLUNAS_MONETARIAS:
+            celulas[:, j] = _celulas_numericas(serie)
+        elif coluna in COLUNAS_HORARIOS or coluna == COL_NOTA:
+            celulas[:, j] = _celulas_texto(esquema.textos_coluna(data_frame, coluna))
+        else:
+            celulas[:, j] = _celulas_texto(serie)
+    return colunas, celulas
+
+
+def nome_aba(nome):
+    """
+    Gera um nome de aba válido para o Excel a partir do nome do funcionário.
+
+    Args:
+        nome: Nome do funcionário.
+
+    Returns:
+        str: Nome sem caracteres proibidos, com no máximo 30 caracteres.
+    """
+    return re.sub(r'[\\/*?:"<>|\[\]]', '', str(nome))[:30]
+
+
+def _nomes_abas_unicos(nomes, ids):
+    """
+    Nomes de aba distintos (o Excel não diferencia maiúsculas) para cada funcionário.
+
+    Homônimos e nomes vazios recebem o ID entre parênteses.
+    """
+    usados = {ABA_CONSOLIDADO.lower()}
+    resultado = []
+    for nome, id_func in zip(nomes, ids):
+        candidato = nome_aba(nome).strip()
+        if not candidato or candidato.lower() in usados:
+            sufixo = f" ({nome_aba(id_func)})"
+            candidato = candidato[:30 - len(sufixo)] + sufixo
+        base, n = candidato, 2
+        while candidato.lower() in usados:
+            sufixo = f" {n}"
+            candidato, n = base[:30 - len(sufixo)] + sufixo, n + 1
+        usados.add(candidato.lower())
+        resultado.append(candidato)
+    return resultado
+
+
+def _particionar_por_id(ids):
+    """
+    Separa as posições das linhas por ID em uma única passada.
+
+    Returns:
+        tuple: (IDs na ordem em que aparecem, lista com as posições das linhas de cada ID).
+    """
+    codigos, unicos = pd.factorize(ids, use_na_sentinel=False)
+    ordem = np.argsort(codigos, kind="stable")
+    limites = np.cumsum(np.bincount(codigos, minlength=len(unicos)))[:-1]
+    return np.asarray(unicos, dtype=object), np.split(ordem, limites)
+
+
+def _iniciar_aba(planilha, colunas, formatos):
+    """Define formatos/larguras das colunas e escreve o cabeçalho."""
+    for j, coluna in enumerate(colunas):
+        formato = formatos["colunas"].get(coluna)
+        planilha.set_column(j, j, 18 if coluna in (COL_NOME, COL_DATA) else 14, formato)
+    planilha.write_row(0, 0, colunas, formatos["cabecalho"])
+
+
+def _blocos_de_celulas(data_frame, posicoes, progresso=None, feito=0, total=None):
+    """
+    Gera as linhas de células de `data_frame` na ordem de `posicoes`.
+
+    As células são preparadas em blocos de TAMANHO_BLOCO_EXPORTACAO linhas,
+    então a memória extra não cresce com o tamanho do DataFrame. A cada
+    PASSO_PROGRESSO linhas o progresso (`feito` + linhas geradas) é avisado.
+    """
+    for inicio in range(0, len(posicoes), TAMANHO_BLOCO_EXPORTACAO):
+        _, celulas = _preparar_para_exportacao(data_frame.take(posicoes[inicio:inicio + TAMANHO_BLOCO_EXPORTACAO]))
+        for k, linha in enumerate(celulas.tolist(), start=inicio):
+            if k % PASSO_PROGRESSO == 0:
+                avisar_progresso(progresso, feito + k, total)
+            yield linha
+
+
+def _escrever_totais(planilha, linha_excel, colunas, totais, formatos):
+    """Escreve a linha de totais do funcionário abaixo dos registros."""
+    planilha.write_string(linha_excel, 0, "Totais", formatos["total_rotulo"])
+    for j, coluna in enumerate(colunas):
+        if coluna not in COLUNAS_TOTAIS:
+            continue
+        valor = totais[COLUNAS_TOTAIS[coluna]]
+        if coluna in COLUNAS_DURACAO:
+            planilha.write_number(linha_excel, j, valor / 1440, formatos["total_duracao"])
+        else:
+            planilha.write_number(linha_excel, j, valor, formatos["total_monetario"])
+
+
+def _escrever_abas_funcionarios(workbook, df, colunas, formatos, progresso=None):
+    """
+    Escreve uma aba por ID percorrendo as linhas já agrupadas por ID uma única vez.
+
+    Cada aba é concluída (com a linha de totais) antes de a próxima começar.
+    """
+    ids, posicoes_por_id = _particionar_por_id(df[COL_ID])
+    if len(ids) == 0:
+        return
+    nomes = _nomes_abas_unicos(df[COL_NOME].to_numpy()[[p[0] for p in posicoes_por_id]], ids)
+    tabela_totais = totais_por_id(df)
+    fins = np.cumsum([len(p) for p in posicoes_por_id])
+
+    def concluir(planilha, indice, linha_excel):
+        if ids[indice] in tabela_totais.index:
+            _escrever_totais(planilha, linha_excel + 1, colunas, tabela_totais.loc[ids[indice]], formatos)
+
+    atual, linha_excel, planilha = -1, 0, None
+    linhas = _blocos_de_celulas(df, np.concatenate(posicoes_por_id), progresso, len(df), 2 * len(df))
+    for k, linha in enumerate(linhas):
+        if atual < 0 or k == fins[atual]:
+            if atual >= 0:
+                concluir(planilha, atual, linha_excel)
+            atual += 1
+            planilha = workbook.add_worksheet(nomes[atual])
+            _iniciar_aba(planilha, colunas, formatos)
+            linha_excel = 1
+        planilha.write_row(linha_excel, 0, linha)
+        linha_excel += 1
+    concluir(planilha, atual, linha_excel)
+
+
+def _escrever_arquivo(df, file_path, progresso=None):
+    colunas = [c for c in df.columns if c not in COLUNAS_INTERNAS]
+    opcoes = {"constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False}
+    with xlsxwriter.Workbook(file_path, opcoes) as workbook:
+        formatos = {
+            "cabecalho": workbook.add_format({"bold": True}),
+            "colunas": {COL_DATA: workbook.add_format({"num_format": FORMATO_DATA})},
+            "total_rotulo": workbook.add_format({"bold": True}),
+            "total_duracao": workbook.add_format({"bold": True, "num_format": FORMATO_DURACAO}),
+            "total_monetario": workbook.add_format({"bold": True, "num_format": FORMATO_MONETARIO}),
+        }
+        formato_duracao = workbook.add_format({"num_format": FORMATO_DURACAO})
+        formato_monetario = workbook.add_format({"num_format": FORMATO_MONETARIO})
+        formatos["colunas"].update({c: formato_duracao for c in COLUNAS_DURACAO})
+        formatos["colunas"].update({c: formato_monetario for c in COLUNAS_MONETARIAS})
+        formatos["colunas"][COL_BANCO_HORAS] = workbook.add_format({"num_format": FORMATO_SALDO})
+
+        consolidado = workbook.add_worksheet(ABA_CONSOLIDADO)
+        _iniciar_aba(consolidado, colunas, formatos)
+        linhas = _blocos_de_celulas(df, np.arange(len(df)), progresso, 0, 2 * len(df))
+        for i, linha in enumerate(linhas, start=1):
+            consolidado.write_row(i, 0, linha)
+        _escrever_abas_funcionarios(workbook, df, colunas, formatos, progresso)
+
+
+def salvar_planilha(df, file_path, progresso=None):
+    """
+    Salva o DataFrame em um arquivo Excel.
+
+    Cria uma aba "Consolidado" com todos os dados e uma aba por funcionário
+    (ID), cada uma terminando com uma linha de totais de horas e valor de HE.
+    O arquivo é gravado num temporário na mesma pasta e só então substitui o
+    destino, então um erro ou cancelamento não deixa um arquivo pela metade.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+        file_path (str): Caminho do arquivo .xlsx de destino.
+        progresso (callable, optional): Recebe (linhas escritas, total de linhas);
+                                        pode levantar `OperacaoCancelada` para interromper.
+    """
+    descritor, temporario = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(file_path)))
+    os.close(descritor)
+    try:
+        with diagnostico.etapa("exportacao", len(df)):
+            _escrever_arquivo(df, temporario, progresso)
+        os.replace(temporario, file_path)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,187 @@
+# pontoknup1028/filtros.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Filtros de exibição por ID, Nome e Área.
+
+`IndiceBusca` pré-calcula, uma vez por carga ou edição, a versão minúscula e
+sem acentos dos valores distintos de cada campo e um índice de n-gramas
+(1 a 3 caracteres) sobre eles. A cada tecla, a busca só examina os valores
+distintos candidatos, e as linhas são selecionadas por código inteiro.
+"""
+
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import diagnostico
+from pontoknup1028.constantes import COL_ID, COL_NOME, COL_AREA
+
+TAMANHO_NGRAMA = 3
+
+
+def normalizar_texto(texto):
+    """
+    Remove acentos, converte para minúsculas e tira espaços das pontas.
+
+    Args:
+        texto (str): Texto a normalizar.
+
+    Returns:
+        str: Texto normalizado (ex: "Área " -> "area").
+    """
+    return unicodedata.normalize('NFKD', str(texto).strip().lower()).encode('ASCII', 'ignore').decode('utf-8')
+
+
+def filtrar(df, id_f="", nome_f="", area_f=""):
+    """
+    Filtra o DataFrame por trechos de ID, Nome e Área (sem diferenciar acentos e maiúsculas).
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+        id_f (str, optional): Trecho do ID.
+        nome_f (str, optional): Trecho do nome.
+        area_f (str, optional): Trecho da área.
+
+    Returns:
+        pd.DataFrame: Cópia com as linhas que atendem a todos os filtros informados.
+    """
+    df_filtrado = df.copy()
+    id_f = id_f.strip().lower()
+    nome_f = normalizar_texto(nome_f)
+    area_f = normalizar_texto(area_f)
+
+    if id_f: df_filtrado = df_filtrado[df_filtrado[COL_ID].str.lower().str.contains(id_f, na=False, regex=False)]
+    if nome_f:
+        df_filtrado = df_filtrado[df_filtrado[COL_NOME].astype(str).apply(
+            lambda x: unicodedata.normalize('NFKD', x.lower()).encode('ASCII', 'ignore').decode('utf-8')
+        ).str.contains(nome_f, na=False, regex=False)]
+    if area_f:
+        df_filtrado = df_filtrado[df_filtrado[COL_AREA].astype(str).apply(
+            lambda x: unicodedata.normalize('NFKD', x.lower()).encode('ASCII', 'ignore').decode('utf-8')
+        ).str.contains(area_f, na=False, regex=False)]
+    return df_filtrado
+
+
+def _dobrar_acentos(texto):
+    """Minúsculas e sem acentos, sem tirar espaços (como o filtro original faz com os valores)."""
+    return unicodedata.normalize('NFKD', texto.lower()).encode('ASCII', 'ignore').decode('utf-8')
+
+
+class _IndiceCampo:
+    """
+    Índice de um campo: código por linha, valores distintos normalizados e n-gramas.
+    """
+
+    def __init__(self, serie, normalizar):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Coluna categórica: os códigos já existem; ausentes (-1) viram um valor "nan" no fim
+            distintos = [str(c) for c in serie.cat.categories] + ["nan"]
+            codigos = serie.cat.codes.to_numpy().astype(np.int64)
+            codigos[codigos < 0] = len(distintos) - 1
+        else:
+            codigos, distintos = pd.factorize(serie.astype(str), use_na_sentinel=False)
+        self.codigos = codigos
+        self.valores = [normalizar(v) for v in distintos]
+        self.ngramas = {}
+        for codigo, valor in enumerate(self.valores):
+            vistos = set()
+            for n in range(1, TAMANHO_NGRAMA + 1):
+                for i in range(len(valor) - n + 1):
+                    vistos.add(valor[i:i + n])
+            for ngrama in vistos:
+                self.ngramas.setdefault(ngrama, []).append(codigo)
+        self.ngramas = {ngrama: np.array(codigos_ng, dtype=np.int64) for ngrama, codigos_ng in self.ngramas.items()}
+
+    def codigos_que_contem(self, termo):
+        """
+        Códigos dos valores distintos que contêm `termo`.
+
+        Termos de até TAMANHO_NGRAMA caracteres são respondidos direto pelo índice;
+        termos maiores intersectam os n-gramas e confirmam só os candidatos.
+        """
+        if len(termo) <= TAMANHO_NGRAMA:
+            return self.ngramas.get(termo, np.array([], dtype=np.int64))
+        listas = []
+        for i in range(len(termo) - TAMANHO_NGRAMA + 1):
+            lista = self.ngramas.get(termo[i:i + TAMANHO_NGRAMA])
+            if lista is None:
+                return np.array([], dtype=np.int64)
+            listas.append(lista)
+        listas.sort(key=len)
+        candidatos = listas[0]
+        for lista in listas[1:]:
+            candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+            if len(candidatos) == 0:
+                break
+        return np.array([c for c in candidatos if termo in self.valores[c]], dtype=np.int64)
+
+    def mascara(self, termo):
+        """Máscara booleana das linhas cujo valor contém `termo`."""
+        encontrados = np.zeros(len(self.valores), dtype=bool)
+        encontrados[self.codigos_que_contem(termo)] = True
+        return encontrados[self.codigos]
+
+
+class IndiceBusca:
+    """
+    Índice de busca por ID, Nome e Área de um DataFrame.
+
+    Deve ser recriado quando as linhas do DataFrame mudam (carga, edição de
+    ID/Nome/Área, exclusões), pois guarda um código por linha.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+    """
+
+    def __init__(self, df):
+        self.n_linhas = len(df)
+        with diagnostico.etapa("indice_busca", len(df)):
+            self.campos = {
+                COL_ID: _IndiceCampo(df[COL_ID], str.lower),
+                COL_NOME: _IndiceCampo(df[COL_NOME], _dobrar_acentos),
+                COL_AREA: _IndiceCampo(df[COL_AREA], _dobrar_acentos),
+            }
+
+    def mascara(self, id_f="", nome_f="", area_f=""):
+        """
+        Máscara das linhas que atendem a todos os filtros informados.
+
+        Args:
+            id_f (str, optional): Trecho do ID.
+            nome_f (str, optional): Trecho do nome.
+            area_f (str, optional): Trecho da área.
+
+        Returns:
+            np.ndarray or None: Máscara booleana, ou None se nenhum filtro foi informado.
+        """
+        termos = {COL_ID: id_f.strip().lower(), COL_NOME: normalizar_texto(nome_f), COL_AREA: normalizar_texto(area_f)}
+        mascara = None
+        for campo, termo in termos.items():
+            if termo:
+                parcial = self.campos[campo].mascara(termo)
+                mascara = parcial if mascara is None else mascara & parcial
+        return mascara
+
+
+def filtrar_com_indice(df, indice, id_f="", nome_f="", area_f=""):
+    """
+    Igual a `filtrar`, mas usando um `IndiceBusca` já construído para `df`.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+        indice (IndiceBusca): Índice construído a partir de `df`.
+        id_f (str, optional): Trecho do ID.
+        nome_f (str, optional): Trecho do nome.
+        area_f (str, optional): Trecho da área.
+
+    Returns:
+        pd.DataFrame: Linhas que atendem aos filtros (o próprio `df` se não houver filtro).
+    """
+    with diagnostico.etapa("filtragem") as medicao:
+        mascara = indice.mascara(id_f, nome_f, area_f)
+        resultado = df if mascara is None else df[mascara]
+        medicao.linhas = len(resultado)
+    return resultado
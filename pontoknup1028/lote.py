@@ -0,0 +1,305 @@
+# pontoknup1028/lote.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Processamento em lote pela linha de comando.
+
+Recebe um diretório, um padrão glob ou uma lista de arquivos e executa
+carregar -> calcular -> exportar para cada planilha em paralelo, um processo
+por núcleo de CPU. Arquivos AFD dos relógios de ponto (`afd`) são aceitos
+como entradas, ao lado das planilhas. Gera uma planilha de saída por entrada, mostra o tempo de
+cada arquivo e termina com código diferente de zero se algum arquivo falhar.
+Entradas de pastas diferentes com o mesmo nome (ex: jan/ponto.xlsx e
+fev/ponto.xlsx) ganham o nome da pasta na saída (`caminhos_saida`).
+
+Com --juntar, as planilhas viram uma só (ex: os meses de um trimestre): as
+linhas do mesmo ID e Data em arquivos diferentes são unificadas, valendo a do
+arquivo que vem por último em ordem alfabética.
+
+Com --escalas, a jornada de cada linha vem da tabela de escalas por ID ou
+Área (`escalas.ler_escalas`) em vez de uma jornada única.
+
+Uso:
+    python -m pontoknup1028 pasta_ou_padrao [...] [--saida PASTA] [--config config.json]
+    python -m pontoknup1028 pasta_ou_padrao [...] --juntar trimestre.xlsx
+    python -m pontoknup1028 pasta_ou_padrao [...] --escalas escalas.txt
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pontoknup1028.config import nova_config, ler_config
+
+SUFIXO_SAIDA = "_calculado"
+EXTENSOES_EXCEL = (".xlsx", ".xls")
+
+
+def listar_planilhas(entradas):
+    """
+    Expande diretórios e padrões glob na lista de planilhas a processar.
+
+    Arquivos temporários do Excel ("~$...") e saídas de execuções anteriores
+    (terminadas em SUFIXO_SAIDA) são ignorados. Arquivos de texto só entram
+    se forem AFD (`afd.eh_arquivo_afd`).
+
+    Args:
+        entradas (list): Diretórios, padrões glob ou caminhos de arquivos.
+
+    Returns:
+        list: Caminhos únicos, em ordem alfabética.
+    """
+    caminhos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = [os.path.join(entrada, nome) for nome in os.listdir(entrada)]
+        else:
+            candidatos = glob.glob(entrada) or [entrada]
+        for caminho in candidatos:
+            nome, extensao = os.path.splitext(os.path.basename(caminho))
+            if nome.startswith("~$") or nome.endswith(SUFIXO_SAIDA):
+                continue
+            if extensao.lower() not in EXTENSOES_EXCEL:
+                from pontoknup1028.afd import eh_arquivo_afd  # Só há arquivos de texto a examinar
+                if not eh_arquivo_afd(caminho):
+                    continue
+            caminhos.add(caminho)
+    return sorted(caminhos)
+
+
+def caminho_saida(caminho_entrada, pasta_saida=None):
+    """
+    Define o arquivo de saída de uma planilha de entrada.
+
+    Args:
+        caminho_entrada (str): Planilha de entrada.
+        pasta_saida (str, optional): Pasta de destino. Padrão é a pasta da entrada.
+
+    Returns:
+        str: Caminho "<nome>_calculado.xlsx".
+    """
+    nome = os.path.splitext(os.path.basename(caminho_entrada))[0]
+    pasta = pasta_saida if pasta_saida else os.path.dirname(caminho_entrada)
+    return os.path.join(pasta, f"{nome}{SUFIXO_SAIDA}.xlsx")
+
+
+def caminhos_saida(caminhos, pasta_saida=None):
+    """
+    Define os arquivos de saída de todas as entradas, sem repetir destino.
+
+    Entradas que gerariam a mesma saída (mesmo nome em pastas diferentes com
+    --saida, ou .xls e .xlsx de mesmo nome) recebem o nome da pasta da
+    entrada como prefixo: "<pasta>_<nome>_calculado.xlsx".
+
+    Args:
+        caminhos (list): Planilhas de entrada.
+        pasta_saida (str, optional): Pasta de destino. Padrão é a pasta de cada entrada.
+
+    Returns:
+        dict: Caminho de entrada -> caminho de saída.
+
+    Raises:
+        ValueError: Duas entradas continuam com o mesmo destino mesmo com o prefixo.
+    """
+    def chave(destino):
+        return os.path.normcase(os.path.abspath(destino))
+
+    destinos = {caminho: caminho_saida(caminho, pasta_saida) for caminho in caminhos}
+    repetidos = Counter(chave(destino) for destino in destinos.values())
+    for caminho, destino in destinos.items():
+        if repetidos[chave(destino)] > 1:
+            pasta_entrada = os.path.basename(os.path.dirname(os.path.abspath(caminho)))
+            destinos[caminho] = os.path.join(os.path.dirname(destino), f"{pasta_entrada}_{os.path.basename(destino)}")
+
+    por_destino = {}
+    for caminho, destino in destinos.items():
+        anterior = por_destino.setdefault(chave(destino), caminho)
+        if anterior != caminho:
+            raise ValueError(f"{anterior} e {caminho} gravariam a mesma saída {destino}; use --saida ou renomeie um deles.")
+    return destinos
+
+
+def processar_arquivo(caminho_entrada, destino, config, usar_cache=True, escala=None):
+    """
+    Executa carregar -> calcular -> exportar para uma planilha.
+
+    Roda dentro de um processo do pool; os imports pesados ficam aqui para que
+    o processo principal continue leve.
+
+    Args:
+        caminho_entrada (str): Planilha de entrada.
+        destino (str): Planilha de saída.
+        config (dict): Configuração de cálculo.
+        usar_cache (bool, optional): Reaproveita o cache em disco de planilhas já lidas.
+        escala (pd.DataFrame, optional): Escalas de `escalas.ler_escalas`.
+
+    Returns:
+        tuple: (número de linhas, segundos gastos).
+    """
+    from pontoknup1028.cache import carregar_planilha_com_cache
+    from pontoknup1028.carregamento import carregar_planilha
+    from pontoknup1028.escalas import aplicar_escala
+    from pontoknup1028.exportacao import salvar_planilha
+
+    inicio = time.perf_counter()
+    if usar_cache:
+        df, _ = carregar_planilha_com_cache(caminho_entrada, config)
+    else:
+        df = carregar_planilha(caminho_entrada, config)
+    if escala is not None:
+        aplicar_escala(df, escala, config)
+    salvar_planilha(df, destino)
+    return len(df), time.perf_counter() - inicio
+
+
+def processar_lote(caminhos, config, pasta_saida=None, processos=None, saida=sys.stdout, usar_cache=True,
+                   escala=None):
+    """
+    Processa várias planilhas em paralelo e relata o resultado de cada uma.
+
+    Args:
+        caminhos (list): Planilhas de entrada.
+        config (dict): Configuração de cálculo.
+        pasta_saida (str, optional): Pasta de destino das saídas.
+        processos (int, optional): Número de processos. Padrão é o número de CPUs.
+        saida (file, optional): Onde escrever o relatório. Padrão é stdout.
+        usar_cache (bool, optional): Reaproveita o cache em disco de planilhas já lidas.
+        escala (pd.DataFrame, optional): Escalas de `escalas.ler_escalas`.
+
+    Returns:
+        dict: Caminho de entrada -> mensagem de erro, apenas para os arquivos que falharam.
+
+    Raises:
+        ValueError: Duas entradas gravariam a mesma saída (`caminhos_saida`); nada é processado.
+    """
+    destinos = caminhos_saida(caminhos, pasta_saida)
+    if pasta_saida:
+        os.makedirs(pasta_saida, exist_ok=True)
+
+    falhas = {}
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {
+            executor.submit(processar_arquivo, caminho, destinos[caminho], config, usar_cache, escala): caminho
+            for caminho in caminhos
+        }
+        for futuro in as_completed(futuros):
+            caminho = futuros[futuro]
+            try:
+                linhas, segundos = futuro.result()
+                print(f"OK    {segundos:7.2f}s  {linhas:8d} linhas  {caminho}", file=saida)
+            except Exception as e:
+                falhas[caminho] = f"{type(e).__name__}: {e}"
+                print(f"FALHA                           {caminho}: {falhas[caminho]}", file=saida)
+
+    total = time.perf_counter() - inicio
+    print(f"{len(caminhos) - len(falhas)} de {len(caminhos)} arquivo(s) processado(s) em {total:.2f}s.", file=saida)
+    return falhas
+
+
+def juntar_lote(caminhos, config, destino, processos=None, saida=sys.stdout, escala=None):
+    """
+    Junta as planilhas em uma só (`mesclagem.juntar_planilhas`) e a exporta.
+
+    Args:
+        caminhos (list): Planilhas de entrada, na ordem de prioridade (a última vence).
+        config (dict): Configuração de cálculo.
+        destino (str): Planilha de saída.
+        processos (int, optional): Número de processos de leitura.
+        saida (file, optional): Onde escrever o relatório. Padrão é stdout.
+        escala (pd.DataFrame, optional): Escalas de `escalas.ler_escalas`.
+
+    Returns:
+        int: Número de linhas da planilha gerada.
+    """
+    from pontoknup1028.escalas import aplicar_escala
+    from pontoknup1028.exportacao import salvar_planilha
+    from pontoknup1028.mesclagem import juntar_planilhas
+
+    inicio = time.perf_counter()
+    df = juntar_planilhas(caminhos, config, processos=processos, em_processos=True)
+    if escala is not None:
+        aplicar_escala(df, escala, config)
+    salvar_planilha(df, destino)
+    print(f"{len(caminhos)} planilha(s) juntada(s) em {destino}: {len(df)} linhas em "
+          f"{time.perf_counter() - inicio:.2f}s.", file=saida)
+    return len(df)
+
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Args:
+        argv (list, optional): Argumentos (sem o nome do programa). Padrão é sys.argv[1:].
+
+    Returns:
+        int: 0 se todos os arquivos foram processados, 1 se algum falhou,
+             2 se nenhuma planilha foi encontrada, a configuração ou a escala
+             é inválida ou duas entradas gravariam a mesma saída.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m pontoknup1028",
+        description="Calcula horas de várias planilhas do Knup 1028 em paralelo."
+    )
+    parser.add_argument("entradas", nargs="+", help="Diretórios, padrões glob ou arquivos .xlsx/.xls.")
+    parser.add_argument("--saida", help="Pasta das planilhas geradas (padrão: a pasta de cada entrada).")
+    parser.add_argument("--config", help="Arquivo config.json com horas_normais_h e multiplicador_hora_extra.")
+    parser.add_argument("--horas-normais", type=float, help="Sobrescreve horas_normais_h.")
+    parser.add_argument("--multiplicador", type=float, help="Sobrescreve multiplicador_hora_extra.")
+    parser.add_argument("--processos", type=int, help="Número de processos (padrão: número de CPUs).")
+    parser.add_argument("--sem-cache", action="store_true", help="Sempre lê o Excel, sem usar o cache em disco.")
+    parser.add_argument("--juntar", metavar="ARQUIVO",
+                        help="Junta todas as entradas em uma só planilha (mesmo ID e Data: vale o último arquivo).")
+    parser.add_argument("--escalas", metavar="ARQUIVO",
+                        help="Tabela de escalas (tipo;chave;jornada[;dias]) com a jornada por ID ou Área.")
+    args = parser.parse_args(argv)
+
+    try:
+        config = ler_config(args.config) if args.config else nova_config()
+    except (OSError, ValueError) as e:
+        print(f"Configuração inválida: {e}", file=sys.stderr)
+        return 2
+    if args.horas_normais is not None:
+        config["horas_normais_h"] = args.horas_normais
+    if args.multiplicador is not None:
+        config["multiplicador_hora_extra"] = args.multiplicador
+
+    caminhos = listar_planilhas(args.entradas)
+    if not caminhos:
+        print("Nenhuma planilha encontrada.", file=sys.stderr)
+        return 2
+
+    escala = None
+    if args.escalas:
+        from pontoknup1028.escalas import ler_escalas
+        try:
+            escala = ler_escalas(args.escalas)
+        except (OSError, ValueError) as e:
+            print(f"Escala inválida: {e}", file=sys.stderr)
+            return 2
+
+    if args.juntar:
+        try:
+            juntar_lote(caminhos, config, args.juntar, args.processos, escala=escala)
+        except Exception as e:
+            print(f"FALHA ao juntar as planilhas: {type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    try:
+        falhas = processar_lote(caminhos, config, args.saida, args.processos, usar_cache=not args.sem_cache,
+                                escala=escala)
+    except ValueError as e:
+        print(f"Saídas repetidas: {e}", file=sys.stderr)
+        return 2
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# pontoknup1028/marcacoes.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Marcações em formato longo: uma posição dos arrays por marcação.
+
+O formato de trabalho tem só quatro colunas de horário, o que não comporta
+dias com pausas extras ou turnos partidos. Aqui cada marcação é um elemento
+de três arrays paralelos (funcionário, dia desde 1970, minuto do dia),
+ordenados uma única vez por (funcionário, dia, hora), e tudo é resolvido com
+deslocamentos e diferenças entre vizinhos, sem laço por jornada:
+
+- `separar_jornadas` marca onde começa cada jornada. Uma jornada continua
+  enquanto as marcações estão a até `PAUSA_MAXIMA_MIN` uma da outra; dentro
+  desse trecho as marcações alternam entrada e saída, e uma entrada depois
+  de um descanso de `DESCANSO_MINIMO_MIN` abre uma jornada nova. A troca de
+  dia não separa jornadas: o turno noturno que sai às 06:00, mesmo com a
+  pausa atravessando a meia-noite, continua na jornada do dia em que entrou.
+- `parear_marcacoes` junta as marcações de cada jornada em intervalos
+  (1ª-2ª, 3ª-4ª, ...) com virada de meia-noite: um minuto menor que o da
+  marcação anterior conta como dia seguinte. Os minutos trabalhados são a
+  soma dos intervalos; jornadas com quantidade ímpar ficam sem cálculo.
+  Também deriva a visão em quatro colunas exibida na tabela: a primeira e a
+  última marcação em Entrada e Saída e, em Saída-Almoço e Volta-Almoço, as
+  pontas da maior pausa.
+"""
+
+import numpy as np
+
+MINUTOS_DIA = 24 * 60
+PAUSA_MAXIMA_MIN = 12 * 60     # Intervalo acima disso entre duas marcações sempre separa jornadas
+DESCANSO_MINIMO_MIN = 11 * 60  # Descanso entre jornadas (CLT, art. 66)
+COLUNAS_VISAO = 4              # Entrada, Saída-Almoço, Volta-Almoço, Saída
+SEM_MARCACAO = -1              # Posição vazia da visão em quatro colunas
+
+
+def ordenar_marcacoes(pessoa, dia, minuto):
+    """
+    Ordena as marcações por (funcionário, dia, hora) e descarta as repetidas no mesmo minuto.
+
+    Args:
+        pessoa (np.ndarray): Funcionário (inteiro) por marcação.
+        dia (np.ndarray): Dias desde 1970 por marcação.
+        minuto (np.ndarray): Minuto do dia por marcação.
+
+    Returns:
+        tuple: Os três arrays ordenados e sem repetições.
+    """
+    ordem = np.lexsort((minuto, dia, pessoa))
+    pessoa, dia, minuto = pessoa[ordem], dia[ordem], minuto[ordem]
+    repetida = np.zeros(len(ordem), dtype=bool)
+    repetida[1:] = (pessoa[1:] == pessoa[:-1]) & (dia[1:] == dia[:-1]) & (minuto[1:] == minuto[:-1])
+    return pessoa[~repetida], dia[~repetida], minuto[~repetida]
+
+
+def _posicoes(inicio):
+    """Índice do grupo de cada marcação, primeira marcação de cada grupo e posição dentro do grupo."""
+    inicios = np.flatnonzero(inicio)
+    grupo = np.cumsum(inicio) - 1
+    return grupo, inicios, np.arange(len(inicio)) - inicios[grupo]
+
+
+def separar_jornadas(pessoa, dia, minuto):
+    """
+    Marca a primeira marcação de cada jornada.
+
+    Duas jornadas do mesmo funcionário que começariam no mesmo dia (ex.:
+    06:00-07:00 e 19:00-20:00) ficam numa só, com os intervalos de ambas.
+
+    Args:
+        pessoa, dia, minuto (np.ndarray): Marcações ordenadas por `ordenar_marcacoes`.
+
+    Returns:
+        np.ndarray: Máscara booleana, True onde começa uma jornada.
+    """
+    if len(pessoa) == 0:
+        return np.zeros(0, dtype=bool)
+    instante = dia.astype(np.int64) * MINUTOS_DIA + minuto
+    intervalo = np.diff(instante, prepend=instante[0])
+    outra_pessoa = np.ones(len(pessoa), dtype=bool)
+    outra_pessoa[1:] = pessoa[1:] != pessoa[:-1]
+
+    # Em cada trecho sem pausa longa as marcações alternam entrada (posição par) e saída
+    trecho = outra_pessoa | (intervalo > PAUSA_MAXIMA_MIN)
+    _, _, posicao = _posicoes(trecho)
+    entrada_nova = (intervalo >= DESCANSO_MINIMO_MIN) & (posicao % 2 == 0)
+    inicio = trecho | entrada_nova
+
+    # Uma jornada por (funcionário, dia de início): une as que começam no mesmo dia da anterior
+    inicios = np.flatnonzero(inicio)
+    mesmo_dia = np.zeros(len(inicios), dtype=bool)
+    mesmo_dia[1:] = (pessoa[inicios[1:]] == pessoa[inicios[:-1]]) & (dia[inicios[1:]] == dia[inicios[:-1]])
+    inicio[inicios[mesmo_dia]] = False
+    return inicio
+
+
+def parear_marcacoes(minuto, inicio):
+    """
+    Pareia as marcações de cada jornada em intervalos trabalhados.
+
+    Args:
+        minuto (np.ndarray): Minuto do dia por marcação, em ordem cronológica
+                             dentro de cada jornada.
+        inicio (np.ndarray): Máscara de `separar_jornadas`.
+
+    Returns:
+        tuple: Por jornada, (quantidade de marcações, minutos trabalhados
+               (int64; SEM_MARCACAO se a quantidade for ímpar) e matriz int16
+               (jornadas, 4) da visão em quatro colunas, com SEM_MARCACAO nas
+               posições vazias).
+    """
+    grupo, inicios, posicao = _posicoes(inicio)
+    quantidade = np.bincount(grupo, minlength=len(inicios))
+    minuto = minuto.astype(np.int64)
+
+    # Virada de meia-noite: cada recuo do relógio em relação à marcação anterior soma um dia
+    recuo = np.zeros(len(minuto), dtype=np.int64)
+    recuo[1:] = ~inicio[1:] & (minuto[1:] < minuto[:-1])
+    viradas = np.cumsum(recuo)
+    continuo = minuto + MINUTOS_DIA * (viradas - viradas[inicios][grupo])
+    desde_anterior = np.diff(continuo, prepend=continuo[:1])
+
+    saida = posicao % 2 == 1
+    trabalhado = np.bincount(grupo[saida], weights=desde_anterior[saida], minlength=len(inicios)).astype(np.int64)
+    completa = quantidade % 2 == 0
+    trabalhado[~completa] = SEM_MARCACAO
+
+    visao = np.full((len(inicios), COLUNAS_VISAO), SEM_MARCACAO, dtype=np.int16)
+    visao[:, 0] = minuto[inicios]
+    ultima = inicios + quantidade - 1
+    visao[completa, COLUNAS_VISAO - 1] = minuto[ultima[completa]]
+    # Ímpar: as primeiras marcações, sem Saída (horários incompletos)
+    impar = ~completa[grupo] & (posicao > 0) & (posicao < COLUNAS_VISAO - 1)
+    visao[grupo[impar], posicao[impar]] = minuto[impar]
+    # Par com pausas: Saída-Almoço e Volta-Almoço são as pontas da maior pausa (a primeira, se empatar)
+    pausa = np.where(~saida & (posicao > 0) & completa[grupo], desde_anterior, -1)
+    maior = np.full(len(inicios), -1, dtype=np.int64)
+    np.maximum.at(maior, grupo, pausa)
+    candidata = np.flatnonzero((pausa >= 0) & (pausa == maior[grupo]))
+    grupos_pausa, primeira = np.unique(grupo[candidata], return_index=True)
+    volta = candidata[primeira]
+    visao[grupos_pausa, 1] = minuto[volta - 1]
+    visao[grupos_pausa, 2] = minuto[volta]
+    return quantidade, trabalhado, visao
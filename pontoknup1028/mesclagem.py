@@ -0,0 +1,175 @@
+# pontoknup1028/mesclagem.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Junção de várias planilhas (ex: os meses de um trimestre) em um só DataFrame.
+
+As planilhas são lidas e normalizadas em paralelo, sem calcular as horas.
+Linhas de arquivos diferentes com o mesmo funcionário e dia (ID, Data) são
+comparadas por um hash de 64 bits da chave: vale a do arquivo que vem por
+último na lista. Cada arquivo é filtrado assim que sua leitura termina,
+na ordem em que ficam prontos: as linhas cuja chave já pertence a um
+arquivo posterior são descartadas na hora, e as chaves que ele toma de
+arquivos anteriores são removidas dos que já estavam guardados. Assim, além
+das leituras em andamento, só as linhas únicas ficam em memória. O
+conjunto final é calculado de uma vez.
+
+Linhas repetidas dentro de um mesmo arquivo são mantidas (como ao abrir a
+planilha sozinha), e linhas sem ID ou sem data válida nunca são descartadas.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import diagnostico, esquema
+from pontoknup1028.calculos import calcular_todas_horas_e_extras
+from pontoknup1028.carregamento import ler_planilha_normalizada
+from pontoknup1028.constantes import COL_ID, COL_DATA
+from pontoknup1028.tarefas import avisar_progresso
+
+
+def hash_chaves(df):
+    """
+    Hash de 64 bits de (ID, Data) por linha.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho.
+
+    Returns:
+        tuple: (np.ndarray uint64 com os hashes, máscara das linhas com chave completa).
+    """
+    ids = df[COL_ID].astype(object).where(df[COL_ID].notna(), "").astype(str).str.strip()
+    datas = df[COL_DATA]
+    chaves = pd.DataFrame({COL_ID: ids.to_numpy(), COL_DATA: datas.to_numpy()})
+    hashes = pd.util.hash_pandas_object(chaves, index=False).to_numpy()
+    com_chave = (ids != "").to_numpy() & datas.notna().to_numpy()
+    return hashes, com_chave
+
+
+class _Juncao:
+    """
+    Junta DataFrames normalizados recebidos em qualquer ordem; em chaves
+    repetidas entre eles vale o de maior posição.
+
+    Guarda só as linhas mantidas de cada DataFrame e, ordenados pelo hash,
+    o dono (posição do arquivo) de cada chave já vista.
+    """
+
+    def __init__(self):
+        self._mantidos = {}  # posição -> (DataFrame, hashes, máscara das linhas com chave)
+        self._chaves = np.empty(0, dtype=np.uint64)
+        self._donos = np.empty(0, dtype=np.int64)
+
+    def acrescentar(self, posicao, frame):
+        """
+        Filtra e guarda um DataFrame.
+
+        Args:
+            posicao (int): Posição do arquivo na lista (a maior vence).
+            frame (pd.DataFrame): DataFrame normalizado do arquivo.
+        """
+        hashes, com_chave = hash_chaves(frame)
+        if len(self._chaves):
+            indice = np.minimum(np.searchsorted(self._chaves, hashes), len(self._chaves) - 1)
+            vista = com_chave & (self._chaves[indice] == hashes)
+            dono = np.where(vista, self._donos[indice], -1)
+        else:
+            indice = np.zeros(len(frame), dtype=np.int64)
+            vista = np.zeros(len(frame), dtype=bool)
+            dono = np.full(len(frame), -1, dtype=np.int64)
+        mantida = ~(vista & (dono > posicao))
+
+        tomadas = vista & (dono < posicao)
+        if tomadas.any():
+            self._donos[indice[tomadas]] = posicao
+            chaves_tomadas = hashes[tomadas]
+            for anterior in np.unique(dono[tomadas]):
+                guardado, hashes_guardados, chave_guardada = self._mantidos[anterior]
+                fica = ~(chave_guardada & np.isin(hashes_guardados, chaves_tomadas))
+                self._mantidos[anterior] = (guardado[fica], hashes_guardados[fica], chave_guardada[fica])
+        novas = np.unique(hashes[com_chave & ~vista])
+        if len(novas):
+            chaves = np.concatenate([self._chaves, novas])
+            ordem = np.argsort(chaves, kind="stable")
+            self._chaves = chaves[ordem]
+            self._donos = np.concatenate([self._donos, np.full(len(novas), posicao, dtype=np.int64)])[ordem]
+        self._mantidos[posicao] = (frame[mantida], hashes[mantida], com_chave[mantida])
+
+    def resultado(self):
+        """
+        Returns:
+            pd.DataFrame: Linhas únicas na ordem dos arquivos, com índice 0..n-1.
+        """
+        return esquema.unificar_categorias([self._mantidos[posicao][0] for posicao in sorted(self._mantidos)])
+
+
+class _ProgressoConjunto:
+    """Soma o progresso de leituras simultâneas em um único callback."""
+
+    def __init__(self, progresso, quantidade):
+        self._progresso = progresso
+        self._feitos = [0] * quantidade
+        self._totais = [None] * quantidade
+        self._trava = threading.Lock()
+
+    def para(self, posicao):
+        def aviso(feito, total=None):
+            with self._trava:
+                self._feitos[posicao], self._totais[posicao] = feito, total
+                feitos = sum(self._feitos)
+                total = None if None in self._totais else sum(self._totais)
+            avisar_progresso(self._progresso, feitos, total)
+        return aviso
+
+
+def juntar_planilhas(caminhos, config, processos=None, em_processos=False, progresso=None):
+    """
+    Lê várias planilhas em paralelo, remove as linhas sobrepostas e calcula tudo de uma vez.
+
+    Args:
+        caminhos (list): Planilhas na ordem de prioridade (a última vence).
+        config (dict): Configuração de cálculo.
+        processos (int, optional): Leituras simultâneas. Padrão do executor.
+        em_processos (bool, optional): Usa processos em vez de threads. Mais rápido
+                                       para muitas planilhas grandes, mas exige que o
+                                       programa principal possa ser importado sem efeitos
+                                       (linha de comando; a interface Tk usa threads).
+        progresso (callable, optional): Recebe (linhas lidas, total estimado ou None);
+                                        só com threads. Pode levantar `OperacaoCancelada`.
+
+    Returns:
+        pd.DataFrame: DataFrame de trabalho com as linhas únicas de todas as planilhas.
+    """
+    caminhos = list(caminhos)
+    juncao = _Juncao()
+    linhas_lidas = 0
+    if em_processos:
+        executor = ProcessPoolExecutor(max_workers=processos)
+        futuros = {executor.submit(ler_planilha_normalizada, caminho, config): i for i, caminho in enumerate(caminhos)}
+    else:
+        conjunto = _ProgressoConjunto(progresso, len(caminhos))
+        executor = ThreadPoolExecutor(max_workers=processos)
+        futuros = {executor.submit(ler_planilha_normalizada, caminho, config, progresso=conjunto.para(i)): i
+                   for i, caminho in enumerate(caminhos)}
+    with executor:
+        try:
+            # Cada planilha é filtrada assim que fica pronta; o futuro libera o DataFrame em seguida
+            for futuro in as_completed(list(futuros)):
+                frame = futuro.result()
+                posicao = futuros.pop(futuro)
+                linhas_lidas += len(frame)
+                juncao.acrescentar(posicao, frame)
+                del frame, futuro
+        except BaseException:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+
+    with diagnostico.etapa("mesclagem", linhas_lidas) as medicao:
+        df = juncao.resultado()
+        medicao.linhas = len(df)
+    return calcular_todas_horas_e_extras(df, config)
@@ -0,0 +1,183 @@
+# pontoknup1028/sintetico.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Gerador de planilhas de ponto sintéticas no layout do Knup 1028.
+
+Produz arquivos com três abas, os dados na terceira, título das colunas e
+4 linhas de cabeçalho, e as 12 colunas de `COLUNAS_PLANILHA`. A mistura de
+casos é realista: dias normais com almoço, dias sem almoço ou com almoço
+"00:00", turnos noturnos, "Omissão", horários em formato inválido e
+marcações incompletas. A geração é determinística para uma mesma semente,
+para que os benchmarks sejam comparáveis entre commits.
+"""
+
+import datetime
+
+import numpy as np
+
+from pontoknup1028.carregamento import LINHAS_CABECALHO
+from pontoknup1028.constantes import COLUNAS_PLANILHA
+
+VERSAO_GERADOR = 2  # Incrementar ao mudar a mistura de casos ou os sorteios (invalida arquivos já gerados)
+TAMANHO_BLOCO = 50_000  # Linhas sorteadas de cada vez
+
+DATA_INICIAL = datetime.date(2024, 1, 1)
+MAX_FUNCIONARIOS = 800
+
+# Proporção de cada tipo de dia (o restante são dias normais com almoço)
+PROPORCOES_CASOS = {
+    "sem_almoco": 0.06,
+    "almoco_zerado": 0.02,
+    "noturno": 0.05,
+    "omissao": 0.07,
+    "formato_invalido": 0.02,
+    "incompleto": 0.03,
+}
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Élida", "Fábio", "Gabriela", "Hélio", "Iara", "João",
+         "Karina", "Luís", "Márcia", "Nélson", "Otávio", "Patrícia", "Quitéria", "Raí", "Sônia", "Tomás"]
+SOBRENOMES = ["Silva", "Souza", "Conceição", "Araújo", "Gonçalves", "Lima", "Peçanha", "Brandão",
+              "Nascimento", "Simões", "Ribeiro", "Assunção"]
+AREAS = ["Produção", "Logística", "Manutenção", "Administração", "Qualidade", "Expedição"]
+HORARIOS_INVALIDOS = ["8h", "25:61", "xx", "12.30", "7:5"]
+
+_HORARIOS = np.array([f"{m // 60:02}:{m % 60:02}" for m in range(1440)], dtype=object)
+
+
+def _funcionarios(quantidade, rng):
+    nomes = [f"{NOMES[i % len(NOMES)]} {SOBRENOMES[(i // len(NOMES)) % len(SOBRENOMES)]}"
+             + (f" {i // (len(NOMES) * len(SOBRENOMES)) + 1}" if i >= len(NOMES) * len(SOBRENOMES) else "")
+             for i in range(quantidade)]
+    areas = [AREAS[i] for i in rng.integers(0, len(AREAS), quantidade)]
+    return nomes, areas
+
+
+def _gerar_bloco(rng, posicao, n_funcionarios, nomes, areas):
+    """Linhas das posições `posicao` (um bloco contíguo), sorteadas com `rng`."""
+    n_linhas = len(posicao)
+    funcionario = posicao % n_funcionarios
+    dia = posicao // n_funcionarios
+    primeiro_dia = int(dia[0])
+    datas = [DATA_INICIAL + datetime.timedelta(days=d) for d in range(primeiro_dia, int(dia[-1]) + 1)]
+    fim_de_semana = np.array([d.weekday() >= 5 for d in datas], dtype=bool)[dia - primeiro_dia]
+    textos_data = np.array([d.strftime("%d/%m/%Y") for d in datas], dtype=object)
+
+    # Dia normal: entrada 07:00-09:00, almoço ~12:00 com ~1h, jornada ~8h48 (+/- 1h)
+    entrada = rng.integers(7 * 60, 9 * 60 + 1, n_linhas)
+    saida_almoco = entrada + rng.integers(3 * 60 + 30, 4 * 60 + 30, n_linhas)
+    volta_almoco = saida_almoco + rng.integers(45, 76, n_linhas)
+    saida = volta_almoco + (528 - (saida_almoco - entrada)) + rng.integers(-60, 61, n_linhas)
+    marcacoes = np.stack([_HORARIOS[np.clip(m, 0, 1439)] for m in (entrada, saida_almoco, volta_almoco, saida)], axis=1)
+
+    sorteio = rng.random(n_linhas)
+    limites = np.cumsum(list(PROPORCOES_CASOS.values()))
+    caso = np.searchsorted(limites, sorteio, side="right")  # len(PROPORCOES_CASOS) = dia normal
+    tipos = list(PROPORCOES_CASOS)
+    omissao = (caso == tipos.index("omissao")) | (fim_de_semana & (rng.random(n_linhas) < 0.9))
+
+    sem_almoco = (caso == tipos.index("sem_almoco")) & ~omissao
+    marcacoes[sem_almoco, 1:3] = ""
+    almoco_zerado = (caso == tipos.index("almoco_zerado")) & ~omissao
+    marcacoes[almoco_zerado, 1:3] = "00:00"
+
+    noturno = (caso == tipos.index("noturno")) & ~omissao
+    entrada_noturna = rng.integers(21 * 60, 23 * 60, n_linhas)
+    marcacoes[noturno, 0] = _HORARIOS[entrada_noturna[noturno]]
+    marcacoes[noturno, 1] = _HORARIOS[(entrada_noturna[noturno] + 240) % 1440]
+    marcacoes[noturno, 2] = _HORARIOS[(entrada_noturna[noturno] + 300) % 1440]
+    marcacoes[noturno, 3] = _HORARIOS[(entrada_noturna[noturno] + 540) % 1440]
+
+    invalido = (caso == tipos.index("formato_invalido")) & ~omissao
+    coluna_invalida = rng.integers(0, 4, n_linhas)
+    for i in np.flatnonzero(invalido):
+        marcacoes[i, coluna_invalida[i]] = HORARIOS_INVALIDOS[(posicao[0] + i) % len(HORARIOS_INVALIDOS)]
+
+    incompleto = (caso == tipos.index("incompleto")) & ~omissao
+    marcacoes[incompleto, 3] = ""
+
+    marcacoes[omissao, 0] = "Omissão"
+    marcacoes[omissao, 1:] = ""
+
+    linhas = []
+    for i in range(n_linhas):
+        f = funcionario[i]
+        linhas.append([int(f) + 1, nomes[f], areas[f], textos_data[dia[i] - primeiro_dia], *marcacoes[i], "", "", "", ""])
+    return linhas
+
+
+def iterar_linhas(n_linhas, n_funcionarios=None, semente=0, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Gera as linhas de dados de uma planilha sintética, um bloco por vez.
+
+    Cada funcionário recebe dias consecutivos a partir de DATA_INICIAL; sábados
+    e domingos costumam vir como "Omissão", como nas exportações reais. Os
+    sorteios são feitos por bloco de `tamanho_bloco` linhas com o mesmo
+    gerador aleatório, então só um bloco fica em memória e o resultado não
+    depende de quem consome as linhas.
+
+    Args:
+        n_linhas (int): Número de linhas de dados.
+        n_funcionarios (int, optional): Número de funcionários. Padrão: uma
+                                        linha por dia útil de um mês por
+                                        funcionário, até MAX_FUNCIONARIOS.
+        semente (int, optional): Semente do gerador aleatório.
+        tamanho_bloco (int, optional): Linhas sorteadas de cada vez.
+
+    Yields:
+        list: Os 12 valores de `COLUNAS_PLANILHA` de uma linha.
+    """
+    rng = np.random.default_rng(semente)
+    if n_funcionarios is None:
+        n_funcionarios = min(MAX_FUNCIONARIOS, max(1, n_linhas // 22))
+    nomes, areas = _funcionarios(n_funcionarios, rng)
+    for inicio in range(0, n_linhas, tamanho_bloco):
+        posicao = np.arange(inicio, min(inicio + tamanho_bloco, n_linhas))
+        yield from _gerar_bloco(rng, posicao, n_funcionarios, nomes, areas)
+
+
+def gerar_linhas(n_linhas, n_funcionarios=None, semente=0):
+    """
+    Lista com todas as linhas de `iterar_linhas` (para testes e planilhas pequenas).
+
+    Args:
+        n_linhas (int): Número de linhas de dados.
+        n_funcionarios (int, optional): Número de funcionários (ver `iterar_linhas`).
+        semente (int, optional): Semente do gerador aleatório.
+
+    Returns:
+        list: Listas com os 12 valores de `COLUNAS_PLANILHA` por linha.
+    """
+    return list(iterar_linhas(n_linhas, n_funcionarios, semente))
+
+
+def escrever_planilha_sintetica(caminho, n_linhas, n_funcionarios=None, semente=0):
+    """
+    Grava uma planilha sintética no layout lido por `carregar_planilha`.
+
+    As linhas vêm de `iterar_linhas`, um bloco por vez, e o XlsxWriter grava
+    em modo de memória constante, então mesmo arquivos com 1 milhão de
+    linhas são gerados e gravados sem montar tudo em memória.
+
+    Args:
+        caminho (str): Arquivo .xlsx de destino.
+        n_linhas (int): Número de linhas de dados.
+        n_funcionarios (int, optional): Número de funcionários (ver `iterar_linhas`).
+        semente (int, optional): Semente do gerador aleatório.
+
+    Returns:
+        str: O próprio `caminho`.
+    """
+    import xlsxwriter
+
+    with xlsxwriter.Workbook(str(caminho), {"constant_memory": True}) as workbook:
+        workbook.add_worksheet("Resumo").write(0, 0, "Relatório de marcações")
+        workbook.add_worksheet("Funcionarios").write(0, 0, "Relatório de funcionários")
+        aba = workbook.add_worksheet("Marcacoes")
+        aba.write_row(0, 0, COLUNAS_PLANILHA)
+        for i in range(1, LINHAS_CABECALHO + 1):
+            aba.write(i, 0, "Relatório")
+        for i, linha in enumerate(iterar_linhas(n_linhas, n_funcionarios, semente), start=LINHAS_CABECALHO + 1):
+            aba.write_row(i, 0, linha)
+    return caminho
@@ -0,0 +1,118 @@
+# pontoknup1028/tarefas.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Execução de operações longas (carregar, calcular, salvar) fora da thread da interface.
+
+A função executada recebe um callback `progresso(feito, total)`. Ele publica o
+andamento numa fila, que a interface consome com `root.after`, e levanta
+`OperacaoCancelada` se o usuário pediu o cancelamento. Assim, a operação para
+no próximo ponto de progresso (a cada bloco de linhas). Não importa tkinter.
+"""
+
+import queue
+import threading
+
+PASSO_PROGRESSO = 5_000  # Linhas entre dois avisos de progresso (e pontos de cancelamento)
+
+# Tipos de evento publicados na fila
+EVENTO_PROGRESSO = "progresso"
+EVENTO_CONCLUIDA = "concluida"
+EVENTO_CANCELADA = "cancelada"
+EVENTO_ERRO = "erro"
+
+
+class OperacaoCancelada(Exception):
+    """Levantada dentro da operação quando o usuário pede o cancelamento."""
+
+
+def avisar_progresso(progresso, feito, total=None):
+    """
+    Chama `progresso(feito, total)` se houver callback.
+
+    Args:
+        progresso (callable or None): Callback recebido pela operação.
+        feito (int): Unidades já processadas (ex: linhas).
+        total (int, optional): Total esperado, se conhecido.
+
+    Raises:
+        OperacaoCancelada: Se o callback sinalizar o cancelamento.
+    """
+    if progresso is not None:
+        progresso(feito, total)
+
+
+class Tarefa:
+    """
+    Executa `funcao(*args, progresso=..., **kwargs)` em uma thread de trabalho.
+
+    Os eventos ficam em `eventos` como tuplas: (EVENTO_PROGRESSO, feito, total),
+    (EVENTO_CONCLUIDA, resultado), (EVENTO_CANCELADA,) ou (EVENTO_ERRO, exceção).
+    Exatamente um evento final é publicado.
+
+    Args:
+        funcao (callable): Operação a executar; deve aceitar o argumento `progresso`.
+        *args: Argumentos posicionais da operação.
+        **kwargs: Argumentos nomeados da operação.
+    """
+
+    def __init__(self, funcao, *args, **kwargs):
+        self.eventos = queue.Queue()
+        self._cancelamento = threading.Event()
+        self._thread = threading.Thread(target=self._executar, args=(funcao, args, kwargs), daemon=True)
+
+    def iniciar(self):
+        """Inicia a thread de trabalho e devolve a própria tarefa."""
+        self._thread.start()
+        return self
+
+    def cancelar(self):
+        """Pede o cancelamento; a operação para no próximo aviso de progresso."""
+        self._cancelamento.set()
+
+    @property
+    def cancelamento_pedido(self):
+        return self._cancelamento.is_set()
+
+    def em_andamento(self):
+        return self._thread.is_alive()
+
+    def aguardar(self, timeout=None):
+        """Espera a thread terminar (usado em scripts e testes)."""
+        self._thread.join(timeout)
+
+    def progresso(self, feito, total=None):
+        """
+        Callback entregue à operação: publica o andamento ou interrompe se cancelada.
+
+        Raises:
+            OperacaoCancelada: Se `cancelar()` já foi chamado.
+        """
+        if self._cancelamento.is_set():
+            raise OperacaoCancelada()
+        self.eventos.put((EVENTO_PROGRESSO, feito, total))
+
+    def eventos_pendentes(self):
+        """
+        Retira da fila, sem bloquear, todos os eventos publicados até agora.
+
+        Returns:
+            list: Eventos na ordem em que foram publicados.
+        """
+        pendentes = []
+        while True:
+            try:
+                pendentes.append(self.eventos.get_nowait())
+            except queue.Empty:
+                return pendentes
+
+    def _executar(self, funcao, args, kwargs):
+        try:
+            resultado = funcao(*args, progresso=self.progresso, **kwargs)
+        except OperacaoCancelada:
+            self.eventos.put((EVENTO_CANCELADA,))
+        except Exception as e:
+            self.eventos.put((EVENTO_ERRO, e))
+        else:
+            self.eventos.put((EVENTO_CONCLUIDA, resultado))
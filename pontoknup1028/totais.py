@@ -0,0 +1,184 @@
+# pontoknup1028/totais.py
+# Copyright (c) 2025 Carlos Alberto Souza Nascimento
+# Licenciado sob a Licença MIT. Veja o arquivo LICENSE para mais detalhes.
+
+"""
+Totais de horas e valores por funcionário.
+
+As colunas de horas do esquema compacto já estão em minutos e são somadas
+direto, em uma só agregação agrupada por ID (categórico). DataFrames com
+textos "HH:MM" continuam aceitos: cada texto distinto é interpretado uma vez.
+"""
+
+import locale
+import re
+
+import numpy as np
+import pandas as pd
+
+from pontoknup1028 import diagnostico
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_HORAS_NORMAIS,
+    COL_VALOR_HORA_EXTRA
+)
+from pontoknup1028.tarefas import avisar_progresso
+
+_RE_DURACAO = re.compile(r"^\s*(-?)(\d+):(\d{2})(?::\d{2})?\s*$")
+AVISOS_PROGRESSO = 100  # Avisos (e pontos de cancelamento) ao montar o resumo por funcionário
+
+# Colunas de `totais_por_id`
+TOTAL_MINUTOS_NORMAIS = "minutos_normais"
+TOTAL_MINUTOS_EXTRAS = "minutos_extras"
+TOTAL_MINUTOS_DEVIDOS = "minutos_devidos"
+TOTAL_VALOR_HORA_EXTRA = "valor_hora_extra"
+
+
+def fmt_td(td):
+    """
+    Formata um Timedelta como "HH:MM" (com sinal se negativo).
+
+    Args:
+        td (pd.Timedelta): Duração a formatar.
+
+    Returns:
+        str: Duração formatada; "00:00" para NaT.
+    """
+    if pd.isna(td): return "00:00"
+    s = int(td.total_seconds())
+    return fmt_minutos(s // 60 if s >= 0 else -(-s // 60))
+
+
+def fmt_minutos(minutos):
+    """
+    Formata um total de minutos como "HH:MM" (com sinal se negativo).
+
+    Args:
+        minutos (int): Total de minutos.
+
+    Returns:
+        str: Duração formatada (as horas podem passar de 24).
+    """
+    sign = "-" if minutos < 0 else ""
+    minutos = abs(int(minutos))
+    return f"{sign}{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def _minutos_da_duracao(valor):
+    """Minutos de um texto "HH:MM"; códigos de erro, vazios e NaN valem 0."""
+    m = _RE_DURACAO.match(str(valor))
+    if not m:
+        return 0
+    minutos = int(m.group(2)) * 60 + int(m.group(3))
+    return -minutos if m.group(1) else minutos
+
+
+def minutos_da_coluna(serie):
+    """
+    Converte uma coluna de durações "HH:MM" em minutos inteiros.
+
+    Args:
+        serie (pd.Series): Coluna com textos "HH:MM", códigos de erro ou vazios.
+
+    Returns:
+        np.ndarray: Minutos (int64) por linha; valores não interpretáveis valem 0.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    tabela = np.fromiter((_minutos_da_duracao(u) for u in unicos), dtype=np.int64, count=len(unicos))
+    return tabela[codigos]
+
+
+def totais_por_id(df):
+    """
+    Soma horas normais, extras, devidas (em minutos) e valor de HE por ID.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho (não é modificado).
+
+    Returns:
+        pd.DataFrame: Uma linha por ID (na ordem em que aparecem), com COL_NOME
+                      (primeiro nome do ID) e as colunas TOTAL_MINUTOS_NORMAIS,
+                      TOTAL_MINUTOS_EXTRAS, TOTAL_MINUTOS_DEVIDOS e
+                      TOTAL_VALOR_HORA_EXTRA. IDs vazios são ignorados.
+    """
+    def coluna_minutos(col):
+        if col not in df.columns: return np.zeros(len(df), dtype=np.int64)
+        if pd.api.types.is_integer_dtype(df[col].dtype):
+            return df[col].to_numpy(dtype=np.int64, na_value=0)
+        return minutos_da_coluna(df[col])
+
+    valor = (pd.to_numeric(df[COL_VALOR_HORA_EXTRA], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+             if COL_VALOR_HORA_EXTRA in df.columns else np.zeros(len(df)))
+    ids = df[COL_ID]
+    base = pd.DataFrame({
+        COL_ID: ids.array,
+        COL_NOME: df[COL_NOME].array,
+        TOTAL_MINUTOS_NORMAIS: coluna_minutos(COL_HORAS_NORMAIS),
+        TOTAL_MINUTOS_EXTRAS: coluna_minutos(COL_HORAS_EXTRAS),
+        TOTAL_MINUTOS_DEVIDOS: coluna_minutos(COL_HORAS_DEVIDAS),
+        TOTAL_VALOR_HORA_EXTRA: valor,
+    })[ids_validos(ids)]
+    totais = base.groupby(COL_ID, sort=False, observed=True).agg({
+        COL_NOME: "first",
+        TOTAL_MINUTOS_NORMAIS: "sum",
+        TOTAL_MINUTOS_EXTRAS: "sum",
+        TOTAL_MINUTOS_DEVIDOS: "sum",
+        TOTAL_VALOR_HORA_EXTRA: "sum",
+    })
+    totais.index = pd.Index(totais.index.tolist(), name=COL_ID, dtype=object)
+    totais[COL_NOME] = totais[COL_NOME].astype(object)
+    return totais
+
+
+def ids_validos(ids):
+    """Máscara das linhas com ID preenchido (não nulo e não em branco)."""
+    if isinstance(ids.dtype, pd.CategoricalDtype):
+        codigos = ids.cat.codes.to_numpy()
+        preenchida = np.asarray(ids.cat.categories.astype(str).str.strip() != "")
+        return (codigos >= 0) & preenchida[codigos]
+    return (ids.notna() & (ids.astype(str).str.strip() != "")).to_numpy()
+
+
+def formatar_totais(linha):
+    """
+    Formata uma linha de `totais_por_id` para exibição.
+
+    Args:
+        linha (pd.Series or dict): Linha com as colunas de `totais_por_id`.
+
+    Returns:
+        dict: "Total Horas Normais", "Total Horas Extras", "Total Horas Devidas"
+              e "Total a Receber Horas Extras" já formatados.
+    """
+    return {
+        "Total Horas Normais": fmt_minutos(linha[TOTAL_MINUTOS_NORMAIS]),
+        "Total Horas Extras": fmt_minutos(linha[TOTAL_MINUTOS_EXTRAS]),
+        "Total Horas Devidas": fmt_minutos(linha[TOTAL_MINUTOS_DEVIDOS]),
+        "Total a Receber Horas Extras": locale.format_string("%.2f", linha[TOTAL_VALOR_HORA_EXTRA], grouping=True)
+    }
+
+
+def calcular_totais_funcionario(df, progresso=None):
+    """
+    Calcula os totais de horas normais, extras, devidas e valor de HE por funcionário.
+
+    Args:
+        df (pd.DataFrame): DataFrame de trabalho (não é modificado).
+        progresso (callable, optional): Recebe (funcionários resumidos, total de
+                                        funcionários) cerca de AVISOS_PROGRESSO vezes;
+                                        pode levantar `OperacaoCancelada`.
+
+    Returns:
+        dict: ID do funcionário -> dicionário com "Nome", "Total Horas Normais",
+              "Total Horas Extras", "Total Horas Devidas" e
+              "Total a Receber Horas Extras" já formatados.
+    """
+    resumo_funcionarios = {}
+    with diagnostico.etapa("totais", len(df)):
+        por_id = totais_por_id(df)
+        passo = max(1, len(por_id) // AVISOS_PROGRESSO)
+        for feitos, (id_func, linha) in enumerate(por_id.iterrows()):
+            if feitos % passo == 0:
+                avisar_progresso(progresso, feitos, len(por_id))
+            resumo_funcionarios[id_func] = {"Nome": linha[COL_NOME], **formatar_totais(linha)}
+        avisar_progresso(progresso, len(por_id), len(por_id))
+    return resumo_funcionarios
@@ -0,0 +1,41 @@
+# tests/conftest.py
+
+import sys
+import os
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+LINHAS_PLANILHA = [
+    # ID, Nome, Área, Data, Entrada, Saída-Almoço, Volta-Almoço, Saída, H.Dev, H.Ext, H.Norm, Nota
+    [1, "João Silva", "Produção", "02/10/2023", "08:00", "12:00", "13:00", "18:00", "", "", "", ""],
+    [1, "João Silva", "Produção", "03/10/2023", "08:00", "12:00", "13:00", "16:00", "", "", "", ""],
+    [2, "Maria Açaí", "Logística", "02/10/2023", "Omissão", "", "", "", "", "", "", ""],
+    [2, "Maria Açaí", "Logística", "03/10/2023", "xx", "12:00", "13:00", "17:00", "", "", "", "obs"],
+]
+
+
+def escrever_planilha_knup(caminho, linhas):
+    """Grava uma planilha no layout do Knup 1028: dados na terceira aba após 4 linhas de cabeçalho."""
+    cabecalho = [["Relatório"] + [""] * 11] * 4
+    aba = pd.DataFrame(cabecalho + linhas, columns=[f"c{i}" for i in range(12)])
+    with pd.ExcelWriter(caminho) as writer:
+        pd.DataFrame({"a": [1]}).to_excel(writer, sheet_name="Resumo", index=False)
+        pd.DataFrame({"a": [1]}).to_excel(writer, sheet_name="Funcionarios", index=False)
+        aba.to_excel(writer, sheet_name="Marcacoes", index=False)
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    caminho = tmp_path / "ponto.xlsx"
+    escrever_planilha_knup(caminho, LINHAS_PLANILHA)
+    return str(caminho)
+
+
+@pytest.fixture(autouse=True)
+def cache_isolado(tmp_path, monkeypatch):
+    """Evita que os testes gravem no cache em disco do usuário."""
+    monkeypatch.delenv("LOCALAPPDATA", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
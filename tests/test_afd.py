@@ -0,0 +1,142 @@
+# tests/test_afd.py
+
+import sys
+import os
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import afd, armazenamento, esquema
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_DATA, COL_NOTA, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COLUNAS_HORARIOS
+)
+from pontoknup1028.lote import listar_planilhas
+
+CABECALHO = "0000000001" + "1" * 222
+
+
+def _marcacao_1510(nsr, data, hora, pis):
+    return f"{nsr:09d}3{data.replace('/', '')}{hora.replace(':', '')}{pis:012d}"
+
+
+def _marcacao_671(nsr, tipo, data_iso, hora, cpf):
+    return f"{nsr:09d}{tipo}{data_iso}T{hora}:00-0300{cpf:012d}ABCD"
+
+
+def _escrever(caminho, linhas):
+    caminho.write_text("\r\n".join([CABECALHO] + linhas + ["999999999" + "0" * 36 + "9"]) + "\r\n",
+                       encoding="latin-1")
+    return str(caminho)
+
+
+def _afd_1510(tmp_path):
+    marcacoes = [
+        ("02102023", ["08:00", "12:00", "13:00", "18:00", "18:00"]),  # Batida repetida no mesmo minuto
+        ("03102023", ["08:00", "16:00"]),
+        ("04102023", ["08:00", "12:00", "13:00"]),
+        ("05102023", ["08:00", "10:00", "10:15", "12:00", "13:00", "17:00"]),
+        ("31022023", ["08:00"]),  # Data inexistente: ignorada
+    ]
+    linhas = [f"{1:09d}5021020230800I{12345678901:012d}{'JOSÉ DA SILVA':52s}"]
+    for data, horas in reversed(marcacoes):  # Fora de ordem no arquivo
+        linhas += [_marcacao_1510(len(linhas) + 1, data, hora, 12345678901) for hora in horas]
+    linhas.append(_marcacao_1510(len(linhas) + 1, "02102023", "22:00", 98765432109))
+    return _escrever(tmp_path / "AFD0001.txt", linhas)
+
+
+def test_afd_1510_agrupa_por_funcionario_e_dia(tmp_path):
+    df = carregar_planilha(_afd_1510(tmp_path), nova_config(horas_normais_h=8.0))
+
+    assert df[COL_ID].tolist() == ["12345678901"] * 4 + ["98765432109"]
+    assert df[COL_NOME].tolist()[:4] == ["JOSÉ DA SILVA"] * 4
+    assert df[COL_DATA].dt.strftime("%d/%m").tolist() == ["02/10", "03/10", "04/10", "05/10", "02/10"]
+    horarios = [list(esquema.textos_coluna(df, col)) for col in COLUNAS_HORARIOS]
+    assert [list(linha) for linha in zip(*horarios)] == [
+        ["08:00", "12:00", "13:00", "18:00"],
+        ["08:00", "", "", "16:00"],
+        ["08:00", "12:00", "13:00", ""],
+        ["08:00", "12:00", "13:00", "17:00"],  # Maior pausa como almoço
+        ["22:00", "", "", ""],
+    ]
+    assert list(esquema.textos_coluna(df, COL_HORAS_EXTRAS))[:2] == ["01:00", "00:00"]
+    # 6 marcações: 08:00-10:00 + 10:15-12:00 + 13:00-17:00 = 7h45
+    assert esquema.textos_coluna(df, COL_HORAS_DEVIDAS)[3] == "00:15"
+    assert df[COL_NOTA].tolist()[3] == "6 marcações"
+    assert "(Horários incompletos)" in esquema.textos_coluna(df, COL_NOTA)[2]
+
+
+def test_afd_em_blocos_de_linhas_equivale_ao_arquivo_inteiro(tmp_path):
+    caminho = _afd_1510(tmp_path)
+    inteiro = carregar_planilha(caminho, nova_config())
+    pd.testing.assert_frame_equal(carregar_planilha(caminho, nova_config(), tamanho_bloco=2), inteiro,
+                                  check_categorical=False)
+
+
+def test_afd_tem_o_esquema_da_planilha(tmp_path, planilha):
+    config = nova_config()
+    df_afd = carregar_planilha(_afd_1510(tmp_path), config)
+    df_excel = carregar_planilha(planilha, config)
+    assert list(df_afd.columns) == list(df_excel.columns)
+    assert df_afd.dtypes.astype(str).equals(df_excel.dtypes.astype(str))
+
+
+def test_afd_671_e_leitura_em_blocos(tmp_path, monkeypatch):
+    linhas = [
+        _marcacao_671(1, "3", "2023-10-02", "22:00", 11122233344),
+        _marcacao_671(2, "7", "2023-10-02", "07:58", 11122233344),
+        _marcacao_671(3, "3", "2023-10-02", "17:00", 11122233344),
+        _marcacao_671(4, "3", "2023-10-02", "xx:00", 11122233344),  # Hora inválida: ignorada
+    ]
+    caminho = _escrever(tmp_path / "AFD0002.txt", linhas)
+    completo = carregar_planilha(caminho, nova_config())
+    assert completo[COL_ID].tolist() == ["11122233344"]
+    assert [esquema.textos_coluna(completo, col)[0] for col in COLUNAS_HORARIOS] == ["07:58", "17:00", "22:00", ""]
+
+    monkeypatch.setattr(afd, "LINHAS_POR_LEITURA", 2)
+    em_blocos = carregar_planilha(caminho, nova_config())
+    assert em_blocos.equals(completo)
+
+
+def test_lote_aceita_afd(tmp_path):
+    _afd_1510(tmp_path)
+    (tmp_path / "escalas.txt").write_text("area;Produção;08:00\n", encoding="utf-8")
+    assert [os.path.basename(c) for c in listar_planilhas([str(tmp_path)])] == ["AFD0001.txt"]
+
+
+def test_afd_no_banco_guarda_os_minutos_somados(tmp_path):
+    caminho = str(tmp_path / "ponto.sqlite3")
+    antigo = armazenamento.abrir_banco(caminho)  # Simula um arquivo da versão 2
+    antigo.execute("ALTER TABLE marcacoes DROP COLUMN minutos_marcacoes")
+    antigo.execute("PRAGMA user_version = 2")
+    antigo.close()
+
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(_afd_1510(tmp_path), config)
+    conexao = armazenamento.abrir_banco(caminho)
+    try:
+        armazenamento.gravar_linhas(conexao, df)
+        lido = armazenamento.carregar_periodo(conexao, config)
+        assert conexao.execute("PRAGMA user_version").fetchone()[0] == armazenamento.VERSAO_ESQUEMA
+    finally:
+        conexao.close()
+    pd.testing.assert_frame_equal(lido, df, check_categorical=False)
+
+
+def test_afd_duas_entradas_no_mesmo_dia_sobrevivem_ao_banco(tmp_path):
+    linhas = [_marcacao_1510(n + 1, "02102023", hora, 12345678901)
+              for n, hora in enumerate(["06:00", "07:00", "19:00", "20:00"])]
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(_escrever(tmp_path / "AFD0003.txt", linhas), config)
+    assert len(df) == 1
+    assert esquema.textos_coluna(df, COL_HORAS_DEVIDAS)[0] == "06:00"  # 07:00-06:00 + 20:00-19:00 = 2h
+
+    conexao = armazenamento.abrir_banco(str(tmp_path / "ponto.sqlite3"))
+    try:
+        assert armazenamento.gravar_linhas(conexao, df) == 1
+        lido = armazenamento.carregar_periodo(conexao, config)
+    finally:
+        conexao.close()
+    pd.testing.assert_frame_equal(lido, df, check_categorical=False)
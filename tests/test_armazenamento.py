@@ -0,0 +1,73 @@
+# tests/test_armazenamento.py
+
+import sys
+import os
+import json
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import armazenamento, esquema
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import PREFERENCIAS_PADRAO, nova_config, ler_config, ler_preferencias, salvar_config
+from pontoknup1028.constantes import COL_ID, COL_AREA, COL_SAIDA, COL_HORAS_EXTRAS
+
+
+@pytest.fixture
+def conexao(tmp_path):
+    conexao = armazenamento.abrir_banco(str(tmp_path / "ponto.sqlite3"))
+    yield conexao
+    conexao.close()
+
+
+def test_gravar_e_carregar_periodo_equivale_a_planilha(planilha, conexao):
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(planilha, config)
+
+    assert armazenamento.gravar_linhas(conexao, df) == 4
+    assert armazenamento.gravar_linhas(conexao, df) == 4  # Reimportar substitui (upsert por ID e Data)
+    assert armazenamento.resumo_banco(conexao) == (4, pd.Timestamp("2023-10-02"), pd.Timestamp("2023-10-03"))
+    pd.testing.assert_frame_equal(armazenamento.carregar_periodo(conexao, config), df, check_categorical=False)
+
+
+def test_filtros_do_periodo(planilha, conexao):
+    config = nova_config(horas_normais_h=8.0)
+    armazenamento.gravar_linhas(conexao, carregar_planilha(planilha, config))
+
+    assert len(armazenamento.carregar_periodo(conexao, config, inicio="2023-10-03")) == 2
+    logistica = armazenamento.carregar_periodo(conexao, config, areas=["Logística"], fim="2023-10-02")
+    assert list(logistica[COL_AREA]) == ["Logística"]
+    # Outra jornada: as horas são recalculadas a partir das marcações gravadas
+    extras = armazenamento.carregar_periodo(conexao, nova_config(horas_normais_h=7.0), ids=["1"])
+    assert list(esquema.textos_coluna(extras, COL_HORAS_EXTRAS)) == ["02:00", "00:00"]
+
+
+def test_atualizar_e_excluir_linhas(planilha, conexao):
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(planilha, config)
+    armazenamento.gravar_linhas(conexao, df)
+
+    chaves = armazenamento.chaves_linhas(df, [0])
+    esquema.atribuir(df, 0, COL_SAIDA, "19:00")
+    esquema.atribuir(df, 0, COL_ID, "7")  # Chave mudou: o registro antigo sai do banco
+    assert armazenamento.atualizar_linhas(conexao, df, [0], chaves) == 1
+    lido = armazenamento.carregar_periodo(conexao, config)
+    assert sorted(lido[COL_ID]) == ["1", "2", "2", "7"]
+    assert esquema.textos_coluna(lido, COL_SAIDA)[-1] == "19:00"
+
+    assert armazenamento.excluir_ids(conexao, ["2"]) == 2
+    assert armazenamento.excluir_linhas(conexao, armazenamento.chaves_linhas(df, [0])) == 1
+    assert armazenamento.resumo_banco(conexao)[0] == 1
+
+
+def test_preferencias_ficam_fora_da_config_de_calculo(tmp_path):
+    caminho = str(tmp_path / "config.json")
+    salvar_config({**nova_config(), "banco_local": True}, caminho)
+
+    assert "banco_local" not in ler_config(caminho)
+    assert ler_preferencias(caminho) == {**PREFERENCIAS_PADRAO, "banco_local": True}
+    with open(caminho, "w") as f:
+        json.dump(nova_config(), f)
+    assert ler_preferencias(caminho)["banco_local"] is False
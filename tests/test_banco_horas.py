@@ -0,0 +1,88 @@
+# tests/test_banco_horas.py
+
+import sys
+import os
+from datetime import timedelta
+
+import openpyxl
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import armazenamento, esquema
+from pontoknup1028.banco_horas import calcular_banco_horas
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import COL_DATA, COL_BANCO_HORAS, COL_HORAS_NORMAIS
+from pontoknup1028.exportacao import salvar_planilha
+
+from conftest import escrever_planilha_knup
+
+LINHAS_MESES = [
+    # Fora de ordem: o saldo segue (ID, Data), não a ordem das linhas
+    ["1", "João Silva", "Produção", "06/11/2023", "08:00", "12:00", "13:00", "15:00", "", "", "", ""],
+    ["1", "João Silva", "Produção", "02/10/2023", "08:00", "12:00", "13:00", "19:00", "", "", "", ""],
+    ["2", "Maria Açaí", "Logística", "02/10/2023", "08:00", "12:00", "13:00", "16:00", "", "", "", ""],
+    ["1", "João Silva", "Produção", "03/10/2023", "08:00", "12:00", "13:00", "18:00", "", "", "", ""],
+    ["1", "João Silva", "Produção", "01/12/2023", "08:00", "12:00", "13:00", "17:00", "", "", "", ""],
+]
+
+
+def _carregar(tmp_path, linhas=LINHAS_MESES):
+    caminho = str(tmp_path / "meses.xlsx")
+    escrever_planilha_knup(caminho, linhas)
+    return carregar_planilha(caminho, nova_config(horas_normais_h=8.0))
+
+
+def test_saldo_acumulado_por_funcionario(tmp_path):
+    df = _carregar(tmp_path)
+    aberturas = calcular_banco_horas(df)
+
+    # João: +2h, +1h em outubro, -2h em novembro; Maria: -1h
+    assert df[COL_BANCO_HORAS].tolist() == [60, 120, -60, 180, 60]
+    assert list(df.columns).index(COL_BANCO_HORAS) == list(df.columns).index(COL_HORAS_NORMAIS) + 1
+    assert list(esquema.textos_coluna(df, COL_BANCO_HORAS)) == ["01:00", "02:00", "-01:00", "03:00", "01:00"]
+    assert aberturas[("1", "2023-11")] == [("2023-10", 180)]
+    assert aberturas[("1", "2023-12")] == [("2023-10", 60)]  # O débito consome o crédito mais antigo
+    assert aberturas[("2", "2023-11")] == [("2023-10", -60)]
+
+
+def test_credito_vence_na_virada_do_mes(planilha):
+    df = carregar_planilha(planilha, nova_config(horas_normais_h=8.0))
+    anteriores = {("1", "2023-09"): [("2023-04", 120), ("2023-08", 60)]}
+
+    novas = calcular_banco_horas(df, validade_meses=6, aberturas=anteriores)
+    # Crédito de abril vence em outubro; sobra 1h de agosto (+1h e -1h no mês)
+    assert df[COL_BANCO_HORAS].tolist()[:2] == [120, 60]
+    assert novas[("1", "2023-11")] == [("2023-08", 60)]
+
+    calcular_banco_horas(df, validade_meses=0, aberturas=anteriores)
+    assert df[COL_BANCO_HORAS].tolist()[:2] == [240, 180]
+
+
+def test_mes_novo_continua_das_aberturas_gravadas(tmp_path):
+    completo = _carregar(tmp_path)
+    calcular_banco_horas(completo)
+
+    conexao = armazenamento.abrir_banco(str(tmp_path / "ponto.sqlite3"))
+    try:
+        outubro = completo[completo[COL_DATA] < "2023-11-01"].copy()
+        armazenamento.gravar_saldos_abertura(conexao, calcular_banco_horas(outubro))
+        novembro = completo[completo[COL_DATA] >= "2023-11-01"].copy()
+        calcular_banco_horas(novembro, aberturas=armazenamento.ler_saldos_abertura(conexao, ids=["1"]))
+    finally:
+        conexao.close()
+
+    assert novembro[COL_BANCO_HORAS].equals(completo.loc[novembro.index, COL_BANCO_HORAS])
+
+
+def test_exporta_saldo_negativo_como_duracao(tmp_path):
+    df = _carregar(tmp_path)
+    calcular_banco_horas(df)
+    destino = tmp_path / "saida.xlsx"
+    salvar_planilha(df, str(destino))
+
+    aba = openpyxl.load_workbook(destino)["Consolidado"]
+    coluna = [c.value for c in aba[1]].index(COL_BANCO_HORAS)
+    celula = aba.cell(row=4, column=coluna + 1)
+    assert celula.value == timedelta(hours=-1)
+    assert celula.number_format == "[hh]:mm;-[hh]:mm"
@@ -0,0 +1,49 @@
+# tests/test_benchmark.py
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028.benchmark import ETAPAS, main
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028 import esquema
+from pontoknup1028.constantes import COL_ENTRADA, COL_NOTA, COL_STATUS, COLUNAS_PLANILHA, STATUS_ERRO_FORMATO
+from pontoknup1028.sintetico import escrever_planilha_sintetica, gerar_linhas
+
+
+def test_gerar_linhas_e_deterministico_e_mistura_casos():
+    linhas = gerar_linhas(2000, semente=7)
+    assert linhas == gerar_linhas(2000, semente=7)
+    assert len(linhas) == 2000 and all(len(linha) == len(COLUNAS_PLANILHA) for linha in linhas)
+
+    entradas = [linha[4] for linha in linhas]
+    assert "Omissão" in entradas
+    assert any(linha[5] == "" and linha[4] not in ("Omissão", "") for linha in linhas)   # sem almoço
+    assert any(linha[5] == "00:00" for linha in linhas)                                  # almoço zerado
+    assert any(linha[4][:2] in ("21", "22") for linha in linhas)                        # turno noturno
+
+
+def test_planilha_sintetica_no_layout_do_carregador(tmp_path):
+    caminho = escrever_planilha_sintetica(str(tmp_path / "sintetica.xlsx"), 500, semente=1)
+    df = carregar_planilha(caminho, nova_config())
+
+    assert len(df) == 500
+    assert (df[COL_STATUS] == STATUS_ERRO_FORMATO).any()
+    assert any("incompletos" in nota for nota in esquema.textos_coluna(df, COL_NOTA))
+    assert df[COL_ENTRADA].isna().any()  # "Omissão" vira marcação vazia
+
+
+def test_benchmark_grava_json_e_compara(tmp_path, capsys):
+    primeiro, segundo = tmp_path / "a.json", tmp_path / "b.json"
+    argumentos = ["--tamanhos", "200", "--pasta", str(tmp_path / "planilhas")]
+    assert main(argumentos + ["--saida", str(primeiro)]) == 0
+    assert main(argumentos + ["--saida", str(segundo), "--comparar", str(primeiro)]) == 0
+
+    resultado = json.loads(segundo.read_text(encoding="utf-8"))
+    assert [r["linhas"] for r in resultado["resultados"]] == [200]
+    assert list(resultado["resultados"][0]["etapas"]) == ETAPAS
+    assert "pandas" in resultado and "commit" in resultado
+    assert "Comparação com" in capsys.readouterr().out
@@ -0,0 +1,75 @@
+# tests/test_cache.py
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import cache
+from pontoknup1028.config import nova_config
+
+
+@pytest.fixture(params=[".parquet", ".pkl"])
+def formato(request, monkeypatch):
+    if request.param == ".parquet":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(cache, "FORMATO_PADRAO", request.param)
+    return request.param
+
+
+def test_segunda_leitura_vem_do_cache(planilha, tmp_path, formato, monkeypatch):
+    pasta = str(tmp_path / "cache")
+    config = nova_config(horas_normais_h=8.0)
+
+    df1, do_cache1 = cache.carregar_planilha_com_cache(planilha, config, pasta)
+    assert not do_cache1
+    assert os.listdir(pasta)[0].endswith(formato)
+
+    def falhar(*args, **kwargs):
+        raise AssertionError("não deveria ler o Excel")
+    monkeypatch.setattr(cache, "carregar_planilha", falhar)
+
+    df2, do_cache2 = cache.carregar_planilha_com_cache(planilha, config, pasta)
+    assert do_cache2
+    pd.testing.assert_frame_equal(df1, df2)
+
+
+def test_chave_muda_com_conteudo_e_config(planilha, tmp_path):
+    chave = cache.chave_cache(planilha, nova_config(horas_normais_h=8.0))
+    assert chave != cache.chave_cache(planilha, nova_config(horas_normais_h=6.0))
+
+    copia = tmp_path / "copia.xlsx"
+    copia.write_bytes(open(planilha, "rb").read())
+    assert chave == cache.chave_cache(str(copia), nova_config(horas_normais_h=8.0))
+    with open(copia, "ab") as f:
+        f.write(b"\0")
+    assert chave != cache.chave_cache(str(copia), nova_config(horas_normais_h=8.0))
+
+
+def test_limite_remove_menos_usadas(tmp_path):
+    pasta = str(tmp_path)
+    df = pd.DataFrame({"a": range(1000)})
+    for i, chave in enumerate(["velha", "usada", "nova"]):
+        cache.guardar(chave, df, pasta)
+        arquivo = next(n for n in os.listdir(pasta) if n.startswith(chave))
+        os.utime(os.path.join(pasta, arquivo), (i, i))
+    cache.obter("velha", pasta)  # passa a ser a mais recente
+
+    tamanho_entrada = cache.tamanho_cache(pasta) // 3
+    removidas = cache.aplicar_limite(pasta, limite_bytes=2 * tamanho_entrada)
+
+    assert removidas == 1
+    assert cache.obter("usada", pasta) is None
+    assert cache.obter("velha", pasta) is not None
+    assert cache.obter("nova", pasta) is not None
+
+
+def test_limpar_cache(tmp_path):
+    pasta = str(tmp_path)
+    cache.guardar("x", pd.DataFrame({"a": [1]}), pasta)
+    assert cache.tamanho_cache(pasta) > 0
+    assert cache.limpar_cache(pasta) == 1
+    assert cache.tamanho_cache(pasta) == 0
@@ -0,0 +1,62 @@
+# tests/test_calendario.py
+
+import sys
+import os
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import calendario
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import COL_DATA, COL_SEMANA, COL_NOTA
+
+
+def test_semana_pela_tabela_fixa():
+    datas = pd.Series(pd.to_datetime(["2023-10-02", "2023-10-07", None, "2023-10-08"]))
+    semana = calendario.semana_das_datas(datas)
+    assert semana.tolist()[:2] == ["Segunda-feira", "Sábado"]
+    assert pd.isna(semana[2]) and semana[3] == "Domingo"
+    assert calendario.nome_dia_semana(pd.Timestamp("2023-10-04")) == "Quarta-feira"
+    assert calendario.nome_dia_semana(pd.NaT) == ""
+
+
+def test_planilha_tem_semana_em_portugues(planilha):
+    df = carregar_planilha(planilha, nova_config())
+    assert set(df[COL_SEMANA].dropna()) <= {"Segunda-feira", "Terça-feira"}
+
+
+def test_ler_feriados(tmp_path):
+    caminho = tmp_path / "feriados.csv"
+    caminho.write_text("# Feriados\n\n12/10/2023;Nossa Senhora Aparecida\n2023-11-02\n12/10/2023;repetido\n",
+                       encoding="utf-8")
+    feriados = calendario.ler_feriados(str(caminho))
+    assert list(feriados.index.strftime("%d/%m")) == ["12/10", "02/11"]
+    assert feriados.tolist() == ["Nossa Senhora Aparecida", ""]
+
+    caminho.write_text("12/10/2023\n31/02/2023\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="linha 2"):
+        calendario.ler_feriados(str(caminho))
+
+    for linha in (";Natal", ",x"):  # Campo da data vazio
+        caminho.write_text(f"12/10/2023\n{linha}\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="linha 2"):
+            calendario.ler_feriados(str(caminho))
+
+
+def test_mascara_e_marcas_fins_de_semana_e_feriados():
+    df = pd.DataFrame({
+        COL_DATA: pd.to_datetime(["2023-10-06", "2023-10-07", "2023-10-12", None]),
+        COL_NOTA: pd.Categorical(["", "obs", "Feriado: Aparecida", ""]),
+    })
+    feriados = pd.Series(["Aparecida"], index=pd.to_datetime(["2023-10-12"]))
+
+    assert calendario.mascara_sem_expediente(df[COL_DATA]).tolist() == [False, True, False, False]
+    mascara = calendario.mascara_sem_expediente(df[COL_DATA], feriados=feriados)
+    assert mascara.tolist() == [False, True, True, False]
+    assert not calendario.mascara_sem_expediente(df[COL_DATA], fins_de_semana=False).any()
+
+    calendario.marcar_sem_expediente(df, df.index[mascara], feriados)
+    assert df[COL_NOTA].tolist() == ["", "obs - Fim de semana", "Feriado: Aparecida", ""]
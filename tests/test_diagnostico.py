@@ -0,0 +1,72 @@
+# tests/test_diagnostico.py
+
+import sys
+import os
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import LINHAS_PLANILHA
+from pontoknup1028 import diagnostico
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.totais import calcular_totais_funcionario
+
+
+@pytest.fixture(autouse=True)
+def instrumentacao_limpa():
+    diagnostico.desativar()
+    diagnostico.limpar()
+    yield
+    diagnostico.desativar()
+    diagnostico.limpar()
+
+
+def test_desativado_nao_registra():
+    with diagnostico.etapa("calculo_horas", 10) as medicao:
+        medicao.linhas = 20
+    assert diagnostico.etapa("outra") is diagnostico.etapa("mais_uma")  # Objeto nulo compartilhado
+    assert diagnostico.registros() == []
+
+
+def test_registro_tem_tempo_linhas_e_erro():
+    diagnostico.ativar()
+    with diagnostico.etapa("filtragem") as medicao:
+        medicao.linhas = 7
+    with pytest.raises(ValueError):
+        with diagnostico.etapa("totais", 3):
+            raise ValueError("falhou")
+
+    primeiro, segundo = diagnostico.registros()
+    assert primeiro["etapa"] == "filtragem" and primeiro["linhas"] == 7
+    assert primeiro["segundos"] >= 0 and primeiro["erro"] is None
+    assert primeiro["pico_memoria_mb"] is None  # Memória só é medida quando pedida
+    assert segundo["erro"] == "ValueError"
+
+
+def test_pico_de_memoria_aninhado_e_log_jsonl(tmp_path):
+    caminho_log = tmp_path / "diagnostico.jsonl"
+    diagnostico.ativar(memoria=True, caminho_log=str(caminho_log))
+    with diagnostico.etapa("externa"):
+        with diagnostico.etapa("interna"):
+            bloco = bytearray(8 * 2**20)
+        del bloco
+
+    interna, externa = diagnostico.registros()
+    assert interna["pico_memoria_mb"] >= 7.9
+    assert externa["pico_memoria_mb"] >= interna["pico_memoria_mb"]  # O pico interno conta para a etapa externa
+    linhas = [json.loads(linha) for linha in caminho_log.read_text(encoding="utf-8").splitlines()]
+    assert [linha["etapa"] for linha in linhas] == ["interna", "externa"]
+
+
+def test_etapas_do_processamento_registradas(planilha):
+    diagnostico.ativar()
+    df = carregar_planilha(planilha, nova_config())
+    calcular_totais_funcionario(df)
+
+    registros = diagnostico.registros()
+    etapas = [r["etapa"] for r in registros]
+    assert etapas == ["leitura_excel", "normalizacao", "calculo_horas", "totais"]
+    assert all(r["linhas"] == len(LINHAS_PLANILHA) for r in registros)
@@ -0,0 +1,87 @@
+# tests/test_edicao.py
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import esquema
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import (
+    COL_ID, COL_AREA, COL_SAIDA, COL_HORAS_EXTRAS, COL_SALARIO_BASE, COL_VALOR_HORA_EXTRA
+)
+from pontoknup1028.edicao import converter_valor, editar_em_massa, linhas_afetadas, linhas_dos_ids
+
+
+def test_edicao_em_massa_recalcula_so_as_linhas(planilha):
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(planilha, config)
+    intocada = df.loc[[2, 3]].copy()
+
+    alteradas = editar_em_massa(df, [0, 1], COL_SAIDA, "19:00", config)
+
+    assert alteradas == [0, 1]
+    assert list(esquema.textos_coluna(df, COL_SAIDA)[:2]) == ["19:00", "19:00"]
+    assert list(esquema.textos_coluna(df, COL_HORAS_EXTRAS)[:2]) == ["02:00", "02:00"]
+    assert df.loc[[2, 3]].equals(intocada)
+
+
+def test_edicao_em_massa_por_ids_e_salario(planilha):
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(planilha, config)
+
+    rotulos = linhas_dos_ids(df, [" 1 "])
+    assert list(rotulos) == list(df.index[df[COL_ID] == "1"])
+
+    editar_em_massa(df, rotulos, COL_SALARIO_BASE, "2200,00", config)
+    assert (df.loc[rotulos, COL_SALARIO_BASE] == 2200.0).all()
+    assert df.loc[rotulos, COL_VALOR_HORA_EXTRA].gt(0).any()
+
+    editar_em_massa(df, rotulos, COL_AREA, "Expedição", config)
+    assert set(df.loc[rotulos, COL_AREA]) == {"Expedição"}
+
+
+def test_salario_em_massa_vale_para_todas_as_linhas_do_id(planilha):
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(planilha, config)
+    do_id = df.index[df[COL_ID] == df.loc[0, COL_ID]]
+    outras = df.loc[~df.index.isin(do_id)].copy()
+    assert len(do_id) > 1
+
+    assert linhas_afetadas(df, [0], COL_SAIDA) == [0]
+    assert linhas_afetadas(df, [0], COL_SALARIO_BASE) == list(do_id)
+    alteradas = editar_em_massa(df, [0], COL_SALARIO_BASE, "2200", config)
+
+    assert alteradas == list(do_id)
+    assert (df.loc[do_id, COL_SALARIO_BASE] == 2200.0).all()
+    assert df.loc[~df.index.isin(do_id)].equals(outras)
+
+
+def test_valor_invalido_nao_altera(planilha):
+    config = nova_config()
+    df = carregar_planilha(planilha, config)
+    original = df.copy()
+
+    with pytest.raises(ValueError):
+        editar_em_massa(df, [0, 1], COL_SAIDA, "25:99", config)
+    with pytest.raises(ValueError):
+        editar_em_massa(df, [0, 1], COL_ID, "9", config)
+    assert df.equals(original)
+    assert editar_em_massa(df, [99], COL_SAIDA, "18:00", config) == []
+
+
+@pytest.mark.parametrize("coluna, texto, esperado", [
+    (COL_SALARIO_BASE, "", np.nan),
+    (COL_SALARIO_BASE, "1500,5", 1500.5),
+    (COL_SAIDA, " 8h00 ", "8h00"),
+])
+def test_converter_valor(coluna, texto, esperado):
+    valor = converter_valor(coluna, texto)
+    if isinstance(esperado, float) and np.isnan(esperado):
+        assert np.isnan(valor)
+    else:
+        assert valor == esperado
@@ -0,0 +1,112 @@
+# tests/test_escalas.py
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import esquema
+from pontoknup1028.calculos import calcular_todas_horas_e_extras, recalcular_configuracao
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import (
+    COL_AREA, COL_HORAS_NORMAIS, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS, COL_VALOR_HORA_EXTRA
+)
+from pontoknup1028.escalas import ler_escalas, minutos_esperados, aplicar_escala, TODOS_OS_DIAS
+from pontoknup1028.sintetico import escrever_planilha_sintetica
+
+
+def _escala(tmp_path, texto):
+    caminho = tmp_path / "escalas.txt"
+    caminho.write_text(texto, encoding="utf-8")
+    return ler_escalas(str(caminho))
+
+
+def test_ler_escalas(tmp_path):
+    escala = _escala(tmp_path, "# Escalas\n\narea;Logística;07:20\nÁREA;producao;8,5;Seg, ter\n"
+                               "id; 7 ;12:00\narea;LOGISTICA;06:00\n")
+    regras = {(t, c, d): m for t, c, d, m in escala.itertuples(index=False)}
+    assert regras == {
+        ("area", "logistica", TODOS_OS_DIAS): 360,  # A última regra repetida vale
+        ("area", "producao", 0): 510,
+        ("area", "producao", 1): 510,
+        ("id", "7", TODOS_OS_DIAS): 720,
+    }
+
+    for linha, erro in [("turno;1;08:00", "Tipo"), ("id;1;25:00", "Jornada"), ("id;1;08:00;sexta,fer", "Dia")]:
+        with pytest.raises(ValueError, match=f"{erro} inválid[oa] na linha 2"):
+            _escala(tmp_path, f"id;1;08:00\n{linha}\n")
+
+
+def test_regra_mais_especifica_vence(tmp_path, planilha):
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(planilha, config)  # João: Produção, Maria: Logística; 02/10 é segunda
+    assert list(minutos_esperados(df, None, config)) == [480] * 4
+
+    escala = _escala(tmp_path, "area;producao;07:00\narea;Produção;06:00;ter\narea;Logística;05:00;seg\n"
+                               "id;2;04:00\n")
+    assert list(minutos_esperados(df, escala, config)) == [420, 360, 240, 240]
+
+    escala = _escala(tmp_path, "area;Logística;05:00;seg\nid;1;04:00;ter\n")
+    assert list(minutos_esperados(df, escala, config)) == [480, 240, 300, 480]
+
+
+def test_aplicar_escala_equivale_a_calcular_com_a_jornada(tmp_path, planilha):
+    config = nova_config(horas_normais_h=8.0)
+    escala = _escala(tmp_path, "area;Produção;07:00\nid;1;09:00;ter\n")
+    df = aplicar_escala(carregar_planilha(planilha, config), escala, config)
+
+    # João: 9h na segunda (2h acima de 7h); 7h na terça (2h abaixo de 9h)
+    assert list(esquema.textos_coluna(df, COL_HORAS_NORMAIS)[:2]) == ["07:00", "09:00"]
+    assert list(esquema.textos_coluna(df, COL_HORAS_EXTRAS)[:2]) == ["02:00", "00:00"]
+    assert list(esquema.textos_coluna(df, COL_HORAS_DEVIDAS)[:2]) == ["00:00", "02:00"]
+
+    completo = carregar_planilha(planilha, config)
+    completo[COL_HORAS_NORMAIS] = df[COL_HORAS_NORMAIS]
+    calcular_todas_horas_e_extras(completo, config)
+    assert completo[[COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS]].equals(df[[COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS]])
+
+
+def test_escala_igual_na_referencia_e_no_vetorizado(tmp_path):
+    caminho = str(tmp_path / "sintetica.xlsx")
+    escrever_planilha_sintetica(caminho, 2_000, n_funcionarios=40)
+    config = nova_config(horas_normais_h=7.5, multiplicador_hora_extra=1.5)
+    escala = _escala(tmp_path, "area;Produção;08:00\narea;Logística;06:00;sex\nid;3;09:12\n")
+    vetorizado = aplicar_escala(carregar_planilha(caminho, config), escala, config)
+    assert (vetorizado[COL_HORAS_NORMAIS] != 450).any()
+
+    referencia = carregar_planilha(caminho, config)
+    referencia[COL_HORAS_NORMAIS] = vetorizado[COL_HORAS_NORMAIS]
+    calcular_todas_horas_e_extras(referencia, config, usar_referencia=True)
+    for col in [COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS]:
+        assert list(esquema.textos_coluna(referencia, col)) == list(esquema.textos_coluna(vetorizado, col)), col
+    np.testing.assert_array_equal(referencia[COL_VALOR_HORA_EXTRA].to_numpy(),
+                                  vetorizado[COL_VALOR_HORA_EXTRA].to_numpy())
+
+
+def test_mudar_jornada_da_configuracao_mantem_a_escala(tmp_path, planilha):
+    config_anterior, config_nova = nova_config(horas_normais_h=8.0), nova_config(horas_normais_h=7.5)
+    escala = _escala(tmp_path, "area;Produção;07:00\n")
+    df = aplicar_escala(carregar_planilha(planilha, config_anterior), escala, config_anterior)
+    recalcular_configuracao(df, config_anterior, config_nova, escala)
+
+    assert list(df[COL_HORAS_NORMAIS]) == [420, 420, 450, 450]
+    esperado = aplicar_escala(carregar_planilha(planilha, config_nova), escala, config_nova)
+    assert df[[COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS]].equals(esperado[[COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS]])
+
+
+def test_aplicar_escala_so_nas_linhas_editadas(tmp_path, planilha):
+    config = nova_config(horas_normais_h=8.0)
+    escala = _escala(tmp_path, "area;Logística;06:00\n")
+    df = aplicar_escala(carregar_planilha(planilha, config), escala, config)
+    antes = df.copy()
+
+    esquema.atribuir(df, 0, COL_AREA, "Logística")
+    esquema.atribuir(df, 1, COL_AREA, "Logística")  # alterada, mas não recalculada
+    aplicar_escala(df, escala, config, rotulos=[0])
+
+    assert df.loc[0, COL_HORAS_NORMAIS] == 360 and df.loc[0, COL_HORAS_EXTRAS] == 180
+    assert df.loc[1, COL_HORAS_NORMAIS] == antes.loc[1, COL_HORAS_NORMAIS]
@@ -0,0 +1,87 @@
+# tests/test_esquema.py
+
+import sys
+import os
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import escrever_planilha_knup
+from pontoknup1028 import esquema
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_AREA, COL_SEMANA, COL_NOTA, COL_ENTRADA, COL_SAIDA,
+    COL_HORAS_EXTRAS, COL_STATUS, STATUS_CALCULADO, STATUS_ERRO_FORMATO, ERRO_FORMATO,
+    MINUTOS_VAZIO, MINUTOS_INVALIDO
+)
+
+
+def test_colunas_tipadas(planilha):
+    df = carregar_planilha(planilha, nova_config(horas_normais_h=8.0))
+
+    for col in [COL_ID, COL_NOME, COL_AREA, COL_SEMANA, COL_NOTA]:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+    assert df[COL_ENTRADA].dtype == "Int16" and df[COL_HORAS_EXTRAS].dtype == "Int16"
+    assert list(df[COL_ENTRADA].iloc[:3]) == [480, 480, pd.NA]
+    assert list(df[COL_STATUS]) == [STATUS_CALCULADO, STATUS_CALCULADO, 0, STATUS_ERRO_FORMATO]
+    assert list(df[COL_NOTA]) == ["", "", "", "obs"]  # A mensagem de erro não é gravada na Nota
+
+
+def test_textos_de_exibicao(planilha):
+    df = carregar_planilha(planilha, nova_config(horas_normais_h=8.0))
+
+    assert list(esquema.textos_coluna(df, COL_ENTRADA)) == ["08:00", "08:00", "", "xx"]  # Texto original preservado
+    assert esquema.textos_coluna(df, COL_HORAS_EXTRAS)[3] == ERRO_FORMATO
+    assert esquema.textos_coluna(df, COL_NOTA)[3] == "obs (Erro: Formato de horário inválido)"
+
+
+def test_atribuir_converte_e_cria_categoria(planilha):
+    df = carregar_planilha(planilha, nova_config(horas_normais_h=8.0))
+
+    esquema.atribuir(df, 0, COL_SAIDA, "19:30")
+    esquema.atribuir(df, 1, COL_SAIDA, "")
+    esquema.atribuir(df, 0, COL_NOME, "Novo Nome")
+    assert df.loc[0, COL_SAIDA] == 19 * 60 + 30 and pd.isna(df.loc[1, COL_SAIDA])
+    assert df.loc[0, COL_NOME] == "Novo Nome" and isinstance(df[COL_NOME].dtype, pd.CategoricalDtype)
+    with pytest.raises(ValueError):
+        esquema.atribuir(df, 0, COL_ENTRADA, "25:00")
+
+
+def test_textos_minutos():
+    minutos = pd.array([0, 65, None, 1439], dtype="Int16")
+    assert list(esquema.textos_minutos(minutos)) == ["00:00", "01:05", "", "23:59"]
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("08:00", 480), ("8:05", 485), (" 8:5 ", 485), ("08h30", 510), ("08:30:00", 510),
+    (time(22, 15), 1335), (datetime(1900, 1, 1, 7, 45), 465), (timedelta(hours=9), 540),
+    (1 / 3, 480), (0.75, 1080),
+    ("", MINUTOS_VAZIO), ("Omissão", MINUTOS_VAZIO), (None, MINUTOS_VAZIO), (float("nan"), MINUTOS_VAZIO),
+    ("24:00", MINUTOS_INVALIDO), ("8:60", MINUTOS_INVALIDO), ("xx", MINUTOS_INVALIDO),
+    (1.5, MINUTOS_INVALIDO), (True, MINUTOS_INVALIDO),
+])
+def test_minutos_do_horario(valor, esperado):
+    assert esquema.minutos_do_horario(valor) == esperado
+
+
+def test_colunas_vetorizadas_equivalem_ao_interpretador():
+    fracoes = pd.Series([1 / 3, None, 0.5, 2.0])
+    assert list(esquema.minutos_das_marcacoes(fracoes)) == [480, MINUTOS_VAZIO, 720, MINUTOS_INVALIDO]
+    datas = pd.Series(pd.to_datetime(["2023-10-02 08:05", None]))
+    assert list(esquema.minutos_das_marcacoes(datas)) == [485, MINUTOS_VAZIO]
+
+
+def test_planilha_com_horas_do_excel(tmp_path):
+    caminho = tmp_path / "horas.xlsx"
+    escrever_planilha_knup(caminho, [
+        [1, "Ana", "RH", "02/10/2023", time(8, 0), time(12, 0), time(13, 0), time(18, 0), "", "", "", ""],
+        [1, "Ana", "RH", "03/10/2023", "08h00", "12:00", "13:00", "19:00:00", "", "", "", ""],
+    ])
+    df = carregar_planilha(str(caminho), nova_config(horas_normais_h=8.0))
+
+    assert list(esquema.textos_coluna(df, COL_HORAS_EXTRAS)) == ["01:00", "02:00"]
+    assert list(esquema.textos_coluna(df, COL_ENTRADA)) == ["08:00", "08:00"]
@@ -0,0 +1,36 @@
+# tests/test_exibicao.py
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028.exibicao import colunas_visiveis, formatar_linhas
+from pontoknup1028.constantes import (
+    COL_ID, COL_DATA, COL_ENTRADA, COL_SALARIO_BASE, COL_NOTA, COL_MINUTOS_TRABALHADOS
+)
+
+
+def test_formatar_linhas():
+    df = pd.DataFrame({
+        COL_ID: ["1", "2"],
+        COL_DATA: [pd.Timestamp("2023-10-02"), pd.NaT],
+        COL_ENTRADA: ["08:00", "  "],
+        COL_SALARIO_BASE: [2200.5, np.nan],
+        COL_NOTA: [np.nan, "obs"],
+        COL_MINUTOS_TRABALHADOS: [480, 0],
+    }, index=[10, 11])
+
+    assert colunas_visiveis(df) == [COL_ID, COL_DATA, COL_ENTRADA, COL_SALARIO_BASE, COL_NOTA]
+    linhas = formatar_linhas(df)
+    assert linhas[0][:3] == ["1", "02/10/2023", "08:00"]
+    assert linhas[0][3].replace(",", "").replace(".", "") in ("220050",)
+    assert linhas[0][4] == ""
+    assert linhas[1] == ["2", "", "", "", "obs"]
+
+
+def test_formatar_linhas_vazio():
+    assert formatar_linhas(pd.DataFrame({COL_ID: []})) == []
@@ -0,0 +1,46 @@
+# tests/test_filtros.py
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028.filtros import IndiceBusca, filtrar, filtrar_com_indice
+from pontoknup1028.constantes import COL_ID, COL_NOME, COL_AREA
+
+
+@pytest.fixture
+def df_pessoas():
+    return pd.DataFrame({
+        COL_ID: ["1", "12", "3", "12", "40"],
+        COL_NOME: ["João Silva", "Maria Açaí", "joana", "Maria Açaí", "Zé Conceição"],
+        COL_AREA: ["Produção", "Logística", "Produção", "Logística", "RH"],
+    })
+
+
+@pytest.mark.parametrize("id_f, nome_f, area_f", [
+    ("", "", ""), ("1", "", ""), ("12", "", ""), ("", "jo", ""), ("", "joão", ""),
+    ("", "acai", ""), ("", "ÇAÍ", ""), ("", "conceicao", ""), ("", "a silva", ""),
+    ("", "xyz", ""), ("", "", "prod"), ("", "", "logistica"), ("1", "maria", "log"),
+    ("", "  silva ", ""), ("4", "zé", "rh"), ("", "silvaa", ""),
+])
+def test_indice_equivale_ao_filtro_simples(df_pessoas, id_f, nome_f, area_f):
+    indice = IndiceBusca(df_pessoas)
+    esperado = filtrar(df_pessoas, id_f, nome_f, area_f)
+    obtido = filtrar_com_indice(df_pessoas, indice, id_f, nome_f, area_f)
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_sem_filtro_nao_copia(df_pessoas):
+    indice = IndiceBusca(df_pessoas)
+    assert filtrar_com_indice(df_pessoas, indice) is df_pessoas
+    assert indice.mascara() is None
+
+
+def test_indice_guarda_so_valores_distintos(df_pessoas):
+    indice = IndiceBusca(df_pessoas)
+    assert indice.n_linhas == 5
+    assert indice.campos[COL_NOME].valores == ["joao silva", "maria acai", "joana", "ze conceicao"]
+    assert list(indice.campos[COL_NOME].codigos) == [0, 1, 2, 1, 3]
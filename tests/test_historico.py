@@ -0,0 +1,95 @@
+# tests/test_historico.py
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import esquema, historico
+from pontoknup1028.calculos import recalcular_linhas
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import COL_ID, COL_SAIDA, COL_HORAS_EXTRAS, COL_NOTA
+
+
+def _editar(df, rotulo, coluna, valor, config):
+    antes = historico.capturar(df, [rotulo])
+    esquema.atribuir(df, rotulo, coluna, valor)
+    recalcular_linhas(df, [rotulo], config)
+    return historico.AlteracaoLinhas(f"Editar {coluna}", antes, df)
+
+
+def test_alteracao_guarda_so_colunas_mudadas_e_desfaz(planilha):
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(planilha, config)
+    original = df.copy()
+
+    pilha = historico.Historico()
+    delta = _editar(df, 0, COL_SAIDA, "19:00", config)
+    pilha.registrar(delta)
+
+    assert COL_SAIDA in delta.antes.columns and COL_HORAS_EXTRAS in delta.antes.columns
+    assert COL_ID not in delta.antes.columns
+    assert delta.rotulos == [0]
+
+    df, _ = pilha.desfazer(df)
+    assert df.equals(original)
+
+    df, _ = pilha.refazer(df)
+    assert esquema.textos_coluna(df, COL_SAIDA)[0] == "19:00"
+
+
+def test_alteracao_com_categoria_nova(planilha):
+    config = nova_config()
+    df = carregar_planilha(planilha, config)
+    original = esquema.textos_coluna(df, COL_NOTA)
+
+    pilha = historico.Historico()
+    pilha.registrar(_editar(df, 1, COL_NOTA, "atestado", config))
+    df, _ = pilha.desfazer(df)
+    assert list(esquema.textos_coluna(df, COL_NOTA)) == list(original)
+    df, _ = pilha.refazer(df)
+    assert esquema.textos_coluna(df, COL_NOTA)[1] == "atestado"
+
+
+def test_remocao_reinsere_nas_posicoes_originais(planilha):
+    config = nova_config()
+    df = carregar_planilha(planilha, config)
+    original = df.copy()
+
+    novo, delta = historico.remover_linhas(df, [0, 2], "Remover")
+    assert len(novo) == len(df) - 2 and list(novo.index) == [1, 3]
+    assert list(delta.posicoes) == [0, 2]
+
+    pilha = historico.Historico()
+    pilha.registrar(delta)
+    restaurado, _ = pilha.desfazer(novo)
+    assert restaurado.equals(original)
+
+    refeito, _ = pilha.refazer(restaurado)
+    assert refeito.equals(novo)
+
+
+def test_nova_acao_descarta_refazer_e_respeita_limite(planilha):
+    config = nova_config()
+    df = carregar_planilha(planilha, config)
+
+    pilha = historico.Historico(limite=2)
+    for nota in ("a", "b", "c"):
+        pilha.registrar(_editar(df, 0, COL_NOTA, nota, config))
+    df, _ = pilha.desfazer(df)
+    df, _ = pilha.desfazer(df)
+    assert not pilha.pode_desfazer()
+    assert esquema.textos_coluna(df, COL_NOTA)[0] == "a"
+
+    pilha.registrar(_editar(df, 0, COL_NOTA, "d", config))
+    assert not pilha.pode_refazer()
+
+    pilha.registrar(_editar(df, 0, COL_NOTA, "d", config))  # Sem mudança: ignorada
+    assert pilha.proxima_desfazer().descricao == f"Editar {COL_NOTA}"
+    pilha.limpar()
+    assert not pilha.pode_desfazer() and not pilha.pode_refazer()
+    with pytest.raises(IndexError):
+        pilha.desfazer(df)
@@ -0,0 +1,97 @@
+# tests/test_lote.py
+
+import io
+import sys
+import os
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import LINHAS_PLANILHA, escrever_planilha_knup
+from pontoknup1028.lote import listar_planilhas, caminho_saida, caminhos_saida, processar_lote, main
+from pontoknup1028.config import nova_config
+
+
+def test_listar_planilhas_ignora_temporarios_e_saidas(tmp_path):
+    for nome in ["a.xlsx", "b.xls", "~$a.xlsx", "a_calculado.xlsx", "notas.txt"]:
+        (tmp_path / nome).write_bytes(b"")
+    encontrados = [os.path.basename(c) for c in listar_planilhas([str(tmp_path)])]
+    assert encontrados == ["a.xlsx", "b.xls"]
+    assert listar_planilhas([str(tmp_path / "*.xls")]) == [str(tmp_path / "b.xls")]
+
+
+def test_caminho_saida(tmp_path):
+    assert caminho_saida("/dados/site1.xlsx") == os.path.join("/dados", "site1_calculado.xlsx")
+    assert caminho_saida("/dados/site1.xls", str(tmp_path)) == str(tmp_path / "site1_calculado.xlsx")
+
+
+def test_saidas_de_entradas_com_mesmo_nome_nao_se_sobrepoem(tmp_path):
+    entradas = []
+    for mes in ["jan", "fev"]:
+        (tmp_path / mes).mkdir()
+        escrever_planilha_knup(tmp_path / mes / "ponto.xlsx", LINHAS_PLANILHA[:2] if mes == "jan" else LINHAS_PLANILHA)
+        entradas.append(str(tmp_path / mes / "ponto.xlsx"))
+    saida = tmp_path / "saida"
+
+    destinos = caminhos_saida(entradas, str(saida))
+    assert destinos == {entradas[0]: str(saida / "jan_ponto_calculado.xlsx"),
+                        entradas[1]: str(saida / "fev_ponto_calculado.xlsx")}
+    assert caminhos_saida(entradas) == {c: caminho_saida(c) for c in entradas}  # Cada uma na sua pasta
+
+    assert processar_lote(entradas, nova_config(), str(saida), processos=2, saida=io.StringIO()) == {}
+    assert len(pd.read_excel(saida / "jan_ponto_calculado.xlsx", sheet_name="Consolidado")) == 2
+    assert len(pd.read_excel(saida / "fev_ponto_calculado.xlsx", sheet_name="Consolidado")) == len(LINHAS_PLANILHA)
+
+    (tmp_path / "jan" / "ponto.xls").write_bytes(b"")  # Mesma pasta e mesmo nome: não há como separar
+    with pytest.raises(ValueError):
+        caminhos_saida([str(tmp_path / "jan" / "ponto.xls"), entradas[0]])
+    assert main([str(tmp_path / "jan" / "ponto.*"), "--processos", "1"]) == 2
+
+
+def test_processar_lote_gera_uma_saida_por_entrada(tmp_path):
+    entradas = []
+    for site in ["site1", "site2"]:
+        caminho = tmp_path / f"{site}.xlsx"
+        escrever_planilha_knup(caminho, LINHAS_PLANILHA)
+        entradas.append(str(caminho))
+    corrompida = tmp_path / "site3.xlsx"
+    corrompida.write_bytes(b"isto nao e um xlsx")
+    entradas.append(str(corrompida))
+
+    relatorio = io.StringIO()
+    falhas = processar_lote(entradas, nova_config(), str(tmp_path / "saida"), processos=2, saida=relatorio)
+
+    assert list(falhas) == [str(corrompida)]
+    for site in ["site1", "site2"]:
+        consolidado = pd.read_excel(tmp_path / "saida" / f"{site}_calculado.xlsx", sheet_name="Consolidado")
+        assert len(consolidado) == len(LINHAS_PLANILHA)
+    assert "2 de 3 arquivo(s)" in relatorio.getvalue()
+
+
+def test_main_codigos_de_saida(tmp_path, capsys):
+    escrever_planilha_knup(tmp_path / "ok.xlsx", LINHAS_PLANILHA)
+    assert main([str(tmp_path), "--processos", "1", "--horas-normais", "8"]) == 0
+    assert (tmp_path / "ok_calculado.xlsx").exists()
+
+    (tmp_path / "ruim.xlsx").write_bytes(b"")
+    assert main([str(tmp_path), "--processos", "1"]) == 1
+    assert main([str(tmp_path / "vazia")]) == 2
+
+    assert main([str(tmp_path), "--config", str(tmp_path / "nao_existe.json")]) == 2
+    (tmp_path / "config.json").write_text("{horas", encoding="utf-8")
+    assert main([str(tmp_path), "--config", str(tmp_path / "config.json")]) == 2
+    assert "Configuração inválida" in capsys.readouterr().err
+
+
+def test_main_com_escalas(tmp_path):
+    escrever_planilha_knup(tmp_path / "ok.xlsx", LINHAS_PLANILHA)
+    escalas = tmp_path / "escalas.txt"
+    escalas.write_text("area;Produção;07:00\n", encoding="utf-8")
+    assert main([str(tmp_path / "ok.xlsx"), "--processos", "1", "--horas-normais", "8", "--escalas", str(escalas)]) == 0
+    saida = pd.read_excel(tmp_path / "ok_calculado.xlsx", sheet_name=0, dtype=str)
+    assert saida["Horas Normais"].tolist() == ["7:00:00", "7:00:00", "8:00:00", "8:00:00"]
+
+    escalas.write_text("turno;1;08:00\n", encoding="utf-8")
+    assert main([str(tmp_path / "ok.xlsx"), "--escalas", str(escalas)]) == 2
@@ -0,0 +1,86 @@
+# tests/test_marcacoes.py
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pontoknup1028 import esquema
+from pontoknup1028.calculos import calcular_todas_horas_e_extras
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import (
+    COL_ENTRADA, COL_HORAS_EXTRAS, COL_MINUTOS_MARCACOES, COL_STATUS, STATUS_CALCULADO
+)
+from pontoknup1028.marcacoes import ordenar_marcacoes, separar_jornadas, parear_marcacoes, SEM_MARCACAO
+
+
+def _minutos(horario):
+    horas, minutos = horario.split(":")
+    return int(horas) * 60 + int(minutos)
+
+
+def _jornadas(marcacoes):
+    """Marcações [(pessoa, dia, "HH:MM")] -> (dia da jornada, quantidade, trabalhado, visão em texto)."""
+    pessoa = np.array([p for p, _, _ in marcacoes], dtype=np.int64)
+    dia = np.array([d for _, d, _ in marcacoes], dtype=np.int32)
+    minuto = np.array([_minutos(h) for _, _, h in marcacoes], dtype=np.int16)
+    pessoa, dia, minuto = ordenar_marcacoes(pessoa, dia, minuto)
+    inicio = separar_jornadas(pessoa, dia, minuto)
+    quantidade, trabalhado, visao = parear_marcacoes(minuto, inicio)
+    textos = [["" if m == SEM_MARCACAO else f"{m // 60:02d}:{m % 60:02d}" for m in linha] for linha in visao]
+    return list(dia[inicio]), list(quantidade), list(trabalhado), textos
+
+
+def test_pareia_qualquer_quantidade_de_marcacoes():
+    dias, quantidade, trabalhado, visao = _jornadas([
+        (1, 0, "13:00"), (1, 0, "08:00"), (1, 0, "10:15"), (1, 0, "17:00"), (1, 0, "12:00"), (1, 0, "10:00"),
+        (1, 0, "12:00"),  # Repetida
+        (1, 1, "08:00"), (1, 1, "12:00"), (1, 1, "13:00"),
+        (2, 0, "09:00"), (2, 0, "15:00"),
+    ])
+    assert dias == [0, 1, 0]
+    assert quantidade == [6, 3, 2]
+    assert trabalhado == [465, SEM_MARCACAO, 360]
+    assert visao == [["08:00", "12:00", "13:00", "17:00"], ["08:00", "12:00", "13:00", ""], ["09:00", "", "", "15:00"]]
+
+
+def test_turno_noturno_fica_na_jornada_do_dia_de_entrada():
+    dias, quantidade, trabalhado, visao = _jornadas([
+        (1, 0, "22:00"), (1, 1, "02:00"), (1, 1, "03:00"), (1, 1, "06:00"),  # Pausa depois da meia-noite
+        (1, 1, "22:00"), (1, 2, "06:00"),
+        (2, 0, "07:00"), (2, 0, "19:00"), (2, 1, "07:00"), (2, 1, "19:00"),  # 12h sem almoço, todo dia
+        (3, 0, "19:00"), (3, 1, "07:00"), (3, 1, "19:00"), (3, 2, "07:00"),  # 12h noturno, descanso de 12h
+        (4, 0, "22:00"), (4, 0, "23:30"), (4, 1, "00:30"), (4, 1, "06:00"),  # Pausa atravessa a meia-noite
+    ])
+    assert dias == [0, 1, 0, 1, 0, 1, 0]
+    assert trabalhado == [420, 480, 720, 720, 720, 720, 420]
+    assert visao[0] == ["22:00", "02:00", "03:00", "06:00"]
+    assert visao[-1] == ["22:00", "23:30", "00:30", "06:00"]
+
+
+def test_minutos_somados_valem_no_calculo_ate_a_edicao(planilha):
+    config = nova_config(horas_normais_h=8.0)
+    df = carregar_planilha(planilha, config)
+    assert df[COL_MINUTOS_MARCACOES].isna().all()  # Planilha: calculada pelas quatro colunas
+
+    df[COL_MINUTOS_MARCACOES] = esquema._array_minutos(np.array([600, 0, 0, 0]), np.array([False, True, True, True]))
+    calcular_todas_horas_e_extras(df, config)
+    assert df.loc[0, COL_STATUS] == STATUS_CALCULADO
+    assert list(esquema.textos_coluna(df, COL_HORAS_EXTRAS)[:2]) == ["02:00", "00:00"]
+
+    esquema.atribuir(df, 0, COL_ENTRADA, "08:00")
+    assert df[COL_MINUTOS_MARCACOES].isna().all()
+
+
+def test_jornadas_que_comecam_no_mesmo_dia_viram_uma_so():
+    dias, quantidade, trabalhado, visao = _jornadas([
+        (1, 0, "06:00"), (1, 0, "07:00"), (1, 0, "19:00"), (1, 0, "20:00"),  # Descanso de 12h no mesmo dia
+        (1, 1, "19:00"), (1, 2, "07:00"),
+    ])
+    assert dias == [0, 1]
+    assert quantidade == [4, 2]
+    assert trabalhado == [120, 720]
+    assert visao[0] == ["06:00", "07:00", "19:00", "20:00"]
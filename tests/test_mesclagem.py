@@ -0,0 +1,82 @@
+# tests/test_mesclagem.py
+
+import sys
+import os
+
+import openpyxl
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import LINHAS_PLANILHA, escrever_planilha_knup
+from pontoknup1028 import esquema
+from pontoknup1028.carregamento import carregar_planilha, ler_planilha_normalizada
+from pontoknup1028.config import nova_config
+from pontoknup1028.constantes import COL_ID, COL_DATA, COL_HORAS_EXTRAS
+from pontoknup1028.lote import main
+from pontoknup1028.mesclagem import juntar_planilhas, _Juncao
+
+# Segundo mês: repete (1, 03/10) com outra saída e acrescenta um funcionário
+LINHAS_SEGUNDO_ARQUIVO = [
+    [1, "João Silva", "Produção", "03/10/2023", "08:00", "12:00", "13:00", "19:00", "", "", "", ""],
+    [3, "Ana Lima", "RH", "04/10/2023", "08:00", "", "", "17:00", "", "", "", ""],
+]
+
+
+@pytest.fixture
+def planilhas(tmp_path):
+    caminhos = [str(tmp_path / "2023-10a.xlsx"), str(tmp_path / "2023-10b.xlsx")]
+    escrever_planilha_knup(caminhos[0], LINHAS_PLANILHA)
+    escrever_planilha_knup(caminhos[1], LINHAS_SEGUNDO_ARQUIVO)
+    return caminhos
+
+
+def test_ultimo_arquivo_vence(planilhas):
+    config = nova_config(horas_normais_h=8.0)
+    df = juntar_planilhas(planilhas, config)
+
+    chaves = list(zip(df[COL_ID], df[COL_DATA].dt.strftime("%d/%m")))
+    assert chaves == [("1", "02/10"), ("2", "02/10"), ("2", "03/10"), ("1", "03/10"), ("3", "04/10")]
+    assert esquema.textos_coluna(df, COL_HORAS_EXTRAS)[3] == "02:00"  # Saída 19:00 do segundo arquivo
+    # Invertendo a ordem, vale o primeiro arquivo (saída 16:00: nenhuma hora extra)
+    invertido = juntar_planilhas(planilhas[::-1], config)
+    linha = invertido[(invertido[COL_ID] == "1") & (invertido[COL_DATA] == "2023-10-03")]
+    assert list(esquema.textos_coluna(linha, COL_HORAS_EXTRAS)) == ["00:00"]
+
+
+def test_um_arquivo_equivale_a_carregar_planilha(planilhas):
+    config = nova_config(horas_normais_h=8.0)
+    pd.testing.assert_frame_equal(juntar_planilhas(planilhas[:1], config), carregar_planilha(planilhas[0], config))
+
+
+def test_threads_e_processos_dao_o_mesmo_resultado(planilhas):
+    config = nova_config(horas_normais_h=8.0)
+    pd.testing.assert_frame_equal(juntar_planilhas(planilhas, config, processos=2, em_processos=True),
+                                  juntar_planilhas(planilhas, config, processos=2))
+
+
+def test_juncao_independe_da_ordem_em_que_as_leituras_terminam(planilhas, tmp_path):
+    terceiro = str(tmp_path / "2023-10c.xlsx")
+    escrever_planilha_knup(terceiro, [LINHAS_SEGUNDO_ARQUIVO[0][:7] + ["18:00"] + [""] * 4, LINHAS_PLANILHA[0]])
+    config = nova_config(horas_normais_h=8.0)
+    frames = [ler_planilha_normalizada(caminho, config) for caminho in planilhas + [terceiro]]
+
+    resultados = []
+    for ordem in ([0, 1, 2], [2, 1, 0], [1, 2, 0], [0, 2, 1]):
+        juncao = _Juncao()
+        for posicao in ordem:
+            juncao.acrescentar(posicao, frames[posicao])
+        resultados.append(juncao.resultado())
+    for resultado in resultados[1:]:
+        pd.testing.assert_frame_equal(resultado, resultados[0])
+    # (1, 03/10) e (1, 02/10) ficam só no terceiro arquivo
+    assert len(resultados[0]) == 5 and list(resultados[0][COL_ID])[-2:] == ["1", "1"]
+
+
+def test_lote_juntar(planilhas, tmp_path):
+    destino = tmp_path / "trimestre.xlsx"
+    assert main([os.path.dirname(planilhas[0]), "--juntar", str(destino), "--processos", "2"]) == 0
+    workbook = openpyxl.load_workbook(destino, read_only=True)
+    assert workbook.sheetnames == ["Consolidado", "João Silva", "Maria Açaí", "Ana Lima"]
+    workbook.close()
@@ -0,0 +1,150 @@
+# tests/test_nucleo.py
+
+import subprocess
+import sys
+import os
+from datetime import datetime, timedelta
+
+import openpyxl
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import LINHAS_PLANILHA, escrever_planilha_knup
+import pontoknup1028
+from pontoknup1028 import esquema
+from pontoknup1028.calculos import calcular_todas_horas_e_extras
+from pontoknup1028.carregamento import carregar_planilha, carregar_planilha_em_blocos, normalizar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.exportacao import salvar_planilha
+from pontoknup1028.filtros import filtrar
+from pontoknup1028.totais import (
+    calcular_totais_funcionario, totais_por_id, TOTAL_MINUTOS_DEVIDOS, TOTAL_MINUTOS_EXTRAS,
+    TOTAL_MINUTOS_NORMAIS
+)
+from pontoknup1028.constantes import (
+    COL_ID, COL_NOME, COL_DATA, COL_SEMANA, COL_HORAS_DEVIDAS, COL_HORAS_EXTRAS,
+    COL_HORAS_NORMAIS, COL_SALARIO_BASE, ORDEM_COLUNAS, COLUNAS_INTERNAS, ERRO_FORMATO
+)
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_importar_nucleo_nao_carrega_tkinter():
+    codigo = ("import sys; import pontoknup1028; assert 'pandas' not in sys.modules; "
+              "import pontoknup1028.carregamento, pontoknup1028.exportacao, pontoknup1028.totais; "
+              "assert 'tkinter' not in sys.modules")
+    subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True)
+
+
+def test_exportacoes_sob_demanda():
+    assert pontoknup1028.carregar_planilha is carregar_planilha
+    with pytest.raises(AttributeError):
+        pontoknup1028.nao_existe
+
+
+def test_carregar_planilha(planilha):
+    df = carregar_planilha(planilha, nova_config(horas_normais_h=8.0))
+
+    assert list(df.columns) == ORDEM_COLUNAS + COLUNAS_INTERNAS
+    assert len(df) == 4
+    assert list(df[COL_ID]) == ["1", "1", "2", "2"]
+    assert df[COL_DATA].iloc[0] == pd.Timestamp("2023-10-02")
+    assert df[COL_SEMANA].notna().all()
+    assert (df[COL_HORAS_NORMAIS] == 480).all()
+    assert list(esquema.textos_coluna(df, COL_HORAS_EXTRAS)) == ["01:00", "00:00", "", ERRO_FORMATO]
+    assert list(esquema.textos_coluna(df, COL_HORAS_DEVIDAS)) == ["00:00", "01:00", "", ERRO_FORMATO]
+
+
+def test_leitura_em_streaming_equivale_a_read_excel(planilha, tmp_path):
+    config = nova_config(horas_normais_h=8.0)
+    esperado = calcular_todas_horas_e_extras(normalizar_planilha(pd.read_excel(planilha, sheet_name=2), config), config)
+    pd.testing.assert_frame_equal(carregar_planilha(planilha, config), esperado)
+
+    # Células vazias, inclusive o ID, chegam do openpyxl como None
+    sem_id = str(tmp_path / "sem_id.xlsx")
+    escrever_planilha_knup(sem_id, LINHAS_PLANILHA + [["", "Sem ID", "", "04/10/2023", "08:00", "", "", "17:00",
+                                                       "", "", "", ""]])
+    esperado = calcular_todas_horas_e_extras(normalizar_planilha(pd.read_excel(sem_id, sheet_name=2), config), config)
+    pd.testing.assert_frame_equal(carregar_planilha(sem_id, config), esperado)
+
+
+def test_leitura_em_blocos(planilha):
+    config = nova_config(horas_normais_h=8.0)
+    blocos = list(carregar_planilha_em_blocos(planilha, config, tamanho_bloco=3))
+
+    assert [len(b) for b in blocos] == [3, 1]
+    assert list(blocos[1].index) == [3]
+    pd.testing.assert_frame_equal(esquema.unificar_categorias(blocos), carregar_planilha(planilha, config))
+
+
+def test_totais_por_funcionario(planilha):
+    df = carregar_planilha(planilha, nova_config(horas_normais_h=8.0))
+    df[COL_SALARIO_BASE] = 2200.0
+    resumo = calcular_totais_funcionario(df)
+
+    assert list(resumo) == ["1", "2"]
+    assert resumo["1"]["Nome"] == "João Silva"
+    assert resumo["1"]["Total Horas Normais"] == "16:00"
+    assert resumo["1"]["Total Horas Extras"] == "01:00"
+    assert resumo["1"]["Total Horas Devidas"] == "01:00"
+    assert resumo["2"]["Total Horas Extras"] == "00:00"
+
+
+def test_totais_agrupam_por_id_e_nao_alteram_df(planilha):
+    df = carregar_planilha(planilha, nova_config(horas_normais_h=8.0))
+    df.loc[2, COL_NOME] = "João Silva"  # homônimo com outro ID
+    antes = df.copy()
+    tabela = totais_por_id(df)
+
+    pd.testing.assert_frame_equal(df, antes)
+    assert list(tabela.index) == ["1", "2"]
+    assert list(tabela[TOTAL_MINUTOS_EXTRAS]) == [60, 0]
+    assert list(tabela[TOTAL_MINUTOS_DEVIDOS]) == [60, 0]
+    assert list(tabela[TOTAL_MINUTOS_NORMAIS]) == [960, 960]
+
+
+def test_filtrar_ignora_acentos(planilha):
+    df = carregar_planilha(planilha, nova_config())
+    assert set(filtrar(df, nome_f="acai")[COL_NOME]) == {"Maria Açaí"}
+    assert set(filtrar(df, area_f="PRODUÇÃO")[COL_NOME]) == {"João Silva"}
+    assert filtrar(df, id_f="9").empty
+
+
+def test_salvar_planilha(planilha, tmp_path):
+    df = carregar_planilha(planilha, nova_config())
+    destino = tmp_path / "saida.xlsx"
+    salvar_planilha(df, str(destino))
+
+    abas = pd.read_excel(destino, sheet_name=None)
+    assert list(abas) == ["Consolidado", "João Silva", "Maria Açaí"]
+    assert list(abas["Consolidado"].columns) == ORDEM_COLUNAS
+    assert len(abas["Consolidado"]) == 4
+    assert list(abas["João Silva"][COL_ID].dropna().astype(str)) == ["1", "1", "Totais"]
+
+
+def test_salvar_planilha_celulas_nativas_e_totais(planilha, tmp_path):
+    df = carregar_planilha(planilha, nova_config(horas_normais_h=8.0))
+    df[COL_SALARIO_BASE] = 2200.0
+    destino = tmp_path / "saida.xlsx"
+    salvar_planilha(df, str(destino))
+
+    aba = openpyxl.load_workbook(destino)["João Silva"]
+    assert aba["D2"].value == datetime(2023, 10, 2)
+    assert aba["D2"].number_format == "dd/mm/yyyy"
+    assert aba["K2"].value == timedelta(hours=1)
+    assert aba["M2"].value == 2200
+    assert aba["M2"].number_format == "#,##0.00"
+    assert aba["A5"].value == "Totais"
+    assert (aba["J5"].value, aba["K5"].value, aba["L5"].value) == (
+        timedelta(hours=1), timedelta(hours=1), timedelta(hours=16))
+
+
+def test_salvar_planilha_homonimos_em_abas_separadas(planilha, tmp_path):
+    df = carregar_planilha(planilha, nova_config())
+    df[COL_NOME] = "Fulano"
+    destino = tmp_path / "saida.xlsx"
+    salvar_planilha(df, str(destino))
+
+    assert openpyxl.load_workbook(destino).sheetnames == ["Consolidado", "Fulano", "Fulano (2)"]
@@ -0,0 +1,103 @@
+# tests/test_tarefas.py
+
+import sys
+import os
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from conftest import LINHAS_PLANILHA, escrever_planilha_knup
+from pontoknup1028.carregamento import carregar_planilha
+from pontoknup1028.config import nova_config
+from pontoknup1028.exportacao import salvar_planilha
+from pontoknup1028.totais import calcular_totais_funcionario
+from pontoknup1028 import tarefas
+from pontoknup1028.tarefas import OperacaoCancelada, Tarefa, PASSO_PROGRESSO
+
+
+def executar(tarefa):
+    tarefa.iniciar().aguardar(30)
+    return tarefa.eventos_pendentes()
+
+
+def test_tarefa_publica_progresso_e_resultado():
+    def operacao(n, progresso=None):
+        for i in range(n):
+            progresso(i, n)
+        return "ok"
+
+    eventos = executar(Tarefa(operacao, 3))
+    assert eventos == [("progresso", 0, 3), ("progresso", 1, 3), ("progresso", 2, 3), ("concluida", "ok")]
+
+
+def test_tarefa_repassa_erro():
+    def operacao(progresso=None):
+        raise ValueError("falhou")
+
+    (evento,) = executar(Tarefa(operacao))
+    assert evento[0] == tarefas.EVENTO_ERRO
+    assert str(evento[1]) == "falhou"
+
+
+def test_cancelamento_para_no_proximo_progresso():
+    liberar = threading.Event()
+    passos = []
+
+    def operacao(progresso=None):
+        progresso(0)
+        liberar.wait(5)
+        passos.append("depois")
+        progresso(1)
+        passos.append("nao deveria chegar")
+
+    tarefa = Tarefa(operacao).iniciar()
+    tarefa.cancelar()
+    liberar.set()
+    tarefa.aguardar(5)
+    eventos = tarefa.eventos_pendentes()
+    assert eventos[-1] == (tarefas.EVENTO_CANCELADA,)
+    assert "nao deveria chegar" not in passos
+
+
+def test_carregar_planilha_avisa_progresso_e_cancela(tmp_path):
+    caminho = str(tmp_path / "grande.xlsx")
+    escrever_planilha_knup(caminho, LINHAS_PLANILHA * (PASSO_PROGRESSO // 2))
+    avisos = []
+    df = carregar_planilha(caminho, nova_config(), progresso=lambda feito, total: avisos.append((feito, total)))
+    assert len(df) == 2 * PASSO_PROGRESSO
+    assert avisos == [(PASSO_PROGRESSO, 2 * PASSO_PROGRESSO), (2 * PASSO_PROGRESSO, 2 * PASSO_PROGRESSO)]
+
+    def cancelar(feito, total):
+        raise OperacaoCancelada()
+
+    with pytest.raises(OperacaoCancelada):
+        carregar_planilha(caminho, nova_config(), progresso=cancelar)
+
+
+def test_salvar_cancelado_nao_altera_destino(planilha, tmp_path):
+    df = carregar_planilha(planilha, nova_config())
+    destino = tmp_path / "saida.xlsx"
+    destino.write_bytes(b"anterior")
+
+    def cancelar(feito, total):
+        raise OperacaoCancelada()
+
+    with pytest.raises(OperacaoCancelada):
+        salvar_planilha(df, str(destino), progresso=cancelar)
+    assert destino.read_bytes() == b"anterior"
+    assert sorted(os.listdir(tmp_path)) == ["ponto.xlsx", "saida.xlsx"]
+
+
+def test_totais_avisam_progresso_e_cancelam(planilha):
+    df = carregar_planilha(planilha, nova_config())
+    avisos = []
+    resumo = calcular_totais_funcionario(df, progresso=lambda feito, total: avisos.append((feito, total)))
+    assert avisos == [(0, 2), (1, 2), (2, 2)] and len(resumo) == 2
+
+    def cancelar(feito, total):
+        raise OperacaoCancelada()
+
+    with pytest.raises(OperacaoCancelada):
+        calcular_totais_funcionario(df, progresso=cancelar)